@@ -5,7 +5,24 @@ WebFetcher - 智能网页内容抓取工具
 
 __version__ = "1.0.0"
 
+import importlib
+
 # 导出 CLI 的 main 函数，用于 [project.scripts] 注册
 from .cli import main
 
-__all__ = ['main', '__version__']
+# asyncio API loads on first access (keeps asyncio out of CLI startup)
+_LAZY_EXPORTS = {
+    'afetch': '.async_fetch',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ['main', '__version__', 'afetch']
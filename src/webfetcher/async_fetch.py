@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Asyncio Fetch API
+异步抓取接口
+
+``afetch()`` is the asyncio-native counterpart of
+``core.fetch_html_with_retry()`` for services that embed webfetcher in an
+event loop: same routing decisions, same classifier-driven retry policy,
+same urllib -> CDP -> Selenium -> manual Chrome fallback chain and the same
+``(html, FetchMetrics, url_metadata)`` result.
+``afetch()`` 是 ``fetch_html_with_retry()`` 的 asyncio 版本：路由、基于错误分类的
+重试策略、降级链与返回值均保持一致。
+
+The urllib stage runs on ``fetchers.async_http`` (asyncio streams, keep-alive
+pool, cached host lookups), and retry back-off uses ``asyncio.sleep``, so an
+in-flight fetch costs a coroutine rather than a thread and thousands can run
+concurrently in one process. Browser stages (CDP, Selenium, manual Chrome)
+drive a single shared browser and stay blocking: they run on a small
+dedicated thread pool (BROWSER_WORKERS) so they never starve the loop's
+default executor, which serves DNS lookups.
+HTTP 阶段完全异步；浏览器阶段（CDP/Selenium/手动 Chrome）仍为阻塞调用，在独立的
+小型线程池中执行。
+
+The HTTP disk cache (ETag/Last-Modified revalidation) is consulted exactly
+as in the blocking path. Its lookups and stores (entry reads, body writes of
+up to several MB, size accounting and eviction scans over the cache
+directory) run on the loop's default executor, never on the loop thread.
+HTTP 磁盘缓存的查找与写入（含容量统计和淘汰扫描）在默认线程池中执行，不阻塞事件循环。
+
+Example:
+    html, metrics, url_metadata = await afetch("https://example.com", timeout=30)
+
+    results = await asyncio.gather(*(afetch(url, fetch_mode='urllib') for url in urls),
+                                   return_exceptions=True)
+"""
+
+import asyncio
+import functools
+import logging
+import sys
+import threading
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from webfetcher import core
+from webfetcher.core import MAX_PAGE_SIZE, MAX_RETRIES, FetchMetrics
+from webfetcher.fetchers.async_http import get_async_http_pool
+
+BROWSER_WORKERS = 4  # 浏览器阶段（CDP/Selenium）线程数
+
+_browser_executor: Optional[ThreadPoolExecutor] = None
+_browser_executor_lock = threading.Lock()
+
+
+def get_browser_executor() -> ThreadPoolExecutor:
+    """Thread pool for the blocking browser fetch stages / 浏览器阶段线程池"""
+    global _browser_executor
+    if _browser_executor is None:
+        with _browser_executor_lock:
+            if _browser_executor is None:
+                _browser_executor = ThreadPoolExecutor(max_workers=BROWSER_WORKERS,
+                                                       thread_name_prefix='wf-browser')
+    return _browser_executor
+
+
+async def _run_browser_stage(func: Callable, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_browser_executor(), functools.partial(func, *args))
+
+
+async def _run_cache_io(func: Callable, *args):
+    """Run an HTTP-cache touching step off the loop thread (inline when the cache is disabled)"""
+    if core.get_http_cache() is None:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+
+async def afetch_html_original(url: str, ua: Optional[str] = None,
+                               timeout: int = 30) -> tuple[str, FetchMetrics, str]:
+    """
+    Single urllib-equivalent fetch on the asyncio connection pool (no retries).
+    单次异步 HTTP 抓取（不重试），对应 core.fetch_html_original()。
+
+    Returns:
+        tuple[str, FetchMetrics, str]: (html_content, fetch_metrics, final_url)
+
+    Raises:
+        urllib.error.HTTPError / urllib.error.URLError, like fetch_html_original()
+    """
+    metrics = FetchMetrics(primary_method="urllib")
+    ua, headers, http_cache, cached = await _run_cache_io(core._prepare_page_request, url, ua)
+
+    try:
+        # Unverified SSL context for sites with legacy SSL configurations, as in the blocking path
+        response = await get_async_http_pool().request(url, headers=headers, timeout=timeout,
+                                                       context=core.unverified_ssl_context(),
+                                                       max_bytes=MAX_PAGE_SIZE)
+    except urllib.error.HTTPError as e:
+        # urlopen (proxy path) reports 304 as an HTTPError
+        if cached and e.code == 304:
+            return await _run_cache_io(core._cached_page, url, ua, http_cache, cached, metrics)
+        core._record_page_error(url, e, metrics)
+        raise
+    except Exception as e:
+        core._record_page_error(url, e, metrics)
+        raise
+
+    if cached and response.status == 304:
+        return await _run_cache_io(core._cached_page, url, ua, http_cache, cached, metrics)
+    if response.truncated:
+        logging.warning(f"Page truncated or incomplete at {len(response.body)} bytes: {url}")
+    return await _run_cache_io(core._decoded_page, url, ua, response, response.body, response.truncated,
+                               http_cache, metrics)
+
+
+async def afetch(url: str, ua: Optional[str] = None, timeout: int = 30,
+                 fetch_mode: str = 'auto', force_chrome: bool = False,
+                 input_url: str = None) -> tuple[str, FetchMetrics, dict]:
+    """
+    Fetch HTML with retries and the multi-layer fallback chain, without blocking the event loop.
+    异步抓取 HTML（重试 + 多层降级），不阻塞事件循环。
+
+    Args:
+        url: Target URL to fetch
+        ua: User agent string (optional)
+        timeout: Network timeout in seconds
+        fetch_mode: 'auto' (urllib->cdp->selenium), 'urllib' (urllib only),
+                   'cdp' (cdp only), 'selenium' (selenium only)
+        force_chrome: Skip Chrome health check (for faster fallback)
+        input_url: Original URL as provided by user (for metadata tracking)
+
+    Returns:
+        tuple[str, FetchMetrics, dict]: (html_content, fetch_metrics, url_metadata),
+        as fetch_html_with_retry()
+    """
+    metrics = FetchMetrics(primary_method="urllib")
+    start_time = time.time()
+    last_exception = None
+
+    # === CONFIG-DRIVEN ROUTING (same decisions as fetch_html_with_retry) ===
+    if fetch_mode == 'auto':
+        fetcher_choice, route_source = core._choose_fetcher(url)
+
+        if fetcher_choice == 'selenium':
+            print(f"🚀 {route_source}: Using Selenium for {url}", file=sys.stderr)
+            logging.info(f"🚀 {route_source} to Selenium: {url}")
+            metrics.primary_method = "selenium_direct"
+            try:
+                return await _run_browser_stage(core._try_selenium_fetch, url, ua, timeout, metrics,
+                                                start_time, force_chrome, input_url)
+            except Exception as e:
+                logging.warning(f"Selenium fetch failed for {url}, falling back to urllib: {e}")
+                metrics.primary_method = "urllib"
+
+        elif fetcher_choice == 'cdp':
+            print(f"🚀 {route_source}: Using CDP for {url}", file=sys.stderr)
+            logging.info(f"🚀 {route_source} to CDP: {url}")
+            metrics.primary_method = "cdp_direct"
+            try:
+                return await _run_browser_stage(core._try_cdp_fetch, url, ua, timeout, metrics,
+                                                start_time, input_url)
+            except Exception as e:
+                logging.warning(f"CDP fetch failed for {url}, falling back to urllib: {e}")
+                metrics.primary_method = "urllib"
+
+    if fetch_mode == 'selenium':
+        metrics.primary_method = "selenium"
+        return await _run_browser_stage(core._try_selenium_fetch, url, ua, timeout, metrics,
+                                        start_time, force_chrome, input_url)
+
+    if fetch_mode == 'cdp':
+        metrics.primary_method = "cdp"
+        return await _run_browser_stage(core._try_cdp_fetch, url, ua, timeout, metrics, start_time, input_url)
+
+    def _browser_fallback(error: str):
+        return _run_browser_stage(core._try_cdp_fallback_after_urllib_failure, url, ua, timeout, metrics,
+                                  start_time, error, input_url, force_chrome)
+
+    # Async urllib stage (fetch_mode: 'auto' or 'urllib')
+    for attempt in range(MAX_RETRIES + 1):
+        metrics.total_attempts = attempt + 1
+
+        try:
+            if attempt > 0:
+                delay = core.calculate_backoff_delay(attempt - 1)
+                logging.info(f"Retry attempt {attempt}/{MAX_RETRIES} for {url} after {delay:.1f}s delay")
+                await asyncio.sleep(delay)
+
+            html, fetch_metrics, final_url = await afetch_html_original(url, ua, timeout)
+            url_metadata = core._record_urllib_success(metrics, fetch_metrics, start_time,
+                                                       input_url or url, final_url)
+            core._record_urllib_outcome(url, metrics)
+            return html, metrics, url_metadata
+
+        except asyncio.CancelledError:
+            raise  # an Exception subclass before Python 3.8
+        except Exception as e:
+            last_exception = e
+            action, wait_time = core._urllib_failure_action(e, url, attempt, fetch_mode)
+            if action == 'raise':
+                core._record_fetch_failure(metrics, start_time, e)
+                raise e
+            if action in ('fallback', 'exhausted'):
+                break
+
+            if wait_time > 0:
+                logging.info(f"Waiting {wait_time:.1f}s before retry {attempt + 1}/{MAX_RETRIES}")
+                await asyncio.sleep(wait_time)
+
+    metrics.fetch_duration = time.time() - start_time
+    core._record_urllib_outcome(url, metrics, last_exception)
+
+    # urllib gave up - CDP then Selenium fallback if enabled
+    if fetch_mode == 'auto':
+        return await _browser_fallback(str(last_exception))
+
+    core._record_fetch_failure(metrics, start_time, last_exception)
+    logging.error(f"All {MAX_RETRIES + 1} attempts failed for {url}, giving up")
+    raise last_exception
+
+
+__all__ = ['BROWSER_WORKERS', 'afetch', 'afetch_html_original', 'get_browser_executor']
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Parallel Batch Fetching
+并行批量抓取
+
+Engine behind ``wf batch``. Arguments are parsed once and every URL goes
+through ``core.process_url`` on a bounded thread pool, so the routing engine,
+template registry, HTTP connection pool and caches are shared by all pages
+instead of being rebuilt per URL.
+``wf batch`` 的执行引擎：参数只解析一次，所有 URL 在有界线程池中通过
+``core.process_url`` 处理，共享路由引擎、模板注册表、连接池与缓存。
+
+URL files may be plain text or JSON Lines with per-URL options, and with
+``--jsonl`` each finished page is appended to a single JSONL stream instead
+of being saved as separate files (see ``webfetcher.utils.jsonl``).
+URL 文件支持纯文本或带单 URL 选项的 JSONL；使用 ``--jsonl`` 时每个完成的页面
+追加写入同一个 JSONL 流。
+
+Scheduling / 调度:
+    - at most ``workers`` pages in flight overall
+    - at most ``per_host_limit`` pages in flight per host; URLs of busy hosts
+      wait in per-host queues, so workers never sit blocked on one slow site
+    - optional ``delay`` between requests to the same host (token bucket)
+
+Example:
+    exit_code = run_batch(urls, ['-o', './output', '--json'], workers=8, per_host_limit=2)
+"""
+
+import sys
+import time
+import logging
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from webfetcher import core
+from webfetcher.core import PageResult
+from webfetcher.crawler import HostPolitenessScheduler
+from webfetcher.utils.jsonl import JsonlWriter, read_url_items
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WORKERS = 8     # 并发工作线程数
+DEFAULT_BATCH_PER_HOST = 2    # 每主机最大并发数
+
+# 不能按URL覆盖的参数（批次级或已在 normalize_args 中生效）
+BATCH_LEVEL_OPTIONS = {'url', 'jsonl', 'cache_dir', 'no_cache', 'parse_budget', 'verbose', 'crawl_site'}
+FETCH_MODE_SHORTCUTS = ('cdp', 'selenium', 'urllib')
+
+BatchItem = Tuple[str, Dict[str, Any]]
+
+
+def load_url_file(path: str) -> List[BatchItem]:
+    """
+    读取URL列表文件（纯文本或JSONL，忽略空行和 # 注释，缺少协议时补 https://）
+
+    Args:
+        path: URL文件路径
+
+    Returns:
+        (url, options) 列表（保持文件顺序）
+    """
+    items = []
+    for url, options in read_url_items(path):
+        if not url.startswith(('http://', 'https://', 'file://')):
+            url = f'https://{url}'
+        items.append((url, options))
+    return items
+
+
+def _coerce_option(action: argparse.Action, value: Any) -> Any:
+    """
+    按命令行参数定义转换单URL选项值（类型转换、取值范围检查）
+
+    Raises:
+        ValueError: 值与参数定义不符（如开关参数不是 true/false）
+    """
+    if action.nargs == 0:
+        if not isinstance(value, bool):
+            raise ValueError(f"expects true or false, got {value!r}")
+        return value
+    if (value is None and action.default is None) or (action.nargs == '?' and value == action.const):
+        return value
+    if action.type is not None:
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f"expects {action.type.__name__}, got {value!r}")
+        try:
+            value = action.type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"expects {action.type.__name__}, got {value!r}") from None
+    elif not isinstance(value, str):
+        raise ValueError(f"expects a string, got {value!r}")
+    if action.choices is not None and value not in action.choices:
+        raise ValueError(f"expects one of {list(action.choices)}, got {value!r}")
+    return value
+
+
+def _validate_options(items: Sequence[BatchItem], parser: argparse.ArgumentParser,
+                      args: argparse.Namespace) -> List[BatchItem]:
+    """
+    按命令行参数定义规范化单URL选项
+
+    JSON 中的值按对应参数的 type/choices 转换（如 "timeout": "10" -> 10），
+    再与共享参数合并后经过 core.normalize_args（如 "cdp": true -> fetch_mode='cdp'）；
+    未知、批次级或取值无效的选项被丢弃并记录警告。
+
+    Returns:
+        (url, overrides) 列表，overrides 只包含与共享参数不同的规范化值
+    """
+    actions = {action.dest: action for action in parser._actions
+               if action.dest in vars(args) and action.dest not in BATCH_LEVEL_OPTIONS}
+    validated = []
+    for url, options in items:
+        unknown = [key for key in options if key not in actions]
+        if unknown:
+            logger.warning(f"Batch: ignoring unsupported options {unknown} for {url}")
+        coerced = {}
+        for key, value in options.items():
+            if key not in actions:
+                continue
+            try:
+                coerced[key] = _coerce_option(actions[key], value)
+            except ValueError as e:
+                logger.warning(f"Batch: ignoring option {key!r} for {url}: {e}")
+        if coerced:
+            # 快捷开关只在本URL的选项中生效，避免共享参数中的 --cdp 覆盖 fetch_mode
+            merged = argparse.Namespace(**{**vars(args), **{key: False for key in FETCH_MODE_SHORTCUTS}, **coerced})
+            core.normalize_args(merged, configure_globals=False)
+            coerced = {key: value for key, value in vars(merged).items()
+                       if key in coerced or (key not in FETCH_MODE_SHORTCUTS and value != getattr(args, key, None))}
+        validated.append((url, coerced))
+    return validated
+
+
+class BatchRunner:
+    """
+    批量抓取执行器：有界线程池 + 每主机并发上限
+
+    Example:
+        runner = BatchRunner(args, workers=8, per_host_limit=2)
+        results = runner.run(urls)
+        print(runner.get_stats())
+    """
+
+    def __init__(self, args, workers: int = DEFAULT_BATCH_WORKERS,
+                 per_host_limit: int = DEFAULT_BATCH_PER_HOST, delay: float = 0.0,
+                 progress: bool = True, writer: Optional[JsonlWriter] = None):
+        """
+        Args:
+            args: 已解析并规范化的参数（core.build_arg_parser + core.normalize_args）
+            workers: 并发工作线程数
+            per_host_limit: 每主机最大并发数
+            delay: 同一主机请求间隔（秒），0 表示不限速
+            progress: 是否逐条输出URL状态
+            writer: JSONL写入器，每个页面完成即写入一条记录
+        """
+        self.args = args
+        self.workers = max(1, int(workers))
+        self.per_host_limit = max(1, int(per_host_limit))
+        self.scheduler = HostPolitenessScheduler(delay=delay, per_host_limit=self.per_host_limit)
+        self.progress = progress
+        self.writer = writer
+        self.stream = sys.stderr if writer is not None and writer.is_stdout else sys.stdout
+        self._print_lock = threading.Lock()
+        self.stats = {'total': 0, 'success': 0, 'failed': 0, 'downloaded': 0, 'elapsed': 0.0}
+
+    def _process(self, url: str, options: Dict[str, Any]) -> PageResult:
+        """处理单个URL，异常转换为失败结果（不中断整个批次）"""
+        started = time.time()
+        args = self.args
+        if options:
+            # 单URL选项（已由 _validate_options 规范化）覆盖共享参数（浅拷贝，不影响其他URL）
+            args = argparse.Namespace(**{**vars(self.args), **options})
+        try:
+            with self.scheduler.slot(url):
+                return core.process_url(url, args)
+        except Exception as e:
+            logger.error(f"Batch: unexpected error for {url}: {e}")
+            return PageResult(url=url, input_url=url, status='failed', error=str(e),
+                              duration=time.time() - started)
+
+    def _report(self, done: int, total: int, result: PageResult):
+        """输出单个URL的处理状态"""
+        if not self.progress:
+            return
+        if result.status == 'failed':
+            line = f"[{done}/{total}] ✗ {result.duration:5.2f}s {result.input_url} - {result.error}"
+        else:
+            target = result.paths[0] if result.paths else (self.writer.path if self.writer else result.status)
+            line = f"[{done}/{total}] ✓ {result.duration:5.2f}s {result.input_url} -> {target}"
+        with self._print_lock:
+            print(line, file=self.stream, flush=True)
+
+    def run(self, urls: Sequence[Union[str, BatchItem]]) -> List[PageResult]:
+        """
+        并行处理全部URL
+
+        Args:
+            urls: URL列表，或 (url, options) 列表
+
+        Returns:
+            与输入顺序一致的 PageResult 列表
+        """
+        start = time.time()
+        total = len(urls)
+        results: List[Optional[PageResult]] = [None] * total
+
+        # 每主机队列 + 可调度主机轮转队列
+        queues: Dict[str, deque] = {}
+        for index, item in enumerate(urls):
+            url, options = (item, {}) if isinstance(item, str) else item
+            queues.setdefault(self.scheduler.host_of(url), deque()).append((index, url, options))
+        ready = deque(queues)
+        in_ready = set(ready)
+        inflight: Dict[str, int] = {host: 0 for host in queues}
+        futures = {}
+        done_count = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='wf-batch') as executor:
+            try:
+                while ready or futures:
+                    while ready and len(futures) < self.workers:
+                        host = ready.popleft()
+                        in_ready.discard(host)
+                        index, url, options = queues[host].popleft()
+                        inflight[host] += 1
+                        futures[executor.submit(self._process, url, options)] = (index, host)
+                        if queues[host] and inflight[host] < self.per_host_limit:
+                            ready.append(host)
+                            in_ready.add(host)
+
+                    finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        index, host = futures.pop(future)
+                        inflight[host] -= 1
+                        if queues[host] and host not in in_ready:
+                            ready.append(host)
+                            in_ready.add(host)
+                        result = future.result()
+                        if self.writer is not None:
+                            self.writer.write(result.to_record())
+                            result.markdown = None  # 已写出，不在内存中保留
+                        results[index] = result
+                        done_count += 1
+                        self.stats[result.status] = self.stats.get(result.status, 0) + 1
+                        self._report(done_count, total, result)
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        self.stats['total'] = total
+        self.stats['elapsed'] = time.time() - start
+        return results
+
+    def get_stats(self) -> dict:
+        """获取批次统计（含吞吐量）"""
+        elapsed = self.stats['elapsed']
+        return {
+            **self.stats,
+            'elapsed': round(elapsed, 2),
+            'throughput': round(self.stats['total'] / elapsed, 2) if elapsed > 0 else 0.0,
+            'politeness': self.scheduler.get_stats(),
+        }
+
+
+def run_batch(urls: Sequence[Union[str, BatchItem]], argv: Sequence[str],
+              workers: int = DEFAULT_BATCH_WORKERS, per_host_limit: int = DEFAULT_BATCH_PER_HOST,
+              delay: float = 0.0) -> int:
+    """
+    解析一次参数并并行抓取URL列表
+
+    Args:
+        urls: URL列表，或 load_url_file() 返回的 (url, options) 列表
+        argv: 传给 webfetcher 的其他参数（如 ['-o', outdir, '--json']）
+        workers: 并发工作线程数
+        per_host_limit: 每主机最大并发数
+        delay: 同一主机请求间隔（秒）
+
+    Returns:
+        int: 退出码（有失败URL时为 1）
+    """
+    if not urls:
+        print("没有可抓取的URL")
+        return 0
+
+    items = [(item, {}) if isinstance(item, str) else item for item in urls]
+
+    # 参数只解析一次，URL位置参数用第一个URL占位
+    parser = core.build_arg_parser()
+    args = parser.parse_args([items[0][0]] + list(argv))
+    if args.crawl_site:
+        print("错误: batch模式不支持 --crawl-site，请使用 wf site", file=sys.stderr)
+        return 2
+    core.normalize_args(args)
+    core.setup_logging(args.verbose)
+    items = _validate_options(items, parser, args)
+
+    writer = JsonlWriter(args.jsonl) if args.jsonl else None
+    try:
+        runner = BatchRunner(args, workers=workers, per_host_limit=per_host_limit, delay=delay, writer=writer)
+        out = runner.stream
+        print(f"准备抓取 {len(items)} 个URL（{runner.workers} 并发，每主机 {runner.per_host_limit}）...", file=out)
+        print(f"输出: {args.jsonl if writer is not None else args.outdir}", file=out)
+        runner.run(items)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    stats = runner.get_stats()
+    print(f"\n完成: {stats['success']} 成功, {stats['failed']} 失败"
+          f"{', ' + str(stats['downloaded']) + ' 下载' if stats['downloaded'] else ''}"
+          f" | 用时 {stats['elapsed']:.1f}s | 吞吐 {stats['throughput']:.2f} URL/s", file=out)
+    http_cache = core.get_http_cache()
+    if http_cache is not None:
+        cache_stats = http_cache.get_stats()
+        if cache_stats['hits'] or cache_stats['misses']:
+            print(f"HTTP缓存: {cache_stats['hits']} 命中 / {cache_stats['misses']} 未命中", file=out)
+    return 1 if stats['failed'] else 0
+
+
+__all__ = ['BatchRunner', 'run_batch', 'load_url_file', 'DEFAULT_BATCH_WORKERS', 'DEFAULT_BATCH_PER_HOST']
@@ -18,12 +18,6 @@ import warnings
 # Suppress SyntaxWarning from parser_engine docstrings
 warnings.filterwarnings('ignore', category=SyntaxWarning)
 
-# Import ChromeDriver version management
-try:
-    from webfetcher.drivers import check_chrome_driver_compatibility
-except ImportError:
-    check_chrome_driver_compatibility = None
-
 # 获取项目根目录（从包安装位置向上查找）
 def get_project_root():
     """获取项目根目录（包含config/目录的位置）"""
@@ -294,6 +288,12 @@ def diagnose_system():
     print("3. ChromeDriver Version Check / ChromeDriver版本检查")
     print("-" * 70)
 
+    # Import ChromeDriver version management (only needed here, kept off the startup path)
+    try:
+        from webfetcher.drivers import check_chrome_driver_compatibility
+    except ImportError:
+        check_chrome_driver_compatibility = None
+
     if check_chrome_driver_compatibility is None:
         print("   ⚠️  ChromeDriver management module not available")
         print("   ⚠️  ChromeDriver管理模块不可用\n")
@@ -349,6 +349,68 @@ def diagnose_system():
 
     sys.exit(exit_code)
 
+def serve_command(serve_args):
+    """wf serve：启动、查询或停止常驻抓取守护进程"""
+    import argparse
+    from webfetcher.daemon.protocol import DEFAULT_TCP_ADDRESS, default_address, format_address, parse_address
+    from webfetcher.daemon import server
+    from webfetcher.parsing.budget import DEFAULT_PARSE_BUDGET
+
+    ap = argparse.ArgumentParser(prog='wf serve',
+                                 description='Resident fetch daemon: wf commands are served over a local socket '
+                                             '/ 常驻抓取守护进程')
+    ap.add_argument('--socket', metavar='PATH', help='Unix socket path (default: $WF_SERVER or ~/.cache/webfetcher/wf.sock)')
+    ap.add_argument('--port', type=int, help='Listen on TCP instead of a Unix socket / 使用 TCP 端口')
+    ap.add_argument('--host', default=DEFAULT_TCP_ADDRESS[0], help='TCP host, loopback only (default: 127.0.0.1)')
+    ap.add_argument('-j', '--workers', type=int, default=server.DEFAULT_SERVER_WORKERS,
+                    help=f'Concurrent fetch requests (default: {server.DEFAULT_SERVER_WORKERS}) / 并发请求数')
+    ap.add_argument('--per-host', type=int, default=server.DEFAULT_SERVER_PER_HOST,
+                    help=f'Max concurrent requests per host (default: {server.DEFAULT_SERVER_PER_HOST}) / 每主机并发数')
+    ap.add_argument('--delay', type=float, default=0.0, help='Delay between requests to the same host in seconds / 同主机请求间隔')
+    ap.add_argument('--cache-dir', default=None, help='HTTP response cache directory / HTTP 响应缓存目录')
+    ap.add_argument('--no-cache', action='store_true', help='Disable the HTTP response cache / 禁用 HTTP 响应缓存')
+    ap.add_argument('--parse-budget', type=float, default=DEFAULT_PARSE_BUDGET, metavar='SECONDS',
+                    help='Per-page parsing CPU time limit, 0 = unlimited / 每页解析 CPU 时间上限')
+    ap.add_argument('--verbose', action='store_true', help='Log every request (INFO level)')
+    ap.add_argument('--status', action='store_true', help='Show the running daemon status and exit / 查询状态')
+    ap.add_argument('--stop', action='store_true', help='Stop the running daemon / 停止守护进程')
+    options = ap.parse_args(serve_args)
+
+    if options.port is not None:
+        address = (options.host, options.port)
+    elif options.socket:
+        address = parse_address(options.socket)
+    else:
+        address = default_address()
+        if address is None:
+            print("错误: 当前平台不支持 Unix 套接字，请使用 --port（客户端设置 WF_SERVER=127.0.0.1:<port>）", file=sys.stderr)
+            sys.exit(2)
+
+    if options.status:
+        status = server.server_status(address)
+        if status is None:
+            print(f"wf serve 未运行: {format_address(address)}")
+            sys.exit(1)
+        stats = status.get('stats', {})
+        print(f"wf serve 运行中: {format_address(address)} (pid {status.get('pid')}, "
+              f"运行 {status.get('uptime')}s, {status.get('workers')} workers)")
+        print("  " + ", ".join(f"{key}={value}" for key, value in stats.items()))
+        return
+    if options.stop:
+        if not server.stop_server(address):
+            print(f"wf serve 未运行: {format_address(address)}")
+            sys.exit(1)
+        print("wf serve 已停止")
+        return
+
+    from webfetcher import core
+    core.setup_logging(options.verbose)
+    core.configure_http_cache(options.cache_dir, enabled=not options.no_cache)
+    core.configure_parse_budget(options.parse_budget)
+    exit_code = server.serve(address, workers=options.workers, per_host_limit=options.per_host, delay=options.delay)
+    if exit_code:
+        sys.exit(exit_code)
+
 def main():
     # Check for updates (async, non-blocking)
     try:
@@ -361,9 +423,6 @@ def main():
         print_help()
         return
 
-    # Import webfetcher.core here to avoid circular imports
-    from webfetcher import core as webfetcher_module
-
     # Parse arguments
     raw_args = sys.argv[1:]
     cmd = raw_args[0]
@@ -373,7 +432,7 @@ def main():
     extraction_performed = False
 
     # Skip extraction for known commands
-    skip_commands = ['help', '-h', '--help', 'fast', 'full', 'site', 'raw', 'batch']
+    skip_commands = ['help', '-h', '--help', 'fast', 'full', 'site', 'raw', 'batch', 'serve']
 
     if cmd not in skip_commands:
         # Attempt to extract URL from mixed text
@@ -405,7 +464,7 @@ def main():
         output_dir, remaining_args = parse_output_dir(raw_args[1:])
         ensure_output_dir(output_dir)
         # Run webfetcher
-        run_webfetcher(webfetcher_module, [url, '-o', output_dir] + remaining_args)
+        run_webfetcher([url, '-o', output_dir] + remaining_args)
 
     # 快速模式
     elif cmd == 'fast':
@@ -430,7 +489,7 @@ def main():
         # Parse output directory
         output_dir, remaining_args = parse_output_dir(raw_args[2:])
         ensure_output_dir(output_dir)
-        run_webfetcher(webfetcher_module, [url, '-o', output_dir, '--render', 'never', '--timeout', '30'] + remaining_args)
+        run_webfetcher([url, '-o', output_dir, '--render', 'never', '--timeout', '30'] + remaining_args)
 
     # 完整模式
     elif cmd == 'full':
@@ -452,7 +511,7 @@ def main():
         # Parse output directory
         output_dir, remaining_args = parse_output_dir(raw_args[2:])
         ensure_output_dir(output_dir)
-        run_webfetcher(webfetcher_module, [url, '-o', output_dir, '--download-assets', '--render', 'auto'] + remaining_args)
+        run_webfetcher([url, '-o', output_dir, '--download-assets', '--render', 'auto'] + remaining_args)
 
     # 站点爬虫
     elif cmd == 'site':
@@ -535,16 +594,19 @@ def main():
         # same-domain-only is default, explicitly add it
         cmd_args.append('--same-domain-only')
 
-        # Add any other remaining args (like --fetch-mode, etc.)
-        for arg in remaining_args:
-            if arg not in ['--max-pages', '--max-depth', '--max-crawl-depth',
-                          '--delay', '--crawl-delay', '--follow-pagination', '--same-domain-only', '--use-sitemap']:
-                # Check if it's a value (next to a parameter we already processed)
-                if not (arg.replace('.', '').isdigit() or arg.startswith('/')):
-                    cmd_args.append(arg)
+        # Add any other remaining args (like --fetch-mode, --jsonl PATH, etc.)
+        i = 0
+        while i < len(remaining_args):
+            arg = remaining_args[i]
+            if arg in ['--max-pages', '--max-depth', '--max-crawl-depth', '--delay', '--crawl-delay']:
+                i += 2  # Skip the parameter and its value (already processed)
+                continue
+            if arg not in ['--follow-pagination', '--same-domain-only', '--use-sitemap']:
+                cmd_args.append(arg)
+            i += 1
 
         logger.info(f"Site crawling with: max-pages={max_pages_value}, max-depth={max_depth_value}, delay={delay_value}")
-        run_webfetcher(webfetcher_module, cmd_args)
+        run_webfetcher(cmd_args)
 
     # Raw模式
     elif cmd == 'raw':
@@ -566,33 +628,55 @@ def main():
         # Parse output directory
         output_dir, remaining_args = parse_output_dir(raw_args[2:])
         ensure_output_dir(output_dir)
-        run_webfetcher(webfetcher_module, [url, '-o', output_dir, '--raw'] + remaining_args)
+        run_webfetcher([url, '-o', output_dir, '--raw'] + remaining_args)
 
     # 批量抓取
     elif cmd == 'batch':
         if len(raw_args) < 2:
             print("错误: batch模式需要提供URL文件")
-            print("用法: wf batch <urls.txt> [输出目录]")
+            print("用法: wf batch <urls.txt> [输出目录] [-j 并发数] [--per-host N] [--delay 秒]")
             return
         urls_file = raw_args[1]
         if not os.path.exists(urls_file):
             print(f"错误: 文件 {urls_file} 不存在")
             return
 
+        # 提取批量参数（并发数、每主机并发、同主机请求间隔）
+        batch_options = {'--workers': None, '-j': None, '--per-host': None, '--delay': None}
+        batch_args = []
+        args_iter = iter(raw_args[2:])
+        for arg in args_iter:
+            if arg in batch_options:
+                batch_options[arg] = next(args_iter, None)
+            else:
+                batch_args.append(arg)
+
         # 解析输出目录
-        output_dir, remaining_args = parse_output_dir(raw_args[2:])
+        output_dir, remaining_args = parse_output_dir(batch_args)
         ensure_output_dir(output_dir)
 
-        with open(urls_file) as f:
-            urls = [line.strip() for line in f if line.strip()]
-
-        print(f"准备抓取 {len(urls)} 个URL...")
-        print(f"输出目录: {output_dir}")
-        for i, url in enumerate(urls, 1):
-            print(f"\n[{i}/{len(urls)}] 抓取: {url}")
-            if not url.startswith('http'):
-                url = f'https://{url}'
-            run_webfetcher(webfetcher_module, [url, '-o', output_dir] + remaining_args)
+        from webfetcher.batch import DEFAULT_BATCH_PER_HOST, DEFAULT_BATCH_WORKERS, load_url_file, run_batch
+        try:
+            workers = int(batch_options['--workers'] or batch_options['-j'] or DEFAULT_BATCH_WORKERS)
+            per_host = int(batch_options['--per-host'] or DEFAULT_BATCH_PER_HOST)
+            delay = float(batch_options['--delay'] or 0)
+        except ValueError:
+            print("错误: --workers/-j、--per-host 需要整数，--delay 需要数字")
+            sys.exit(2)
+
+        urls = load_url_file(urls_file)
+        try:
+            exit_code = run_batch(urls, ['-o', output_dir] + remaining_args,
+                                  workers=workers, per_host_limit=per_host, delay=delay)
+        except KeyboardInterrupt:
+            print("\n已取消")
+            sys.exit(1)
+        if exit_code:
+            sys.exit(exit_code)
+
+    # 常驻抓取守护进程
+    elif cmd == 'serve':
+        serve_command(raw_args[1:])
 
     # 诊断系统
     elif cmd == 'diagnose' or cmd == '--diagnose':
@@ -607,10 +691,18 @@ def main():
         # 对于其他命令，也处理输出目录
         output_dir, remaining_args = parse_output_dir(raw_args)
         ensure_output_dir(output_dir)
-        run_webfetcher(webfetcher_module, ['-o', output_dir] + remaining_args)
+        run_webfetcher(['-o', output_dir] + remaining_args)
+
+def run_webfetcher(args):
+    """运行webfetcher.core并传递参数（wf serve 守护进程运行时交由其处理）"""
+    from webfetcher.daemon.client import run_via_server
+    exit_code = run_via_server(args)
+    if exit_code is not None:
+        if exit_code:
+            sys.exit(exit_code)
+        return
 
-def run_webfetcher(webfetcher_module, args):
-    """运行webfetcher.core并传递参数"""
+    from webfetcher import core as webfetcher_module
     try:
         # Temporarily modify sys.argv to pass arguments to webfetcher
         original_argv = sys.argv
@@ -680,7 +772,8 @@ wf - WebFetcher便捷命令
   wf full URL [输出目录]            # 完整模式（含资源）
   wf raw URL [输出目录]             # Raw模式（完整内容）
   wf site URL [输出目录]            # 整站爬虫
-  wf batch urls.txt [输出目录]     # 批量抓取
+  wf batch urls.txt [输出目录]     # 批量抓取（并行，-j 并发数，默认8）
+  wf serve [--socket PATH|--port N] # 常驻守护进程（之后的 wf 调用自动复用，--status/--stop）
   wf diagnose                       # 系统诊断（含ChromeDriver检查）
 
 处理复杂URL的示例:
@@ -695,6 +788,8 @@ wf - WebFetcher便捷命令
   # 批量和站点模式
   wf site docs.python.org -o ./python-docs/
   wf batch ./urls.txt -- ~/Downloads/
+  wf batch ./urls.txt -o ./out -j 16 --per-host 2   # 16并发，每主机最多2个
+  wf batch ./urls.jsonl --jsonl pages.jsonl        # JSONL输入（每行可带选项），逐页流式输出
 
 高级用法:
   # 组合多个参数
@@ -716,6 +811,7 @@ wf - WebFetcher便捷命令
   -m cdp / -c                     # 仅使用CDP（Chrome DevTools Protocol，保留会话）
   -m selenium / -s                # 仅使用Selenium（完整浏览器自动化）
   --selenium-timeout 30           # Selenium/CDP页面加载超时（秒）
+  --hedge                         # urllib超出主机p90延迟时并行启动CDP，取先返回者
 
   启动Chrome调试会话: ./config/start_chrome_debug.sh
   CDP优势：轻量、快速、保留登录状态
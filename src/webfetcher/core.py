@@ -24,48 +24,30 @@ import urllib.request
 import urllib.error
 import ssl
 import sys
-from typing import Optional, List, Dict, Set, Any
-from dataclasses import dataclass
+import tempfile
+from typing import Optional, List, Dict, Set, Any, Callable, Iterator
+import dataclasses
+from dataclasses import dataclass, field
 from enum import Enum
 from html.parser import HTMLParser
 from pathlib import Path
 import logging
 import time
 import random
-import signal
+import threading
 from collections import deque
-import xml.etree.ElementTree as ET  # Task-008 Phase 2: Sitemap parsing
-import gzip  # Task-008 Phase 2: Gzipped sitemap support
-
-# Selenium integration (Phase 2) - graceful degradation when not available
-try:
-    from webfetcher.fetchers.config import SeleniumConfig
-    from webfetcher.fetchers.selenium import SeleniumFetcher, SeleniumMetrics, ChromeConnectionError, SeleniumFetchError, SeleniumTimeoutError, SeleniumNotAvailableError
-    SELENIUM_INTEGRATION_AVAILABLE = True
-except ImportError as e:
-    logging.debug(f"Selenium integration not available: {e}")
-    SELENIUM_INTEGRATION_AVAILABLE = False
-    # Create dummy classes to prevent import errors
-    class SeleniumConfig: pass
-    class SeleniumFetcher: pass
-    class SeleniumMetrics: pass
-    class ChromeConnectionError(Exception): pass
-    class SeleniumFetchError(Exception): pass
-    class SeleniumTimeoutError(Exception): pass
-    class SeleniumNotAvailableError(Exception): pass
-
-# CDP (Chrome DevTools Protocol) integration - graceful degradation when not available
-try:
-    from webfetcher.fetchers.cdp_fetcher import CDPFetcher, fetch_with_cdp, CDP_AVAILABLE
-    if CDP_AVAILABLE:
-        logging.info("CDP fetcher available")
-        CDP_INTEGRATION_AVAILABLE = True
-    else:
-        CDP_INTEGRATION_AVAILABLE = False
-except ImportError as e:
-    logging.debug(f"CDP integration not available: {e}")
-    CDP_INTEGRATION_AVAILABLE = False
-    CDP_AVAILABLE = False
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError, wait as futures_wait
+from itertools import chain, islice
+
+# Optional integrations (Selenium, CDP, routing, manual Chrome) and the parsers are
+# imported on first use, see the lazy loaders below: loading them eagerly cost
+# hundreds of milliseconds on every run, including urllib-only fetches.
+# 可选集成与解析器在首次使用时才导入，urllib 抓取无需为浏览器/路由/解析依赖付出启动开销。
+from webfetcher.fetchers.errors import (
+    ChromeConnectionError, SeleniumFetchError,
+    SeleniumTimeoutError, SeleniumNotAvailableError
+)
 
 # Chrome error handling (Phase 2.3) - enhanced error messages
 from webfetcher.errors.handler import (
@@ -77,76 +59,17 @@ from webfetcher.errors.handler import (
 # Smart routing for SSL problematic domains (Phase 3.5)
 from webfetcher.config.ssl_problematic_domains import should_use_selenium_directly
 
-# Config-Driven Routing System (Task-1) - intelligently route URLs to appropriate fetcher
-try:
-    from webfetcher.routing import RoutingEngine, RoutingDecision
-    routing_engine = RoutingEngine()
-    ROUTING_ENGINE_AVAILABLE = True
-    logging.info("Config-driven routing system initialized")
-except ImportError as e:
-    logging.debug(f"Routing engine not available: {e}")
-    ROUTING_ENGINE_AVAILABLE = False
-    routing_engine = None
-except Exception as e:
-    logging.warning(f"Failed to initialize routing engine: {e}")
-    ROUTING_ENGINE_AVAILABLE = False
-    routing_engine = None
-
-# Manual Chrome Hybrid Mode (Task 000) - graceful degradation when not available
-try:
-    import yaml
-    from manual_chrome import ManualChromeHelper
-    from manual_chrome.exceptions import (
-        ManualChromeError,
-        ChromeNotFoundError,
-        PortInUseError,
-        AttachmentError,
-        TimeoutError as ManualChromeTimeoutError
-    )
-    MANUAL_CHROME_AVAILABLE = True
-
-    # Load manual Chrome configuration
-    try:
-        manual_chrome_config_path = Path(__file__).parent / "config" / "manual_chrome_config.yaml"
-        with open(manual_chrome_config_path, 'r', encoding='utf-8') as f:
-            manual_chrome_config = yaml.safe_load(f)
-
-        # Check if manual Chrome is enabled in config
-        if manual_chrome_config.get('enabled', False):
-            manual_chrome_helper = ManualChromeHelper(manual_chrome_config)
-            logging.info("Manual Chrome mode enabled and initialized")
-        else:
-            manual_chrome_helper = None
-            logging.debug("Manual Chrome mode is disabled in configuration")
-    except FileNotFoundError:
-        logging.debug("Manual Chrome config not found, feature disabled")
-        manual_chrome_helper = None
-    except Exception as e:
-        logging.warning(f"Failed to initialize manual Chrome: {e}")
-        manual_chrome_helper = None
-
-except ImportError as e:
-    logging.debug(f"Manual Chrome integration not available: {e}")
-    MANUAL_CHROME_AVAILABLE = False
-    manual_chrome_helper = None
-    # Create dummy classes to prevent import errors
-    class ManualChromeHelper: pass
-    class ManualChromeError(Exception): pass
-    class ChromeNotFoundError(Exception): pass
-    class PortInUseError(Exception): pass
-    class AttachmentError(Exception): pass
-    class ManualChromeTimeoutError(Exception): pass
-
-# Parser modules
-import webfetcher.parsing.parser as parsers
-from webfetcher.parsing.parser import (
-    wechat_to_markdown,
-    xhs_to_markdown,
-    generic_to_markdown
-)
-
 # Task-003 Phase 3: URL Formatter Module
 from webfetcher.utils.url_formatter import insert_dual_url_section
+from webfetcher.utils.environment import getenv
+from webfetcher.utils.redirect_cache import get_redirect_cache
+from webfetcher.utils.host_stats import get_host_stats
+from webfetcher.utils.http_cache import configure_http_cache, get_http_cache
+from webfetcher.utils.jsonl import STDOUT as JSONL_STDOUT, JsonlWriter
+from webfetcher.crawler import CrawlManifest, HostPolitenessScheduler, manifest_path_for
+from webfetcher.fetchers.http_pool import get_http_pool, pooled_urlopen
+from webfetcher.parsing.pool import DEFAULT_PARSE_WORKERS, ParsePool
+from webfetcher.parsing.budget import DEFAULT_PARSE_BUDGET, ParseBudgetExceeded, configure_parse_budget
 
 # Error handler integration (Task 1 Phase 2)
 try:
@@ -171,15 +94,166 @@ except ImportError as e:
 
 # Safari integration removed - using urllib only
 
+# Error classifier (Task 7 Phase 1), created by get_error_classifier() on the first fetch error
+_error_classifier = None
+
+
+# === LAZY INTEGRATION LOADERS ===
+_unverified_ssl_context: Optional[ssl.SSLContext] = None
+_routing_engine = None
+_routing_engine_loaded = False
+_manual_chrome_helper = None
+_manual_chrome_loaded = False
+_lazy_init_lock = threading.Lock()
+
+
+def unverified_ssl_context() -> ssl.SSLContext:
+    """
+    SSL context that doesn't verify certificates (legacy sites), created on first use.
+
+    Built without loading the system CA bundle: nothing is verified, and
+    ssl.create_default_context() spends tens of milliseconds reading it.
+    """
+    global _unverified_ssl_context
+    if _unverified_ssl_context is None:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        _unverified_ssl_context = context
+    return _unverified_ssl_context
+
+
+def get_error_classifier():
+    """Unified error classifier (compiles its patterns on first use), or None when unavailable"""
+    global _error_classifier
+    if _error_classifier is None and ERROR_CLASSIFIER_AVAILABLE:
+        _error_classifier = UnifiedErrorClassifier()
+    return _error_classifier
+
+
+def get_routing_engine():
+    """
+    Config-driven routing engine (Task-1), built on first use.
+
+    Returns:
+        RoutingEngine, or None when routing is unavailable or failed to load
+    """
+    global _routing_engine, _routing_engine_loaded
+    if _routing_engine_loaded:
+        return _routing_engine
+    with _lazy_init_lock:
+        if not _routing_engine_loaded:
+            try:
+                from webfetcher.routing import RoutingEngine
+                _routing_engine = RoutingEngine()
+                logging.info("Config-driven routing system initialized")
+            except ImportError as e:
+                logging.debug(f"Routing engine not available: {e}")
+            except Exception as e:
+                logging.warning(f"Failed to initialize routing engine: {e}")
+            _routing_engine_loaded = True
+    return _routing_engine
+
+
+def get_manual_chrome_helper():
+    """
+    Manual Chrome hybrid mode helper (Task 000), created on first use.
+
+    Returns:
+        ManualChromeHelper, or None when the integration is missing or disabled in config
+    """
+    global _manual_chrome_helper, _manual_chrome_loaded
+    if _manual_chrome_loaded:
+        return _manual_chrome_helper
+    with _lazy_init_lock:
+        if not _manual_chrome_loaded:
+            _manual_chrome_helper = _load_manual_chrome_helper()
+            _manual_chrome_loaded = True
+    return _manual_chrome_helper
+
+
+def _load_manual_chrome_helper():
+    try:
+        import yaml
+        from manual_chrome import ManualChromeHelper
+    except ImportError as e:
+        logging.debug(f"Manual Chrome integration not available: {e}")
+        return None
+
+    # Load manual Chrome configuration
+    try:
+        manual_chrome_config_path = Path(__file__).parent / "config" / "manual_chrome_config.yaml"
+        with open(manual_chrome_config_path, 'r', encoding='utf-8') as f:
+            manual_chrome_config = yaml.safe_load(f)
+
+        # Check if manual Chrome is enabled in config
+        if manual_chrome_config.get('enabled', False):
+            logging.info("Manual Chrome mode enabled and initialized")
+            return ManualChromeHelper(manual_chrome_config)
+        logging.debug("Manual Chrome mode is disabled in configuration")
+    except FileNotFoundError:
+        logging.debug("Manual Chrome config not found, feature disabled")
+    except Exception as e:
+        logging.warning(f"Failed to initialize manual Chrome: {e}")
+    return None
+
+
+def _selenium_integration():
+    """
+    Selenium fetcher classes (Phase 2), imported on first use.
+
+    Returns:
+        (SeleniumConfig, SeleniumFetcher), or None when the integration cannot be imported
+    """
+    try:
+        from webfetcher.fetchers.config import SeleniumConfig
+        from webfetcher.fetchers.selenium import SeleniumFetcher
+    except ImportError as e:
+        logging.debug(f"Selenium integration not available: {e}")
+        return None
+    return SeleniumConfig, SeleniumFetcher
+
+
+def _cdp_fetch_function() -> Optional[Callable]:
+    """
+    CDP (Chrome DevTools Protocol) fetch function, imported on first use.
+
+    Returns:
+        fetch_with_cdp, or None when pychrome/requests are not installed
+    """
+    try:
+        from webfetcher.fetchers.cdp_fetcher import fetch_with_cdp, CDP_AVAILABLE
+    except ImportError as e:
+        logging.debug(f"CDP integration not available: {e}")
+        return None
+    return fetch_with_cdp if CDP_AVAILABLE else None
+
+
+# Parser entry points: thin wrappers so webfetcher.parsing (BeautifulSoup,
+# html2text, template registry) is only imported once a page is parsed.
+# They stay module-level functions so crawl parse workers can pickle them.
+
+def wechat_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[str, str, dict]:
+    """WeChat parser, see webfetcher.parsing.parser.wechat_to_markdown"""
+    from webfetcher.parsing.parser import wechat_to_markdown as parse
+    return parse(html, url, url_metadata)
+
+
+def xhs_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[str, str, dict]:
+    """XiaoHongShu parser, see webfetcher.parsing.parser.xhs_to_markdown"""
+    from webfetcher.parsing.parser import xhs_to_markdown as parse
+    return parse(html, url, url_metadata)
 
-# === EMBEDDED DOWNLOADER MODULE ===
-# SSL context for unverified connections
-ssl_context_unverified = ssl.create_default_context()
-ssl_context_unverified.check_hostname = False
-ssl_context_unverified.verify_mode = ssl.CERT_NONE
 
-# Initialize error classifier (Task 7 Phase 1)
-error_classifier = UnifiedErrorClassifier() if ERROR_CLASSIFIER_AVAILABLE else None
+def generic_to_markdown(html: str, url: str, filter_level: str = 'safe', is_crawling: bool = False,
+                        url_metadata: dict = None) -> tuple[str, str, dict]:
+    """Generic parser, see webfetcher.parsing.parser.generic_to_markdown"""
+    from webfetcher.parsing.parser import generic_to_markdown as parse
+    return parse(html, url, filter_level, is_crawling=is_crawling, url_metadata=url_metadata)
+# === END LAZY INTEGRATION LOADERS ===
+
+
+# === EMBEDDED DOWNLOADER MODULE ===
 
 
 def sanitize_filename(name: str) -> str:
@@ -198,6 +272,7 @@ class SimpleDownloader:
             'zip', 'rar', '7z', 'tar', 'gz', 'bz2', 'xz', 'dmg', 'iso', 'exe', 'msi', 'deb', 'rpm',
             'xml', 'json', 'csv', 'sql', 'log', 'conf', 'cfg', 'ini', 'yaml', 'yml'
         }
+        self.downloaded_path: Optional[Path] = None  # 最近一次成功下载的文件路径
     
     def try_download(self, url, ua, timeout, outdir):
         # Check if this is a downloadable file based on URL extension
@@ -239,7 +314,7 @@ class SimpleDownloader:
                 
                 # Re-fetch the content as binary data
                 req = urllib.request.Request(url, headers={"User-Agent": ua, "Accept-Language": "zh-CN,zh;q=0.9"})
-                with urllib.request.urlopen(req, timeout=timeout, context=ssl_context_unverified) as response:
+                with urllib.request.urlopen(req, timeout=timeout, context=unverified_ssl_context()) as response:
                     # Write binary data to file
                     with open(final_path, 'wb') as f:
                         while True:
@@ -250,7 +325,7 @@ class SimpleDownloader:
                 
                 file_size = final_path.stat().st_size
                 logging.info(f"File downloaded successfully: {final_path} ({file_size} bytes)")
-                print(str(final_path))
+                self.downloaded_path = final_path
                 return True  # Downloaded successfully, skip HTML processing
                 
             except Exception as e:
@@ -284,6 +359,13 @@ class FetchMetrics:
     chrome_auto_launched: bool = False
     chrome_launch_message: Optional[str] = None
 
+    # HTTP disk cache (304 revalidation) tracking
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    # Hedged fetch: CDP was started alongside a slow urllib attempt
+    hedged: bool = False
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert metrics to dictionary for JSON serialization."""
         return {
@@ -299,7 +381,10 @@ class FetchMetrics:
             'chrome_connected': self.chrome_connected,
             'js_detection_used': self.js_detection_used,
             'chrome_auto_launched': self.chrome_auto_launched,
-            'chrome_launch_message': self.chrome_launch_message
+            'chrome_launch_message': self.chrome_launch_message,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'hedged': self.hedged
         }
     
     def get_summary(self) -> str:
@@ -317,6 +402,12 @@ class FetchMetrics:
         
         if self.ssl_fallback_used:
             summary += " | SSL fallback used"
+
+        if self.cache_hits:
+            summary += " | Cache: not modified (304)"
+
+        if self.hedged:
+            summary += " | Hedged"
         
         # Add Selenium-specific information
         if self.chrome_connected:
@@ -331,6 +422,50 @@ class FetchMetrics:
         return summary
 
 
+@dataclass
+class PageResult:
+    """
+    Outcome of process_url() for a single page.
+    单页处理结果。
+
+    status is 'success', 'failed' (paths holds the failure report) or
+    'downloaded' (binary file saved by SimpleDownloader). markdown is only
+    kept in --jsonl mode, where the page is streamed instead of saved.
+    """
+    url: str
+    input_url: str
+    status: str
+    final_url: Optional[str] = None
+    title: Optional[str] = None
+    paths: List[str] = field(default_factory=list)
+    images: List[str] = field(default_factory=list)
+    parser: Optional[str] = None
+    error: Optional[str] = None
+    fetch_metrics: Optional[FetchMetrics] = None
+    duration: float = 0.0
+    markdown: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for reports / 转换为字典"""
+        return {
+            'url': self.url,
+            'input_url': self.input_url,
+            'status': self.status,
+            'final_url': self.final_url,
+            'title': self.title,
+            'paths': self.paths,
+            'images': self.images,
+            'parser': self.parser,
+            'error': self.error,
+            'fetch_metrics': self.fetch_metrics.to_dict() if self.fetch_metrics else None,
+            'duration': round(self.duration, 3),
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """JSON Lines output record (to_dict() plus the page Markdown) / JSONL 输出记录"""
+        return {**self.to_dict(), 'markdown': self.markdown}
+
+
 def create_url_metadata(input_url: str, final_url: str = None,
                        fetch_mode: str = None) -> dict:
     """
@@ -538,212 +673,165 @@ def get_beautifulsoup_parser():
 from html.parser import HTMLParser
 
 class ContentFilter:
-    """Generic content filtering system for noise removal from any website"""
-    
+    """Generic content filtering system for noise removal from any website
+
+    All rules are evaluated in a single pre-order walk of the tree: each element
+    is checked against precompiled tag/class/id/style tables and, on the first
+    matching rule, removed together with its subtree (which is then never
+    visited). Every rule depends only on the element's own tag and attributes,
+    so the result is the same as running the rules as separate sweeps.
+    所有规则在一次前序遍历中完成匹配；命中即删除整棵子树，结果与逐条规则多次遍历一致。
+
+    removed_elements records only the outermost removed element of each subtree.
+    """
+
+    # Semantic HTML5 tags white-list: never removed by hidden/ad rules
+    SEMANTIC_TAGS = frozenset({'body', 'html', 'main', 'article', 'section',
+                               'nav', 'header', 'footer', 'aside'})
+
+    SCRIPT_TAGS = frozenset({'script', 'style', 'noscript'})
+
+    # Phase 2 Fix: exact class name matching only, so Tailwind utility classes
+    # like "overflow-hidden" or "mx-auto-hidden" are not treated as hidden
+    HIDDEN_CLASSES = frozenset({
+        'hidden',           # Plain hidden class
+        'sr-only',          # Screen reader only
+        'screen-reader-only',
+        'visually-hidden',  # Visually hidden
+        'invisible',        # Invisible class
+        'hide',             # Alternative hidden class
+        'd-none'            # Bootstrap hidden class
+    })
+
+    # Phase 2 Fix: precise ad patterns instead of broad '[class*="ad"]', which
+    # matched semantic classes like "antialiased" and removed whole bodies.
+    # Class rules: complete class names only (.ad, .ads, ...)
+    AD_CLASSES = frozenset({
+        'ad', 'ads', 'ad-container', 'ad-wrapper',
+        'advertisement', 'adsbygoogle', 'ad-slot', 'ad-banner',
+        'ad-unit', 'ad-content', 'ad-box', 'ad-space',
+        # Common ad networks
+        'google-ad', 'amazon-ad', 'facebook-ad',
+        # Promotional and sponsored content
+        'promo', 'promo-banner', 'sponsored', 'sponsored-content'
+    })
+
+    # Id rules: [id^="ad-"], [id^="ad_"], [id$="-ad"], [id$="_ad"], [id="ad"],
+    # [id="ads"], [id="advertisement"] (same regex semantics as the CSS selectors)
+    AD_ID_PATTERN = re.compile(r'ad[-_]|.*?[-_]ad$|(?:ad|ads|advertisement)$', re.DOTALL)
+
+    # Ad matches are kept when class or id mentions main content
+    PROTECTED_KEYWORDS = ('main', 'content', 'article', 'post', 'entry')
+
+    NAV_TAGS = frozenset({'nav', 'header', 'footer', 'aside'})
+
+    META_KEEP_NAMES = ('description', 'author', 'keywords')
+
+    ESSENTIAL_ATTRS = frozenset({'href', 'src', 'alt', 'title', 'id'})
+
+    # Nav ('nav', 'menu', ...), tracking ('analytics', 'pixel', ...) and social
+    # ('share', 'twitter', ...) class keywords were matched with
+    # find_all(class_=lambda x: x and any(cls for cls in x if kw in cls.lower())).
+    # BeautifulSoup passes each class *string* to the lambda, which then iterates
+    # its characters, so those sweeps never removed anything; they are not part
+    # of the rule set to keep output unchanged.
+
     def __init__(self, filter_level='safe'):
         self.filter_level = filter_level
         self.removed_elements = []
-        
+
     def filter_content(self, soup):
         """Apply content filtering based on filter level"""
         if not soup:
             return soup
-            
+
         self.removed_elements = []
-        
-        if self.filter_level == 'none':
-            return soup
-            
+
         # Safe filters (default) - remove obvious noise
-        if self.filter_level in ['safe', 'moderate', 'aggressive']:
-            self._remove_scripts_and_styles(soup)
-            self._remove_hidden_elements(soup)
-            self._remove_ads_and_popups(soup)
-            
         # Moderate filters - also remove navigation
-        if self.filter_level in ['moderate', 'aggressive']:
-            self._remove_navigation_elements(soup)
-            
-        # Aggressive filters - remove all identified noise
-        if self.filter_level == 'aggressive':
-            self._remove_metadata_elements(soup)
-            self._remove_social_elements(soup)
-            self._clean_attributes(soup)
-            
+        # Aggressive filters - also remove metadata, comments and attributes
+        if self.filter_level not in ['safe', 'moderate', 'aggressive']:
+            return soup
+
+        self._walk(soup,
+                   moderate=self.filter_level in ['moderate', 'aggressive'],
+                   aggressive=self.filter_level == 'aggressive')
         return soup
-    
-    def _remove_scripts_and_styles(self, soup):
-        """Remove script and style tags"""
-        for tag in soup.find_all(['script', 'style', 'noscript']):
-            self.removed_elements.append(f"script/style: {tag.name}")
-            tag.decompose()
-    
-    def _remove_hidden_elements(self, soup):
-        """Remove visually hidden elements with precise class matching
 
-        Phase 2 Fix: Changed from substring matching to exact word matching.
-        Previously matched any class containing "hidden" (e.g., "mx-auto-hidden"),
-        now only matches complete class names like "hidden", "visually-hidden", etc.
+    def _walk(self, root, moderate: bool, aggressive: bool):
+        """Single pre-order traversal: remove matching subtrees, clean survivors"""
+        from bs4 import Comment, Tag
+
+        stack = list(reversed(root.contents))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Tag):
+                label = self._match(node, moderate, aggressive)
+                if label is not None:
+                    if label:
+                        self.removed_elements.append(f"{label}: {node.name}")
+                    node.decompose()
+                    continue
+                if aggressive:
+                    # Keep only essential attributes
+                    for attr in [attr for attr in node.attrs if attr not in self.ESSENTIAL_ATTRS]:
+                        del node.attrs[attr]
+                stack.extend(reversed(node.contents))
+            elif aggressive and isinstance(node, Comment):
+                node.extract()
+
+    def _match(self, element, moderate: bool, aggressive: bool) -> Optional[str]:
         """
-        # Semantic HTML5 tags white-list: NEVER delete these
-        semantic_tags = {'body', 'html', 'main', 'article', 'section',
-                        'nav', 'header', 'footer', 'aside'}
-
-        # Elements with display:none or visibility:hidden
-        for element in soup.find_all(style=lambda x: x and ('display:none' in x.replace(' ', '') or 'visibility:hidden' in x.replace(' ', ''))):
-            # Protect semantic tags
-            if element.name in semantic_tags:
-                continue
-            self.removed_elements.append(f"hidden: {element.name}")
-            element.decompose()
-
-        # Common hidden classes - Phase 2 Fix: exact class name matching only
-        # Only match standalone "hidden" class, not Tailwind utility classes like "overflow-hidden"
-        hidden_classes = [
-            'hidden',           # Plain hidden class
-            'sr-only',          # Screen reader only
-            'screen-reader-only',
-            'visually-hidden',  # Visually hidden
-            'invisible',        # Invisible class
-            'hide',             # Alternative hidden class
-            'd-none'            # Bootstrap hidden class
-        ]
+        Return the removal label for an element, '' to remove it silently,
+        or None to keep it. Rules are checked in the original sweep order.
+        """
+        name = element.name
+        if name in self.SCRIPT_TAGS:
+            return 'script/style'
 
-        # Build list first to avoid modification during iteration
-        elements_to_remove = []
-        for element in soup.find_all():
-            if not element or not hasattr(element, 'get'):
-                continue
+        if name not in self.SEMANTIC_TAGS:
+            # Elements with display:none or visibility:hidden
+            style = element.get('style')
+            if style:
+                style = style.replace(' ', '')
+                if 'display:none' in style or 'visibility:hidden' in style:
+                    return 'hidden'
 
-            elem_classes = element.get('class', [])
-            if not elem_classes:
-                continue
+            classes = element.get('class') or ()
+            if not self.HIDDEN_CLASSES.isdisjoint(classes):
+                return 'hidden class'
 
-            # Check if element has any exact hidden class (not as substring)
-            has_hidden_class = any(cls in hidden_classes for cls in elem_classes)
+            if self._is_ad(element, classes):
+                return 'ad'
 
-            if has_hidden_class:
-                # Protect semantic tags
-                if element.name in semantic_tags:
-                    continue
-                elements_to_remove.append(element)
+        if moderate and name in self.NAV_TAGS:
+            return 'navigation'
 
-        # Remove collected elements
-        for element in elements_to_remove:
-            self.removed_elements.append(f"hidden class: {element.name}")
-            element.decompose()
-    
-    def _remove_ads_and_popups(self, soup):
-        """Remove advertisement and popup elements with precise selectors
+        # Meta tags not needed for content
+        if aggressive and name == 'meta' and element.get('name') not in self.META_KEEP_NAMES:
+            return ''
 
-        Phase 2 Fix: Replaced broad selectors like '[class*="ad"]' which incorrectly
-        matched semantic classes like "antialiased" (used by Tailwind CSS), causing
-        entire body tags to be removed on 30-50% of modern websites.
+        return None
 
-        Now using precise selectors that match exact ad patterns while protecting
-        semantic HTML5 tags (body, main, article, etc.).
-        """
-        # Precise ad selectors - Phase 2 Fix
-        # Only match explicit ad-related patterns, not substrings in unrelated classes
-        ad_selectors = [
-            # ID selectors: precise prefix/suffix matching
-            '[id^="ad-"]', '[id^="ad_"]', '[id$="-ad"]', '[id$="_ad"]',
-            '[id="ad"]', '[id="ads"]', '[id="advertisement"]',
-
-            # Class selectors: complete class names only
-            '.ad', '.ads', '.ad-container', '.ad-wrapper',
-            '.advertisement', '.adsbygoogle', '.ad-slot', '.ad-banner',
-            '.ad-unit', '.ad-content', '.ad-box', '.ad-space',
-
-            # Common ad networks
-            '.google-ad', '.amazon-ad', '.facebook-ad',
-
-            # Explicit banner and popup patterns (must contain both keywords)
-            '[id*="banner"][id*="ad"]',
-            '[class*="popup"][class*="modal"]',
-
-            # Promotional and sponsored content
-            '.promo', '.promo-banner', '.sponsored', '.sponsored-content'
-        ]
+    def _is_ad(self, element, classes) -> bool:
+        """Ad/popup rules, excluding elements that look like main content"""
+        elem_id = element.get('id')
+        class_attr = ' '.join(classes)
+        if not (
+            not self.AD_CLASSES.isdisjoint(classes)
+            or (elem_id is not None and (
+                self.AD_ID_PATTERN.match(elem_id)
+                # Explicit banner and popup patterns (must contain both keywords)
+                or ('banner' in elem_id and 'ad' in elem_id)))
+            or ('popup' in class_attr and 'modal' in class_attr)
+        ):
+            return False
 
-        # Semantic HTML5 tags white-list: NEVER delete these
-        semantic_tags = {'body', 'html', 'main', 'article', 'section',
-                        'nav', 'header', 'footer', 'aside'}
+        # Protect main content areas
+        elem_classes = class_attr.lower()
+        elem_id = (elem_id or '').lower()
+        return not any(kw in elem_classes or kw in elem_id for kw in self.PROTECTED_KEYWORDS)
 
-        for selector in ad_selectors:
-            try:
-                for element in soup.select(selector):
-                    # CRITICAL: Protect semantic tags (Phase 2 Fix)
-                    if element.name in semantic_tags:
-                        continue
-
-                    # Protect main content areas (preserve original logic)
-                    elem_classes = ' '.join(element.get('class', [])).lower()
-                    elem_id = element.get('id', '').lower()
-
-                    protected_keywords = ['main', 'content', 'article', 'post', 'entry']
-                    if any(kw in elem_classes or kw in elem_id
-                           for kw in protected_keywords):
-                        continue
-
-                    # Safe to remove: not semantic, not main content
-                    self.removed_elements.append(f"ad: {element.name}")
-                    element.decompose()
-            except Exception as e:
-                # Silently continue on selector errors
-                continue
-    
-    def _remove_navigation_elements(self, soup):
-        """Remove navigation, header, footer elements"""
-        nav_tags = ['nav', 'header', 'footer', 'aside']
-        for tag in nav_tags:
-            for element in soup.find_all(tag):
-                self.removed_elements.append(f"navigation: {element.name}")
-                element.decompose()
-        
-        # Common navigation classes
-        nav_classes = ['nav', 'navigation', 'menu', 'sidebar', 'breadcrumb', 'pagination']
-        for class_name in nav_classes:
-            for element in soup.find_all(class_=lambda x: x and any(cls for cls in x if class_name in cls.lower())):
-                self.removed_elements.append(f"nav class: {element.name}")
-                element.decompose()
-    
-    def _remove_metadata_elements(self, soup):
-        """Remove metadata and tracking elements"""
-        # Meta tags not needed for content
-        for meta in soup.find_all('meta'):
-            if meta.get('name') not in ['description', 'author', 'keywords']:
-                meta.decompose()
-        
-        # Comments
-        from bs4 import Comment
-        comments = soup.find_all(string=lambda text: isinstance(text, Comment))
-        for comment in comments:
-            comment.extract()
-            
-        # Tracking and analytics
-        tracking_classes = ['analytics', 'tracking', 'pixel', 'beacon']
-        for class_name in tracking_classes:
-            for element in soup.find_all(class_=lambda x: x and any(cls for cls in x if class_name in cls.lower())):
-                element.decompose()
-    
-    def _remove_social_elements(self, soup):
-        """Remove social media widgets and share buttons"""
-        social_classes = ['social', 'share', 'facebook', 'twitter', 'linkedin', 'pinterest']
-        for class_name in social_classes:
-            for element in soup.find_all(class_=lambda x: x and any(cls for cls in x if class_name in cls.lower())):
-                self.removed_elements.append(f"social: {element.name}")
-                element.decompose()
-    
-    def _clean_attributes(self, soup):
-        """Remove unnecessary attributes to clean up HTML"""
-        for element in soup.find_all(True):
-            # Keep only essential attributes
-            essential_attrs = ['href', 'src', 'alt', 'title', 'id']
-            attrs_to_remove = [attr for attr in element.attrs.keys() if attr not in essential_attrs]
-            for attr in attrs_to_remove:
-                del element.attrs[attr]
-    
     def get_filter_stats(self):
         """Return filtering statistics"""
         stats = {}
@@ -882,11 +970,6 @@ def extract_with_htmlparser(html_content: str, url: str) -> tuple[str, str, dict
     
     return date_only, markdown_content, metadata
 
-# Create an SSL context that doesn't verify certificates for legacy sites
-ssl_context_unverified = ssl.create_default_context()
-ssl_context_unverified.check_hostname = False
-ssl_context_unverified.verify_mode = ssl.CERT_NONE
-
 # Multi-page document support constants
 MAX_PAGINATION_DEPTH = 5
 
@@ -894,6 +977,8 @@ MAX_PAGINATION_DEPTH = 5
 MAX_CRAWL_DEPTH = 10  # Absolute maximum to prevent infinite recursion
 MAX_CRAWL_PAGES = 1000  # Absolute maximum pages (increased for larger documentation sites)
 DEFAULT_CRAWL_DELAY = 0.5  # Polite crawling delay
+DEFAULT_CRAWL_WORKERS = 4  # Concurrent crawl fetch workers
+CRAWL_LOOKAHEAD_FACTOR = 4  # Frontier entries prefetched per worker
 
 # Memory protection constants
 MAX_PAGE_SIZE = 10 * 1024 * 1024  # 10MB limit for individual pages
@@ -911,6 +996,8 @@ BUILD_PATTERNS = {'/node_modules/', '/dist/', '/build/', '/.git/', '/target/',
 MAX_RETRIES = 3
 BASE_DELAY = 1.0  # Base delay in seconds (1s, 2s, 4s progression)
 MAX_JITTER = 0.1  # Add small random jitter to prevent thundering herd
+HEDGE_WORKERS = 32  # threads for both legs of hedged fetches (--hedge)
+HEDGE_LOST_ERROR_CLASS = 'hedge_timeout'  # per-host error class of a urllib leg cancelled by CDP
 
 # Define which exceptions and HTTP status codes are retryable
 RETRYABLE_EXCEPTIONS = (
@@ -1234,7 +1321,8 @@ def _determine_fetcher_via_routing(url: str) -> Optional[str]:
     Returns:
         Fetcher name ('urllib', 'selenium', 'manual_chrome') or None if routing disabled
     """
-    if not ROUTING_ENGINE_AVAILABLE or routing_engine is None:
+    routing_engine = get_routing_engine()
+    if routing_engine is None:
         return None
 
     try:
@@ -1253,14 +1341,55 @@ def _determine_fetcher_via_routing(url: str) -> Optional[str]:
         return None
 
 
+def _choose_fetcher(url: str) -> tuple[Optional[str], str]:
+    """
+    Fetcher for an auto-mode fetch: the routing config first, then per-host memory.
+
+    A config rule naming a browser fetcher always wins. Otherwise a host where
+    urllib has recently kept failing while CDP or Selenium worked is sent
+    straight to that fetcher (see utils.host_stats for decay and re-probing).
+
+    Returns:
+        tuple[Optional[str], str]: (fetcher name or None, source label for logging)
+    """
+    fetcher_choice = _determine_fetcher_via_routing(url)
+    if fetcher_choice not in (None, 'urllib'):
+        return fetcher_choice, "Config-driven routing"
+
+    learned = get_host_stats().preferred_method(url)
+    if learned:
+        logging.info(f"Host memory: urllib keeps failing for {urllib.parse.urlparse(url).hostname} "
+                     f"(last error: {get_host_stats().last_error_class(url)}), {learned} has been working")
+        return learned, "Learned routing"
+    return fetcher_choice, "Config-driven routing"
+
+
+def _routing_block_list(url: str) -> tuple:
+    """
+    Resource categories the matching routing rule asks browser fetchers to block.
+
+    Reads ``action.block`` (e.g. ``[image, font, media, tracker]``) from the
+    routing decision, which is cached, so this adds no rule evaluation cost.
+    """
+    routing_engine = get_routing_engine()
+    if routing_engine is None:
+        return ()
+    try:
+        return routing_engine.evaluate(url).block
+    except Exception as e:
+        logging.debug(f"Routing block lookup failed for {url}: {e}")
+        return ()
+
+
 def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
                          fetch_mode: str = 'auto', force_chrome: bool = False,
-                         input_url: str = None) -> tuple[str, FetchMetrics, dict]:
+                         input_url: str = None, hedge: bool = False) -> tuple[str, FetchMetrics, dict]:
     """
     Fetch HTML with exponential backoff retry logic and multi-layer fallback strategy.
 
     Implements intelligent fallback chain:
-    1. Try urllib first (existing retry logic)
+    1. Try urllib first (existing retry logic), unless routing config or the
+       per-host fetch memory picks a browser fetcher for this host
     2. If urllib fails AND fetch_mode='auto', try CDP (Chrome DevTools Protocol)
     3. If CDP fails or unavailable, try Selenium fallback (preserves login state)
     4. If Selenium fails, try manual Chrome as last resort
@@ -1273,6 +1402,9 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
                    'cdp' (cdp only), 'selenium' (selenium only)
         force_chrome: Skip Chrome health check (for faster fallback)
         input_url: Original URL as provided by user (for metadata tracking, Task-003 Phase 1)
+        hedge: In auto mode, start CDP in parallel once urllib runs past the host's
+               p90 latency budget (learned from earlier fetches) and keep the first
+               valid result; hosts without latency history are fetched sequentially
 
     Returns:
         tuple[str, FetchMetrics, dict]: (html_content, fetch_metrics, url_metadata)
@@ -1280,17 +1412,16 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
     """
     metrics = FetchMetrics(primary_method="urllib")
     start_time = time.time()
-    last_exception = None
 
     # === CONFIG-DRIVEN ROUTING: Intelligent fetcher selection ===
     # === 配置驱动路由：智能获取器选择 ===
     if fetch_mode == 'auto':
-        # Try config-driven routing first (Task-1)
-        fetcher_choice = _determine_fetcher_via_routing(url)
+        # Try config-driven routing first (Task-1), then what worked for this host before
+        fetcher_choice, route_source = _choose_fetcher(url)
 
         if fetcher_choice == 'selenium':
-            print(f"🚀 Config-driven routing: Using Selenium for {url}", file=sys.stderr)
-            logging.info(f"🚀 Config-driven routing to Selenium: {url}")
+            print(f"🚀 {route_source}: Using Selenium for {url}", file=sys.stderr)
+            logging.info(f"🚀 {route_source} to Selenium: {url}")
             metrics.primary_method = "selenium_direct"
 
             try:
@@ -1301,9 +1432,9 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
                 # Continue to urllib logic below
 
         elif fetcher_choice == 'cdp':
-            # CDP requested by routing config (e.g., for Google Search)
-            print(f"🚀 Config-driven routing: Using CDP for {url}", file=sys.stderr)
-            logging.info(f"🚀 Config-driven routing to CDP: {url}")
+            # CDP requested by routing config (e.g., for Google Search) or learned for the host
+            print(f"🚀 {route_source}: Using CDP for {url}", file=sys.stderr)
+            logging.info(f"🚀 {route_source} to CDP: {url}")
             metrics.primary_method = "cdp_direct"
 
             try:
@@ -1333,137 +1464,358 @@ def fetch_html_with_retry(url: str, ua: Optional[str] = None, timeout: int = 30,
         metrics.primary_method = "cdp"
         return _try_cdp_fetch(url, ua, timeout, metrics, start_time, input_url)
 
+    # Hedging mode: start CDP alongside urllib once it runs past the host's latency budget
+    if hedge and fetch_mode == 'auto':
+        budget = _hedge_budget(url)
+        if budget is not None:
+            return _hedged_fetch(url, ua, timeout, metrics, start_time, input_url, force_chrome, budget)
+
     # Try urllib first (fetch_mode: 'auto' or 'urllib')
+    result, last_exception = _urllib_retry_chain(url, ua, timeout, fetch_mode, metrics, start_time, input_url)
+    if result is not None:
+        return result
+
+    # Phase 2: urllib gave up (non-retryable error or retries exhausted) - try CDP then Selenium fallback if enabled
+    if fetch_mode == 'auto':
+        return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(last_exception), input_url, force_chrome)
+
+    # urllib-only mode or fallbacks not enabled - fail normally
+    _record_fetch_failure(metrics, start_time, last_exception)
+    logging.error(f"All {MAX_RETRIES + 1} attempts failed for {url}, giving up")
+    raise last_exception
+
+
+class _HedgeCancel(threading.Event):
+    """
+    Cancellation flag of a hedged urllib leg that also decides, under one lock,
+    whether the leg or the hedger records the leg's per-host outcome: exactly
+    one of them does, so a leg that finishes while CDP wins is never counted
+    both as a success (or failure) and as a lost hedge.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._claim_lock = threading.Lock()
+        self._claimed = False
+
+    def claim(self) -> bool:
+        """Leg side: True when the leg records its own outcome (not cancelled yet)"""
+        with self._claim_lock:
+            if self._claimed or self.is_set():
+                return False
+            self._claimed = True
+            return True
+
+    def cancel(self) -> bool:
+        """Hedger side: cancel the leg; True when the leg has not recorded an outcome"""
+        with self._claim_lock:
+            self.set()
+            claimed, self._claimed = self._claimed, True
+            return not claimed
+
+
+def _urllib_retry_chain(url: str, ua: Optional[str], timeout: int, fetch_mode: str,
+                        metrics: FetchMetrics, start_time: float, input_url: str = None,
+                        cancel_event: Optional[_HedgeCancel] = None) -> tuple[Optional[tuple], Optional[Exception]]:
+    """
+    urllib stage of fetch_html_with_retry(): attempts with classifier-driven retries.
+
+    Args:
+        cancel_event: Set by a hedged fetch whose CDP leg already won; stops further
+            attempts and back-off sleeps (an in-flight request still runs to completion).
+            The per-host outcome is recorded by whichever of this chain and the hedged
+            fetch claims it first
+
+    Returns:
+        tuple: ((html, metrics, url_metadata), None) on success, or (None, last_exception)
+        when urllib gives up and the browser fallback chain should take over
+
+    Raises:
+        Exception: The urllib error, when the failure policy says to fail outright
+    """
+    last_exception = None
     for attempt in range(MAX_RETRIES + 1):  # 0, 1, 2, 3 (4 total attempts)
         metrics.total_attempts = attempt + 1
-        
+
         try:
             if attempt > 0:
                 delay = calculate_backoff_delay(attempt - 1)
                 logging.info(f"Retry attempt {attempt}/{MAX_RETRIES} for {url} after {delay:.1f}s delay")
-                time.sleep(delay)
-            
+                if _sleep_unless_cancelled(delay, cancel_event):
+                    return None, last_exception
+
             # Call the original fetch_html function and track metrics
             html, fetch_metrics, final_url = fetch_html_original(url, ua, timeout)
             logging.debug(f"Task-003: Received final_url from fetch_html_original: {final_url}")
+            url_metadata = _record_urllib_success(metrics, fetch_metrics, start_time, input_url or url, final_url)
+            if cancel_event is None or cancel_event.claim():
+                _record_urllib_outcome(url, metrics)
+            return (html, metrics, url_metadata), None
 
-            # Merge metrics from original fetch
-            metrics.fetch_duration = time.time() - start_time
-            metrics.ssl_fallback_used = fetch_metrics.ssl_fallback_used
-            if fetch_metrics.fallback_method:
-                metrics.fallback_method = fetch_metrics.fallback_method
-            metrics.final_status = "success"
-
-            # Task-003 Phase 1: Create URL metadata
-            url_metadata = create_url_metadata(
-                input_url=input_url or url,  # Use preserved input_url if provided
-                final_url=final_url,
-                fetch_mode='urllib'
-            )
-            logging.debug(f"Task-003: Created URL metadata: {url_metadata}")
-
-            return html, metrics, url_metadata
-            
         except Exception as e:
             last_exception = e
-
-            # Log the error with context
-            if attempt == 0:
-                logging.warning(f"Initial fetch failed for {url}: {type(e).__name__}: {e}")
-            else:
-                logging.warning(f"Retry {attempt}/{MAX_RETRIES} failed for {url}: {type(e).__name__}: {e}")
-
-            # Phase 1: Classify error using unified classifier
-            should_retry = True
-            wait_time = calculate_backoff_delay(attempt) if attempt < MAX_RETRIES else 0
-
-            if ERROR_CLASSIFIER_AVAILABLE and error_classifier:
-                classification = error_classifier.classify_error(e, url)
-                logging.info(f"Error classified as {classification.error_type.value}: {classification.reason}")
-
-                # Handle permanent errors
-                if classification.error_type == ErrorType.PERMANENT:
-                    logging.error(f"Permanent error: {classification.reason}")
-                    if classification.fallback_method == "selenium" and fetch_mode == 'auto':
-                        return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(e), input_url, force_chrome)
-
-                    # Store the exception for error reporting
-                    metrics.fetch_duration = time.time() - start_time
-                    metrics.final_status = "failed"
-                    metrics.error_message = str(e)
-                    raise e
-
-                # Handle SSL configuration errors - immediate CDP/Selenium fallback
-                elif classification.error_type == ErrorType.SSL_CONFIG:
-                    logging.warning(f"SSL configuration error: {classification.reason}")
-                    if fetch_mode == 'auto':
-                        return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(e), input_url, force_chrome)
-
-                    metrics.fetch_duration = time.time() - start_time
-                    metrics.final_status = "failed"
-                    metrics.error_message = str(e)
-                    raise e
-
-                # Use classifier's retry recommendation
-                should_retry = classification.should_retry
-                wait_time = classification.recommended_wait if classification.should_retry else 0
-            else:
-                # Fallback to legacy should_retry_exception logic
-                should_retry = should_retry_exception(e)
-
-            # Check if we should retry this exception
-            if not should_retry:
-                # Special handling for HTTP 307 redirect loops
-                if isinstance(e, urllib.error.HTTPError) and e.status == 307:
-                    logging.error(f"HTTP 307 redirect loop detected for {url}. "
-                                 f"This may indicate a redirect loop. "
-                                 f"Try using a specific page URL instead of the root domain.")
-                else:
-                    logging.info(f"Non-retryable error for {url}, failing immediately: {type(e).__name__}")
-
-                # Phase 2: Immediate CDP/Selenium fallback for non-retryable errors (if enabled)
-                if fetch_mode == 'auto':
-                    return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(e), input_url, force_chrome)
-
+            action, wait_time = _urllib_failure_action(e, url, attempt, fetch_mode)
+            if action == 'raise':
                 # Store the exception for error reporting
-                metrics.fetch_duration = time.time() - start_time
-                metrics.final_status = "failed"
-                metrics.error_message = str(e)
+                _record_fetch_failure(metrics, start_time, e)
                 raise e
-
-            # If this was the last attempt, don't sleep
-            if attempt == MAX_RETRIES:
+            if action in ('fallback', 'exhausted'):
                 break
 
             # Use classifier's recommended wait time if available
-            if wait_time > 0 and attempt < MAX_RETRIES:
+            if wait_time > 0:
                 logging.info(f"Waiting {wait_time:.1f}s before retry {attempt + 1}/{MAX_RETRIES}")
-                time.sleep(wait_time)
-    
-    # Phase 2: All urllib retry attempts exhausted - try CDP then Selenium fallback if enabled
-    if fetch_mode == 'auto':
-        return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time, str(last_exception), input_url, force_chrome)
+                if _sleep_unless_cancelled(wait_time, cancel_event):
+                    return None, last_exception
+
+    if cancel_event is None or cancel_event.claim():
+        metrics.fetch_duration = time.time() - start_time
+        _record_urllib_outcome(url, metrics, last_exception)
+    return None, last_exception
 
-    # urllib-only mode or fallbacks not enabled - fail normally
-    metrics.fetch_duration = time.time() - start_time
-    metrics.final_status = "failed"
-    metrics.error_message = str(last_exception)
-    logging.error(f"All {MAX_RETRIES + 1} attempts failed for {url}, giving up")
-    raise last_exception
 
+def _sleep_unless_cancelled(seconds: float, cancel_event: Optional[_HedgeCancel]) -> bool:
+    """Sleep between urllib attempts; True when cancel_event was set meanwhile"""
+    if cancel_event is None:
+        time.sleep(seconds)
+        return False
+    return cancel_event.wait(seconds)
 
 
-def _create_empty_metrics_with_guidance() -> FetchMetrics:
+def _record_urllib_outcome(url: str, metrics: FetchMetrics, error: Optional[Exception] = None):
+    """Record how the urllib stage ended (fetch_duration, error class) in the per-host statistics"""
+    get_host_stats().record(url, 'urllib', metrics.fetch_duration, ok=error is None,
+                            error_class=_error_class(error, url) if error is not None else None)
+
+
+def _error_class(error: Exception, url: str) -> str:
+    """Classified error type ('ssl_config', 'temporary', ...) for the per-host statistics"""
+    error_classifier = get_error_classifier()
+    if error_classifier:
+        try:
+            return error_classifier.classify_error(error, url).error_type.value
+        except Exception as e:
+            logging.debug(f"Error classification failed for {url}: {e}")
+    return type(error).__name__
+
+
+def _fetch_and_remember(method: str, url: str, fetch: Callable, *args, **kwargs):
+    """Run one browser fetcher call, recording its outcome in the per-host statistics"""
+    started = time.time()
+    try:
+        result = fetch(*args, **kwargs)
+    except Exception as e:
+        get_host_stats().record(url, method, time.time() - started, ok=False, error_class=_error_class(e, url))
+        raise
+    get_host_stats().record(url, method, time.time() - started, ok=True)
+    return result
+
+
+def _hedge_budget(url: str) -> Optional[float]:
     """
-    Create empty metrics with helpful guidance message.
-    Used when both urllib and Selenium fail or Selenium is unavailable.
+    Seconds to give urllib before hedging with CDP, or None to fetch sequentially
+    (no latency history for the host yet, or CDP not available).
     """
-    metrics = FetchMetrics(
-        primary_method="failed",
-        final_status="failed",
-        error_message="Both urllib and Selenium failed. To enable Selenium fallback, start Chrome debug session with: ./config/chrome-debug.sh"
-    )
-    return metrics
+    budget = get_host_stats().budget(url)
+    if budget is None or _cdp_fetch_function() is None:
+        return None
+    return budget
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    """Thread pool running both legs of hedged fetches / 对冲抓取线程池"""
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedge_executor_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix='wf-hedge')
+    return _hedge_executor
+
+
+def _hedged_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetrics, start_time: float,
+                  input_url: str, force_chrome: bool, budget: float) -> tuple[str, FetchMetrics, dict]:
+    """
+    Auto-mode fetch that races CDP against a slow urllib chain.
+    对冲抓取：urllib 超出预算后并行启动 CDP，取先返回有效内容者。
+
+    urllib runs first. If it has not finished within budget seconds, a CDP
+    fetch starts in parallel and the first leg to produce a non-empty page
+    wins; the loser is cancelled (urllib stops retrying, a queued CDP fetch is
+    dropped, and in-flight work runs to completion with its result
+    discarded). A urllib leg that loses is recorded in the per-host
+    statistics as a failure at its elapsed time, so hosts where urllib keeps
+    losing build up evidence for learned routing. A permanent urllib error such as HTTP 404 still fails the
+    fetch, and Selenium remains the last resort when both legs fail.
+    """
+    executor = _get_hedge_executor()
+    cancel_urllib = _HedgeCancel()
+    urllib_future = executor.submit(_urllib_retry_chain, url, ua, timeout, 'auto', metrics,
+                                    start_time, input_url, cancel_urllib)
+    try:
+        result, urllib_error = urllib_future.result(timeout=budget)
+    except FuturesTimeoutError:
+        pass
+    else:
+        # urllib finished within budget: continue exactly as the sequential chain
+        if result is not None:
+            return result
+        return _try_cdp_fallback_after_urllib_failure(url, ua, timeout, metrics, start_time,
+                                                      str(urllib_error), input_url, force_chrome)
+
+    logging.info(f"⏱ urllib exceeded {budget:.2f}s hedge budget for {url}, starting CDP in parallel")
+    metrics.hedged = True
+    cdp_metrics = dataclasses.replace(metrics)  # the urllib leg keeps mutating metrics
+    cdp_future = executor.submit(_try_cdp_fetch, url, ua, timeout, cdp_metrics, start_time, input_url)
+
+    urllib_error = cdp_error = None
+    pending = {urllib_future, cdp_future}
+    while pending:
+        done, pending = futures_wait(pending, return_when=FIRST_COMPLETED)
+
+        if urllib_future in done:
+            try:
+                result, urllib_error = urllib_future.result()
+            except Exception:
+                # Permanent error (e.g. 404): the page does not exist, whatever CDP renders
+                cdp_future.cancel()
+                raise
+            if result is not None:
+                cdp_future.cancel()
+                logging.info(f"✓ urllib won hedged fetch for {url}")
+                return result
+
+        if cdp_future in done:
+            try:
+                html, cdp_metrics, url_metadata = cdp_future.result()
+            except Exception as e:
+                cdp_error = e
+            else:
+                if html and html.strip():
+                    if cancel_urllib.cancel():
+                        # The urllib leg lost: count it as a failure at the time it was given up
+                        get_host_stats().record(url, 'urllib', time.time() - start_time, ok=False,
+                                                error_class=HEDGE_LOST_ERROR_CLASS)
+                    cdp_metrics.fallback_method = "cdp"
+                    logging.info(f"✓ CDP won hedged fetch for {url}")
+                    return html, cdp_metrics, url_metadata
+                cdp_error = Exception("CDP returned empty content")
+
+    logging.warning(f"Both hedged legs failed for {url}: urllib: {urllib_error}; CDP: {cdp_error}")
+    return _try_selenium_fallback_after_urllib_failure(
+        url, ua, timeout, metrics, start_time,
+        f"urllib failed: {urllib_error}. CDP failed: {cdp_error}",
+        input_url, force_chrome
+    )
+
+
+def _record_urllib_success(metrics: FetchMetrics, fetch_metrics: FetchMetrics, start_time: float,
+                           input_url: str, final_url: str) -> dict:
+    """Merge a successful fetch_html_original() attempt into the retry metrics; returns url_metadata"""
+    metrics.fetch_duration = time.time() - start_time
+    metrics.ssl_fallback_used = fetch_metrics.ssl_fallback_used
+    metrics.cache_hits += fetch_metrics.cache_hits
+    metrics.cache_misses += fetch_metrics.cache_misses
+    if fetch_metrics.fallback_method:
+        metrics.fallback_method = fetch_metrics.fallback_method
+    metrics.final_status = "success"
+
+    # Task-003 Phase 1: Create URL metadata
+    url_metadata = create_url_metadata(
+        input_url=input_url,  # Preserved input_url if provided
+        final_url=final_url,
+        fetch_mode='urllib'
+    )
+    logging.debug(f"Task-003: Created URL metadata: {url_metadata}")
+    return url_metadata
+
+
+def _record_fetch_failure(metrics: FetchMetrics, start_time: float, error: Exception):
+    metrics.fetch_duration = time.time() - start_time
+    metrics.final_status = "failed"
+    metrics.error_message = str(error)
+
+
+def _urllib_failure_action(e: Exception, url: str, attempt: int, fetch_mode: str) -> tuple[str, float]:
+    """
+    Decide how the urllib retry loop continues after a failed attempt.
+
+    Shared by fetch_html_with_retry() and async_fetch.afetch(), so both apply
+    the same classifier-driven policy.
+
+    Returns:
+        tuple[str, float]: (action, wait_time). action is 'fallback' (hand over to
+        the CDP/Selenium chain), 'raise' (fail with e), 'exhausted' (no attempts
+        left) or 'retry' (wait wait_time seconds first)
+    """
+    # Log the error with context
+    if attempt == 0:
+        logging.warning(f"Initial fetch failed for {url}: {type(e).__name__}: {e}")
+    else:
+        logging.warning(f"Retry {attempt}/{MAX_RETRIES} failed for {url}: {type(e).__name__}: {e}")
+
+    # Phase 1: Classify error using unified classifier
+    should_retry = True
+    wait_time = calculate_backoff_delay(attempt) if attempt < MAX_RETRIES else 0
+
+    error_classifier = get_error_classifier()
+    if error_classifier:
+        classification = error_classifier.classify_error(e, url)
+        logging.info(f"Error classified as {classification.error_type.value}: {classification.reason}")
+
+        # Handle permanent errors
+        if classification.error_type == ErrorType.PERMANENT:
+            logging.error(f"Permanent error: {classification.reason}")
+            if classification.fallback_method == "selenium" and fetch_mode == 'auto':
+                return 'fallback', 0
+            return 'raise', 0
+
+        # Handle SSL configuration errors - immediate CDP/Selenium fallback
+        elif classification.error_type == ErrorType.SSL_CONFIG:
+            logging.warning(f"SSL configuration error: {classification.reason}")
+            return ('fallback' if fetch_mode == 'auto' else 'raise'), 0
+
+        # Use classifier's retry recommendation
+        should_retry = classification.should_retry
+        wait_time = classification.recommended_wait if classification.should_retry else 0
+    else:
+        # Fallback to legacy should_retry_exception logic
+        should_retry = should_retry_exception(e)
+
+    # Check if we should retry this exception
+    if not should_retry:
+        # Special handling for HTTP 307 redirect loops
+        if isinstance(e, urllib.error.HTTPError) and e.status == 307:
+            logging.error(f"HTTP 307 redirect loop detected for {url}. "
+                         f"This may indicate a redirect loop. "
+                         f"Try using a specific page URL instead of the root domain.")
+        else:
+            logging.info(f"Non-retryable error for {url}, failing immediately: {type(e).__name__}")
+
+        # Phase 2: Immediate CDP/Selenium fallback for non-retryable errors (if enabled)
+        return ('fallback' if fetch_mode == 'auto' else 'raise'), 0
+
+    # If this was the last attempt, don't sleep
+    if attempt == MAX_RETRIES:
+        return 'exhausted', 0
+    return 'retry', wait_time
+
+
+
+def _create_empty_metrics_with_guidance() -> FetchMetrics:
+    """
+    Create empty metrics with helpful guidance message.
+    Used when both urllib and Selenium fail or Selenium is unavailable.
+    """
+    metrics = FetchMetrics(
+        primary_method="failed",
+        final_status="failed",
+        error_message="Both urllib and Selenium failed. To enable Selenium fallback, start Chrome debug session with: ./config/chrome-debug.sh"
+    )
+    return metrics
 
 
 def _try_cdp_fallback_after_urllib_failure(url: str, ua: Optional[str], timeout: int,
@@ -1493,7 +1845,7 @@ def _try_cdp_fallback_after_urllib_failure(url: str, ua: Optional[str], timeout:
     """
     logging.info(f"urllib failed for {url}, attempting CDP fallback...")
 
-    if not CDP_INTEGRATION_AVAILABLE:
+    if _cdp_fetch_function() is None:
         logging.info("CDP integration not available, falling back to Selenium")
         return _try_selenium_fallback_after_urllib_failure(
             url, ua, timeout, metrics, start_time, urllib_error, input_url, force_chrome
@@ -1522,7 +1874,24 @@ def _try_cdp_fallback_after_urllib_failure(url: str, ua: Optional[str], timeout:
         )
 
 
-def _try_cdp_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetrics, start_time: float, input_url: str = None, wait_time: float = 3.0) -> tuple[str, FetchMetrics, dict]:
+def _template_ready_selector(url: str) -> Optional[str]:
+    """
+    Get the CDP ready selector configured by the URL's parsing template.
+
+    Templates may declare ``fetch: {ready_selector: "<css>"}``; browser fetches
+    then treat the page as ready once that element exists.
+    """
+    try:
+        from webfetcher.parsing.engine.template_registry import get_template_registry
+        template = get_template_registry().loader.get_template_for_url(url)
+    except Exception as e:
+        logging.debug(f"Template lookup for ready selector failed: {e}")
+        return None
+    fetch_config = (template or {}).get('fetch') or {}
+    return fetch_config.get('ready_selector') if isinstance(fetch_config, dict) else None
+
+
+def _try_cdp_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetrics, start_time: float, input_url: str = None, wait_time: Optional[float] = None) -> tuple[str, FetchMetrics, dict]:
     """
     Try CDP (Chrome DevTools Protocol) fetch.
 
@@ -1539,7 +1908,8 @@ def _try_cdp_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetr
         metrics: FetchMetrics object to update
         start_time: Start time for duration calculation
         input_url: Original URL as provided by user (for metadata tracking)
-        wait_time: Time to wait for page rendering (default 3s)
+        wait_time: Fixed time to wait for page rendering; None (default) waits for
+            CDP readiness events (load + network idle, or the template's ready selector)
 
     Returns:
         tuple[str, FetchMetrics, dict]: (html_content, updated_metrics, url_metadata)
@@ -1547,7 +1917,8 @@ def _try_cdp_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetr
     Raises:
         Exception: When CDP is not available or fetch fails
     """
-    if not CDP_INTEGRATION_AVAILABLE:
+    fetch_with_cdp = _cdp_fetch_function()
+    if fetch_with_cdp is None:
         error_msg = "CDP integration not available - install with: pip install pychrome"
         logging.error(f"CDP mode requested but CDP integration not available")
         metrics.fetch_duration = time.time() - start_time
@@ -1559,7 +1930,9 @@ def _try_cdp_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetr
         logging.info(f"🔌 Attempting CDP fetch for {url}")
 
         # Use the simplified fetch_with_cdp interface
-        html, final_url, cdp_metadata = fetch_with_cdp(url, wait_time=wait_time)
+        html, final_url, cdp_metadata = _fetch_and_remember('cdp', url, fetch_with_cdp, url, wait_time=wait_time,
+                                                            ready_selector=_template_ready_selector(url),
+                                                            block=_routing_block_list(url))
 
         # Update metrics
         metrics.fetch_duration = time.time() - start_time
@@ -1576,6 +1949,8 @@ def _try_cdp_fetch(url: str, ua: Optional[str], timeout: int, metrics: FetchMetr
         logging.info(f"✓ CDP fetch successful for {url}")
         logging.info(f"  HTML length: {len(html)} chars")
         logging.info(f"  Duration: {metrics.fetch_duration:.2f}s")
+        if cdp_metadata.get('wait_reason'):
+            logging.info(f"  Page ready: {cdp_metadata['wait_reason']} after {cdp_metadata.get('time_to_ready', 0):.2f}s")
 
         return html, metrics, url_metadata
 
@@ -1614,13 +1989,15 @@ def _try_selenium_fetch(url: str, ua: Optional[str], timeout: int, metrics: Fetc
         SeleniumFetchError: When Selenium fetch fails
         SeleniumTimeoutError: When fetch times out
     """
-    if not SELENIUM_INTEGRATION_AVAILABLE:
+    selenium_integration = _selenium_integration()
+    if selenium_integration is None:
         error_msg = "Selenium integration not available - install requirements-selenium.txt"
         logging.error(f"Selenium mode requested but Selenium integration not available")
         metrics.fetch_duration = time.time() - start_time
         metrics.final_status = "failed"
         metrics.error_message = error_msg
         raise SeleniumNotAvailableError(error_msg)
+    SeleniumConfig, SeleniumFetcher = selenium_integration
 
     try:
         # Load Selenium configuration
@@ -1701,7 +2078,8 @@ def _try_selenium_fetch(url: str, ua: Optional[str], timeout: int, metrics: Fetc
                 raise ChromeConnectionError(message)
 
             # Fetch HTML using Selenium
-            html_content, selenium_metrics = fetcher.fetch_html_selenium(url, ua, timeout)
+            html_content, selenium_metrics = _fetch_and_remember('selenium', url, fetcher.fetch_html_selenium,
+                                                                 url, ua, timeout, block=_routing_block_list(url))
 
             # Update main metrics with Selenium data
             metrics.fetch_duration = time.time() - start_time
@@ -1768,7 +2146,8 @@ def _try_manual_chrome_fallback(url: str, metrics: FetchMetrics, start_time: flo
     )
 
     # Check if manual Chrome is available and enabled
-    if not MANUAL_CHROME_AVAILABLE or manual_chrome_helper is None:
+    manual_chrome_helper = get_manual_chrome_helper()
+    if manual_chrome_helper is None:
         logging.debug("Manual Chrome fallback not available or disabled")
         metrics.fetch_duration = time.time() - start_time
         metrics.final_status = "failed"
@@ -1862,12 +2241,14 @@ def _try_selenium_fallback_after_urllib_failure(url: str, ua: Optional[str], tim
     """
     logging.info(f"urllib failed for {url}, attempting Selenium fallback...")
     
-    if not SELENIUM_INTEGRATION_AVAILABLE:
+    selenium_integration = _selenium_integration()
+    if selenium_integration is None:
         logging.warning("Selenium fallback requested but integration not available")
         # Try manual Chrome as last resort
         error_msg = f"urllib failed: {urllib_error}. Selenium fallback not available - install requirements-selenium.txt"
         return _try_manual_chrome_fallback(url, metrics, start_time, error_msg, input_url)
-    
+    SeleniumConfig, SeleniumFetcher = selenium_integration
+
     try:
         # Load Selenium configuration
         config = SeleniumConfig()
@@ -1910,7 +2291,8 @@ def _try_selenium_fallback_after_urllib_failure(url: str, ua: Optional[str], tim
                 return _try_manual_chrome_fallback(url, metrics, start_time, error_msg, input_url)
             
             # Attempt Selenium fetch
-            html_content, selenium_metrics = fetcher.fetch_html_selenium(url, ua, timeout)
+            html_content, selenium_metrics = _fetch_and_remember('selenium', url, fetcher.fetch_html_selenium,
+                                                                 url, ua, timeout, block=_routing_block_list(url))
             
             # Update metrics - urllib failed, Selenium succeeded
             metrics.fallback_method = "selenium"
@@ -2101,49 +2483,110 @@ def fetch_html_original(url: str, ua: Optional[str] = None, timeout: int = 30) -
     """
     Fetch HTML using urllib with enhanced SSL error handling.
 
+    When the HTTP disk cache is enabled, a stored copy is revalidated with
+    If-None-Match / If-Modified-Since; a 304 answer returns the stored HTML
+    without downloading or decoding the body.
+
     Returns:
         tuple[str, FetchMetrics, str]: (html_content, fetch_metrics, final_url)
                                        final_url is the URL after following redirects
     """
     metrics = FetchMetrics(primary_method="urllib")
-    ua = ua or "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0 Safari/537.36"
-    req = urllib.request.Request(url, headers={"User-Agent": ua, "Accept-Language": "zh-CN,zh;q=0.9"})
-    
+    ua, headers, http_cache, cached = _prepare_page_request(url, ua)
+    req = urllib.request.Request(url, headers=headers)
+
     try:
         # Use unverified SSL context for sites with legacy SSL configurations
-        with urllib.request.urlopen(req, timeout=timeout, context=ssl_context_unverified) as r:
+        # Shared keep-alive pool: repeated requests to one host reuse the TCP/TLS connection
+        with pooled_urlopen(req, timeout=timeout, context=unverified_ssl_context()) as r:
+            if cached and r.status == 304:
+                return _cached_page(url, ua, http_cache, cached, metrics)
+            truncated = False
             try:
                 data = r.read(MAX_PAGE_SIZE)  # Limit read size
                 # Check if there's more data and truncate if needed
                 remaining = r.read(1)
                 if remaining:
+                    truncated = True
                     logging.warning(f"Page truncated at {MAX_PAGE_SIZE} bytes: {url}")
             except http_client.IncompleteRead as e:
+                truncated = True
                 logging.warning(f"Incomplete read, using partial data: {len(e.partial or b'')} bytes")
                 data = (e.partial or b"")
-            # 使用智能解码替代简单的UTF-8解码
-            html = smart_decode(data, r)
-
-            # Task-003 Phase 1: Capture final URL after redirects
-            final_url = r.geturl()
-            logging.debug(f"Task-003: Final URL after redirects: {final_url}")
-
-            metrics.final_status = "success"
-            return html, metrics, final_url
+            return _decoded_page(url, ua, r, data, truncated, http_cache, metrics)
             
+    except urllib.error.HTTPError as e:
+        # urlopen (proxy path) reports 304 as an HTTPError
+        if cached and e.code == 304:
+            return _cached_page(url, ua, http_cache, cached, metrics)
+        _record_page_error(url, e, metrics)
+        raise
     except Exception as e:
-        # If SSL error, provide enhanced error reporting
-        if "SSL" in str(e) or "CERTIFICATE" in str(e).upper():
-            error_msg = f"SSL verification failed for {url}. Consider using different SSL handling."
-            logging.error(error_msg)
-            metrics.final_status = "failed"
-            metrics.error_message = error_msg
-            raise
+        _record_page_error(url, e, metrics)
+        raise
+
 
-        logging.error(f"Failed to fetch HTML from {url}: {e}")
+def _prepare_page_request(url: str, ua: Optional[str]) -> tuple:
+    """
+    Request headers for a page fetch, with cache validators when a stored copy exists.
+
+    Returns:
+        tuple: (ua, headers, http_cache, cached_entry); http_cache/cached_entry may be None
+    """
+    ua = ua or DEFAULT_DESKTOP_UA
+    headers = {"User-Agent": ua, "Accept-Language": "zh-CN,zh;q=0.9"}
+
+    # HTTP disk cache: revalidate a stored copy instead of re-downloading it
+    http_cache = get_http_cache()
+    cached = http_cache.lookup(url, ua) if http_cache else None
+    if cached:
+        headers.update(cached.validators())
+    return ua, headers, http_cache, cached
+
+
+def _cached_page(url: str, ua: str, http_cache, cached, metrics: FetchMetrics) -> tuple[str, FetchMetrics, str]:
+    """304 Not Modified: serve the stored copy"""
+    logging.debug(f"HTTP cache: 304 Not Modified, using stored copy of {url}")
+    http_cache.touch(url, ua)
+    http_cache.record(hit=True)
+    metrics.cache_hits += 1
+    metrics.final_status = "success"
+    return cached.html, metrics, cached.final_url
+
+
+def _decoded_page(url: str, ua: str, response, data: bytes, truncated: bool, http_cache,
+                  metrics: FetchMetrics) -> tuple[str, FetchMetrics, str]:
+    """Decode a downloaded page and store it in the HTTP cache (complete pages only)"""
+    # 使用智能解码替代简单的UTF-8解码
+    html = smart_decode(data, response)
+
+    # Task-003 Phase 1: Capture final URL after redirects
+    final_url = response.geturl()
+    logging.debug(f"Task-003: Final URL after redirects: {final_url}")
+
+    if http_cache:
+        http_cache.record(hit=False)
+        metrics.cache_misses += 1
+        if not truncated:  # Never store a partial page
+            http_cache.store(url, ua, final_url, html, response.headers)
+
+    metrics.final_status = "success"
+    return html, metrics, final_url
+
+
+def _record_page_error(url: str, e: Exception, metrics: FetchMetrics):
+    """Log a failed page fetch and record it in the metrics"""
+    # If SSL error, provide enhanced error reporting
+    if not isinstance(e, urllib.error.HTTPError) and ("SSL" in str(e) or "CERTIFICATE" in str(e).upper()):
+        error_msg = f"SSL verification failed for {url}. Consider using different SSL handling."
+        logging.error(error_msg)
         metrics.final_status = "failed"
-        metrics.error_message = str(e)
-        raise
+        metrics.error_message = error_msg
+        return
+
+    logging.error(f"Failed to fetch HTML from {url}: {e}")
+    metrics.final_status = "failed"
+    metrics.error_message = str(e)
 
 # Public interface - using direct urllib with retry fallback
 fetch_html = fetch_html_with_retry
@@ -2183,7 +2626,7 @@ def resolve_final_url(url: str, ua: Optional[str] = None, timeout: int = 10, max
             req.get_method = lambda: 'HEAD'
             
             try:
-                with urllib.request.urlopen(req, timeout=timeout, context=ssl_context_unverified) as response:
+                with pooled_urlopen(req, timeout=timeout, context=unverified_ssl_context()) as response:
                     # If we get here without exception, no redirect occurred
                     final_url = response.geturl()
                     if final_url != current_url:
@@ -2329,7 +2772,7 @@ def resolve_redirects_with_get(url: str, ua: str, timeout: int, max_redirects: i
                 "Accept-Language": "zh-CN,zh;q=0.9"
             })
             
-            with urllib.request.urlopen(req, timeout=timeout, context=ssl_context_unverified) as response:
+            with pooled_urlopen(req, timeout=timeout, context=unverified_ssl_context()) as response:
                 final_url = response.geturl()
                 if final_url != current_url:
                     was_redirected = True
@@ -2399,6 +2842,31 @@ def get_effective_host(url: str, ua: Optional[str] = None) -> str:
         return urllib.parse.urlparse(url).hostname or ''
 
 
+DEFAULT_DESKTOP_UA = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0 Safari/537.36"
+
+
+def select_user_agent(host: str, original_host: str = '') -> str:
+    """
+    Pick the User-Agent for a page from its (effective) hostname.
+    根据（有效）主机名选择 User-Agent。
+
+    Args:
+        host: Effective hostname (after redirects, if known)
+        original_host: Hostname of the URL as given by the user
+
+    Returns:
+        str: User-Agent string
+    """
+    # Use a mobile WeChat UA for WeChat pages; desktop Chrome UA for XHS
+    if 'mp.weixin.qq.com' in host or 'weixin.qq.com' in host:
+        return 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 MicroMessenger/8.0.42(0x18002a2c) NetType/WIFI Language/zh_CN'
+    elif 'xiaohongshu.com' in host or 'xhslink.com' in original_host:
+        return 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    elif 'dianping.com' in host:
+        return 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1'
+    return DEFAULT_DESKTOP_UA
+
+
 def try_render_with_metrics(url: str, ua: Optional[str] = None, timeout_ms: int = 60000) -> tuple[Optional[str], FetchMetrics]:
     """
     Try to render page with Playwright and track metrics.
@@ -2475,8 +2943,22 @@ def ensure_unique_path(outdir: Path, base: str) -> Path:
         n += 1
 
 
+_output_path_lock = threading.Lock()
+
+
+def _reserve_output_path(outdir: Path, base: str) -> Path:
+    """
+    ensure_unique_path() that also creates the file, so concurrent batch
+    workers saving pages with the same title never pick the same path.
+    """
+    with _output_path_lock:
+        path = ensure_unique_path(outdir, base)
+        path.touch()
+    return path
+
+
 # WeChat parser moved to parsers module
-# Import above: from webfetcher.parsing.parser import wechat_to_markdown
+# Lazy wrapper above: wechat_to_markdown -> webfetcher.parsing.parser
 
 class PageType(Enum):
     """页面类型枚举"""
@@ -2485,7 +2967,7 @@ class PageType(Enum):
 
 
 # XiaoHongShu parser moved to parsers module
-# Import above: from webfetcher.parsing.parser import xhs_to_markdown
+# Lazy wrapper above: xhs_to_markdown -> webfetcher.parsing.parser
 
 def detect_page_type(html: str, url: Optional[str] = None, is_crawling: bool = False) -> PageType:
     """
@@ -2507,7 +2989,7 @@ def detect_page_type(html: str, url: Optional[str] = None, is_crawling: bool = F
     # Mode-aware detection: Skip detection in single-page mode
     if not is_crawling:
         # Check for emergency disable via environment variable
-        if os.environ.get('WF_FORCE_PAGE_DETECTION', '').lower() == 'true':
+        if getenv('WF_FORCE_PAGE_DETECTION', '').lower() == 'true':
             logging.debug("WF_FORCE_PAGE_DETECTION is set, proceeding with detection")
         else:
             logging.debug("Single-page mode: defaulting to ARTICLE type")
@@ -2522,99 +3004,28 @@ def detect_page_type(html: str, url: Optional[str] = None, is_crawling: bool = F
             logging.debug(f"12371.cn article pattern detected: {url}")
             return PageType.ARTICLE
     
-    # 1. 提取所有链接
-    link_pattern = r'<a[^>]*href=["\']([^"\']+)["\'][^>]*>(.*?)</a>'
-    links = re.findall(link_pattern, html, re.I | re.S)
-    
-    # 2. 计算页面文本总量（去除HTML标签）
-    # 移除脚本和样式
-    clean_html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.I | re.S)
-    clean_html = re.sub(r'<style[^>]*>.*?</style>', '', clean_html, flags=re.I | re.S)
-    # 提取纯文本
-    text_content = re.sub(r'<[^>]+>', ' ', clean_html)
-    text_content = ihtml.unescape(text_content)
-    total_text_length = len(text_content.strip())
-    
-    # 3. 计算有效链接数量（排除导航、页脚等）
-    content_links = []
-    anchor_links = []  # 添加锚点链接列表
-    for href, link_text in links:
-        link_text_clean = re.sub(r'<[^>]+>', '', link_text).strip()
-        # 识别锚点链接
-        if href.startswith('#'):
-            anchor_links.append((href, link_text_clean))
-        # 过滤掉明显的导航链接（放宽条件）
-        elif (len(link_text_clean) > 2 and  # 降低最小长度要求
-            not any(nav_word in link_text_clean.lower() for nav_word in 
-                   ['首页', '返回', '登录', '注册', 'home', 'back', 'login', 'register']) and
-            not link_text_clean.lower() in ['更多', '更多>>']):  # 分别检查常见的短导航词
-            content_links.append((href, link_text_clean))
-    
-    # 4. 计算链接密度
-    link_density = len(content_links) / max(total_text_length, 1) * 1000  # 每1000字符的链接数
-    
-    # 5. 检测列表容器
-    list_containers = [
-        r'<ul[^>]*class=["\'][^"\']*list[^"\']*["\']',  # ul.list*
-        r'<ol[^>]*class=["\'][^"\']*list[^"\']*["\']',  # ol.list*
-        r'<div[^>]*class=["\'][^"\']*list[^"\']*["\']', # div.list*
-        r'<div[^>]*class=["\'][^"\']*index[^"\']*["\']', # div.index*
-        r'<div[^>]*class=["\'][^"\']*content-list[^"\']*["\']', # div.content-list*
-        r'<div[^>]*id=["\'][^"\']*list[^"\']*["\']',    # div#list*
-        r'<table[^>]*>.*?<tr[^>]*>.*?<td[^>]*>.*?</td>.*?<td[^>]*>.*?</td>.*?<td[^>]*>.*?</td>', # 三列表格
-    ]
-    
-    list_container_count = 0
-    for pattern in list_containers:
-        if re.search(pattern, html, re.I):
-            list_container_count += 1
-    
-    # 6. 检测重复链接模式（相似的链接文本长度和格式）
-    if len(content_links) >= 5:
-        link_lengths = [len(text) for _, text in content_links]
-        avg_length = sum(link_lengths) / len(link_lengths)
-        # 检查链接文本长度的一致性
-        similar_length_links = sum(1 for length in link_lengths 
-                                 if abs(length - avg_length) <= avg_length * 0.5)
-        pattern_consistency = similar_length_links / len(content_links)
-    else:
-        pattern_consistency = 0
-    
-    # 6.5. 锚点链接比例判定（解决章节导航误判问题）
-    all_links = links
-    if len(all_links) > 0:
-        anchor_ratio = len(anchor_links) / len(all_links)
-        
-        # 如果锚点链接占比超过30%，或者锚点链接数量>=10，很可能是文章页面的章节导航
-        if anchor_ratio > 0.3 or len(anchor_links) >= 10:
-            return PageType.ARTICLE
-        
-        # 如果有较多锚点链接（如章节导航），降低列表页判定权重
-        if len(anchor_links) >= 5:
-            # 减少有效链接计数，避免误判
-            content_links = content_links[:max(len(content_links)//2, 1)]
-    
-    # 7. 决策逻辑
-    # 强列表信号：
+    # 单次 lxml 解析提取特征：链接密度、列表容器、列数一致的表格（线性时间）
+    from webfetcher.parsing.page_analysis import analyze_page
+    features = analyze_page(html)
+
+    # 锚点链接比例判定（解决章节导航误判问题）
+    # 锚点链接占比超过30%或数量>=10，很可能是文章页面的章节导航
+    if features.is_section_navigation:
+        return PageType.ARTICLE
+
+    # 决策逻辑（锚点链接>=5时有效链接计数减半）：
     # - 高链接密度 (>1.5个链接/1000字符)
     # - 存在列表容器
     # - 链接模式一致性高 (>50%)
     # - 链接数量多 (>=5个)
-    
-    is_list_page = (
-        (link_density > 1.5 and len(content_links) >= 5) or  # 降低密度要求
-        (list_container_count >= 2) or  # 多个列表容器
-        (len(content_links) >= 8 and pattern_consistency > 0.5) or  # 降低一致性要求
-        (link_density > 1.0 and list_container_count >= 1 and len(content_links) >= 5) or  # 降低综合判断阈值
-        (list_container_count >= 1 and len(content_links) >= 10)  # 如果有列表容器且链接多，直接判定为列表
-    )
-    
+    is_list_page = features.is_list_page()
+
     # 调试信息（可选）
-    print(f"[DEBUG] Links - Total: {len(all_links)}, Content: {len(content_links)}, Anchor: {len(anchor_links)}")
-    logging.debug(f"Page type detection - Links: {len(content_links)}, "
-                 f"Density: {link_density:.2f}, "
-                 f"List containers: {list_container_count}, "
-                 f"Pattern consistency: {pattern_consistency:.2f}, "
+    print(f"[DEBUG] Links - Total: {features.total_links}, Content: {features.content_link_count}, Anchor: {features.anchor_links}")
+    logging.debug(f"Page type detection - Links: {features.content_link_count}, "
+                 f"Density: {features.link_density:.2f}, "
+                 f"List containers: {features.list_container_count}, "
+                 f"Pattern consistency: {features.pattern_consistency:.2f}, "
                  f"Result: {'LIST' if is_list_page else 'ARTICLE'}")
     
     return PageType.LIST_INDEX if is_list_page else PageType.ARTICLE
@@ -2646,26 +3057,10 @@ def extract_list_content(html: str, base_url: str) -> tuple[str, List[ListItem]]
     Returns:
         tuple: (页面标题, 列表项列表)
     """
-    # 性能保护机制：内容大小和复杂度检测
-    html_size = len(html)
-    if html_size > 5 * 1024 * 1024:  # 超过5MB的HTML
-        print(f"Warning: Large HTML content ({html_size // 1024}KB), using simplified processing")
-    
-    # 表格复杂度检测
-    table_count = len(re.findall(r'<table[^>]*>', html, re.I))
-    tr_count = len(re.findall(r'<tr[^>]*>', html, re.I))
-    td_count = len(re.findall(r'<td[^>]*>', html, re.I))
-    
-    # 设置处理超时
-    def timeout_handler(_, __):
-        raise TimeoutError("List content extraction timeout after 5 seconds")
-    
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(5)  # 5秒超时
-    
     try:
         # 1. 提取页面标题
-        page_title = parsers.extract_meta(html, 'og:title') or parsers.extract_meta(html, 'twitter:title')
+        from webfetcher.parsing.parser import extract_meta
+        page_title = extract_meta(html, 'og:title') or extract_meta(html, 'twitter:title')
         if not page_title:
             title_match = re.search(r'<title[^>]*>(.*?)</title>', html, re.I | re.S)
             if title_match:
@@ -2675,218 +3070,14 @@ def extract_list_content(html: str, base_url: str) -> tuple[str, List[ListItem]]
         # 检查是否为人民网，使用特殊处理策略
         is_people_site = 'cpc.people.com.cn' in base_url or 'people.com.cn' in base_url
         
-        # 表格数量过多时使用简化策略
-        if td_count > 500:
-            print(f"Warning: Too many table cells ({td_count}), limiting to first 500")
-            # 截断HTML以减少处理量
-            html = html[:len(html)//2] if len(html) > 1024*1024 else html
-        
-        # 2. 定义多种列表项提取模式，针对不同网站结构
-        list_patterns = []
-        
-        # 对于人民网使用优化的分步处理策略
-        if is_people_site:
-            list_patterns.append({
-                'container': r'<table[^>]*>(.*?)</table>',
-                'item': 'people_table_optimized',  # 标记使用优化处理
-                'title_link': None,
-                'date': r'(\d{4}年\d{1,2}月\d{1,2}日)',
-                'special': 'people_table_optimized'
-            })
-        else:
-            # 人民网政治局会议表格专用模式（原始版本，仅用于非人民网站点）
-            list_patterns.append({
-                'container': r'<table[^>]*>(.*?)</table>',
-                'item': r'<tr[^>]*>.*?<td[^>]*>.*?</td>.*?<td[^>]*>.*?<center>(.*?)</center>.*?</td>.*?<td[^>]*>(.*?)</td>.*?</tr>',
-                'title_link': None,  # 特殊处理
-                'date': r'(\d{4}年\d{1,2}月\d{1,2}日)',
-                'special': 'people_table'
-            })
-        
-        # 添加通用模式
-        list_patterns.extend([
-            # 通用表格形式的列表
-            {
-                'container': r'<table[^>]*>(.*?)</table>',
-                'item': r'<tr[^>]*>(.*?)</tr>',
-                'title_link': r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>',
-                'date': r'(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})'
-            },
-            # 人民网等新闻网站的典型结构
-            {
-                'container': r'<ul[^>]*class=["\'][^"\']*list[^"\']*["\'][^>]*>(.*?)</ul>',
-                'item': r'<li[^>]*>(.*?)</li>',
-                'title_link': r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>',
-                'date': r'(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})'
-            },
-            # 带有div包装的列表项
-            {
-                'container': r'<div[^>]*class=["\'][^"\']*list[^"\']*["\'][^>]*>(.*?)</div>',
-                'item': r'<div[^>]*class=["\'][^"\']*item[^"\']*["\'][^>]*>(.*?)</div>',
-                'title_link': r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>',
-                'date': r'(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})'
-            },
-            # 通用链接提取（作为后备方案）
-            {
-                'container': r'<body[^>]*>(.*?)</body>',
-                'item': r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>',
-                'title_link': None,  # 已在item中处理
-                'date': r'(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})'
-            }
-        ])
-        
-        list_items = []
-        
-        # 3. 尝试每种模式提取列表项
-        for pattern_config in list_patterns:
-            container_match = re.search(pattern_config['container'], html, re.I | re.S)
-            if container_match:
-                container_content = container_match.group(1)
-                
-                # 优化的人民网表格处理
-                if pattern_config.get('special') == 'people_table_optimized':
-                    # 分步处理，避免复杂正则表达式的灾难性回溯
-                    # 1. 先提取所有表格行
-                    rows = re.findall(r'<tr[^>]*>(.*?)</tr>', container_content, re.I | re.S)
-                    row_count = 0
-                    for row_html in rows:
-                        row_count += 1
-                        if row_count > 50:  # 限制处理行数
-                            print(f"Warning: Too many table rows, stopping at {row_count}")
-                            break
-                            
-                        # 2. 从每行中提取单元格
-                        cells = re.findall(r'<td[^>]*>(.*?)</td>', row_html, re.I | re.S)
-                        if len(cells) >= 3:  # 确保有足够的单元格
-                            # 3. 分别处理日期和内容单元格
-                            for i, cell in enumerate(cells):
-                                if i >= 2:  # 只处理前3个单元格
-                                    break
-                                # 寻找包含center标签的单元格（通常是日期）
-                                center_match = re.search(r'<center[^>]*>(.*?)</center>', cell, re.I | re.S)
-                                if center_match:
-                                    date_text = center_match.group(1)
-                                    date = re.sub(r'<[^>]+>', '', date_text).strip()
-                                    date = ihtml.unescape(date)
-                                    
-                                    # 从下一个单元格中提取内容
-                                    if i + 1 < len(cells):
-                                        content_cell = cells[i + 1]
-                                        link_match = re.search(r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>', content_cell, re.I | re.S)
-                                        if link_match:
-                                            href = link_match.group(1)
-                                            link_text = re.sub(r'<[^>]+>', '', link_match.group(2)).strip()
-                                            
-                                            # 构建标题
-                                            title = f"中央政治局会议 {date}"
-                                            
-                                            if title and href:
-                                                full_url = resolve_url_with_context(base_url, href)
-                                                list_items.append(ListItem(
-                                                    title=title,
-                                                    url=full_url,
-                                                    date=date,
-                                                    summary=None,
-                                                    index=len(list_items) + 1
-                                                ))
-                                    break  # 找到一个有效的日期单元格后跳出
-                
-                # 特殊处理人民网表格格式（原始版本）
-                elif pattern_config.get('special') == 'people_table':
-                    # 人民网政治局会议特殊表格处理
-                    items = re.findall(pattern_config['item'], container_content, re.I | re.S)
-                    for date_text, content_html in items:
-                        # 清理日期
-                        date = re.sub(r'<[^>]+>', '', date_text).strip()
-                        date = ihtml.unescape(date)
-                        
-                        # 提取链接
-                        link_match = re.search(r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>', content_html, re.I | re.S)
-                        if link_match:
-                            href = link_match.group(1)
-                            link_text = re.sub(r'<[^>]+>', '', link_match.group(2)).strip()
-                        else:
-                            # 如果没有链接，跳过这项
-                            continue
-                        
-                        # 清理内容作为摘要
-                        summary_text = re.sub(r'<a[^>]*>.*?</a>', '', content_html, flags=re.I | re.S)
-                        summary_text = re.sub(r'<[^>]+>', ' ', summary_text)
-                        summary_text = ihtml.unescape(summary_text).strip()
-                        summary = summary_text if len(summary_text) > 10 else None
-                        
-                        # 构建标题：会议名称 + 日期
-                        title = f"中央政治局会议 {date}"
-                        
-                        if title and href:
-                            full_url = resolve_url_with_context(base_url, href)
-                            list_items.append(ListItem(
-                                title=title,
-                                url=full_url,
-                                date=date,
-                                summary=summary,
-                                index=len(list_items) + 1
-                            ))
-                
-                elif pattern_config['title_link']:
-                    # 常规模式：先提取item，再提取链接
-                    items = re.findall(pattern_config['item'], container_content, re.I | re.S)
-                    for item_html in items:
-                        link_match = re.search(pattern_config['title_link'], item_html, re.I | re.S)
-                        if link_match:
-                            href = link_match.group(1)
-                            title_html = link_match.group(2)
-                            
-                            # 清理标题
-                            title = re.sub(r'<[^>]+>', '', title_html).strip()
-                            title = ihtml.unescape(title)
-                            
-                            # 提取日期
-                            date_match = re.search(pattern_config['date'], item_html)
-                            date = date_match.group(1) if date_match else None
-                            
-                            # 提取摘要（链接外的其他文本）
-                            summary_text = re.sub(r'<a[^>]*>.*?</a>', '', item_html, flags=re.I | re.S)
-                            summary_text = re.sub(r'<[^>]+>', ' ', summary_text)
-                            summary_text = ihtml.unescape(summary_text).strip()
-                            summary = summary_text if len(summary_text) > 10 else None
-                            
-                            if title and len(title) > 3:  # 过滤过短的标题
-                                full_url = resolve_url_with_context(base_url, href)
-                                list_items.append(ListItem(
-                                    title=title,
-                                    url=full_url,
-                                    date=date,
-                                    summary=summary,
-                                    index=len(list_items) + 1
-                                ))
-                else:
-                    # 直接链接模式：item就是链接
-                    items = re.findall(pattern_config['item'], container_content, re.I | re.S)
-                    for href, title_html in items:
-                        title = re.sub(r'<[^>]+>', '', title_html).strip()
-                        title = ihtml.unescape(title)
-                        
-                        # 过滤导航和无关链接
-                        if (len(title) > 5 and 
-                            not any(skip_word in title.lower() for skip_word in 
-                                   ['首页', '返回', '登录', '注册', 'home', 'back', 'login', 'register', 
-                                    '更多>>', '更多', '上一页', '下一页', 'prev', 'next'])):
-                            
-                            full_url = resolve_url_with_context(base_url, href)
-                            list_items.append(ListItem(
-                                title=title,
-                                url=full_url,
-                                date=None,
-                                summary=None,
-                                index=len(list_items) + 1
-                            ))
-        
-            # 如果找到足够的列表项，就停止尝试其他模式
-            if len(list_items) >= 5:
-                break
+        # 2. 单次 lxml 解析，依次尝试表格、ul.list、div.list、全部链接，提取到足够项即停止
+        from webfetcher.parsing.page_analysis import extract_list_candidates
+        list_items = [
+            ListItem(title=title, url=resolve_url_with_context(base_url, href), date=date, summary=summary)
+            for title, href, date, summary in extract_list_candidates(html, people_table_optimized=is_people_site)
+        ]
         
-        # 4. 去重和排序
+        # 3. 去重和排序
         seen_urls = set()
         unique_items = []
         for item in list_items:
@@ -2904,15 +3095,11 @@ def extract_list_content(html: str, base_url: str) -> tuple[str, List[ListItem]]
         
         return page_title, unique_items
         
-    except TimeoutError as e:
-        print(f"List extraction timed out: {e}")
-        return "页面处理超时", []
+    except ParseBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error during list extraction: {e}")
         return "列表页面", []
-    finally:
-        # 清理超时设置
-        signal.alarm(0)
 
 
 def format_list_page_markdown(page_title: str, list_items: List[ListItem], url: str) -> tuple[str, str, dict]:
@@ -2978,7 +3165,7 @@ def format_list_page_markdown(page_title: str, list_items: List[ListItem], url:
 
 
 # Generic parser moved to parsers module
-# Import above: from webfetcher.parsing.parser import generic_to_markdown
+# Lazy wrapper above: generic_to_markdown -> webfetcher.parsing.parser
 
 
 def find_next_url(html: str, current_url: str, parser_name: str) -> Optional[str]:
@@ -3314,7 +3501,7 @@ def discover_sitemaps(base_url: str, ua: str) -> list:
             req = urllib.request.Request(sitemap_url, method='HEAD')
             req.add_header('User-Agent', ua)
 
-            with urllib.request.urlopen(req, timeout=10) as response:
+            with pooled_urlopen(req, timeout=10) as response:
                 if response.status == 200:
                     content_type = response.headers.get('Content-Type', '')
                     # Accept text/xml, application/xml, or gzipped content
@@ -3351,6 +3538,10 @@ def parse_sitemap(sitemap_url: str, ua: str) -> list:
             - lastmod: Last modification date (ISO format string, or None)
             - changefreq: Change frequency (e.g., 'daily', 'weekly', or None)
     """
+    # Task-008 Phase 2: Sitemap parsing, only imported when a sitemap is used
+    import gzip
+    import xml.etree.ElementTree as ET
+
     urls = []
 
     try:
@@ -3358,7 +3549,7 @@ def parse_sitemap(sitemap_url: str, ua: str) -> list:
         req = urllib.request.Request(sitemap_url)
         req.add_header('User-Agent', ua)
 
-        with urllib.request.urlopen(req, timeout=30) as response:
+        with pooled_urlopen(req, timeout=30) as response:
             content = response.read()
 
         # Handle gzipped sitemaps
@@ -3451,12 +3642,17 @@ def crawl_from_sitemap(start_url: str, ua: str, max_pages: int = 1000,
         ua: User agent string
         max_pages: Maximum number of pages to crawl
         delay: Delay between requests
-        **kwargs: Additional arguments to pass to crawl_site() if fallback is needed
+        **kwargs: Additional arguments to pass to crawl_site() if fallback is needed;
+            manifest (CrawlManifest) enables incremental mode, on_page streams
+            each page (see crawl_site())
 
     Returns:
-        List of (url, html, depth) tuples, same format as crawl_site()
+        List of (url, html, depth) tuples, same format as crawl_site().
+        In incremental mode, pages whose lastmod has not advanced are returned
+        with html='' and are rebuilt from the manifest by aggregate_crawled_site().
     """
     logging.info("Task-008 Phase 2: Attempting sitemap-first crawling / 尝试sitemap优先爬取")
+    manifest = kwargs.pop('manifest', None)
 
     # Step 1: Discover sitemaps
     sitemaps = discover_sitemaps(start_url, ua)
@@ -3502,29 +3698,73 @@ def crawl_from_sitemap(start_url: str, ua: str, max_pages: int = 1000,
     logging.info(f"Will fetch {len(urls_to_fetch)} URLs (limited by max_pages={max_pages}) / 将获取 {len(urls_to_fetch)} 个URL")
 
     # Step 5: Fetch each URL from sitemap
+    # Concurrent fetch through the per-host politeness scheduler; results are
+    # collected in sitemap order so output matches the serial implementation.
+    max_workers = max(1, kwargs.get('max_workers', DEFAULT_CRAWL_WORKERS))
+    scheduler = HostPolitenessScheduler(delay=delay,
+                                        per_host_limit=kwargs.get('per_host_limit') or 1)
+
+    def _fetch_sitemap_page(page_url: str) -> str:
+        with scheduler.slot(page_url):
+            page_html, _, _ = fetch_html(page_url, ua=ua, timeout=30)
+        return page_html
+
+    # Incremental mode: pages whose lastmod has not advanced are not fetched
+    unchanged = set()
+    if manifest is not None:
+        for url_dict in urls_to_fetch:
+            manifest.note_lastmod(url_dict['url'], url_dict.get('lastmod'))
+            if manifest.is_unchanged(url_dict['url'], url_dict.get('lastmod')):
+                unchanged.add(url_dict['url'])
+        logging.info(f"Incremental crawl: {len(unchanged)}/{len(urls_to_fetch)} URLs unchanged since last run "
+                     f"(lastmod) / 增量爬取：{len(unchanged)} 个URL未更新")
+
+    # Bounded prefetch window: completed-but-uncommitted pages are the only HTML held in memory
+    on_page = kwargs.get('on_page')
+    window = max_workers * CRAWL_LOOKAHEAD_FACTOR
+    pending = deque()  # (url, Future[str] or None for unchanged pages), in sitemap order
+    remaining = iter(urls_to_fetch)
+
     results = []
-    for i, url_dict in enumerate(urls_to_fetch):
-        url = url_dict['url']
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wf-sitemap') as executor:
+        i = 0
+        while True:
+            while len(pending) < window:
+                url_dict = next(remaining, None)
+                if url_dict is None:
+                    break
+                page_url = url_dict['url']
+                pending.append((page_url, None if page_url in unchanged
+                                else executor.submit(_fetch_sitemap_page, page_url)))
+            if not pending:
+                break
+            url, future = pending.popleft()
+            i += 1
 
-        try:
-            logging.info(f"[{i+1}/{len(urls_to_fetch)}] Fetching: {url}")
+            if future is None:
+                if on_page is not None:
+                    on_page(url, '', 0)
+                results.append((url, '', 0))
+                continue
 
-            # Fetch the page
-            html = fetch_html(url, ua)
+            try:
+                logging.info(f"[{i}/{len(urls_to_fetch)}] Fetching: {url}")
 
-            if html:
-                # Add to results (depth=0 for sitemap-sourced URLs)
-                results.append((url, html, 0))
-            else:
-                logging.warning(f"Failed to fetch: {url}")
+                # Fetch the page
+                html = future.result()
 
-            # Respect crawl delay
-            if delay > 0 and i < len(urls_to_fetch) - 1:
-                time.sleep(delay)
+                if html:
+                    # Add to results (depth=0 for sitemap-sourced URLs)
+                    if on_page is not None:
+                        on_page(url, html, 0)
+                        html = ''
+                    results.append((url, html, 0))
+                else:
+                    logging.warning(f"Failed to fetch: {url}")
 
-        except Exception as e:
-            logging.error(f"Error fetching {url}: {e}")
-            continue
+            except Exception as e:
+                logging.error(f"Error fetching {url}: {e}")
+                continue
 
     logging.info(f"Sitemap crawl completed: {len(results)}/{len(urls_to_fetch)} pages fetched successfully")
 
@@ -3713,7 +3953,9 @@ def crawl_site_by_categories(start_url: str, ua: str, categories: list, **kwargs
     max_pages_per_category = min(kwargs.get('max_pages', 1000) // max(len(categories), 1), 100)
     delay = kwargs.get('delay', 0.5)
     enable_optimizations = kwargs.get('enable_optimizations', True)
-    
+    max_workers = kwargs.get('max_workers', DEFAULT_CRAWL_WORKERS)
+    per_host_limit = kwargs.get('per_host_limit')
+
     logging.info(f"Starting category-first crawl with {len(categories)} categories")
     logging.info(f"Max {max_pages_per_category} pages per category")
     
@@ -3742,7 +3984,9 @@ def crawl_site_by_categories(start_url: str, ua: str, categories: list, **kwargs
                 max_pages=max_pages_per_category,
                 delay=delay,
                 enable_optimizations=enable_optimizations,
-                crawl_strategy='default'  # Use default strategy for individual categories
+                crawl_strategy='default',  # Use default strategy for individual categories
+                max_workers=max_workers,
+                per_host_limit=per_host_limit
             )
             
             logging.info(f"Category '{category_name}' yielded {len(category_pages)} pages")
@@ -3776,11 +4020,25 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
                crawl_strategy: str = 'default',
                # Stage 1.3 memory optimization
                memory_efficient: bool = False,
-               page_callback = None) -> list:
+               page_callback = None,
+               # Streaming pipeline: called with (url, html, depth) as each page is committed
+               on_page: Optional[Callable[[str, str, int], None]] = None,
+               # Concurrent crawl engine
+               max_workers: int = DEFAULT_CRAWL_WORKERS,
+               per_host_limit: Optional[int] = None) -> list:
     """
     Crawl entire site using BFS algorithm.
     使用 BFS 算法爬取整个站点。
 
+    Pages are fetched by a worker pool that prefetches the head of the BFS
+    frontier, while results are committed strictly in frontier order. Output
+    ordering, max_pages/max_depth semantics and page_callback batches are
+    therefore identical to a serial crawl. The delay is enforced per host by
+    a token-bucket HostPolitenessScheduler instead of a global sleep.
+    页面由工作线程池预取 BFS 队列头部，结果严格按队列顺序提交，因此输出顺序、
+    max_pages/max_depth 语义和 page_callback 批次与串行爬取一致。请求间隔由
+    按主机的令牌桶调度器控制，而不是全局 sleep。
+
     Returns list of (url, html, depth) tuples.
     返回 (url, html, depth) 元组列表。
 
@@ -3796,6 +4054,12 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
         crawl_strategy: Crawling strategy / 爬取策略
         memory_efficient: Enable memory optimization / 启用内存优化
         page_callback: Optional callback for streaming / 流式处理的可选回调
+        on_page: Per-page callback (url, html, depth) called in commit order; the
+            returned list then holds (url, '', depth) so HTML is not retained
+            / 逐页回调（按提交顺序），返回列表中不再保留 HTML
+        max_workers: Concurrent fetch workers / 并发抓取线程数
+        per_host_limit: Concurrent requests per host (default: 1, so ``delay`` spaces
+            requests to each host as before) / 每主机并发数（默认 1，保持 delay 的原有含义）
     """
     # Initialize crawl statistics
     stats = {
@@ -3820,13 +4084,14 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
         pages = []  # Traditional full storage
     
     logging.info(f"Starting site crawl from {start_url}")
-    logging.info(f"Settings: max_depth={max_depth}, max_pages={max_pages}, delay={delay}s, strategy={crawl_strategy}")
+    max_workers = max(1, max_workers or 1)
+    logging.info(f"Settings: max_depth={max_depth}, max_pages={max_pages}, delay={delay}s, strategy={crawl_strategy}, workers={max_workers}")
     
     # Stage 2.3: Check for government site and category-first strategy
     if crawl_strategy == 'category_first':
         # First, fetch the homepage to detect government site and extract categories
         try:
-            homepage_html, _ = fetch_html(start_url, ua=ua, timeout=30)  # Fix: properly unpack tuple return value
+            homepage_html, _, _ = fetch_html(start_url, ua=ua, timeout=30)  # Fix: properly unpack tuple return value
             
             # Detect if it's a government site
             is_government = detect_government_site(start_url, homepage_html)
@@ -3844,7 +4109,9 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
                         'max_depth': max_depth,
                         'max_pages': max_pages,
                         'delay': delay,
-                        'enable_optimizations': enable_optimizations
+                        'enable_optimizations': enable_optimizations,
+                        'max_workers': max_workers,
+                        'per_host_limit': per_host_limit
                     }
                     
                     for category_info, category_pages in crawl_site_by_categories(start_url, ua, categories, **crawl_params):
@@ -3856,7 +4123,12 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
                     
                     # Update final statistics (simplified for category-first mode)
                     logging.info(f"Category-first crawl summary: {len(all_category_pages)} pages total")
-                    return all_category_pages[:max_pages]  # Ensure we don't exceed limit
+                    category_result = all_category_pages[:max_pages]  # Ensure we don't exceed limit
+                    if on_page is not None:
+                        for page_url, page_html, page_depth in category_result:
+                            on_page(page_url, page_html, page_depth)
+                        category_result = [(page_url, '', page_depth) for page_url, _, page_depth in category_result]
+                    return category_result
                 else:
                     logging.info("Government site detected but no categories found. Falling back to default strategy.")
             else:
@@ -3865,103 +4137,138 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
         except Exception as e:
             logging.warning(f"Category-first strategy failed: {e}. Falling back to default strategy.")
     
-    # Default BFS crawling strategy (original logic)
-    while queue and len(visited_normalized) < max_pages:
-        current_url, depth = queue.popleft()
-        current_normalized = normalize_url_for_dedup(current_url)
-        
-        # Skip if already visited or too deep
-        if current_normalized in visited_normalized or depth > max_depth:
-            continue
-        
-        # Rate limiting
-        if visited_normalized and delay > 0:
-            time.sleep(delay)
-        
-        stats['pages_crawled'] += 1
-        
-        try:
-            # Progress reporting: verbose logging vs progress line
-            if logging.getLogger().level <= logging.INFO:
-                # Verbose mode: full logging
-                logging.info(f"[{len(visited_normalized)+1}/{max_pages}] Crawling depth {depth}: {current_url}")
-            else:
-                # Normal mode: updating progress line on stderr
-                elapsed = time.time() - stats['start_time']
-                rate = stats['pages_success'] / (elapsed / 60) if elapsed > 0 else 0  # pages per minute
-                
-                # Progress line that overwrites itself
-                sys.stderr.write(f"\rCrawling: {len(visited_normalized)+1}/{max_pages} pages ({rate:.1f} pages/min)")
-                sys.stderr.flush()
-            
-            # Fetch page using original URL (preserves case)
-            html, _ = fetch_html(current_url, ua=ua, timeout=30)  # Fix: properly unpack tuple return value
-            visited_normalized.add(current_normalized)
-            url_mapping[current_normalized] = current_url
-            
-            # Stage 1.3: Memory-efficient page handling
-            if memory_efficient:
-                # Add to batch for processing
-                page_batch.append((current_url, html, depth))
-                
-                # Process batch when full
-                if len(page_batch) >= batch_size:
-                    if page_callback:
-                        page_callback(page_batch.copy())  # Send copy to callback
-                    # Keep only metadata for final result (no HTML content)
-                    for url, _, d in page_batch:
-                        pages.append((url, '', d))
-                    page_batch.clear()
-            else:
-                # Traditional full storage
-                pages.append((current_url, html, depth))
-            
-            # Update statistics
-            stats['pages_success'] += 1
-            stats['total_size'] += len(html.encode('utf-8'))
-            
-            # Extract and queue new links (only if not at max depth)
-            if depth < max_depth:
-                # Stage 1.1 optimization: Enable documentation filter during link extraction
-                enable_doc_filter = enable_optimizations and crawl_strategy == 'default'
-                link_mapping = extract_internal_links(html, current_url, enable_doc_filter=enable_doc_filter)
-                
-                # Stage 1.2 optimization: Batch process new links
-                if enable_optimizations:
-                    # Batch filtering and deduplication
-                    new_normalized_links = set(link_mapping.keys()) - visited_normalized
-                    
-                    if enable_doc_filter:
-                        # All links already pre-filtered for documentation
-                        doc_links = [(norm, orig) for norm, orig in link_mapping.items() 
-                                   if norm in new_normalized_links]
-                        logging.info(f"Found {len(doc_links)} new documentation links (pre-filtered)")
+    # Concurrent crawl engine: per-host token bucket replaces the global sleep
+    scheduler = HostPolitenessScheduler(delay=delay, per_host_limit=per_host_limit or 1)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wf-crawl')
+    inflight = {}  # normalized URL -> Future[str], prefetched ahead of the commit point
+    lookahead = max_workers * CRAWL_LOOKAHEAD_FACTOR
+
+    def _fetch_page(page_url: str) -> str:
+        with scheduler.slot(page_url):
+            page_html, _, _ = fetch_html(page_url, ua=ua, timeout=30)
+        return page_html
+
+    def _prefetch_frontier():
+        # Never fetch more than could still be committed under max_pages
+        budget = max_pages - len(visited_normalized) - len(inflight)
+        for queued_url, queued_depth in islice(queue, lookahead):
+            if budget <= 0:
+                break
+            queued_normalized = normalize_url_for_dedup(queued_url)
+            if (queued_depth > max_depth or queued_normalized in visited_normalized
+                    or queued_normalized in inflight):
+                continue
+            inflight[queued_normalized] = executor.submit(_fetch_page, queued_url)
+            budget -= 1
+
+    # Default BFS crawling strategy (original logic, committed in frontier order)
+    try:
+        while queue and len(visited_normalized) < max_pages:
+            _prefetch_frontier()
+            current_url, depth = queue.popleft()
+            current_normalized = normalize_url_for_dedup(current_url)
+
+            # Skip if already visited or too deep
+            if current_normalized in visited_normalized or depth > max_depth:
+                continue
+
+            stats['pages_crawled'] += 1
+            future = inflight.pop(current_normalized, None)
+
+            try:
+                # Progress reporting: verbose logging vs progress line
+                if logging.getLogger().level <= logging.INFO:
+                    # Verbose mode: full logging
+                    logging.info(f"[{len(visited_normalized)+1}/{max_pages}] Crawling depth {depth}: {current_url}")
+                else:
+                    # Normal mode: updating progress line on stderr
+                    elapsed = time.time() - stats['start_time']
+                    rate = stats['pages_success'] / (elapsed / 60) if elapsed > 0 else 0  # pages per minute
+
+                    # Progress line that overwrites itself
+                    sys.stderr.write(f"\rCrawling: {len(visited_normalized)+1}/{max_pages} pages ({rate:.1f} pages/min)")
+                    sys.stderr.flush()
+
+                # Fetch page using original URL (preserves case)
+                if future is None:
+                    future = executor.submit(_fetch_page, current_url)
+                html = future.result()
+                visited_normalized.add(current_normalized)
+                url_mapping[current_normalized] = current_url
+
+                # Streaming pipeline: hand the page over now, keep only its URL and depth
+                if on_page is not None:
+                    on_page(current_url, html, depth)
+                    pages.append((current_url, '', depth))
+                # Stage 1.3: Memory-efficient page handling
+                elif memory_efficient:
+                    # Add to batch for processing
+                    page_batch.append((current_url, html, depth))
+
+                    # Process batch when full
+                    if len(page_batch) >= batch_size:
+                        if page_callback:
+                            page_callback(page_batch.copy())  # Send copy to callback
+                        # Keep only metadata for final result (no HTML content)
+                        for url, _, d in page_batch:
+                            pages.append((url, '', d))
+                        page_batch.clear()
+                else:
+                    # Traditional full storage
+                    pages.append((current_url, html, depth))
+
+                # Update statistics
+                stats['pages_success'] += 1
+                stats['total_size'] += len(html.encode('utf-8'))
+
+                # Extract and queue new links (only if not at max depth)
+                if depth < max_depth:
+                    # Stage 1.1 optimization: Enable documentation filter during link extraction
+                    enable_doc_filter = enable_optimizations and crawl_strategy == 'default'
+                    link_mapping = extract_internal_links(html, current_url, enable_doc_filter=enable_doc_filter)
+
+                    # Stage 1.2 optimization: Batch process new links
+                    if enable_optimizations:
+                        # Batch filtering and deduplication
+                        new_normalized_links = set(link_mapping.keys()) - visited_normalized
+
+                        if enable_doc_filter:
+                            # All links already pre-filtered for documentation
+                            doc_links = [(norm, orig) for norm, orig in link_mapping.items() 
+                                       if norm in new_normalized_links]
+                            logging.info(f"Found {len(doc_links)} new documentation links (pre-filtered)")
+                        else:
+                            # Batch apply documentation filter
+                            doc_links = [(norm, orig) for norm, orig in link_mapping.items() 
+                                       if norm in new_normalized_links and is_documentation_url(orig)]
+                            logging.info(f"Found {len(doc_links)} new documentation links")
+
+                        # Batch queue operations - sort and limit in one operation
+                        links_to_queue = sorted(doc_links)[:50]  # Limit per-page discoveries
+                        for normalized_link, original_link in links_to_queue:
+                            queue.append((original_link, depth + 1))
+
                     else:
-                        # Batch apply documentation filter
+                        # Original non-optimized path for compatibility
+                        new_normalized_links = set(link_mapping.keys()) - visited_normalized
                         doc_links = [(norm, orig) for norm, orig in link_mapping.items() 
                                    if norm in new_normalized_links and is_documentation_url(orig)]
                         logging.info(f"Found {len(doc_links)} new documentation links")
-                    
-                    # Batch queue operations - sort and limit in one operation
-                    links_to_queue = sorted(doc_links)[:50]  # Limit per-page discoveries
-                    for normalized_link, original_link in links_to_queue:
-                        queue.append((original_link, depth + 1))
-                        
-                else:
-                    # Original non-optimized path for compatibility
-                    new_normalized_links = set(link_mapping.keys()) - visited_normalized
-                    doc_links = [(norm, orig) for norm, orig in link_mapping.items() 
-                               if norm in new_normalized_links and is_documentation_url(orig)]
-                    logging.info(f"Found {len(doc_links)} new documentation links")
-                    
-                    for normalized_link, original_link in sorted(doc_links)[:50]:
-                        queue.append((original_link, depth + 1))
-            
-        except Exception as e:
-            logging.warning(f"Failed to crawl {current_url}: {e}")
-            stats['pages_failed'] += 1
-            stats['failed_urls'].append((current_url, str(e)))
-            continue
+
+                        for normalized_link, original_link in sorted(doc_links)[:50]:
+                            queue.append((original_link, depth + 1))
+
+            except Exception as e:
+                logging.warning(f"Failed to crawl {current_url}: {e}")
+                stats['pages_failed'] += 1
+                stats['failed_urls'].append((current_url, str(e)))
+                continue
+    finally:
+        # Drop speculative fetches that will never be committed
+        for pending in inflight.values():
+            pending.cancel()
+        executor.shutdown(wait=True)
+        stats['politeness'] = scheduler.get_stats()
     
     # Stage 1.3: Process any remaining batch
     if memory_efficient and 'page_batch' in locals() and page_batch:
@@ -3984,6 +4291,18 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
     # 1. Crawl quality summary (5-8 lines)
     logging.info(f"Crawl Quality Summary: {success_rate:.1f}% success rate ({stats['pages_success']}/{stats['pages_crawled']} pages)")
     logging.info(f"Data Retrieved: {size_mb:.1f}MB in {duration:.1f}s ({size_mb/duration:.2f} MB/s)")
+    politeness = stats['politeness']
+    logging.info(f"Politeness: {max_workers} workers across {politeness['hosts']} host(s), "
+                 f"{politeness['throttled']} throttled requests ({politeness['wait_time']:.1f}s waited)")
+    pool_stats = get_http_pool().get_stats()
+    logging.info(f"Connection Pool: {pool_stats['reuse_rate']:.1f}% reuse "
+                 f"({pool_stats['connections_reused']} reused / {pool_stats['connections_created']} opened), "
+                 f"~{pool_stats['handshake_time_saved']:.2f}s handshake time saved")
+    http_cache = get_http_cache()
+    if http_cache:
+        cache_stats = http_cache.get_stats()
+        logging.info(f"HTTP Cache: {cache_stats['hits']} not modified (304) / {cache_stats['misses']} downloaded "
+                     f"({cache_stats['hit_rate']:.1f}% hit rate)")
     
     # 2. Failed URL details in verbose mode (3-5 lines)
     if stats['failed_urls'] and logging.getLogger().level <= logging.INFO:
@@ -4006,70 +4325,310 @@ def crawl_site(start_url: str, ua: str, max_depth: int = 10,
     
     return pages
 
-def aggregate_crawled_site(pages: list, parser_func) -> tuple[str, str, dict]:
+CRAWL_FILTER_LEVEL = 'safe'  # content filter level applied to crawled pages
+
+
+def crawl_parser_identity(parser_func) -> str:
+    """
+    Identity of the crawl parse setup for CrawlManifest: parser function, filter
+    level and template files. Stored fragments are reused only while it matches.
+    增量爬取清单的解析器标识：解析函数、过滤级别与模板文件指纹。
+    """
+    from webfetcher.parsing.engine.template_registry import template_fingerprint
+    name = f"{getattr(parser_func, '__module__', '')}.{getattr(parser_func, '__qualname__', parser_func)}"
+    return f"{name}|filter={CRAWL_FILTER_LEVEL}|templates={template_fingerprint()}"
+
+
+def _run_page_parser(parser_func, html: str, url: str) -> tuple[str, str, list]:
+    """
+    Parse one crawled page to Markdown (runs in a parse worker process or in-process).
+    将单个爬取页面解析为 Markdown（在解析进程或当前进程中执行）。
+
+    Returns:
+        (content, title, images)
+    """
+    # Pass is_crawling=True only to generic_to_markdown which supports it
+    if parser_func == generic_to_markdown:
+        date, content, metadata = parser_func(html, url, CRAWL_FILTER_LEVEL, is_crawling=True)
+    else:
+        date, content, metadata = parser_func(html, url)
+
+    # Extract title from content
+    title_match = re.search(r'^#\s+(.+)$', content, re.M)
+    title = title_match.group(1) if title_match else urllib.parse.urlparse(url).path
+    return content, title, metadata.get('images', [])
+
+
+class StreamingSiteAggregator:
+    """
+    Streaming counterpart of aggregate_crawled_site().
+    流式站点聚合器（aggregate_crawled_site 的流式版本）。
+
+    Pass add_page as crawl_site(on_page=...) / crawl_from_sitemap(on_page=...):
+    each page is parsed as soon as the crawler commits it, its Markdown is
+    appended to a per-depth spooled temp file and only a lightweight TOC
+    record stays in memory, so peak memory is bounded by the crawler's
+    prefetch window rather than the size of the site. For pages arriving in
+    depth order (BFS and sitemap crawls) the document is identical to
+    aggregate_crawled_site().
+    页面提交即解析，Markdown 追加到按深度分组的临时文件（超过阈值写入磁盘），
+    内存中只保留目录条目，峰值内存取决于抓取预取窗口而非站点大小。
+
+    With a JsonlWriter each page is written as a JSON Lines record instead.
+
+    With a parallel ParsePool, parsing runs in worker processes while the
+    crawler keeps fetching; results are applied strictly in commit order and
+    at most PENDING_PER_WORKER x workers pages wait for their parse.
+    使用多进程 ParsePool 时解析与抓取并行，结果严格按提交顺序写入。
+    """
+
+    SPOOL_MAX_SIZE = 1024 * 1024  # Per-depth Markdown kept in memory before spilling to disk
+    CHUNK_SIZE = 64 * 1024
+    PENDING_PER_WORKER = 2  # Pages queued per parse worker before add_page() blocks
+
+    # First H1 line, as found by insert_dual_url_section()
+    _H1_LINE = re.compile(r'^[^\S\n]*# [^\n]*\S[^\n]*$', re.M)
+
+    def __init__(self, parser_func, manifest: Optional[CrawlManifest] = None,
+                 writer: Optional[JsonlWriter] = None, parse_pool: Optional[ParsePool] = None):
+        self.parser_func = parser_func
+        self.manifest = manifest
+        self.writer = writer
+        self.parse_pool = parse_pool or ParsePool(workers=0)
+        self._max_pending = max(1, self.parse_pool.workers * self.PENDING_PER_WORKER)
+        self._pending = deque()  # (url, html, depth, started, Future) in commit order
+        self.first_html: Optional[str] = None  # First page's HTML, for --format html
+        self.total_pages = 0
+        self.written = 0
+        self.max_depth = 0
+        self._toc: List[tuple] = []  # (depth, title, anchor)
+        self._images: Set[str] = set()
+        self._spools: Dict[int, list] = {}  # depth -> [SpooledTemporaryFile, piece count]
+
+    def _spool(self, depth: int) -> list:
+        entry = self._spools.get(depth)
+        if entry is None:
+            entry = [tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE, mode='w+', encoding='utf-8'), 0]
+            self._spools[depth] = entry
+            if depth > 0:
+                self._write(entry, f"\n{'#' * (depth + 1)} Level {depth} Pages\n")
+        return entry
+
+    @staticmethod
+    def _write(entry: list, *pieces: str):
+        # Pieces are joined with '\n', exactly like aggregate_crawled_site()
+        for piece in pieces:
+            if entry[1]:
+                entry[0].write('\n')
+            entry[0].write(piece)
+            entry[1] += 1
+
+    def add_page(self, url: str, html: str, depth: int):
+        """
+        Queue one committed page for parsing and apply finished pages in order
+        提交一个页面进行解析，并按顺序写入已完成的页面
+        """
+        self.total_pages += 1
+        self.max_depth = max(self.max_depth, depth)
+        if self.total_pages == 1:
+            self.first_html = html
+        if self.writer is None:
+            self._spool(depth)
+        started = time.time()
+
+        fragment = self.manifest.get_fragment(url, html) if self.manifest is not None else None
+        if fragment is not None:
+            # Unchanged since last run: reuse the stored parse result
+            future = Future()
+            future.set_result((fragment['content'], fragment['title'], fragment['images']))
+            html = None  # Nothing to store back
+        else:
+            future = self.parse_pool.submit(_run_page_parser, self.parser_func, html, url)
+        self._pending.append((url, html, depth, started, future))
+        self._drain(self._max_pending)
+
+    def _drain(self, limit: int):
+        """Apply finished pages in commit order, blocking while more than limit are pending"""
+        while self._pending and (self._pending[0][4].done() or len(self._pending) > limit):
+            self._apply(*self._pending.popleft())
+
+    def _apply(self, url: str, html: Optional[str], depth: int, started: float, future: Future):
+        try:
+            content, title, images = self.parse_pool.result(future)
+        except Exception as e:
+            logging.warning(f"Failed to parse {url}: {e}")
+            if self.writer is not None:
+                self.writer.write(PageResult(url=url, input_url=url, status='failed', error=str(e),
+                                             duration=time.time() - started).to_record())
+            return
+
+        if self.manifest is not None and html:
+            self.manifest.put(url, html, content, title, images)
+
+        if self.writer is not None:
+            record = PageResult(url=url, input_url=url, status='success', final_url=url, title=title,
+                                images=images, parser=getattr(self.parser_func, '__name__', None),
+                                duration=time.time() - started, markdown=content).to_record()
+            record['depth'] = depth
+            self.writer.write(record)
+            self.written += 1
+            return
+
+        anchor = f"{depth}-{len(self._toc)}"
+        self._toc.append((depth, title, anchor))
+        self._write(self._spools[depth], f"\n<a id='{anchor}'></a>\n", content, "\n---\n")
+        self._images.update(images)
+
+    def finish(self) -> tuple[str, dict]:
+        """
+        Build the aggregate metadata once the crawl is complete
+        爬取结束后生成聚合元数据
+
+        Returns:
+            (date, metadata) in the format of aggregate_crawled_site()
+        """
+        self._drain(0)
+        metadata = {
+            'total_pages': self.total_pages,
+            'max_depth': self.max_depth,
+            'images': list(self._images),
+            'crawl_complete': True
+        }
+        if self.manifest is not None:
+            incremental = self.manifest.get_stats()
+            metadata['incremental'] = incremental
+            logging.info(f"Incremental crawl: {incremental['parsed']} pages parsed, "
+                         f"{incremental['reused_hash']} unchanged (hash), "
+                         f"{incremental['skipped_lastmod']} skipped (lastmod)")
+        return datetime.datetime.now().strftime("%Y-%m-%d"), metadata
+
+    def toc(self) -> str:
+        """Table of contents built from the per-page records / 由页面记录生成目录"""
+        entries = [f"{'  ' * depth}- [{title}](#{anchor})" for depth, title, anchor in self._toc]
+        return "## Table of Contents\n\n" + '\n'.join(entries)
+
+    def iter_document(self) -> Iterator[str]:
+        """Yield the aggregate Markdown in chunks / 分块输出聚合 Markdown"""
+        yield self.toc() + "\n\n"
+        first = True
+        for depth in sorted(self._spools):
+            spool, pieces = self._spools[depth]
+            if not pieces:
+                continue
+            if not first:
+                yield '\n'
+            first = False
+            spool.seek(0)
+            while True:
+                chunk = spool.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+            spool.seek(0, os.SEEK_END)
+
+    def get_document(self) -> str:
+        """The whole aggregate Markdown as one string / 完整聚合 Markdown"""
+        return ''.join(self.iter_document())
+
+    def write_document(self, path: Path, url_metadata: Optional[dict] = None):
+        """
+        Stream the aggregate Markdown to a file, inserting the dual URL section
+        流式写出聚合 Markdown，并插入双 URL 区块
+
+        Same result as path.write_text(insert_dual_url_section(get_document(), url_metadata)),
+        but only the text up to the first H1 line is transformed in memory.
+        """
+        with open(path, 'w', encoding='utf-8') as out:
+            chunks = self.iter_document()
+            if not url_metadata:
+                for chunk in chunks:
+                    out.write(chunk)
+                return
+
+            buffer = ''
+            split = None
+            for chunk in chunks:
+                buffer += chunk
+                split = self._split_after_title(buffer, final=False)
+                if split is not None:
+                    break
+            else:
+                split = self._split_after_title(buffer, final=True)
+            if split is None:
+                out.write(insert_dual_url_section(buffer, url_metadata))
+                return
+
+            head, rest = split
+            out.write(insert_dual_url_section(head, url_metadata))
+            if rest is None:
+                return
+            # insert_dual_url_section() re-joins lines, dropping one trailing newline:
+            # hold back the last character so the streamed tail matches
+            held = '\n'
+            for text in chain([rest], chunks):
+                if text:
+                    out.write(held + text[:-1])
+                    held = text[-1]
+            if held != '\n':
+                out.write(held)
+
+    def _split_after_title(self, buffer: str, final: bool) -> Optional[tuple]:
+        """
+        Split the document after the first H1 line (and the blank line following it)
+        在第一个 H1 行（及其后的空行）之后拆分文档
+
+        Returns:
+            (head, rest) with rest None if the document ends there, or None if
+            more text is needed (or, when final, there is no H1 line)
+        """
+        m = self._H1_LINE.search(buffer)
+        if m is None:
+            return None
+        end = m.end()
+        if end == len(buffer):
+            return (buffer, None) if final else None
+        nxt = buffer.find('\n', end + 1)
+        if nxt == -1:
+            if not final:
+                return None
+            if not buffer[end + 1:].strip():
+                return buffer, None
+            return buffer[:end], buffer[end + 1:]
+        if not buffer[end + 1:nxt].strip():
+            return buffer[:nxt], buffer[nxt + 1:]
+        return buffer[:end], buffer[end + 1:]
+
+    def close(self):
+        """Release the spooled temp files / 释放临时文件"""
+        for spool, _ in self._spools.values():
+            spool.close()
+        self._spools.clear()
+
+
+def aggregate_crawled_site(pages: list, parser_func, manifest: Optional[CrawlManifest] = None) -> tuple[str, str, dict]:
     """
     Aggregate crawled site pages into single comprehensive document.
     Organizes content by depth and URL structure.
+
+    With a CrawlManifest, pages whose body hash is unchanged (or that were
+    skipped by lastmod, html='') reuse their stored Markdown fragment; only
+    changed pages are parsed and written back to the manifest.
+
+    In-memory wrapper around StreamingSiteAggregator, which the CLI feeds
+    page by page while crawling.
     """
     if not pages:
         return '', '', {}
-    
-    # Group pages by depth for hierarchical organization
-    by_depth = {}
-    for url, html, depth in pages:
-        if depth not in by_depth:
-            by_depth[depth] = []
-        by_depth[depth].append((url, html))
-    
-    # Parse all pages
-    all_content = []
-    all_images = []
-    toc_entries = []
-    
-    for depth in sorted(by_depth.keys()):
-        if depth > 0:
-            all_content.append(f"\n{'#' * (depth + 1)} Level {depth} Pages\n")
-        
-        for url, html in by_depth[depth]:
-            try:
-                # Pass is_crawling=True only to generic_to_markdown which supports it
-                if parser_func == generic_to_markdown:
-                    date, content, metadata = parser_func(html, url, 'safe', is_crawling=True)
-                else:
-                    date, content, metadata = parser_func(html, url)
-                
-                # Extract title from content
-                title_match = re.search(r'^#\s+(.+)$', content, re.M)
-                title = title_match.group(1) if title_match else urllib.parse.urlparse(url).path
-                
-                # Add to TOC
-                indent = '  ' * depth
-                toc_entries.append(f"{indent}- [{title}](#{depth}-{len(toc_entries)})")
-                
-                # Add content with section anchor
-                all_content.append(f"\n<a id='{depth}-{len(toc_entries)-1}'></a>\n")
-                all_content.append(content)
-                all_content.append("\n---\n")
-                
-                # Collect images
-                all_images.extend(metadata.get('images', []))
-                
-            except Exception as e:
-                logging.warning(f"Failed to parse {url}: {e}")
-    
-    # Build final document with TOC
-    toc = "## Table of Contents\n\n" + '\n'.join(toc_entries)
-    final_content = toc + "\n\n" + '\n'.join(all_content)
-    
-    # Create metadata
-    metadata = {
-        'total_pages': len(pages),
-        'max_depth': max(by_depth.keys()) if by_depth else 0,
-        'images': list(set(all_images)),
-        'crawl_complete': True
-    }
-    
-    return datetime.datetime.now().strftime("%Y-%m-%d"), final_content, metadata
+
+    aggregator = StreamingSiteAggregator(parser_func, manifest=manifest)
+    try:
+        # Group pages by depth for hierarchical organization (stable: keeps crawl order within a depth)
+        for url, html, depth in sorted(pages, key=lambda page: page[2]):
+            aggregator.add_page(url, html, depth)
+        date, metadata = aggregator.finish()
+        return date, aggregator.get_document(), metadata
+    finally:
+        aggregator.close()
 
 
 def rewrite_and_download_assets(md: str, md_base: str, outdir: Path, ua: str, assets_root: str) -> str:
@@ -4114,7 +4673,7 @@ def rewrite_and_download_assets(md: str, md_base: str, outdir: Path, ua: str, as
             # download with UA
             try:
                 req = urllib.request.Request(u, headers={"User-Agent": ua, "Accept-Language": "zh-CN,zh;q=0.9"})
-                with urllib.request.urlopen(req, timeout=60, context=ssl_context_unverified) as r:
+                with pooled_urlopen(req, timeout=60, context=unverified_ssl_context()) as r:
                     data = r.read()
                 dest.write_bytes(data)
             except Exception:
@@ -4320,7 +4879,7 @@ def format_selenium_error(exception):
         str: 格式化的错误消息字符串
     """
     # Detect system language from LANG environment variable
-    lang = os.environ.get('LANG', '').lower()
+    lang = getenv('LANG', '').lower()
     is_chinese = 'zh' in lang or 'cn' in lang
 
     # Define bilingual labels
@@ -4473,7 +5032,7 @@ def generate_failure_markdown(url: str, metrics: FetchMetrics, exception=None) -
 
     # Original implementation (fallback when error_handler is not available or fails)
     # Detect system language from LANG environment variable
-    lang = os.environ.get('LANG', '').lower()
+    lang = getenv('LANG', '').lower()
     is_chinese = 'zh' in lang or 'cn' in lang
 
     # Get current timestamp
@@ -4614,7 +5173,8 @@ def get_failure_filename(timestamp: str, url: str) -> str:
     return f"FAILED_{timestamp} - {sanitized_domain}"
 
 
-def main():
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Build the webfetcher command line parser (shared by main() and batch mode)."""
     ap = argparse.ArgumentParser(
         description='Fetch a URL (WeChat/XHS/generic) and save as Markdown.',
         prog='webfetcher'
@@ -4630,6 +5190,9 @@ def main():
     ap.add_argument('--assets-root', default='assets', help='Assets root directory name (default: assets)')
     ap.add_argument('--save-html', nargs='?', const=True, help='Save fetched/rendered HTML snapshot before parsing (optional path).')
     ap.add_argument('--json', action='store_true', help='Output structured JSON alongside Markdown')
+    ap.add_argument('--jsonl', metavar='PATH', default=None,
+                    help="Append one JSON Lines record per page (url, final_url, title, markdown, images, fetch_metrics) "
+                         "to PATH ('-' for stdout) instead of per-page files / 每页一行 JSONL 流式输出")
     ap.add_argument('--verbose', action='store_true', help='Enable verbose logging (INFO level)')
     ap.add_argument('--filter', choices=['none', 'safe', 'moderate', 'aggressive'], default='safe',
                     help='Content filtering level: none (no filtering), safe (remove scripts/ads), moderate (+ navigation), aggressive (+ metadata) (default: safe)')
@@ -4641,6 +5204,18 @@ def main():
                     help='Maximum pages to crawl (default: 1000, max: 1000)')
     ap.add_argument('--crawl-delay', type=float, default=0.5,
                     help='Delay between crawl requests in seconds (default: 0.5)')
+    ap.add_argument('--crawl-workers', type=int, default=DEFAULT_CRAWL_WORKERS,
+                    help=f'Concurrent crawl fetch workers (default: {DEFAULT_CRAWL_WORKERS}) / 并发爬取线程数')
+    ap.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS,
+                    help=f'Parser processes for site crawls, 1 = parse in-process (default: {DEFAULT_PARSE_WORKERS}) / 爬取解析进程数')
+    ap.add_argument('--parse-budget', type=float, default=DEFAULT_PARSE_BUDGET, metavar='SECONDS',
+                    help=f'Per-page parsing CPU time limit in seconds, 0 = unlimited (default: {DEFAULT_PARSE_BUDGET:g}) / 每页解析 CPU 时间上限')
+    ap.add_argument('--crawl-per-host', type=int, default=None,
+                    help='Max concurrent requests per host; --crawl-delay applies per slot (default: 1) / 每主机最大并发数（默认 1）')
+    ap.add_argument('--cache-dir', default=None,
+                    help='HTTP response cache directory for ETag/Last-Modified revalidation (default: ~/.cache/webfetcher/http) / HTTP 响应缓存目录')
+    ap.add_argument('--no-cache', action='store_true',
+                    help='Disable the HTTP response cache (always download full pages) / 禁用 HTTP 响应缓存')
 
     # Task-008 Phase 1: Add pagination and domain control flags
     # Task-008 Phase 1：添加分页和域名控制标志
@@ -4653,6 +5228,10 @@ def main():
     # Task-008 Phase 2：Sitemap 支持
     ap.add_argument('--use-sitemap', action='store_true',
                     help='Use sitemap.xml for site crawling (if available, falls back to BFS if not found) / 使用 sitemap.xml 进行站点爬取（如可用，未找到时回退到BFS）')
+    ap.add_argument('--incremental', action='store_true',
+                    help='Incremental re-crawl: skip sitemap URLs whose lastmod has not advanced and reuse unchanged pages from the previous run / 增量爬取：跳过未更新页面并复用上次结果')
+    ap.add_argument('--crawl-manifest', default=None,
+                    help='Crawl manifest path for --incremental (default: <output-dir>/.wf-manifest/<host>.json) / 增量爬取清单路径')
 
     ap.add_argument('--format', choices=['markdown', 'html', 'both'], default='markdown',
                     help='Output format: markdown (default), html, or both')
@@ -4672,8 +5251,23 @@ def main():
     # Task-002 Phase 1: Force Chrome mode flag
     ap.add_argument('--force-chrome', action='store_true',
                     help='Skip Chrome health check (use when Chrome is known to be running)')
-    
-    args = ap.parse_args()
+    ap.add_argument('--hedge', action='store_true',
+                    help='In auto mode, start CDP in parallel when urllib exceeds the host\'s learned p90 latency '
+                         'and keep the first valid page / urllib 超出主机 p90 延迟时并行启动 CDP')
+    return ap
+
+
+def normalize_args(args: argparse.Namespace, configure_globals: bool = True) -> argparse.Namespace:
+    """
+    Apply fetch-mode shortcuts, global cache/parse budget settings and crawl limits to parsed arguments.
+
+    configure_globals=False leaves the process-wide HTTP cache and parse budget
+    alone (wf serve: those are daemon settings, not per-request options).
+    """
+
+    if configure_globals:
+        configure_http_cache(args.cache_dir, enabled=not args.no_cache)
+        configure_parse_budget(args.parse_budget)
     
     # Handle shortcuts for fetch modes
     if args.cdp:
@@ -4684,7 +5278,7 @@ def main():
         args.fetch_mode = 'urllib'
     
     # Check for legacy mode environment variable
-    if os.environ.get('WF_LEGACY_IMAGE_MODE'):
+    if getenv('WF_LEGACY_IMAGE_MODE'):
         logging.warning("DEPRECATION: WF_LEGACY_IMAGE_MODE is set. Auto-download behavior will be removed in future versions.")
         # Set a flag for legacy behavior
         args.legacy_image_mode = True
@@ -4698,18 +5292,24 @@ def main():
     if args.max_pages > MAX_CRAWL_PAGES:
         logging.warning(f"Requested pages {args.max_pages} exceeds maximum {MAX_CRAWL_PAGES}, using {MAX_CRAWL_PAGES}")
         args.max_pages = MAX_CRAWL_PAGES
-    
-    
-    setup_logging(args.verbose)
+    return args
 
+
+def _prepare_target(raw_url: str, args: argparse.Namespace) -> tuple[str, str, Optional[str], str, str]:
+    """
+    Normalize a target URL and pick the hosts used for UA/parser selection.
+
+    Returns:
+        tuple: (input_url, url, html_file, host, original_host); html_file is the
+        local HTML path for --html or file:// URLs, otherwise None
+    """
     # Task-003 Phase 1: Preserve original input URL exactly as provided by user
-    input_url = args.url.strip()  # Keep original, unmodified
+    input_url = raw_url.strip()  # Keep original, unmodified
     logging.debug(f"Task-003: Input URL preserved: {input_url}")
 
     # Validate and encode URL for proper Unicode handling
-    url = validate_and_encode_url(args.url)
-    outdir = Path(args.outdir)
-    outdir.mkdir(parents=True, exist_ok=True)
+    url = validate_and_encode_url(raw_url)
+    html_file = args.html
 
     # Detect file:// URLs and convert to --html mode
     is_file_url = url.startswith('file://')
@@ -4722,8 +5322,8 @@ def main():
         logging.info(f"Detected file:// URL, converting to local HTML mode")
         logging.info(f"Local file path: {file_path}")
 
-        # Set args.html to the file path
-        args.html = file_path
+        # Use the file as local HTML input
+        html_file = file_path
 
         # Use the file name (without directory path) as URL for display purposes
         file_name = parsed_file_url.path.split('/')[-1] if '/' in parsed_file_url.path else 'file'
@@ -4731,8 +5331,8 @@ def main():
         logging.info(f"Using display URL: {url}")
 
     logging.info(f"Starting webfetcher for URL: {url}")
-    if url != args.url and not is_file_url:
-        logging.info(f"URL encoded from: {args.url}")
+    if url != raw_url and not is_file_url:
+        logging.info(f"URL encoded from: {raw_url}")
 
     # Task-011 Phase 1: Skip URL resolution for explicit Selenium/manual Chrome modes
     # Task-011 阶段1：跳过显式 Selenium/手动 Chrome 模式的 URL 解析
@@ -4751,159 +5351,52 @@ def main():
         original_host = host
         logging.info(f"Selenium/manual Chrome mode: Skipping URL resolution to avoid premature network requests")
     else:
-        # For auto/urllib modes, resolve redirects to get effective host for parser selection
-        # 对于 auto/urllib 模式，解析重定向以获取用于解析器选择的有效主机
-        host = get_effective_host(url, ua=None)  # UA will be determined after this
+        # For auto/urllib modes, parser/UA selection is lazy: use a previously observed
+        # redirect if cached, otherwise the URL's own host. The effective host is
+        # confirmed from url_metadata['final_url'] after the real fetch (no HEAD pre-flight).
+        # 对于 auto/urllib 模式，解析器/UA 选择延迟进行：优先使用缓存的重定向，否则使用
+        # URL 自身主机；抓取后再根据 url_metadata['final_url'] 确认有效主机（不再预先 HEAD）。
         original_host = urllib.parse.urlparse(url).hostname or ''
+        cached_final_url = get_redirect_cache().get(url)
+        host = (urllib.parse.urlparse(cached_final_url).hostname if cached_final_url else None) or original_host
+        if cached_final_url:
+            logging.info(f"Redirect cache hit for parser selection: {url} -> {cached_final_url}")
 
-    ua = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0 Safari/537.36"
-    # Use a mobile WeChat UA for WeChat pages; desktop Chrome UA for XHS
-    if 'mp.weixin.qq.com' in host or 'weixin.qq.com' in host:
-        ua = 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 MicroMessenger/8.0.42(0x18002a2c) NetType/WIFI Language/zh_CN'
-    elif 'xiaohongshu.com' in host or 'xhslink.com' in original_host:
-        ua = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    elif 'dianping.com' in host:
-        ua = 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1'
+    return input_url, url, html_file, host, original_host
 
-    # Site crawling mode (overrides single-page fetch)
-    if args.crawl_site:
-        logging.info("Site crawling mode activated / 站点爬取模式已激活")
 
-        # Task-008 Phase 1: Log pagination mode
-        if args.follow_pagination:
-            logging.info("Pagination following enabled / 已启用分页跟随")
-        if not args.same_domain_only:
-            logging.warning("Cross-domain crawling enabled - use with caution / 已启用跨域爬取 - 请谨慎使用")
-
-        # Task-008 Phase 2: Log sitemap mode
-        if args.use_sitemap:
-            logging.info("Sitemap-first crawling enabled / 已启用sitemap优先爬取")
+def process_url(raw_url: str, args: argparse.Namespace, target: Optional[tuple] = None) -> PageResult:
+    """
+    Fetch, parse and save a single page (the non-crawl path of main()).
 
-        # Check if supported site type
-        if 'mp.weixin.qq.com' in host or 'xiaohongshu.com' in host or 'xhslink.com' in original_host or 'dianping.com' in host:
-            logging.error("Site crawling not supported for social media sites")
-            sys.exit(1)
+    Safe to call from several threads with a shared, normalized args
+    namespace: all per-URL state is local, and output paths are reserved
+    under a lock so concurrent pages with the same title do not collide.
+    单页抓取、解析与保存（main() 的非爬取路径），可在多个线程中共享同一 args 调用。
 
-        # Task-008 Phase 2: Choose crawling method based on --use-sitemap flag
-        if args.use_sitemap:
-            # Use sitemap-first crawling (with automatic fallback to BFS)
-            crawled_pages = crawl_from_sitemap(
-                url, ua,
-                max_pages=args.max_pages,
-                delay=args.crawl_delay,
-                # Pass additional args for fallback
-                max_depth=args.max_crawl_depth,
-                follow_pagination=args.follow_pagination,
-                same_domain_only=args.same_domain_only
-            )
-        else:
-            # Use regular BFS crawling
-            crawled_pages = crawl_site(
-                url, ua,
-                max_depth=args.max_crawl_depth,
-                max_pages=args.max_pages,
-                delay=args.crawl_delay,
-                follow_pagination=args.follow_pagination,      # Task-008 Phase 1
-                same_domain_only=args.same_domain_only        # Task-008 Phase 1
-            )
-        
-        if crawled_pages:
-            # Detect appropriate parser from first page
-            first_html = crawled_pages[0][1]
-            # Always use generic parser for crawling
-            parser_func = generic_to_markdown
-            parser_name = "Generic"
-            
-            logging.info(f"Using {parser_name} parser for site content")
-            
-            # Aggregate all content
-            date_only, md, metadata = aggregate_crawled_site(crawled_pages, parser_func)
-            metadata['parser_used'] = parser_name
-            rendered = False
-            
-            # Process and save file directly in crawl mode
-            # Title for filename comes from first heading
-            m = re.match(r'^#\s*(.+)$', md.splitlines()[0].strip())
-            title = m.group(1) if m else '未命名'
-            # Use current timestamp for filename to avoid conflicts
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H%M%S")
-            base = f"{timestamp} - {sanitize_filename(title)}"
-            path = ensure_unique_path(outdir, base)
-            
-            # Optionally download images and rewrite links
-            if hasattr(args, 'legacy_image_mode') and args.legacy_image_mode:
-                # Legacy behavior for backward compatibility
-                do_download_assets = args.download_assets or ('mp.weixin.qq.com' in host) or ('xiaohongshu.com' in host) or ('xhslink.com' in original_host)
-            else:
-                # New default: only download if explicitly requested
-                do_download_assets = args.download_assets
-            if do_download_assets:
-                logging.info("Starting asset downloads")
-                md_base = base  # same base as filename
-                md = rewrite_and_download_assets(md, md_base, outdir, ua, args.assets_root)
-                logging.info("Asset downloads completed")
-            
-            # Determine output formats needed
-            output_markdown, output_html = determine_output_format(args, url)
+    Args:
+        raw_url: URL as given by the user
+        args: Parsed and normalized arguments (build_arg_parser + normalize_args)
+        target: Pre-computed _prepare_target() result (optional)
 
-            # Task-003 Phase 3: Create url_metadata for crawl mode
-            crawl_url_metadata = create_url_metadata(
-                input_url=input_url,
-                final_url=url,  # For crawl mode, final URL is typically the starting URL
-                fetch_mode='crawl'
-            )
+    Returns:
+        PageResult: status ('success', 'failed' or 'downloaded'), output paths and metrics
+    """
+    started = time.time()
+    jsonl_mode = bool(getattr(args, 'jsonl', None))
+    input_url, url, html_file, host, original_host = target or _prepare_target(raw_url, args)
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    ua = select_user_agent(host, original_host)
+    url_metadata = None
 
-            # Task-003 Phase 3: Enhance markdown with dual URL section
-            md = insert_dual_url_section(md, crawl_url_metadata)
+    def _failed_result(failure_path: Path, metrics: FetchMetrics) -> PageResult:
+        return PageResult(url=url, input_url=input_url, status='failed', paths=[str(failure_path)],
+                          error=metrics.error_message, fetch_metrics=metrics, duration=time.time() - started)
 
-            # Write markdown file if requested
-            if output_markdown:
-                path.write_text(md, encoding='utf-8')
-                logging.info(f"Markdown file saved: {path}")
-            
-            # Write HTML file if requested
-            if output_html:
-                try:
-                    html_path = get_html_output_path(args, url, base)
-                    write_html_file(crawled_pages[0][1], html_path, url, title)  # Use first page's HTML
-                    logging.info(f"HTML file saved: {html_path}")
-                except Exception as e:
-                    logging.error(f"Failed to write HTML output: {e}")
-            
-            # Generate JSON output if requested
-            if args.json:
-                json_data = {
-                    'url': url,
-                    'title': title,
-                    'date': f"{date_only} {datetime.datetime.now().strftime('%H:%M:%S')}",
-                    'content': md,
-                    'images': metadata.get('images', []),
-                    'metadata': {
-                        **metadata,
-                        'parser_used': parser_name,
-                        'fetch_method': 'crawl',
-                        'scraped_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                }
-                json_path = path.with_suffix('.json')
-                json_path.write_text(json.dumps(json_data, ensure_ascii=False, indent=2), encoding='utf-8')
-                logging.info(f"JSON data saved: {json_path}")
-            
-            # Print primary output path(s)
-            if output_markdown and output_html:
-                print(f"{path}\n{html_path}")
-            elif output_html:
-                print(str(html_path))
-            else:
-                print(str(path))
-            return  # Exit the main function after crawling is complete
-            
-        else:
-            logging.error("No pages crawled successfully")
-            sys.exit(1)
-    elif args.html:
+    if html_file:
         # Local HTML file
-        html = Path(args.html).read_text(encoding='utf-8', errors='ignore')
+        html = Path(html_file).read_text(encoding='utf-8', errors='ignore')
         fetch_metrics = FetchMetrics(primary_method="local_file", final_status="success")
         rendered = False
         # Create url_metadata for local file mode
@@ -4959,10 +5452,27 @@ def main():
             # Task-002 Phase 1: Pass force_chrome flag to fetch function
             # Task-003 Phase 1: Pass input_url and receive url_metadata
             try:
-                html, fetch_metrics, url_metadata = fetch_html(url, ua=ua, timeout=fetch_timeout, fetch_mode=args.fetch_mode, force_chrome=args.force_chrome, input_url=input_url)
+                html, fetch_metrics, url_metadata = fetch_html(url, ua=ua, timeout=fetch_timeout, fetch_mode=args.fetch_mode, force_chrome=args.force_chrome, hedge=getattr(args, 'hedge', False), input_url=input_url)
                 logging.info("Static fetch completed")
                 logging.debug(f"Task-003: Received url_metadata: {url_metadata}")
 
+                # Lazy parser/UA selection: derive the effective host from the final URL
+                # the fetch already followed, and remember the redirect for next time
+                final_url = (url_metadata or {}).get('final_url') or url
+                effective_host = urllib.parse.urlparse(final_url).hostname or host
+                if final_url != url and fetch_metrics and fetch_metrics.final_status != "failed":
+                    get_redirect_cache().put(url, final_url)
+                if effective_host != host:
+                    logging.info(f"Redirect resolved for parser selection: {url} -> {final_url}")
+                    host = effective_host
+                    effective_ua = select_user_agent(host, original_host)
+                    if effective_ua != ua:
+                        # Rare: an unseen redirect landed on a site needing a specific UA.
+                        # Refetch once with it; the redirect cache avoids this next time.
+                        logging.info("Refetching with site-specific User-Agent for redirected host")
+                        ua = effective_ua
+                        html, fetch_metrics, url_metadata = fetch_html(final_url, ua=ua, timeout=fetch_timeout, fetch_mode=args.fetch_mode, force_chrome=args.force_chrome, hedge=getattr(args, 'hedge', False), input_url=input_url or url)
+
                 # Phase 2: Check if fetch failed
                 if fetch_metrics and fetch_metrics.final_status == "failed":
                     logging.warning(f"Fetch failed: {fetch_metrics.error_message}")
@@ -4975,8 +5485,7 @@ def main():
                     failure_md = generate_failure_markdown(url, fetch_metrics, None)
                     failure_path.write_text(failure_md, encoding='utf-8')
                     logging.info(f"Failure report saved: {failure_path}")
-                    print(str(failure_path))
-                    sys.exit(1)
+                    return _failed_result(failure_path, fetch_metrics)
 
             except (ChromeConnectionError, SeleniumNotAvailableError, SeleniumFetchError, SeleniumTimeoutError) as e:
                 logging.error(f"Selenium fetch failed: {e}")
@@ -4999,8 +5508,7 @@ def main():
                 failure_md = generate_failure_markdown(url, failure_metrics, e)
                 failure_path.write_text(failure_md, encoding='utf-8')
                 logging.info(f"Failure report saved: {failure_path}")
-                print(str(failure_path))
-                sys.exit(1)
+                return _failed_result(failure_path, failure_metrics)
 
             except Exception as e:
                 # Phase 2: Catch urllib and other fetch failures
@@ -5022,13 +5530,14 @@ def main():
                 failure_md = generate_failure_markdown(url, failure_metrics, e)
                 failure_path.write_text(failure_md, encoding='utf-8')
                 logging.info(f"Failure report saved: {failure_path}")
-                print(str(failure_path))
-                sys.exit(1)
+                return _failed_result(failure_path, failure_metrics)
 
     # Try to download file if it's a downloadable type
     downloader = SimpleDownloader()
     if downloader.try_download(url, ua, args.timeout, args.outdir):
-        return  # Exit early, skip HTML processing for binary files
+        # Exit early, skip HTML processing for binary files
+        return PageResult(url=url, input_url=input_url, status='downloaded',
+                          paths=[str(downloader.downloaded_path)], duration=time.time() - started)
 
     # Optionally save HTML snapshot before parsing
     if args.save_html:
@@ -5073,7 +5582,7 @@ def main():
     # Use current timestamp for filename to avoid conflicts
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H%M%S")
     base = f"{timestamp} - {sanitize_filename(title)}"
-    path = ensure_unique_path(outdir, base)
+    path = None if jsonl_mode else _reserve_output_path(outdir, base)
     # Optionally download images and rewrite links
     if hasattr(args, 'legacy_image_mode') and args.legacy_image_mode:
         # Legacy behavior for backward compatibility
@@ -5086,6 +5595,21 @@ def main():
         md_base = base  # same base as filename (includes timestamp)
         md = rewrite_and_download_assets(md, md_base, outdir, ua, args.assets_root)
         logging.info("Asset downloads completed")
+
+    if jsonl_mode:
+        # JSONL output: the caller streams the record, metrics travel as structured data
+        return PageResult(
+            url=url,
+            input_url=input_url,
+            status='success',
+            final_url=(url_metadata or {}).get('final_url') or url,
+            title=title,
+            images=metadata.get('images', []),
+            parser=parser_name,
+            fetch_metrics=fetch_metrics,
+            duration=time.time() - started,
+            markdown=md,
+        )
     
     # Add fetch metrics to markdown content if available
     if fetch_metrics:
@@ -5135,13 +5659,229 @@ def main():
         json_path.write_text(json.dumps(json_data, ensure_ascii=False, indent=2), encoding='utf-8')
         logging.info(f"JSON data saved: {json_path}")
     
-    # Print primary output path(s)
+    # Primary output path(s)
     if output_markdown and output_html:
-        print(f"{path}\n{html_path}")
+        paths = [str(path), str(html_path)]
     elif output_html:
-        print(str(html_path))
+        paths = [str(html_path)]
     else:
-        print(str(path))
+        paths = [str(path)]
+    return PageResult(
+        url=url,
+        input_url=input_url,
+        status='success',
+        final_url=(url_metadata or {}).get('final_url') or url,
+        title=title,
+        paths=paths,
+        images=metadata.get('images', []),
+        parser=parser_name,
+        fetch_metrics=fetch_metrics,
+        duration=time.time() - started,
+    )
+
+
+def main():
+    ap = build_arg_parser()
+    args = ap.parse_args()
+    normalize_args(args)
+
+    setup_logging(args.verbose)
+
+    input_url, url, html_file, host, original_host = _prepare_target(args.url, args)
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    ua = select_user_agent(host, original_host)
+
+    # Site crawling mode (overrides single-page fetch)
+    if args.crawl_site:
+        logging.info("Site crawling mode activated / 站点爬取模式已激活")
+
+        # Task-008 Phase 1: Log pagination mode
+        if args.follow_pagination:
+            logging.info("Pagination following enabled / 已启用分页跟随")
+        if not args.same_domain_only:
+            logging.warning("Cross-domain crawling enabled - use with caution / 已启用跨域爬取 - 请谨慎使用")
+
+        # Task-008 Phase 2: Log sitemap mode
+        if args.use_sitemap:
+            logging.info("Sitemap-first crawling enabled / 已启用sitemap优先爬取")
+
+        # Check if supported site type
+        if 'mp.weixin.qq.com' in host or 'xiaohongshu.com' in host or 'xhslink.com' in original_host or 'dianping.com' in host:
+            logging.error("Site crawling not supported for social media sites")
+            sys.exit(1)
+
+        # Always use generic parser for crawling
+        parser_func = generic_to_markdown
+        parser_name = "Generic"
+
+        # Incremental re-crawl: manifest of the previous run's pages
+        manifest = None
+        if args.incremental:
+            manifest_path = Path(args.crawl_manifest) if args.crawl_manifest else manifest_path_for(outdir, url)
+            manifest = CrawlManifest(manifest_path, parser=crawl_parser_identity(parser_func))
+            logging.info(f"Incremental crawl enabled, manifest: {manifest_path} / 已启用增量爬取")
+
+        # Streaming pipeline: each page is parsed as soon as the crawler commits it and
+        # appended to a spooled aggregate (or the JSONL stream), so the site's HTML is never held in memory
+        jsonl_writer = JsonlWriter(args.jsonl) if args.jsonl else None
+        # CPU-bound Markdown conversion runs in worker processes alongside the fetch threads
+        parse_pool = ParsePool(workers=args.parse_workers, preload_modules=(__name__, 'webfetcher.parsing.parser'))
+        aggregator = StreamingSiteAggregator(parser_func, manifest=manifest, writer=jsonl_writer,
+                                             parse_pool=parse_pool)
+
+        # Task-008 Phase 2: Choose crawling method based on --use-sitemap flag
+        try:
+            if args.use_sitemap:
+                # Use sitemap-first crawling (with automatic fallback to BFS)
+                crawled_pages = crawl_from_sitemap(
+                    url, ua,
+                    max_pages=args.max_pages,
+                    delay=args.crawl_delay,
+                    manifest=manifest,
+                    # Pass additional args for fallback
+                    max_depth=args.max_crawl_depth,
+                    follow_pagination=args.follow_pagination,
+                    same_domain_only=args.same_domain_only,
+                    max_workers=args.crawl_workers,
+                    per_host_limit=args.crawl_per_host,
+                    on_page=aggregator.add_page
+                )
+            else:
+                # Use regular BFS crawling
+                crawled_pages = crawl_site(
+                    url, ua,
+                    max_depth=args.max_crawl_depth,
+                    max_pages=args.max_pages,
+                    delay=args.crawl_delay,
+                    follow_pagination=args.follow_pagination,      # Task-008 Phase 1
+                    same_domain_only=args.same_domain_only,       # Task-008 Phase 1
+                    max_workers=args.crawl_workers,
+                    per_host_limit=args.crawl_per_host,
+                    on_page=aggregator.add_page
+                )
+            # Wait for the parses still in flight
+            date_only, metadata = aggregator.finish()
+        finally:
+            parse_pool.shutdown()
+            if jsonl_writer is not None:
+                jsonl_writer.close()
+
+        if not crawled_pages:
+            aggregator.close()
+            logging.error("No pages crawled successfully")
+            sys.exit(1)
+
+        logging.info(f"Used {parser_name} parser for site content")
+        metadata['parser_used'] = parser_name
+        if manifest is not None:
+            manifest.save()
+
+        if jsonl_writer is not None:
+            logging.info(f"JSONL: {aggregator.written} pages written to {args.jsonl}")
+            if not jsonl_writer.is_stdout:
+                print(args.jsonl)
+            return
+
+        try:
+            # Process and save file directly in crawl mode
+            # Title for filename comes from first heading
+            m = re.match(r'^#\s*(.+)$', aggregator.toc().splitlines()[0].strip())
+            title = m.group(1) if m else '未命名'
+            # Use current timestamp for filename to avoid conflicts
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H%M%S")
+            base = f"{timestamp} - {sanitize_filename(title)}"
+            path = ensure_unique_path(outdir, base)
+
+            # Optionally download images and rewrite links
+            if hasattr(args, 'legacy_image_mode') and args.legacy_image_mode:
+                # Legacy behavior for backward compatibility
+                do_download_assets = args.download_assets or ('mp.weixin.qq.com' in host) or ('xiaohongshu.com' in host) or ('xhslink.com' in original_host)
+            else:
+                # New default: only download if explicitly requested
+                do_download_assets = args.download_assets
+
+            # Determine output formats needed
+            output_markdown, output_html = determine_output_format(args, url)
+
+            # Task-003 Phase 3: Create url_metadata for crawl mode
+            crawl_url_metadata = create_url_metadata(
+                input_url=input_url,
+                final_url=url,  # For crawl mode, final URL is typically the starting URL
+                fetch_mode='crawl'
+            )
+
+            md = None
+            if do_download_assets or args.json:
+                # Whole-document transforms need the aggregate Markdown in memory
+                md = aggregator.get_document()
+                if do_download_assets:
+                    logging.info("Starting asset downloads")
+                    md_base = base  # same base as filename
+                    md = rewrite_and_download_assets(md, md_base, outdir, ua, args.assets_root)
+                    logging.info("Asset downloads completed")
+
+                # Task-003 Phase 3: Enhance markdown with dual URL section
+                md = insert_dual_url_section(md, crawl_url_metadata)
+
+            # Write markdown file if requested
+            if output_markdown:
+                if md is not None:
+                    path.write_text(md, encoding='utf-8')
+                else:
+                    aggregator.write_document(path, crawl_url_metadata)
+                logging.info(f"Markdown file saved: {path}")
+
+            # Write HTML file if requested
+            if output_html:
+                try:
+                    html_path = get_html_output_path(args, url, base)
+                    write_html_file(aggregator.first_html or '', html_path, url, title)  # Use first page's HTML
+                    logging.info(f"HTML file saved: {html_path}")
+                except Exception as e:
+                    logging.error(f"Failed to write HTML output: {e}")
+
+            # Generate JSON output if requested
+            if args.json:
+                json_data = {
+                    'url': url,
+                    'title': title,
+                    'date': f"{date_only} {datetime.datetime.now().strftime('%H:%M:%S')}",
+                    'content': md,
+                    'images': metadata.get('images', []),
+                    'metadata': {
+                        **metadata,
+                        'parser_used': parser_name,
+                        'fetch_method': 'crawl',
+                        'scraped_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    }
+                }
+                json_path = path.with_suffix('.json')
+                json_path.write_text(json.dumps(json_data, ensure_ascii=False, indent=2), encoding='utf-8')
+                logging.info(f"JSON data saved: {json_path}")
+        finally:
+            aggregator.close()
+
+        # Print primary output path(s)
+        if output_markdown and output_html:
+            print(f"{path}\n{html_path}")
+        elif output_html:
+            print(str(html_path))
+        else:
+            print(str(path))
+        return  # Exit the main function after crawling is complete
+
+    # Single page: fetch, parse and save
+    result = process_url(args.url, args, target=(input_url, url, html_file, host, original_host))
+    if args.jsonl:
+        with JsonlWriter(args.jsonl) as writer:
+            writer.write(result.to_record())
+    for output_path in result.paths:
+        print(output_path, file=sys.stderr if args.jsonl == JSONL_STDOUT else sys.stdout)
+    if args.jsonl and args.jsonl != JSONL_STDOUT:
+        print(args.jsonl)
+    if result.status == 'failed':
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,5 @@
+"""Site crawling support (scheduling, politeness, incremental manifests)."""
+from .politeness import HostPolitenessScheduler
+from .manifest import CrawlManifest, manifest_path_for
+
+__all__ = ['HostPolitenessScheduler', 'CrawlManifest', 'manifest_path_for']
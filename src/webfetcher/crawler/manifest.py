@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Incremental Crawl Manifest
+增量爬取清单
+
+Records, per crawled URL, the sitemap ``lastmod``, a hash of the fetched HTML
+and the path of the page's parsed Markdown fragment. On the next run:
+
+- sitemap URLs whose ``lastmod`` has not advanced are not fetched at all;
+- fetched pages whose body hash is unchanged are not parsed again;
+
+and the aggregated Markdown is rebuilt from stored fragments, so a nightly
+refresh only pays for pages that actually changed.
+按 URL 记录 sitemap ``lastmod``、页面 HTML 哈希以及解析后 Markdown 片段路径。
+下次运行时跳过 ``lastmod`` 未更新的 URL，并对哈希未变的页面跳过重新解析，
+聚合 Markdown 由已存储片段重建，只有变化的页面需要重新处理。
+
+Layout / 目录结构::
+
+    <outdir>/.wf-manifest/<host>.json          # manifest
+    <outdir>/.wf-manifest/<host>/<key>.md      # per-page Markdown fragments
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+MANIFEST_DIRNAME = ".wf-manifest"
+
+
+def _parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """Parse a sitemap lastmod (W3C datetime) to a timestamp / 解析 lastmod 为时间戳"""
+    if not value:
+        return None
+    try:
+        dt = datetime.datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.timestamp()
+
+
+def manifest_path_for(outdir: Path, start_url: str) -> Path:
+    """Default manifest location for a crawl / 爬取清单的默认路径"""
+    host = urlparse(start_url).netloc or 'local'
+    return Path(outdir) / MANIFEST_DIRNAME / f"{re.sub(r'[^A-Za-z0-9._-]', '_', host)}.json"
+
+
+class CrawlManifest:
+    """
+    Manifest of a previous crawl used for incremental re-crawls.
+    用于增量爬取的上次爬取清单。
+
+    Example:
+        manifest = CrawlManifest(manifest_path_for(outdir, url), parser=crawl_parser_identity(generic_to_markdown))
+        pages = crawl_from_sitemap(url, ua, manifest=manifest)
+        date, md, meta = aggregate_crawled_site(pages, generic_to_markdown, manifest=manifest)
+        manifest.save()
+    """
+
+    def __init__(self, path: Path, parser: str = ''):
+        """
+        Load a manifest (missing or incompatible manifests start empty)
+
+        Args:
+            path: Manifest JSON path; fragments go to a sibling directory
+            parser: Parse setup identity (parser, filter level, template fingerprint);
+                a change invalidates all fragments
+        """
+        self.path = Path(path)
+        self.parser = parser
+        self.fragment_dir = self.path.with_suffix('')
+        self._entries: Dict[str, dict] = {}
+        self._lastmods: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'skipped_lastmod': 0, 'reused_hash': 0, 'parsed': 0}
+        self._load()
+
+    @staticmethod
+    def content_hash(html: str) -> str:
+        """Hash of a page body / 页面内容哈希"""
+        return hashlib.sha256(html.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable crawl manifest {self.path}: {e}")
+            return
+        if data.get('version') != MANIFEST_VERSION or data.get('parser') != self.parser:
+            logger.info(f"Crawl manifest {self.path} was built with a different parser/version, starting fresh")
+            return
+        self._entries = data.get('pages', {})
+        logger.info(f"Loaded crawl manifest with {len(self._entries)} pages: {self.path}")
+
+    def _fragment_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        return self.fragment_dir / f"{key}.md"
+
+    def is_unchanged(self, url: str, lastmod: Optional[str]) -> bool:
+        """
+        True if the sitemap lastmod has not advanced since the stored fragment
+        sitemap lastmod 未晚于已存储片段时返回 True
+        """
+        new_ts = _parse_lastmod(lastmod)
+        entry = self._entries.get(url)
+        if new_ts is None or not entry:
+            return False
+        old_ts = _parse_lastmod(entry.get('lastmod'))
+        if old_ts is None or new_ts > old_ts:
+            return False
+        if not (self.fragment_dir / entry.get('output_path', '')).is_file():
+            return False
+        with self._lock:
+            self.stats['skipped_lastmod'] += 1
+        return True
+
+    def note_lastmod(self, url: str, lastmod: Optional[str]):
+        """Remember the sitemap lastmod seen for a URL in this run / 记录本次运行的 lastmod"""
+        self._lastmods[url] = lastmod
+
+    def get_fragment(self, url: str, html: Optional[str]) -> Optional[dict]:
+        """
+        Get the stored parse result for a page if it is still valid
+        获取仍然有效的已存储解析结果
+
+        Args:
+            url: Page URL
+            html: Fetched HTML, or '' for pages skipped by lastmod
+
+        Returns:
+            dict with content, title and images, or None if the page must be parsed
+        """
+        entry = self._entries.get(url)
+        if not entry:
+            return None
+        if html and entry.get('content_hash') != self.content_hash(html):
+            return None
+        try:
+            content = (self.fragment_dir / entry['output_path']).read_text(encoding='utf-8')
+        except Exception:
+            return None
+        if html:
+            with self._lock:
+                self.stats['reused_hash'] += 1
+                # Same body under a newer lastmod: remember it so the next run can skip the fetch
+                if self._lastmods.get(url):
+                    entry['lastmod'] = self._lastmods[url]
+        return {'content': content, 'title': entry.get('title'), 'images': entry.get('images', [])}
+
+    def put(self, url: str, html: str, content: str, title: str, images: List[str]):
+        """
+        Store the parse result of a (re)parsed page
+        存储重新解析页面的结果
+        """
+        fragment = self._fragment_path(url)
+        try:
+            fragment.parent.mkdir(parents=True, exist_ok=True)
+            fragment.write_text(content, encoding='utf-8')
+        except Exception as e:
+            logger.debug(f"Failed to write crawl fragment for {url}: {e}")
+            return
+        previous = self._entries.get(url, {})
+        with self._lock:
+            self.stats['parsed'] += 1
+            self._entries[url] = {
+                'lastmod': self._lastmods.get(url, previous.get('lastmod')),
+                'content_hash': self.content_hash(html),
+                'output_path': fragment.name,
+                'title': title,
+                'images': images,
+                'updated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            }
+
+    def save(self):
+        """Persist the manifest atomically / 原子写入清单"""
+        data = {'version': MANIFEST_VERSION, 'parser': self.parser, 'pages': self._entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+            logger.info(f"Crawl manifest saved: {self.path} ({len(self._entries)} pages)")
+        except Exception as e:
+            logger.warning(f"Failed to save crawl manifest {self.path}: {e}")
+
+    def get_stats(self) -> dict:
+        """Get incremental crawl statistics / 获取增量爬取统计"""
+        with self._lock:
+            return dict(self.stats)
@@ -0,0 +1,14 @@
+"""
+Resident fetch daemon (``wf serve``) and its thin client
+常驻抓取守护进程（wf serve）及轻量客户端
+
+Only the client and protocol are exported here: they are imported on every
+``wf`` run and must not pull in webfetcher.core. The server lives in
+``webfetcher.daemon.server``.
+"""
+
+from webfetcher.daemon.client import ServerUnavailable, request, run_via_server
+from webfetcher.daemon.protocol import NO_SERVER_ENV, SERVER_ENV, default_address, parse_address
+
+__all__ = ['NO_SERVER_ENV', 'SERVER_ENV', 'ServerUnavailable', 'default_address', 'parse_address',
+           'request', 'run_via_server']
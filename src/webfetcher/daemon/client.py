@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Fetch Daemon Client
+抓取守护进程客户端
+
+Used by ``wf`` before importing webfetcher.core: when a ``wf serve`` daemon
+is listening, the already-parsed command line is sent to it and only the
+result comes back, so the CLI run costs a socket round trip instead of an
+interpreter warm-up (routing config, template registry, parsers, CDP tab).
+wf 在导入 core 之前先尝试守护进程：命令行发送给常驻进程处理，只取回结果。
+
+Anything the daemon cannot do (site crawls, --help/--version, argparse
+errors, no daemon running) returns None and the caller runs in-process,
+so output and exit codes are the same either way.
+守护进程无法处理的情况返回 None，由调用方在本进程内执行，输出与退出码保持一致。
+"""
+
+import os
+import sys
+import logging
+from typing import Any, Dict, List, Optional
+
+from webfetcher.daemon.protocol import (
+    FORWARDED_ENV, NO_SERVER_ENV, SERVER_ENV, Address, connect, default_address, format_address, mac_matches, new_nonce,
+    read_message, read_token, request_auth, server_proof, write_message,
+)
+
+logger = logging.getLogger(__name__)
+
+# 由本进程执行的参数（守护进程不处理）
+LOCAL_ONLY_ARGS = ('-h', '--help', '--version', '--crawl-site')
+
+
+class ServerUnavailable(Exception):
+    """No daemon is listening at the address"""
+    pass
+
+
+def request(message: Dict[str, Any], address: Optional[Address] = None,
+            connect_timeout: Optional[float] = None, token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Send one request to the daemon and wait for its response
+    发送一个请求并等待响应（先完成令牌握手）
+
+    The daemon must first prove that it holds the per-user token; until it
+    has, only a random nonce is sent, so a process squatting on the address
+    learns neither the token nor the request.
+    对端证明持有令牌之前只发送随机数，抢占地址的进程拿不到令牌和请求内容。
+
+    Args:
+        token: 用户级令牌（默认读取 TOKEN_FILE）
+
+    Raises:
+        ServerUnavailable: 无法连接守护进程、没有令牌或对端未通过令牌校验
+        ConnectionError: 守护进程未返回响应就关闭了连接
+    """
+    address = address or default_address()
+    if address is None:
+        raise ServerUnavailable(f"no wf serve address: AF_UNIX is not available, set {SERVER_ENV}=host:port")
+    token = token or read_token()
+    if not token:
+        raise ServerUnavailable("no wf serve token for this user")
+    kwargs = {} if connect_timeout is None else {'timeout': connect_timeout}
+    try:
+        sock = connect(address, **kwargs)
+    except OSError as e:
+        raise ServerUnavailable(f"wf serve not reachable at {format_address(address)}: {e}") from e
+    client_nonce = new_nonce()
+    with sock, sock.makefile('rwb') as stream:
+        write_message(stream, {'op': 'hello', 'nonce': client_nonce})
+        hello = read_message(stream)
+        if hello is None:
+            raise ConnectionError(f"wf serve at {format_address(address)} closed the connection")
+        server_nonce = hello.get('nonce')
+        if not isinstance(server_nonce, str) or not mac_matches(
+                server_proof(token, client_nonce, server_nonce), hello.get('proof')):
+            raise ServerUnavailable(f"{format_address(address)} did not prove it is this user's wf serve")
+        write_message(stream, dict(message, auth=request_auth(token, client_nonce, server_nonce, message)))
+        response = read_message(stream)
+    if response is None:
+        raise ConnectionError(f"wf serve at {format_address(address)} closed the connection")
+    return response
+
+
+def _client_jsonl(argv: List[str]) -> Optional[str]:
+    """
+    --jsonl value of the client's own command line
+    客户端自身命令行中的 --jsonl（输出路径只由客户端决定，不采用守护进程返回的路径）
+    """
+    if not any(arg.startswith('--js') for arg in argv):
+        return None
+    import argparse
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--json', action='store_true')  # keeps --js... abbreviations resolving as in core
+    parser.add_argument('--jsonl')
+
+    def _error(message):
+        raise ValueError(message)
+
+    parser.error = _error
+    return parser.parse_known_args(argv)[0].jsonl
+
+
+def _emit(response: Dict[str, Any], jsonl: Optional[str] = None) -> int:
+    """
+    Print a fetch response the way core.main() prints a single page; returns the exit code
+
+    Args:
+        jsonl: --jsonl path parsed from the client's argv; the record is appended there
+    """
+    from webfetcher.utils.jsonl import STDOUT, JsonlWriter
+
+    # What the fetch printed in the daemon (error guidance, progress notes)
+    sys.stdout.write(response.get('stdout') or '')
+    sys.stderr.write(response.get('stderr') or '')
+    if not response.get('ok'):
+        print(f"错误: {response.get('error')}")
+        return int(response.get('exit_code') or 1)
+
+    record = response.get('result') or {}
+    if jsonl:
+        with JsonlWriter(jsonl) as writer:
+            writer.write(record)
+    for output_path in record.get('paths') or []:
+        print(output_path, file=sys.stderr if jsonl == STDOUT else sys.stdout)
+    if jsonl and jsonl != STDOUT:
+        print(jsonl)
+    return int(response.get('exit_code') or 0)
+
+
+def run_via_server(argv: List[str], address: Optional[Address] = None) -> Optional[int]:
+    """
+    Run a webfetcher command line on the daemon
+    在守护进程上执行 webfetcher 命令行
+
+    Args:
+        argv: webfetcher.core 参数（不含程序名）
+        address: 守护进程地址（默认 WF_SERVER 或用户级 Unix 套接字）
+
+    Returns:
+        退出码；None 表示未使用守护进程，调用方应在本进程内执行
+    """
+    if os.environ.get(NO_SERVER_ENV) or any(arg in LOCAL_ONLY_ARGS for arg in argv):
+        return None
+    address = address or default_address()
+    if address is None or (isinstance(address, str) and not os.path.exists(address)):
+        return None  # 未配置或未启动守护进程：不尝试连接
+
+    try:
+        jsonl = _client_jsonl(argv)
+        response = request({'op': 'fetch', 'argv': list(argv), 'cwd': os.getcwd(),
+                            'env': {name: os.environ.get(name) for name in FORWARDED_ENV}}, address)
+    except (ServerUnavailable, ConnectionError, ValueError) as e:
+        logger.debug(f"Running in-process: {e}")
+        return None
+    if response.get('local'):
+        logger.debug(f"Running in-process: {response.get('error')}")
+        return None
+    logger.debug(f"Served by wf serve at {format_address(address)}")
+    return _emit(response, jsonl)
+
+
+__all__ = ['LOCAL_ONLY_ARGS', 'ServerUnavailable', 'request', 'run_via_server']
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Fetch Daemon Protocol
+抓取守护进程通信协议
+
+One JSON object per line over a stream socket: a Unix socket by default,
+or TCP on 127.0.0.1 when asked for explicitly (``wf serve --port`` and
+``WF_SERVER=host:port``; there is no silent TCP fallback). Each connection
+carries a handshake, one request and one response.
+基于流式套接字的 JSON Lines 协议（默认 Unix 套接字；本机 TCP 须显式指定），
+每个连接一次握手、一次请求、一次响应。
+
+Both sides prove that they know the per-user token from ``TOKEN_FILE``
+(owner-only, 0600) without sending it::
+
+    client: {"op": "hello", "nonce": "<client nonce>"}
+    server: {"ok": true, "nonce": "<server nonce>", "proof": HMAC(token, server|cn|sn)}
+    client: {"op": "fetch", ..., "auth": HMAC(token, client|sn|cn|request)}
+
+The client checks the server's proof before sending anything else, so a
+process squatting on the address never sees the token, argv or cwd; the
+daemon checks ``auth`` (which also covers the request body) before doing
+anything, so other local users cannot make it read or write files on its
+owner's behalf.
+双方通过 HMAC 证明持有用户级令牌（TOKEN_FILE，权限 0600），令牌本身不经过套接字：
+客户端先校验服务端证明再发送请求，守护进程先校验请求签名再处理。
+
+Requests::
+
+    {"op": "fetch", "argv": ["https://example.com", "-o", "out"], "cwd": "/home/me",
+     "env": {"LANG": "zh_CN.UTF-8", "WF_LEGACY_IMAGE_MODE": null}, "auth": "..."}
+    {"op": "ping", "auth": "..."}
+    {"op": "shutdown", "auth": "..."}
+
+Responses::
+
+    {"ok": true, "exit_code": 0, "result": {...PageResult.to_record()...}, "stdout": "", "stderr": "..."}
+    {"ok": false, "exit_code": 1, "error": "...", "stdout": "", "stderr": "..."}
+    {"ok": false, "local": true, "error": "..."}   # client should run the command itself
+                                                   # (also sent when authentication fails)
+
+``env`` carries the client's values of FORWARDED_ENV (null when unset), and
+``stdout``/``stderr`` what the fetch printed (e.g. Selenium error guidance),
+which the client prints as if the fetch had run in its own process.
+env 为客户端的 FORWARDED_ENV 取值；stdout/stderr 为抓取过程的输出，由客户端原样打印。
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+SERVER_ENV = 'WF_SERVER'        # 守护进程地址：套接字路径或 host:port
+NO_SERVER_ENV = 'WF_NO_SERVER'  # 设置后 wf 不使用守护进程
+DEFAULT_SOCKET_PATH = Path.home() / '.cache' / 'webfetcher' / 'wf.sock'
+DEFAULT_TCP_ADDRESS = ('127.0.0.1', 8765)
+TOKEN_FILE = Path.home() / '.cache' / 'webfetcher' / 'wf.token'
+CONNECT_TIMEOUT = 0.5  # 连接超时（秒）；抓取本身不设超时
+
+# 抓取时读取的环境变量：随请求发送，守护进程使用客户端的取值
+FORWARDED_ENV = ('WF_LEGACY_IMAGE_MODE', 'WF_FORCE_PAGE_DETECTION', 'LANG')
+
+Address = Union[str, Tuple[str, int]]
+
+
+def parse_address(value: str) -> Address:
+    """
+    Parse a daemon address / 解析守护进程地址
+
+    ``host:port`` or ``tcp://host:port`` is a TCP address, anything else a
+    Unix socket path.
+    """
+    value = value.strip()
+    if value.startswith('tcp://'):
+        value = value[len('tcp://'):]
+    elif value.startswith('unix://'):
+        return os.path.expanduser(value[len('unix://'):])
+    host, sep, port = value.rpartition(':')
+    if sep and port.isdigit() and '/' not in value:
+        return host or DEFAULT_TCP_ADDRESS[0], int(port)
+    return os.path.expanduser(value)
+
+
+def default_address() -> Optional[Address]:
+    """
+    WF_SERVER if set, else the per-user Unix socket
+
+    Returns None on platforms without AF_UNIX: TCP is only used when
+    configured explicitly, never as a silent fallback.
+    """
+    configured = os.environ.get(SERVER_ENV)
+    if configured:
+        return parse_address(configured)
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    return str(DEFAULT_SOCKET_PATH)
+
+
+def read_token(path: Path = TOKEN_FILE) -> Optional[str]:
+    """The per-user daemon token, or None when it does not exist or is unreadable"""
+    try:
+        return Path(path).read_text(encoding='ascii').strip() or None
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def ensure_token(path: Path = TOKEN_FILE) -> str:
+    """
+    Return the per-user daemon token, creating it (mode 0600) if needed
+    获取用户级令牌，不存在或权限过宽时重新生成（0600）
+    """
+    path = Path(path)
+    token = read_token(path)
+    try:
+        if token and (os.name != 'posix' or path.stat().st_mode & 0o077 == 0):
+            return token
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    token = secrets.token_hex(32)
+    tmp_path = path.with_suffix('.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='ascii') as f:
+        f.write(token)
+    os.chmod(tmp_path, 0o600)  # O_CREAT mode does not apply to an existing tmp file
+    os.replace(tmp_path, path)
+    return token
+
+
+def new_nonce() -> str:
+    """Fresh handshake nonce / 握手随机数"""
+    return secrets.token_hex(16)
+
+
+def _mac(token: str, *parts: str) -> str:
+    return hmac.new(token.encode('utf-8'), '|'.join(parts).encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def server_proof(token: str, client_nonce: str, server_nonce: str) -> str:
+    """The daemon's answer to a hello: proves it holds the token / 服务端持有令牌的证明"""
+    return _mac(token, 'server', client_nonce, server_nonce)
+
+
+def request_auth(token: str, client_nonce: str, server_nonce: str, message: Dict[str, Any]) -> str:
+    """MAC over the handshake nonces and the request body (without ``auth``) / 请求签名"""
+    body = json.dumps({key: value for key, value in message.items() if key != 'auth'},
+                      ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return _mac(token, 'client', server_nonce, client_nonce, body)
+
+
+def mac_matches(expected: str, supplied: Any) -> bool:
+    """Constant-time comparison of a proof or request MAC / 常量时间比较"""
+    return isinstance(supplied, str) and hmac.compare_digest(supplied.encode('utf-8'), expected.encode('utf-8'))
+
+
+def format_address(address: Address) -> str:
+    return address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+
+def connect(address: Address, timeout: Optional[float] = CONNECT_TIMEOUT) -> socket.socket:
+    """
+    Connect to the daemon; the returned socket has no timeout
+
+    Raises:
+        OSError: nothing is listening at the address
+    """
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.settimeout(None)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def write_message(stream, message: Dict[str, Any]):
+    """Write one message to a binary stream (socket.makefile('wb'))"""
+    stream.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+    stream.flush()
+
+
+def read_message(stream) -> Optional[Dict[str, Any]]:
+    """
+    Read one message from a binary stream
+
+    Returns:
+        The message, or None when the peer closed the connection
+
+    Raises:
+        ValueError: the line is not a JSON object
+    """
+    line = stream.readline()
+    if not line:
+        return None
+    message = json.loads(line.decode('utf-8'))
+    if not isinstance(message, dict):
+        raise ValueError("message must be a JSON object")
+    return message
+
+
+__all__ = ['Address', 'CONNECT_TIMEOUT', 'DEFAULT_SOCKET_PATH', 'DEFAULT_TCP_ADDRESS', 'FORWARDED_ENV',
+           'NO_SERVER_ENV', 'SERVER_ENV', 'TOKEN_FILE', 'connect', 'default_address', 'ensure_token', 'format_address',
+           'mac_matches', 'new_nonce', 'parse_address', 'read_message', 'read_token', 'request_auth',
+           'server_proof', 'write_message']
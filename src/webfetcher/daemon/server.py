@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Resident Fetch Daemon (wf serve)
+常驻抓取守护进程
+
+Every ``wf`` invocation otherwise pays for a fresh interpreter: importing
+core, loading the routing config, building the template registry, compiling
+classifier patterns and, for JS sites, attaching to Chrome. The daemon does
+that once and then serves fetches from ``wf`` clients over a local socket
+(see ``webfetcher.daemon.protocol``), so repeated CLI runs hit warm caches:
+routing decisions, parsed templates, the redirect/HTTP caches, the pooled
+HTTP connections and the shared CDP tab.
+常驻进程只初始化一次（路由、模板、错误分类、CDP 连接），之后通过本地套接字
+为 wf 客户端服务，重复调用直接命中已预热的缓存与连接池。
+
+Concurrent clients share those pools. Each request runs on its own thread,
+bounded by ``workers`` overall and ``per_host_limit`` per host through the
+same HostPolitenessScheduler that ``wf batch`` uses.
+并发客户端共享上述资源；每个请求一个线程，总并发与每主机并发受限。
+
+Requests run with the client's view of the process: relative paths resolve
+against its cwd, the variables in ``protocol.FORWARDED_ENV`` take the
+client's values (``utils.environment.getenv``), and whatever the fetch
+prints on the request thread (Selenium error guidance, for instance) is
+returned in the response for the client to print, so ``wf`` behaves the
+same with or without a daemon.
+请求按客户端的工作目录和环境变量执行，抓取过程的输出随响应返回并由客户端打印。
+
+Cache location and parse budget are daemon settings: per-request
+``--cache-dir``/``--no-cache``/``--parse-budget``/``--parse-workers``/``--verbose``
+are ignored with a warning. Site crawls (``--crawl-site``) are handed back to
+the client and run in-process.
+缓存目录、解析预算等为守护进程级设置；整站爬取交回客户端本地执行。
+
+Only the owner is served: every request must be signed with the token
+from ``protocol.TOKEN_FILE`` (created 0600 at startup) after the handshake
+described in ``webfetcher.daemon.protocol``, and on the Unix socket the
+peer's uid (SO_PEERCRED, where available) must match the daemon's. Anyone
+else is told to run the command locally, with their own privileges, so
+``--html``/``-o``/``cwd`` can never reach files through the daemon.
+仅为所有者服务：请求须经令牌握手签名，Unix 套接字还校验对端 uid；其他客户端在本地以自身权限执行。
+
+Example:
+    wf serve                         # ~/.cache/webfetcher/wf.sock
+    wf serve --port 8765 -j 16       # TCP on 127.0.0.1
+"""
+
+import io
+import os
+import sys
+import time
+import errno
+import signal
+import socket
+import struct
+import logging
+import argparse
+import importlib
+import threading
+import socketserver
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from webfetcher import core
+from webfetcher.crawler import HostPolitenessScheduler
+from webfetcher.daemon.client import ServerUnavailable, request
+from webfetcher.daemon.protocol import (
+    FORWARDED_ENV, Address, connect, default_address, ensure_token, format_address, mac_matches, new_nonce,
+    read_message, request_auth, server_proof, write_message,
+)
+from webfetcher.utils.environment import client_environment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVER_WORKERS = 8    # 同时处理的抓取请求数
+DEFAULT_SERVER_PER_HOST = 2   # 每主机最大并发数
+
+# 守护进程级参数（按请求传入时忽略）
+SERVER_LEVEL_OPTIONS = ('cache_dir', 'no_cache', 'parse_budget', 'parse_workers', 'verbose')
+
+# 相对路径参数：按客户端工作目录解析
+PATH_OPTIONS = ('outdir', 'html', 'save_html')
+
+
+class _RunLocally(Exception):
+    """The request must run in the client process (argparse error, site crawl)"""
+    pass
+
+
+class _ThreadLocalStream:
+    """sys.stdout/sys.stderr stand-in that sends a request thread's writes to that request"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def _target(self):
+        buffer = getattr(self.local, 'buffer', None)
+        return self.stream if buffer is None else buffer
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+_output_lock = threading.Lock()
+
+
+def _thread_local_stream(name: str) -> _ThreadLocalStream:
+    with _output_lock:
+        stream = getattr(sys, name)
+        if not isinstance(stream, _ThreadLocalStream):
+            stream = _ThreadLocalStream(stream)
+            setattr(sys, name, stream)
+        return stream
+
+
+@contextmanager
+def _captured_output() -> Iterator[Dict[str, io.StringIO]]:
+    """
+    Capture what the current thread prints to stdout/stderr (other threads are unaffected)
+    捕获当前线程打印到 stdout/stderr 的内容（不影响其他线程）
+    """
+    streams = {name: _thread_local_stream(name) for name in ('stdout', 'stderr')}
+    buffers = {name: io.StringIO() for name in streams}
+    for name, stream in streams.items():
+        stream.local.buffer = buffers[name]
+    try:
+        yield buffers
+    finally:
+        for stream in streams.values():
+            stream.local.buffer = None
+
+
+def warm_up():
+    """
+    Initialize the lazily loaded integrations once, before the first request
+    预先初始化按需加载的组件（路由、错误分类、解析器、模板注册表）
+    """
+    started = time.time()
+    core.unverified_ssl_context()
+    core.get_routing_engine()
+    core.get_error_classifier()
+    for module in ('webfetcher.parsing.parser', 'webfetcher.parsing.page_analysis'):
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            # Requests still work: the import is retried (and reported) on first use
+            logger.warning(f"wf serve: could not preload {module}: {e}")
+    try:
+        from webfetcher.parsing.engine.template_registry import get_template_registry
+        get_template_registry().get_parser()
+    except Exception as e:
+        logger.warning(f"wf serve: template registry warm-up failed: {e}")
+    logger.info(f"wf serve: warm-up finished in {time.time() - started:.2f}s")
+
+
+class FetchService:
+    """
+    Runs fetch requests against the shared, warmed-up core
+    在共享（已预热）的 core 上执行抓取请求
+
+    Example:
+        service = FetchService(workers=8, per_host_limit=2)
+        response = service.handle({'op': 'fetch', 'argv': [url, '-o', 'out'], 'cwd': '/tmp',
+                                   'env': {'LANG': 'zh_CN.UTF-8'}})
+    """
+
+    def __init__(self, workers: int = DEFAULT_SERVER_WORKERS,
+                 per_host_limit: int = DEFAULT_SERVER_PER_HOST, delay: float = 0.0):
+        """
+        Args:
+            workers: 同时处理的抓取请求数（其余请求排队等待）
+            per_host_limit: 每主机最大并发数
+            delay: 同一主机请求间隔（秒），0 表示不限速
+        """
+        self.workers = max(1, int(workers))
+        self.scheduler = HostPolitenessScheduler(delay=delay, per_host_limit=per_host_limit)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._parser = self._build_parser()
+        self._stats_lock = threading.Lock()
+        self.started = time.time()
+        self.stats = {'requests': 0, 'success': 0, 'failed': 0, 'downloaded': 0, 'local': 0, 'in_flight': 0}
+
+    @staticmethod
+    def _build_parser() -> argparse.ArgumentParser:
+        """core's parser, raising instead of printing usage and exiting"""
+        parser = core.build_arg_parser()
+
+        def _error(message):
+            raise _RunLocally(message)
+
+        def _exit(status=0, message=None):
+            raise _RunLocally(message or f"exit {status}")
+
+        parser.error = _error
+        parser.exit = _exit
+        return parser
+
+    def _count(self, key: str, delta: int = 1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + delta
+
+    def parse_args(self, argv: List[str], cwd: Optional[str]) -> argparse.Namespace:
+        """
+        Parse and normalize a client command line / 解析并规范化客户端命令行
+
+        Raises:
+            _RunLocally: 参数错误或需要在客户端执行（整站爬取）
+        """
+        args = self._parser.parse_args(argv)
+        if args.crawl_site:
+            raise _RunLocally("site crawls run in the client process")
+
+        ignored = [name for name in SERVER_LEVEL_OPTIONS
+                   if getattr(args, name) != self._parser.get_default(name)]
+        if ignored:
+            logger.warning(f"wf serve: ignoring daemon-level options {ignored} for {args.url}")
+            for name in ignored:
+                setattr(args, name, self._parser.get_default(name))
+
+        base = Path(cwd) if cwd else Path.cwd()
+        for name in PATH_OPTIONS:
+            value = getattr(args, name)
+            if isinstance(value, str):
+                setattr(args, name, str(base / os.path.expanduser(value)))
+        return core.normalize_args(args, configure_globals=False)
+
+    def fetch(self, argv: List[str], cwd: Optional[str],
+              env: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, Any]:
+        """
+        Run one client command line / 执行一个客户端命令行
+
+        Args:
+            env: 客户端的 FORWARDED_ENV 取值（缺失或 None 表示客户端未设置）
+        """
+        env = env or {}
+        with client_environment({name: env.get(name) for name in FORWARDED_ENV}), \
+                _captured_output() as output:
+            response = self._fetch(argv, cwd)
+        if not response.get('local'):
+            response.update({name: buffer.getvalue() for name, buffer in output.items()})
+        return response
+
+    def _fetch(self, argv: List[str], cwd: Optional[str]) -> Dict[str, Any]:
+        try:
+            args = self.parse_args(argv, cwd)
+        except _RunLocally as e:
+            self._count('local')
+            return {'ok': False, 'local': True, 'error': str(e)}
+
+        with self._slots:
+            self._count('in_flight')
+            try:
+                with self.scheduler.slot(args.url):
+                    result = core.process_url(args.url, args)
+            except Exception as e:
+                logger.error(f"wf serve: unexpected error for {args.url}: {e}")
+                self._count('failed')
+                return {'ok': False, 'exit_code': 1, 'error': str(e)}
+            finally:
+                self._count('in_flight', -1)
+
+        self._count(result.status)
+        logger.info(f"wf serve: {result.status} {result.duration:.2f}s {result.input_url}")
+        return {'ok': True, 'exit_code': 1 if result.status == 'failed' else 0,
+                'result': result.to_record(), 'jsonl': args.jsonl}
+
+    def status(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {'ok': True, 'pid': os.getpid(), 'uptime': round(time.time() - self.started, 1),
+                'workers': self.workers, 'per_host_limit': self.scheduler.per_host_limit, 'stats': stats}
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch one protocol request / 分发一个请求"""
+        op = message.get('op')
+        if op == 'fetch':
+            self._count('requests')
+            argv = message.get('argv')
+            if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+                return {'ok': False, 'exit_code': 2, 'error': "fetch request needs an argv list of strings"}
+            env = message.get('env')
+            if env is not None and not (isinstance(env, dict) and all(
+                    isinstance(value, (str, type(None))) for value in env.values())):
+                return {'ok': False, 'exit_code': 2, 'error': "fetch request env must map names to strings"}
+            return self.fetch(argv, message.get('cwd'), env)
+        if op == 'ping':
+            return self.status()
+        return {'ok': False, 'exit_code': 2, 'error': f"unknown op: {op!r}"}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handshake, one request and one response per connection"""
+
+    def _reject(self, op: Any, reason: str):
+        logger.warning(f"wf serve: rejected {op!r} request: {reason}")
+        write_message(self.wfile, {'ok': False, 'local': True, 'exit_code': 2, 'error': f"wf serve: {reason}"})
+
+    def handle(self):
+        try:
+            hello = read_message(self.rfile)
+            if hello is None:
+                return
+            denied = self.server.deny_reason(self.request, hello)
+            if denied:
+                self._reject(hello.get('op'), denied)
+                return
+            client_nonce, server_nonce = hello['nonce'], new_nonce()
+            write_message(self.wfile, {'ok': True, 'nonce': server_nonce,
+                                       'proof': server_proof(self.server.token, client_nonce, server_nonce)})
+            message = read_message(self.rfile)
+        except ValueError as e:
+            write_message(self.wfile, {'ok': False, 'exit_code': 2, 'error': f"bad request: {e}"})
+            return
+        if message is None:
+            return
+        if not mac_matches(request_auth(self.server.token, client_nonce, server_nonce, message), message.get('auth')):
+            self._reject(message.get('op'), "invalid request signature")
+            return
+        if message.get('op') == 'shutdown':
+            write_message(self.wfile, {'ok': True, 'pid': os.getpid()})
+            self.server.stop()
+            return
+        try:
+            write_message(self.wfile, self.server.service.handle(message))
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("wf serve: client disconnected before the response was sent")
+
+
+def _peer_uid(sock) -> Optional[int]:
+    """uid of a Unix socket peer (Linux SO_PEERCRED); None when the platform cannot tell"""
+    if getattr(sock, 'family', None) != getattr(socket, 'AF_UNIX', None) or not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    try:
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    except OSError:
+        return None
+    return struct.unpack('3i', creds)[1]
+
+
+class _ServerMixin(socketserver.ThreadingMixIn):
+    daemon_threads = True  # 退出时不等待仍在处理的请求
+    token: str = ''
+
+    def deny_reason(self, sock, hello: Dict[str, Any]) -> Optional[str]:
+        """Why a connection must not get a handshake (None = may be the daemon's owner) / 拒绝原因"""
+        if not self.token:
+            return "no token configured"
+        nonce = hello.get('nonce')
+        if hello.get('op') != 'hello' or not isinstance(nonce, str) or not 16 <= len(nonce) <= 128:
+            return "missing token handshake"
+        uid = _peer_uid(sock)
+        if uid is not None and hasattr(os, 'getuid') and uid != os.getuid():
+            return f"peer uid {uid} is not the daemon owner"
+        return None
+
+    def stop(self):
+        """Stop serve_forever() from any thread (signal handlers included)"""
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(_ServerMixin, socketserver.UnixStreamServer):
+        pass
+
+
+class _TCPServer(_ServerMixin, socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def _is_running(address: Address) -> bool:
+    try:
+        connect(address).close()
+        return True
+    except OSError:
+        return False
+
+
+def _bind_unix(path: str):
+    """Bind the Unix socket (owner-only permissions), replacing a stale socket file"""
+    if os.path.exists(path):
+        if _is_running(path):
+            raise OSError(errno.EADDRINUSE, f"wf serve is already running at {path}")
+        os.unlink(path)
+    Path(path).parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    old_umask = os.umask(0o177)
+    try:
+        return _UnixServer(path, _RequestHandler)
+    finally:
+        os.umask(old_umask)
+
+
+def serve(address: Optional[Address] = None, workers: int = DEFAULT_SERVER_WORKERS,
+          per_host_limit: int = DEFAULT_SERVER_PER_HOST, delay: float = 0.0) -> int:
+    """
+    Run the daemon until SIGTERM/SIGINT or a shutdown request
+    运行守护进程直到收到 SIGTERM/SIGINT 或 shutdown 请求
+
+    Args:
+        address: Unix 套接字路径或 (host, port)；TCP 仅允许本机地址
+        workers: 同时处理的抓取请求数
+        per_host_limit: 每主机最大并发数
+        delay: 同一主机请求间隔（秒）
+
+    Returns:
+        退出码
+    """
+    address = address or default_address()
+    if address is None:
+        print("错误: AF_UNIX is not available on this platform, use wf serve --port", file=sys.stderr)
+        return 2
+    if not isinstance(address, str) and address[0] not in ('127.0.0.1', 'localhost', '::1'):
+        logger.error(f"wf serve: refusing to listen on non-loopback address {address[0]}")
+        return 2
+
+    try:
+        if isinstance(address, str):
+            server = _bind_unix(address)
+        else:
+            if _is_running(address):
+                raise OSError(errno.EADDRINUSE, f"wf serve is already running at {format_address(address)}")
+            server = _TCPServer(address, _RequestHandler)
+    except OSError as e:
+        print(f"错误: {e.strerror or e}", file=sys.stderr)
+        return 1
+
+    try:
+        server.token = ensure_token()
+    except OSError as e:
+        server.server_close()
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)
+        print(f"错误: cannot create the wf serve token: {e.strerror or e}", file=sys.stderr)
+        return 1
+
+    warm_up()
+    server.service = FetchService(workers=workers, per_host_limit=per_host_limit, delay=delay)
+
+    def _terminate(signum, frame):
+        logger.info(f"wf serve: received signal {signum}, shutting down")
+        server.stop()
+
+    previous = {sig: signal.signal(sig, _terminate) for sig in (signal.SIGTERM, signal.SIGINT)}
+    print(f"wf serve: listening on {format_address(address)} (pid {os.getpid()}, {server.service.workers} workers)",
+          file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        server.server_close()
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)
+        print("wf serve: stopped", file=sys.stderr)
+    return 0
+
+
+def server_status(address: Optional[Address] = None) -> Optional[Dict[str, Any]]:
+    """ping 响应；守护进程未运行时返回 None"""
+    try:
+        return request({'op': 'ping'}, address)
+    except (ServerUnavailable, ConnectionError):
+        return None
+
+
+def stop_server(address: Optional[Address] = None) -> bool:
+    """请求守护进程退出；未运行时返回 False"""
+    try:
+        return bool(request({'op': 'shutdown'}, address).get('ok'))
+    except (ServerUnavailable, ConnectionError):
+        return False
+
+
+__all__ = ['DEFAULT_SERVER_PER_HOST', 'DEFAULT_SERVER_WORKERS', 'FetchService', 'SERVER_LEVEL_OPTIONS',
+           'serve', 'server_status', 'stop_server', 'warm_up']
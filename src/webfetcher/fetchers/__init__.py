@@ -1,18 +1,33 @@
 """Web content fetchers (Selenium, etc)."""
-# Conditional imports to handle optional dependencies
-try:
-    from .selenium import SeleniumFetcher, SeleniumMetrics
-    from .selenium import ChromeConnectionError, SeleniumFetchError
-    from .selenium import SeleniumTimeoutError, SeleniumNotAvailableError
-    from .config import SeleniumConfig
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
+import importlib
 
-__all__ = []
-if SELENIUM_AVAILABLE:
-    __all__.extend([
-        'SeleniumFetcher', 'SeleniumMetrics', 'SeleniumConfig',
-        'ChromeConnectionError', 'SeleniumFetchError',
-        'SeleniumTimeoutError', 'SeleniumNotAvailableError'
-    ])
+from .http_pool import HTTPConnectionPool, get_http_pool, pooled_urlopen
+from .errors import ChromeConnectionError, SeleniumFetchError, SeleniumTimeoutError, SeleniumNotAvailableError
+
+# Selenium classes load on first access: importing selenium (and the YAML
+# config loader) eagerly slowed down every urllib-only run
+_LAZY_EXPORTS = {
+    'SeleniumFetcher': '.selenium',
+    'SeleniumMetrics': '.selenium',
+    'SeleniumConfig': '.config',
+    'AsyncHTTPConnectionPool': '.async_http',
+    'get_async_http_pool': '.async_http',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    'HTTPConnectionPool', 'get_http_pool', 'pooled_urlopen',
+    'AsyncHTTPConnectionPool', 'get_async_http_pool',
+    'SeleniumFetcher', 'SeleniumMetrics', 'SeleniumConfig',
+    'ChromeConnectionError', 'SeleniumFetchError',
+    'SeleniumTimeoutError', 'SeleniumNotAvailableError'
+]
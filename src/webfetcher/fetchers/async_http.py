@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Asyncio HTTP Connection Pool
+异步 HTTP 连接池
+
+asyncio counterpart of ``http_pool.HTTPConnectionPool`` for ``afetch()``:
+HTTP/1.1 over ``asyncio`` streams with keep-alive connections per
+(scheme, host, port, ssl context), so an in-flight request costs a coroutine
+and a socket instead of a blocked thread.
+``HTTPConnectionPool`` 的 asyncio 版本：基于 asyncio 流的 HTTP/1.1 长连接池，
+每个进行中的请求只占用一个协程和一个套接字，而不是一个阻塞线程。
+
+Semantics mirror the blocking pool, so the retry and error classification
+code treats both the same way:
+    - redirects are followed (HEAD stays HEAD, everything else becomes GET)
+    - HTTP status >= 400 raises ``urllib.error.HTTPError``
+    - connection failures and timeouts raise ``urllib.error.URLError``
+    - no Accept-Encoding is negotiated (identity bodies, like urllib)
+    - requests through a configured proxy fall back to urlopen on the
+      loop's default executor
+
+Host lookups go through ``loop.getaddrinfo`` once per host and are cached
+for DNS_CACHE_TTL seconds; concurrent lookups of the same host share one
+resolution. Bodies are read completely (up to ``max_bytes``) before the
+response is returned.
+主机名解析结果缓存 DNS_CACHE_TTL 秒，同一主机的并发解析只执行一次。
+
+Pools are bound to an event loop; ``get_async_http_pool()`` returns the pool
+of the running loop.
+"""
+
+import asyncio
+import http.client as http_client
+import io
+import logging
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from webfetcher.fetchers.http_pool import (
+    MAX_DRAIN_BYTES, MAX_REDIRECTIONS, REDIRECT_CODES, HTTPConnectionPool, PoolKey, PoolStats,
+)
+
+logger = logging.getLogger(__name__)
+
+DNS_CACHE_TTL = 60.0              # 主机名解析缓存时间（秒）
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+MAX_HEADER_LINES = 100
+
+# Errors indicating a pooled keep-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (
+    http_client.RemoteDisconnected,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+@dataclass
+class AsyncResponse:
+    """
+    Fully read HTTP response / 已完整读取的 HTTP 响应
+
+    ``headers`` is an ``http.client.HTTPMessage`` and geturl()/getcode()/info()
+    exist, so helpers written for urlopen responses (charset detection, the
+    HTTP cache) accept it unchanged.
+    """
+    url: str
+    status: int
+    reason: str
+    headers: http_client.HTTPMessage
+    body: bytes = b''
+    truncated: bool = False  # body cut at max_bytes or connection closed mid-body
+
+    @property
+    def code(self) -> int:
+        return self.status
+
+    def geturl(self) -> str:
+        return self.url
+
+    def getcode(self) -> int:
+        return self.status
+
+    def info(self) -> http_client.HTTPMessage:
+        return self.headers
+
+
+@dataclass
+class _Connection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+
+    def close(self):
+        self.writer.close()
+
+
+@dataclass
+class _AsyncHostPool:
+    """Idle connections and concurrency slots for one pool key / 单个主机的连接池"""
+    semaphore: asyncio.Semaphore
+    idle: List[Tuple[_Connection, float]] = field(default_factory=list)
+    handshakes: int = 0
+    handshake_time: float = 0.0
+
+    @property
+    def avg_handshake(self) -> float:
+        return self.handshake_time / self.handshakes if self.handshakes else 0.0
+
+
+class AsyncHTTPConnectionPool:
+    """
+    Keep-alive connection pool for one event loop, with per-host limits.
+    单个事件循环内的长连接池（带每主机上限）。
+
+    Requests beyond ``max_per_host`` for one host wait for a free connection
+    without a deadline: queued coroutines are cheap, and ``timeout`` covers
+    the connect and the request itself.
+
+    Example:
+        pool = get_async_http_pool()
+        response = await pool.request(url, headers={"User-Agent": ua}, timeout=30)
+        html = response.body.decode('utf-8')
+    """
+
+    def __init__(self, max_per_host: int = 8, idle_timeout: float = 30.0,
+                 dns_ttl: float = DNS_CACHE_TTL):
+        """
+        Args:
+            max_per_host: Maximum concurrent connections per host (default: 8)
+            idle_timeout: Seconds an idle connection is kept before closing (default: 30)
+            dns_ttl: Seconds a host lookup is cached (default: DNS_CACHE_TTL)
+        """
+        self.max_per_host = max(1, max_per_host)
+        self.idle_timeout = idle_timeout
+        self.dns_ttl = dns_ttl
+        self._hosts: Dict[PoolKey, _AsyncHostPool] = {}
+        self._contexts: Dict[int, Optional[ssl.SSLContext]] = {}
+        self._default_context: Optional[ssl.SSLContext] = None
+        self._dns: Dict[Tuple[str, int], Tuple[float, list]] = {}
+        self._dns_pending: Dict[Tuple[str, int], asyncio.Task] = {}
+        self.stats = PoolStats()
+        self.dns_lookups = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def request(self, url: Union[str, urllib.request.Request], headers: Optional[dict] = None,
+                      timeout: float = 30, context: Optional[ssl.SSLContext] = None,
+                      method: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES) -> AsyncResponse:
+        """
+        Fetch a URL on a pooled connection, following redirects like urlopen.
+        使用连接池请求 URL，与 urlopen 一样跟随重定向。
+
+        Args:
+            url: URL string or urllib.request.Request
+            headers: Extra request headers (merged over the Request's own)
+            timeout: Seconds for connecting, and again for the request/response
+            context: SSL context for https URLs (default: system default)
+            method: HTTP method (default: the Request's, i.e. GET or POST)
+            max_bytes: Body size limit; longer bodies are cut and marked truncated
+
+        Returns:
+            AsyncResponse with the body read
+
+        Raises:
+            urllib.error.HTTPError: For HTTP status >= 400
+            urllib.error.URLError: For connection failures and timeouts
+        """
+        req = url if isinstance(url, urllib.request.Request) else urllib.request.Request(url)
+        method = method or req.get_method()
+        all_headers = {**dict(req.header_items()), **(headers or {})}
+        current_url = req.full_url
+        body = req.data
+        self.stats.requests += 1
+
+        if HTTPConnectionPool._uses_proxy(current_url):
+            self.stats.proxy_bypassed += 1
+            return await self._urlopen_in_executor(current_url, method, all_headers, body,
+                                                   timeout, context, max_bytes)
+
+        for _ in range(MAX_REDIRECTIONS + 1):
+            response = await self._request(method, current_url, all_headers, body, timeout, context, max_bytes)
+            if response.status in REDIRECT_CODES and response.headers.get('Location'):
+                location = urllib.parse.urljoin(current_url, response.headers['Location'])
+                logger.debug(f"Async redirect {response.status}: {current_url} -> {location}")
+                method, body = ('HEAD' if method == 'HEAD' else 'GET'), None
+                current_url = location
+                continue
+            if response.status >= 400:
+                raise urllib.error.HTTPError(current_url, response.status, response.reason,
+                                             response.headers, io.BytesIO(response.body[:MAX_DRAIN_BYTES]))
+            return response
+
+        raise urllib.error.HTTPError(current_url, response.status,
+                                     f"Redirect limit ({MAX_REDIRECTIONS}) exceeded",
+                                     response.headers, None)
+
+    def get_stats(self) -> dict:
+        """Get pool statistics including reuse rate and DNS lookups / 获取连接池统计"""
+        stats = self.stats.to_dict()
+        stats['hosts'] = len(self._hosts)
+        stats['idle_connections'] = sum(len(h.idle) for h in self._hosts.values())
+        stats['dns_lookups'] = self.dns_lookups
+        return stats
+
+    async def close(self):
+        """Close all idle connections / 关闭所有空闲连接"""
+        idle = [conn for host in self._hosts.values() for conn, _ in host.idle]
+        for host in self._hosts.values():
+            host.idle.clear()
+        for conn in idle:
+            conn.close()
+        for conn in idle:
+            try:
+                await conn.writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    async def _resolve(self, host: str, port: int) -> list:
+        """getaddrinfo with a TTL cache; concurrent lookups of one host share a single task"""
+        key = (host, port)
+        cached = self._dns.get(key)
+        if cached and time.monotonic() - cached[0] < self.dns_ttl:
+            return cached[1]
+        task = self._dns_pending.get(key)
+        if task is None:
+            self.dns_lookups += 1
+            loop = asyncio.get_running_loop()
+            task = loop.create_task(loop.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+            task.add_done_callback(lambda done: self._lookup_done(key, done))
+            self._dns_pending[key] = task
+        # shield: one caller timing out must not cancel the lookup for the others
+        return await asyncio.shield(task)
+
+    def _lookup_done(self, key: Tuple[str, int], task: asyncio.Task):
+        self._dns_pending.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._dns[key] = (time.monotonic(), task.result())
+
+    def _ssl_context(self, context: Optional[ssl.SSLContext]) -> ssl.SSLContext:
+        if context is not None:
+            return context
+        if self._default_context is None:
+            self._default_context = ssl.create_default_context()
+        return self._default_context
+
+    def _host_pool(self, key: PoolKey, context: Optional[ssl.SSLContext]) -> _AsyncHostPool:
+        host = self._hosts.get(key)
+        if host is None:
+            host = _AsyncHostPool(semaphore=asyncio.Semaphore(self.max_per_host))
+            self._hosts[key] = host
+            # Keep the context alive so its id() cannot be recycled
+            self._contexts[key[3]] = context
+        return host
+
+    async def _connect(self, key: PoolKey, host: _AsyncHostPool, timeout: float,
+                       context: Optional[ssl.SSLContext]) -> _Connection:
+        scheme, hostname, port, _ = key
+        start = time.monotonic()
+        try:
+            infos = await asyncio.wait_for(self._resolve(hostname, port), timeout)
+            last_error: Optional[BaseException] = None
+            for family, _, _, _, sockaddr in infos:
+                try:
+                    reader, writer = await asyncio.wait_for(asyncio.open_connection(
+                        sockaddr[0], port, family=family,
+                        ssl=self._ssl_context(context) if scheme == 'https' else None,
+                        server_hostname=hostname if scheme == 'https' else None,
+                    ), timeout)
+                    break
+                except (OSError, asyncio.TimeoutError) as e:
+                    last_error = e
+            else:
+                raise last_error or OSError(f"no addresses for {hostname}")
+        except asyncio.TimeoutError:
+            raise urllib.error.URLError(TimeoutError('timed out'))
+        except OSError as e:
+            raise urllib.error.URLError(e)
+        elapsed = time.monotonic() - start
+        self.stats.connections_created += 1
+        self.stats.handshake_time += elapsed
+        host.handshakes += 1
+        host.handshake_time += elapsed
+        return _Connection(reader, writer)
+
+    def _checkout_idle(self, host: _AsyncHostPool) -> Optional[_Connection]:
+        now = time.monotonic()
+        while host.idle:
+            conn, idle_since = host.idle.pop()
+            if now - idle_since <= self.idle_timeout and not conn.reader.at_eof():
+                return conn
+            self.stats.connections_discarded += 1
+            conn.close()
+        return None
+
+    async def _request(self, method: str, url: str, headers: dict, body: Optional[bytes],
+                       timeout: float, context: Optional[ssl.SSLContext], max_bytes: int) -> AsyncResponse:
+        key, path, host_header = _split_url(url, context)
+        host = self._host_pool(key, context)
+
+        async with host.semaphore:
+            for attempt in range(2):
+                conn = self._checkout_idle(host)
+                reused = conn is not None
+                if conn is None:
+                    conn = await self._connect(key, host, timeout, context)
+                try:
+                    response, reusable = await asyncio.wait_for(
+                        _exchange(conn, method, url, path, host_header, headers, body, max_bytes), timeout)
+                except STALE_CONNECTION_ERRORS as e:
+                    self._discard(conn)
+                    if reused and attempt == 0:
+                        # Server closed the idle keep-alive connection; retry on a fresh one
+                        self.stats.stale_retries += 1
+                        logger.debug(f"Stale pooled connection to {key[1]}, reconnecting: {e}")
+                        continue
+                    raise urllib.error.URLError(e)
+                except asyncio.TimeoutError:
+                    self._discard(conn)
+                    raise urllib.error.URLError(TimeoutError('timed out'))
+                except OSError as e:
+                    self._discard(conn)
+                    raise urllib.error.URLError(e)
+                except BaseException:
+                    # Protocol errors and cancellation: the stream state is unknown
+                    self._discard(conn)
+                    raise
+                if reused:
+                    self.stats.connections_reused += 1
+                    self.stats.handshake_time_saved += host.avg_handshake
+                if reusable and len(host.idle) < self.max_per_host:
+                    host.idle.append((conn, time.monotonic()))
+                else:
+                    self._discard(conn)
+                return response
+
+        raise urllib.error.URLError(f"failed to obtain connection for {url}")
+
+    def _discard(self, conn: _Connection):
+        conn.close()
+        self.stats.connections_discarded += 1
+
+    @staticmethod
+    async def _urlopen_in_executor(url: str, method: str, headers: dict, body: Optional[bytes],
+                                   timeout: float, context: Optional[ssl.SSLContext],
+                                   max_bytes: int) -> AsyncResponse:
+        """Proxied requests: blocking urlopen (it implements proxy support) on the default executor"""
+        def _open() -> AsyncResponse:
+            req = urllib.request.Request(url, data=body, headers=headers, method=method)
+            with urllib.request.urlopen(req, timeout=timeout, context=context) as r:
+                data = r.read(max_bytes + 1)
+                return AsyncResponse(r.geturl(), r.status, r.reason, r.headers,
+                                     data[:max_bytes], truncated=len(data) > max_bytes)
+        return await asyncio.get_running_loop().run_in_executor(None, _open)
+
+
+def _split_url(url: str, context: Optional[ssl.SSLContext]) -> Tuple[PoolKey, str, str]:
+    """(pool key, request path, Host header) for a URL"""
+    parsed = urllib.parse.urlsplit(url)
+    scheme = parsed.scheme.lower()
+    if scheme not in ('http', 'https'):
+        raise urllib.error.URLError(f"unknown url type: {scheme}")
+    if not parsed.hostname:
+        raise urllib.error.URLError(f"no host given: {url}")
+    default_port = 443 if scheme == 'https' else 80
+    port = parsed.port or default_port
+    path = parsed.path or '/'
+    if parsed.query:
+        path += '?' + parsed.query
+    hostname = parsed.hostname.lower()
+    host_header = hostname.encode('idna').decode('ascii')
+    if ':' in host_header:
+        host_header = f"[{host_header}]"  # IPv6 literal
+    if port != default_port:
+        host_header += f":{port}"
+    key = (scheme, hostname, port, id(context) if scheme == 'https' else 0)
+    return key, path, host_header
+
+
+async def _exchange(conn: _Connection, method: str, url: str, path: str, host_header: str,
+                    headers: dict, body: Optional[bytes], max_bytes: int) -> Tuple[AsyncResponse, bool]:
+    """
+    Send one request and read its response
+
+    Returns:
+        (response, reusable): reusable is False when the connection cannot
+        carry another request (Connection: close, body read to EOF or cut short)
+    """
+    lower = {name.lower() for name in headers}
+    lines = [f"{method} {path} HTTP/1.1"]
+    if 'host' not in lower:
+        lines.append(f"Host: {host_header}")
+    if 'accept-encoding' not in lower:
+        lines.append("Accept-Encoding: identity")
+    if body is not None and 'content-length' not in lower:
+        lines.append(f"Content-Length: {len(body)}")
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    try:
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+    except UnicodeEncodeError as e:
+        raise http_client.InvalidURL(f"URL can't contain control or non-ASCII characters ({e}): {url}")
+    conn.writer.write(head + (body or b''))
+    await conn.writer.drain()
+
+    reader = conn.reader
+    while True:
+        status_line = await reader.readline()
+        if not status_line:
+            raise http_client.RemoteDisconnected("Remote end closed connection without response")
+        try:
+            version, status, reason = (status_line.decode('iso-8859-1').rstrip('\r\n').split(None, 2) + [''])[:3]
+            status = int(status)
+        except ValueError:
+            raise http_client.BadStatusLine(status_line.decode('iso-8859-1', 'replace'))
+        if not version.startswith('HTTP/'):
+            raise http_client.BadStatusLine(status_line.decode('iso-8859-1', 'replace'))
+        raw_headers = await _read_header_block(reader)
+        if status != 100 and not 101 < status < 200:
+            break  # skip interim 1xx responses
+
+    message = http_client.parse_headers(io.BytesIO(raw_headers))
+    connection = (message.get('Connection') or '').lower()
+    reusable = 'close' not in connection and (version != 'HTTP/1.0' or 'keep-alive' in connection)
+
+    data = b''
+    truncated = False
+    if method == 'HEAD' or status in (204, 304):
+        pass
+    elif 'chunked' in (message.get('Transfer-Encoding') or '').lower():
+        data, truncated = await _read_chunked(reader, max_bytes)
+    elif message.get('Content-Length') is not None:
+        try:
+            length = int(message['Content-Length'])
+        except ValueError:
+            raise http_client.HTTPException(f"invalid Content-Length: {message['Content-Length']!r}")
+        data, truncated = await _read_exact(reader, min(length, max_bytes))
+        truncated = truncated or length > max_bytes
+    else:
+        # No framing: the body ends when the server closes the connection
+        buffer = bytearray()
+        while len(buffer) <= max_bytes:
+            chunk = await reader.read(64 * 1024)
+            if not chunk:
+                break
+            buffer += chunk
+        truncated = len(buffer) > max_bytes
+        data = bytes(buffer[:max_bytes])
+        reusable = False
+    if truncated:
+        reusable = False
+    return AsyncResponse(url, status, reason, message, data, truncated), reusable
+
+
+async def _read_header_block(reader: asyncio.StreamReader) -> bytes:
+    lines = []
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return b''.join(lines)
+        lines.append(line)
+        if len(lines) > MAX_HEADER_LINES:
+            raise http_client.HTTPException(f"got more than {MAX_HEADER_LINES} headers")
+
+
+async def _read_exact(reader: asyncio.StreamReader, length: int) -> Tuple[bytes, bool]:
+    """readexactly(); a connection closed early yields the partial body marked truncated"""
+    try:
+        return await reader.readexactly(length), False
+    except asyncio.IncompleteReadError as e:
+        logger.debug(f"Incomplete read: {len(e.partial)} of {length} bytes")
+        return e.partial, True
+
+
+async def _read_chunked(reader: asyncio.StreamReader, max_bytes: int) -> Tuple[bytes, bool]:
+    chunks = []
+    size = 0
+    while True:
+        line = await reader.readline()
+        if not line:
+            return b''.join(chunks), True
+        try:
+            chunk_size = int(line.split(b';', 1)[0].strip(), 16)
+        except ValueError:
+            raise http_client.HTTPException(f"invalid chunk size: {line!r}")
+        if chunk_size == 0:
+            await _read_header_block(reader)  # trailers
+            return b''.join(chunks), False
+        chunk, truncated = await _read_exact(reader, chunk_size)
+        chunks.append(chunk)
+        size += len(chunk)
+        if truncated:
+            return b''.join(chunks), True
+        if size > max_bytes:
+            return b''.join(chunks)[:max_bytes], True
+        _, truncated = await _read_exact(reader, 2)  # CRLF after the chunk
+        if truncated:
+            return b''.join(chunks), True
+
+
+_loop_pools: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHTTPConnectionPool]' = weakref.WeakKeyDictionary()
+_loop_pools_lock = threading.Lock()
+
+
+def get_async_http_pool() -> AsyncHTTPConnectionPool:
+    """Get the connection pool of the running event loop / 获取当前事件循环的共享连接池"""
+    loop = asyncio.get_running_loop()
+    with _loop_pools_lock:
+        pool = _loop_pools.get(loop)
+        if pool is None:
+            pool = _loop_pools[loop] = AsyncHTTPConnectionPool()
+    return pool
+
+
+__all__ = ['AsyncHTTPConnectionPool', 'AsyncResponse', 'DNS_CACHE_TTL', 'get_async_http_pool']
@@ -5,13 +5,24 @@ CDP (Chrome DevTools Protocol) Fetcher
 """
 import time
 import json
+import atexit
 import logging
+import threading
 import requests
-from typing import Optional, Dict, Any, Tuple
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 
+from .cdp_ready import PageReadyWaiter, DEFAULT_READY_TIMEOUT, READY_FIXED
+from .resource_blocking import normalize_block, apply_cdp_blocking
+
 logger = logging.getLogger(__name__)
 
+# 标签页池默认参数
+DEFAULT_MAX_TABS = 4        # 每个浏览器会话最多并行标签页数
+DEFAULT_PREWARM_TABS = 1    # 会话创建时预热的标签页数
+CDP_COMMAND_TIMEOUT = 10    # 单个CDP命令超时（秒）
+
 # 检查pychrome是否可用
 try:
     import pychrome
@@ -32,6 +43,32 @@ class CDPFetchResult:
     metadata: Dict[str, Any] = None
 
 
+def _navigate_and_wait(tab, url: str, wait_time: Optional[float], ready_timeout: float,
+                       ready_selector: Optional[str] = None) -> Tuple[str, float]:
+    """
+    导航并等待页面就绪
+
+    Args:
+        tab: 已启用 Network/Page/Runtime 域的标签页
+        url: 目标URL
+        wait_time: 固定等待时间（秒）；None 表示按CDP事件判断
+        ready_timeout: 事件等待模式下的最长等待时间（秒）
+        ready_selector: 可选就绪选择器
+
+    Returns:
+        (wait_reason, time_to_ready)
+    """
+    with PageReadyWaiter(tab, ready_selector=ready_selector) as waiter:
+        waiter.navigate(url, timeout=CDP_COMMAND_TIMEOUT)
+        if wait_time is not None:
+            logger.info(f"Waiting {wait_time}s for page to load...")
+            time.sleep(wait_time)
+            return READY_FIXED, wait_time
+        reason, time_to_ready = waiter.wait(ready_timeout)
+    logger.info(f"Page ready after {time_to_ready:.2f}s ({reason})")
+    return reason, time_to_ready
+
+
 class CDPFetcher:
     """
     CDP浏览器会话复用抓取器
@@ -148,21 +185,28 @@ class CDPFetcher:
         tab.Runtime.enable()
 
         if url:
-            tab.Page.navigate(url=url)
-            time.sleep(2)  # 等待页面加载
+            # 等待页面加载（load事件 + 网络空闲）
+            with PageReadyWaiter(tab) as waiter:
+                waiter.navigate(url)
+                waiter.wait(DEFAULT_READY_TIMEOUT)
 
         self.current_tab = tab
         logger.info(f"✓ Created/attached to tab{': ' + url if url else ''}")
         return tab
 
-    def fetch(self, url: str, wait_time: float = 3.0, use_existing_tab: bool = True) -> CDPFetchResult:
+    def fetch(self, url: str, wait_time: Optional[float] = None, use_existing_tab: bool = True,
+              ready_timeout: float = DEFAULT_READY_TIMEOUT,
+              ready_selector: Optional[str] = None, block=()) -> CDPFetchResult:
         """
         使用CDP采集网页
 
         Args:
             url: 目标URL
-            wait_time: 等待页面加载时间（秒）
+            wait_time: 固定等待时间（秒）；None 表示按CDP事件判断页面就绪
             use_existing_tab: 是否复用现有标签页
+            ready_timeout: 事件等待模式下的最长等待时间（秒）
+            ready_selector: 可选CSS选择器，出现即视为页面就绪
+            block: 要拦截的资源类别（image, font, media, stylesheet, tracker）
 
         Returns:
             CDPFetchResult: 采集结果
@@ -184,13 +228,20 @@ class CDPFetcher:
             # 选择或创建标签页
             if use_existing_tab and self.current_tab:
                 tab = self.current_tab
-                tab.Page.navigate(url=url)
             else:
-                tab = self.new_tab(url)
+                tab = self.new_tab()
 
-            # 等待页面加载
-            logger.info(f"Waiting {wait_time}s for page to load...")
-            time.sleep(wait_time)
+            # 资源拦截仅在本次采集期间生效（标签页可能是用户自己的）
+            categories = normalize_block(block)
+            if categories:
+                apply_cdp_blocking(tab, categories)
+            try:
+                # 导航并等待页面就绪
+                wait_reason, time_to_ready = _navigate_and_wait(
+                    tab, url, wait_time, ready_timeout, ready_selector)
+            finally:
+                if categories:
+                    apply_cdp_blocking(tab, ())
 
             # 获取渲染后的HTML
             html = self._get_html(tab)
@@ -213,6 +264,9 @@ class CDPFetcher:
                 metadata={
                     'method': 'cdp',
                     'wait_time': wait_time,
+                    'wait_reason': wait_reason,
+                    'time_to_ready': round(time_to_ready, 3),
+                    'blocked': list(categories),
                     'tab_reused': use_existing_tab
                 }
             )
@@ -302,24 +356,357 @@ class CDPFetcher:
         logger.info("✓ CDP connection closed")
 
 
+class CDPSessionManager:
+    """
+    进程级CDP会话管理器：长连接浏览器 + 预热标签页池
+
+    特点：
+    - 每个调试地址只建立一次浏览器连接
+    - 标签页预先创建并启用 Network/Page/Runtime 域，借出-导航-归还复用
+    - 多个工作线程可同时借出不同标签页并行采集
+    - 异常标签页自动关闭并按需补建
+
+    用法：
+        session = get_cdp_session()
+        with session.tab() as tab:
+            tab.Page.navigate(url=url)
+        result = session.fetch(url, ready_selector="#content")
+    """
+
+    def __init__(self, host="127.0.0.1", port=9222,
+                 max_tabs: int = DEFAULT_MAX_TABS, prewarm: int = DEFAULT_PREWARM_TABS):
+        """
+        初始化会话管理器
+
+        Args:
+            host: Chrome调试服务器地址
+            port: Chrome调试端口（默认9222）
+            max_tabs: 最大并行标签页数
+            prewarm: 预热标签页数
+        """
+        if not CDP_AVAILABLE:
+            raise ImportError("pychrome is required for CDP fetcher. Install with: pip install pychrome")
+
+        self.host = host
+        self.port = port
+        self.url = f"http://{host}:{port}"
+        self.max_tabs = max(1, max_tabs)
+        self.browser = None
+        self._idle: List[Any] = []
+        self._tabs: Dict[str, Any] = {}  # 池中全部标签页（含借出）
+        self._creating = 0
+        self._blocking: Dict[str, Tuple[str, ...]] = {}  # 标签页ID -> 已下发的拦截类别
+        self._cond = threading.Condition()
+        self.stats = {'tabs_created': 0, 'tabs_discarded': 0, 'checkouts': 0,
+                      'reused': 0, 'waits': 0, 'fetches': 0}
+
+        self.prewarm(min(prewarm, self.max_tabs))
+
+    def _connect(self):
+        """连接到Chrome浏览器（仅首次或重置后）"""
+        if self.browser is None:
+            self.browser = pychrome.Browser(url=self.url)
+            logger.debug(f"CDP session using Chrome at {self.url}")
+        return self.browser
+
+    def _create_tab(self):
+        """创建并初始化新标签页（无固定等待）"""
+        self._connect()
+        # 新版Chrome要求使用PUT创建标签页
+        response = requests.put(f"{self.url}/json/new?about:blank", timeout=CDP_COMMAND_TIMEOUT)
+        tab = pychrome.Tab(**response.json())
+        tab.start()
+        tab.Network.enable(_timeout=CDP_COMMAND_TIMEOUT)
+        tab.Page.enable(_timeout=CDP_COMMAND_TIMEOUT)
+        tab.Runtime.enable(_timeout=CDP_COMMAND_TIMEOUT)
+        with self._cond:
+            self.stats['tabs_created'] += 1
+        logger.debug(f"CDP session: created pooled tab {tab.id}")
+        return tab
+
+    @staticmethod
+    def _is_healthy(tab) -> bool:
+        return getattr(tab, 'status', None) == pychrome.Tab.status_started
+
+    def _discard(self, tab):
+        """关闭并移出异常标签页"""
+        with self._cond:
+            self._tabs.pop(tab.id, None)
+            self._blocking.pop(tab.id, None)
+            self.stats['tabs_discarded'] += 1
+            self._cond.notify()
+        try:
+            if getattr(tab, 'status', None) == pychrome.Tab.status_started:
+                tab.stop()
+            requests.get(f"{self.url}/json/close/{tab.id}", timeout=2)
+        except Exception as e:
+            logger.debug(f"CDP session: close tab {tab.id} failed (ignored): {e}")
+
+    def prewarm(self, count: int):
+        """
+        预热标签页，失败时只记录日志（借出时会重试创建）
+
+        Args:
+            count: 目标空闲标签页数
+        """
+        while True:
+            with self._cond:
+                if len(self._idle) >= count or len(self._tabs) + self._creating >= self.max_tabs:
+                    return
+                self._creating += 1
+            try:
+                tab = self._create_tab()
+            except Exception as e:
+                logger.warning(f"CDP session: failed to pre-warm tab at {self.url}: {e}")
+                with self._cond:
+                    self._creating -= 1
+                return
+            with self._cond:
+                self._creating -= 1
+                self._tabs[tab.id] = tab
+                self._idle.append(tab)
+                self._cond.notify()
+
+    def checkout(self, timeout: float = 30.0):
+        """
+        借出一个可用标签页（空闲复用，未满则新建，满则等待）
+
+        Args:
+            timeout: 等待空闲标签页的最长时间（秒）
+
+        Returns:
+            (tab, reused): 标签页对象及是否复用
+
+        Raises:
+            TimeoutError: 等待超时
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                while self._idle:
+                    tab = self._idle.pop()
+                    if self._is_healthy(tab):
+                        self.stats['checkouts'] += 1
+                        self.stats['reused'] += 1
+                        return tab, True
+                    self._tabs.pop(tab.id, None)
+                    self._blocking.pop(tab.id, None)
+                    self.stats['tabs_discarded'] += 1
+                if len(self._tabs) + self._creating < self.max_tabs:
+                    self._creating += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No CDP tab available within {timeout:.0f}s ({self.max_tabs} in use)")
+                self.stats['waits'] += 1
+                self._cond.wait(remaining)
+
+        try:
+            tab = self._create_tab()
+        except Exception:
+            with self._cond:
+                self._creating -= 1
+                self._cond.notify()
+            # 浏览器可能已重启，下次重新连接
+            self.browser = None
+            raise
+        with self._cond:
+            self._creating -= 1
+            self._tabs[tab.id] = tab
+            self.stats['checkouts'] += 1
+        return tab, False
+
+    def checkin(self, tab, healthy: bool = True):
+        """
+        归还标签页
+
+        Args:
+            tab: 借出的标签页
+            healthy: False 表示标签页出错，将被关闭
+        """
+        if not healthy or not self._is_healthy(tab):
+            self._discard(tab)
+            return
+        with self._cond:
+            if tab.id in self._tabs:
+                self._idle.append(tab)
+                self._cond.notify()
+
+    @contextmanager
+    def tab(self, timeout: float = 30.0):
+        """借出标签页的上下文管理器，异常时丢弃标签页"""
+        tab, _ = self.checkout(timeout)
+        try:
+            yield tab
+        except Exception:
+            self.checkin(tab, healthy=False)
+            raise
+        else:
+            self.checkin(tab)
+
+    def fetch(self, url: str, wait_time: Optional[float] = None, timeout: float = 30.0,
+              ready_timeout: float = DEFAULT_READY_TIMEOUT,
+              ready_selector: Optional[str] = None, block=()) -> CDPFetchResult:
+        """
+        在池化标签页中采集网页
+
+        Args:
+            url: 目标URL
+            wait_time: 固定等待时间（秒）；None 表示按CDP事件判断页面就绪
+            timeout: 等待空闲标签页的最长时间（秒）
+            ready_timeout: 事件等待模式下的最长等待时间（秒）
+            ready_selector: 可选CSS选择器，出现即视为页面就绪
+            block: 要拦截的资源类别（image, font, media, stylesheet, tracker）
+
+        Returns:
+            CDPFetchResult: 采集结果
+        """
+        start_time = time.time()
+        tab = None
+        try:
+            tab, reused = self.checkout(timeout)
+
+            # 池化标签页记住当前拦截设置，仅在规则变化时重新下发
+            categories = normalize_block(block)
+            if self._blocking.get(tab.id, ()) != categories:
+                apply_cdp_blocking(tab, categories, CDP_COMMAND_TIMEOUT)
+                self._blocking[tab.id] = categories
+
+            # 导航并等待页面就绪
+            wait_reason, time_to_ready = _navigate_and_wait(
+                tab, url, wait_time, ready_timeout, ready_selector)
+
+            html = tab.Runtime.evaluate(expression="document.documentElement.outerHTML",
+                                        _timeout=CDP_COMMAND_TIMEOUT)["result"]["value"]
+            final_url = tab.Runtime.evaluate(expression="window.location.href",
+                                             _timeout=CDP_COMMAND_TIMEOUT)["result"].get("value") or url
+            self.checkin(tab)
+
+            duration = time.time() - start_time
+            with self._cond:
+                self.stats['fetches'] += 1
+            logger.info(f"✓ CDP fetch completed in {duration:.2f}s (tab {'reused' if reused else 'new'})")
+            logger.info(f"  HTML length: {len(html)} chars")
+            logger.info(f"  Final URL: {final_url}")
+
+            return CDPFetchResult(
+                html=html,
+                final_url=final_url,
+                status_code=200,
+                error=None,
+                duration=duration,
+                metadata={
+                    'method': 'cdp',
+                    'wait_time': wait_time,
+                    'wait_reason': wait_reason,
+                    'time_to_ready': round(time_to_ready, 3),
+                    'blocked': list(categories),
+                    'tab_reused': reused
+                }
+            )
+
+        except Exception as e:
+            if tab is not None:
+                self.checkin(tab, healthy=False)
+            duration = time.time() - start_time
+            error_msg = f"CDP fetch failed: {str(e)}"
+            if isinstance(e, requests.exceptions.ConnectionError):
+                error_msg = f"CDP fetch failed: Failed to connect to Chrome at {self.url}"
+                logger.error(f"  请确保Chrome已启动: ./config/start_chrome_debug.sh")
+            logger.error(error_msg)
+
+            return CDPFetchResult(
+                html="",
+                final_url=url,
+                status_code=0,
+                error=error_msg,
+                duration=duration
+            )
+
+    def close(self):
+        """关闭池中全部标签页"""
+        with self._cond:
+            tabs = list(self._tabs.values())
+            self._tabs.clear()
+            self._idle.clear()
+            self._blocking.clear()
+        for tab in tabs:
+            try:
+                if getattr(tab, 'status', None) == pychrome.Tab.status_started:
+                    tab.stop()
+                requests.get(f"{self.url}/json/close/{tab.id}", timeout=2)
+            except Exception:
+                pass
+        self.browser = None
+
+    def get_stats(self) -> dict:
+        """获取会话统计"""
+        with self._cond:
+            return {
+                **self.stats,
+                'pooled_tabs': len(self._tabs),
+                'idle_tabs': len(self._idle),
+                'max_tabs': self.max_tabs,
+            }
+
+
+_sessions: Dict[Tuple[str, int], CDPSessionManager] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_cdp_session(host: str = "127.0.0.1", port: int = 9222) -> CDPSessionManager:
+    """
+    获取进程级CDP会话（首次调用时连接并预热标签页）
+
+    Args:
+        host: Chrome调试服务器地址
+        port: Chrome调试端口
+
+    Returns:
+        CDPSessionManager: 共享会话
+    """
+    key = (host, port)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = CDPSessionManager(host, port)
+                _sessions[key] = session
+    return session
+
+
+@atexit.register
+def _close_cdp_sessions():
+    """进程退出时关闭池化标签页"""
+    for session in list(_sessions.values()):
+        session.close()
+
+
 # ============================================================================
 # 简化的函数接口（兼容现有fetcher模式）
 # ============================================================================
 
-def fetch_with_cdp(url: str, wait_time: float = 3.0, **kwargs) -> Tuple[str, str, dict]:
+def fetch_with_cdp(url: str, wait_time: Optional[float] = None, **kwargs) -> Tuple[str, str, dict]:
     """
     使用CDP采集网页（简化接口）
 
+    使用进程级会话的池化标签页，不再每次新建浏览器连接和标签页。
+    默认按CDP事件（load事件、网络空闲、就绪选择器）判断页面就绪，不再固定等待。
+
     Args:
         url: 目标URL
-        wait_time: 等待时间
-        **kwargs: 其他参数
+        wait_time: 固定等待时间；None 表示事件驱动等待
+        **kwargs: 其他参数（host, port, ready_timeout, ready_selector, block）
 
     Returns:
         Tuple[html, final_url, metadata]
     """
-    fetcher = CDPFetcher()
-    result = fetcher.fetch(url, wait_time=wait_time)
+    session = get_cdp_session(kwargs.get('host', "127.0.0.1"), kwargs.get('port', 9222))
+    result = session.fetch(url, wait_time=wait_time,
+                           ready_timeout=kwargs.get('ready_timeout', DEFAULT_READY_TIMEOUT),
+                           ready_selector=kwargs.get('ready_selector'),
+                           block=kwargs.get('block', ()))
 
     metadata = {
         'method': 'cdp',
@@ -329,8 +716,6 @@ def fetch_with_cdp(url: str, wait_time: float = 3.0, **kwargs) -> Tuple[str, str
         **(result.metadata or {})
     }
 
-    fetcher.close()
-
     if result.error:
         raise Exception(result.error)
 
@@ -340,6 +725,8 @@ def fetch_with_cdp(url: str, wait_time: float = 3.0, **kwargs) -> Tuple[str, str
 __all__ = [
     'CDPFetcher',
     'CDPFetchResult',
+    'CDPSessionManager',
+    'get_cdp_session',
     'fetch_with_cdp',
     'CDP_AVAILABLE'
 ]
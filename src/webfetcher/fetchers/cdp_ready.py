@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+CDP Page Readiness Detection
+基于CDP事件的页面就绪检测
+
+Replaces the fixed ``time.sleep(wait_time)`` after ``Page.navigate`` with
+waiting on what the browser reports:
+
+- ``Page.loadEventFired`` for the navigated document
+- network idle: no in-flight requests (``Network.requestWillBeSent`` vs.
+  ``loadingFinished``/``loadingFailed``) for ``NETWORK_IDLE_TIME`` seconds
+- optional "selector present": a CSS selector (e.g. from the site template's
+  ``fetch.ready_selector``) exists in the DOM
+
+取代 ``Page.navigate`` 之后的固定等待：页面 load 事件 + 网络空闲即返回，
+或在配置了就绪选择器时等待该元素出现；最长等待 ``timeout`` 秒。
+
+Events are attributed to the navigation through its ``frameId`` and
+``loaderId``: document loads of iframes (own loaderIds) and late events from
+the previous page of a reused (pooled) tab are ignored.
+通过 ``frameId`` 与 ``loaderId`` 区分导航：忽略 iframe 文档及复用标签页时上一页面的残留事件。
+"""
+
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 就绪检测默认参数
+DEFAULT_READY_TIMEOUT = 15.0    # 最长等待页面就绪时间（秒）
+NETWORK_IDLE_TIME = 0.5         # 无进行中请求持续多久视为网络空闲（秒）
+NETWORK_SETTLE_TIMEOUT = 2.0    # load事件后最多再等网络空闲多久（秒）
+POLL_INTERVAL = 0.05            # 状态检查间隔（秒）
+SELECTOR_POLL_INTERVAL = 0.1    # 选择器检查间隔（秒）
+
+# 就绪原因
+READY_NETWORK_IDLE = "network_idle"   # load事件 + 网络空闲
+READY_LOAD_EVENT = "load_event"       # load事件后网络未能空闲（长连接、轮询等）
+READY_SELECTOR = "selector"           # 就绪选择器已出现
+READY_TIMEOUT = "timeout"             # 超时，按当前DOM返回
+READY_FIXED = "fixed"                 # 显式指定固定等待时间
+READY_NAVIGATE_ERROR = "navigate_error"  # 导航失败（DNS、连接错误等），不再等待
+
+
+class PageReadyWaiter:
+    """
+    页面就绪等待器：监听标签页CDP事件判断导航是否完成
+
+    要求标签页已启用 Network 与 Page 域（CDPFetcher/CDPSessionManager 创建的标签页均已启用）。
+
+    用法：
+        with PageReadyWaiter(tab, ready_selector="#content") as waiter:
+            waiter.navigate(url)
+            reason, time_to_ready = waiter.wait(timeout=15.0)
+    """
+
+    EVENTS = (
+        'Page.domContentEventFired',
+        'Page.loadEventFired',
+        'Network.requestWillBeSent',
+        'Network.loadingFinished',
+        'Network.loadingFailed',
+    )
+
+    def __init__(self, tab, ready_selector: Optional[str] = None,
+                 idle_time: float = NETWORK_IDLE_TIME,
+                 settle_timeout: float = NETWORK_SETTLE_TIMEOUT,
+                 max_inflight: int = 0):
+        """
+        Args:
+            tab: pychrome标签页（已start）
+            ready_selector: 可选CSS选择器，出现即视为就绪
+            idle_time: 网络空闲持续时间（秒）
+            settle_timeout: load事件后等待网络空闲的上限（秒）
+            max_inflight: 允许的进行中请求数（0 = 完全空闲）
+        """
+        self.tab = tab
+        self.ready_selector = ready_selector
+        self.idle_time = idle_time
+        self.settle_timeout = settle_timeout
+        self.max_inflight = max_inflight
+
+        self._cond = threading.Condition()
+        self._loader_id: Optional[str] = None      # Page.navigate 返回的 loaderId
+        self._frame_id: Optional[str] = None       # Page.navigate 返回的主框架 frameId
+        self._document_loaders: Dict[Optional[str], str] = {}  # frameId -> 最近 Document 请求的 loaderId
+        # 事件发生时各框架 Document loaderId 的快照（load 事件可能早于 Page.navigate 返回）
+        self._dom_ready_loaders: Optional[Dict[Optional[str], str]] = None
+        self._load_loaders: Optional[Dict[Optional[str], str]] = None
+        self._load_time: Optional[float] = None
+        self._inflight: Dict[str, Optional[str]] = {}  # requestId -> loaderId
+        self._last_activity = time.monotonic()
+        self._start: Optional[float] = None
+        self._error_text: Optional[str] = None
+        self._attached = False
+
+    # ------------------------------------------------------------------
+    # Event handlers (pychrome event thread)
+    # ------------------------------------------------------------------
+
+    def _on_request(self, requestId=None, loaderId=None, type=None, frameId=None, **kwargs):
+        with self._cond:
+            if type == 'Document':
+                # iframe 文档有各自的 loaderId，按 frameId 分别记录
+                self._document_loaders[frameId] = loaderId
+            self._inflight[requestId] = loaderId
+            self._last_activity = time.monotonic()
+            self._cond.notify_all()
+
+    def _on_request_done(self, requestId=None, **kwargs):
+        with self._cond:
+            self._inflight.pop(requestId, None)
+            self._last_activity = time.monotonic()
+            self._cond.notify_all()
+
+    def _on_dom_content(self, **kwargs):
+        with self._cond:
+            self._dom_ready_loaders = dict(self._document_loaders)
+            self._cond.notify_all()
+
+    def _on_load(self, **kwargs):
+        with self._cond:
+            self._load_loaders = dict(self._document_loaders)
+            self._load_time = time.monotonic()
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def attach(self):
+        """注册事件监听"""
+        handlers = {
+            'Page.domContentEventFired': self._on_dom_content,
+            'Page.loadEventFired': self._on_load,
+            'Network.requestWillBeSent': self._on_request,
+            'Network.loadingFinished': self._on_request_done,
+            'Network.loadingFailed': self._on_request_done,
+        }
+        for event, handler in handlers.items():
+            self.tab.set_listener(event, handler)
+        self._attached = True
+        return self
+
+    def detach(self):
+        """移除事件监听（归还池化标签页前必须调用）"""
+        if not self._attached:
+            return
+        for event in self.EVENTS:
+            try:
+                self.tab.set_listener(event, None)
+            except Exception:
+                pass
+        self._attached = False
+
+    def __enter__(self):
+        return self.attach()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.detach()
+        return False
+
+    def navigate(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        导航到URL并记录本次导航的 loaderId
+
+        Args:
+            url: 目标URL
+            timeout: Page.navigate 命令超时（秒）
+
+        Returns:
+            Page.navigate 的返回值
+        """
+        self._start = time.monotonic()
+        kwargs = {'url': url}
+        if timeout is not None:
+            kwargs['_timeout'] = timeout
+        result = self.tab.Page.navigate(**kwargs) or {}
+        self._error_text = result.get('errorText')
+        if self._error_text:
+            logger.warning(f"Page.navigate reported {self._error_text} for {url}")
+        with self._cond:
+            # 同文档导航（仅hash变化）没有 loaderId，此时接受任意事件
+            self._loader_id = result.get('loaderId')
+            self._frame_id = result.get('frameId')
+        return result
+
+    def wait(self, timeout: float = DEFAULT_READY_TIMEOUT) -> Tuple[str, float]:
+        """
+        等待页面就绪
+
+        Args:
+            timeout: 最长等待时间（秒），超时后按当前DOM继续
+
+        Returns:
+            (reason, time_to_ready): 就绪原因与自导航开始的耗时（秒）
+        """
+        start = self._start if self._start is not None else time.monotonic()
+        deadline = start + timeout
+        next_selector_check = 0.0
+        if self._error_text:
+            return READY_NAVIGATE_ERROR, time.monotonic() - start
+
+        while True:
+            now = time.monotonic()
+            with self._cond:
+                dom_ready = self._matches(self._dom_ready_loaders) or self._matches(self._load_loaders)
+                loaded = self._matches(self._load_loaders)
+                idle = self._is_network_idle(now)
+                load_time = self._load_time
+
+            if self.ready_selector:
+                # 选择器模式：元素出现即就绪（DOMContentLoaded之后才检查，避免命中上一页面）
+                if dom_ready and now >= next_selector_check:
+                    if self._selector_present():
+                        return READY_SELECTOR, time.monotonic() - start
+                    next_selector_check = time.monotonic() + SELECTOR_POLL_INTERVAL
+            elif loaded:
+                if idle:
+                    return READY_NETWORK_IDLE, now - start
+                if now - load_time >= self.settle_timeout:
+                    return READY_LOAD_EVENT, now - start
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.info(f"Page not ready after {timeout:.1f}s (loaded={loaded}, "
+                            f"inflight={self._inflight_count()}), using current DOM")
+                return READY_TIMEOUT, time.monotonic() - start
+            with self._cond:
+                self._cond.wait(min(POLL_INTERVAL, remaining))
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _matches(self, loaders: Optional[Dict[Optional[str], str]]) -> bool:
+        """事件是否属于本次导航（loaders: 事件发生时的 frameId -> loaderId 快照）"""
+        if loaders is None:
+            return False
+        if self._loader_id is None:
+            return True
+        if self._frame_id in loaders:
+            return loaders[self._frame_id] == self._loader_id
+        # 主框架未知（旧版 Chrome 未返回 frameId）：任一框架的 Document 属于本次导航即可
+        return self._loader_id in loaders.values()
+
+    def _inflight_count(self) -> int:
+        """本次导航进行中的请求数（未知 loaderId 的请求也计入）"""
+        with self._cond:
+            if self._loader_id is None:
+                return len(self._inflight)
+            return sum(1 for loader in self._inflight.values() if loader in (self._loader_id, None))
+
+    def _is_network_idle(self, now: float) -> bool:
+        return self._inflight_count() <= self.max_inflight and now - self._last_activity >= self.idle_time
+
+    def _selector_present(self) -> bool:
+        try:
+            result = self.tab.Runtime.evaluate(
+                expression=f"!!document.querySelector({json.dumps(self.ready_selector)})",
+                _timeout=2)
+            return bool(result.get("result", {}).get("value"))
+        except Exception as e:
+            logger.debug(f"Ready selector check failed: {e}")
+            return False
+
+
+__all__ = [
+    'PageReadyWaiter',
+    'DEFAULT_READY_TIMEOUT',
+    'READY_NETWORK_IDLE',
+    'READY_LOAD_EVENT',
+    'READY_SELECTOR',
+    'READY_TIMEOUT',
+    'READY_FIXED',
+    'READY_NAVIGATE_ERROR',
+]
@@ -0,0 +1,31 @@
+"""
+Browser Fetcher Exceptions
+浏览器抓取异常
+
+Defined apart from fetchers.selenium so callers can catch them without
+importing Selenium (and its configuration loader) on every run.
+独立于 fetchers.selenium 定义，捕获这些异常时无需导入 Selenium。
+"""
+
+
+class ChromeConnectionError(Exception):
+    """Chrome debug connection failed"""
+    pass
+
+
+class SeleniumNotAvailableError(Exception):
+    """Selenium dependencies not installed"""
+    pass
+
+
+class SeleniumFetchError(Exception):
+    """Selenium fetch operation failed"""
+    pass
+
+
+class SeleniumTimeoutError(Exception):
+    """Selenium page load timeout"""
+    pass
+
+
+__all__ = ['ChromeConnectionError', 'SeleniumNotAvailableError', 'SeleniumFetchError', 'SeleniumTimeoutError']
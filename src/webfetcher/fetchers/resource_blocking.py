@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Network Resource Blocking for Browser Fetches
+浏览器抓取的网络资源拦截
+
+Rendered fetches only keep ``outerHTML`` / ``page_source``, yet Chrome still
+downloads every image, font, video and analytics beacon on the page. Routing
+rules can list resource categories to block::
+
+    action:
+      fetcher: "selenium"
+      block: [image, font, media, tracker]
+
+渲染抓取只保留 HTML，但 Chrome 仍会下载页面上的全部图片、字体、视频和统计脚本。
+路由规则可通过 ``block`` 列出要拦截的资源类别。
+
+- CDP: ``Network.setBlockedURLs`` for URL patterns, plus ``Fetch.enable`` with
+  resource-type patterns and ``Fetch.requestPaused`` -> ``Fetch.failRequest``,
+  which also catches images/fonts served without a file extension.
+- Selenium: ``Network.setBlockedURLs`` via ``execute_cdp_cmd`` (chromedriver
+  cannot deliver ``Fetch.requestPaused`` events). Blocking is cleared after
+  the fetch because Selenium attaches to the user's own Chrome session.
+
+Blocked requests fail with ``BlockedByClient``; element attributes such as
+``<img src>`` are unchanged, so the parsed output is the same.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _extensions(*exts: str) -> List[str]:
+    """文件扩展名 -> URL模式（含带查询参数的形式）"""
+    patterns = []
+    for ext in exts:
+        patterns += [f'*.{ext}', f'*.{ext}?*']
+    return patterns
+
+
+# 资源类别 -> URL匹配模式（Network.setBlockedURLs，支持 * 通配符）
+BLOCK_URL_PATTERNS: Dict[str, List[str]] = {
+    'image': _extensions('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'ico', 'bmp', 'svg'),
+    'font': _extensions('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': _extensions('mp4', 'webm', 'm3u8', 'mp3', 'm4a', 'ogg', 'flv', 'mov'),
+    'stylesheet': _extensions('css'),
+    'tracker': [
+        '*google-analytics.com/*', '*googletagmanager.com/*', '*doubleclick.net/*',
+        '*googlesyndication.com/*', '*connect.facebook.net/*', '*facebook.com/tr*',
+        '*hotjar.com/*', '*segment.io/*', '*scorecardresearch.com/*',
+        '*hm.baidu.com/*', '*cnzz.com/*', '*umeng.com/*', '*growingio.com/*',
+        '*sensorsdata.cn/*', '*mmstat.com/*',
+    ],
+}
+
+# 资源类别 -> CDP资源类型（Fetch.enable 拦截模式）
+BLOCK_RESOURCE_TYPES: Dict[str, List[str]] = {
+    'image': ['Image'],
+    'font': ['Font'],
+    'media': ['Media'],
+    'stylesheet': ['Stylesheet'],
+}
+
+BLOCK_CATEGORIES = tuple(BLOCK_URL_PATTERNS)
+
+
+def normalize_block(value: Any) -> Tuple[str, ...]:
+    """
+    规范化 routing.yaml 中的 block 配置
+
+    Args:
+        value: 类别列表、逗号分隔字符串或 None
+
+    Returns:
+        去重且排序的类别元组，未知类别记录警告后忽略
+    """
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(',')
+    categories = set()
+    for item in value:
+        name = str(item).strip().lower()
+        if not name:
+            continue
+        if name.endswith('s') and name[:-1] in BLOCK_URL_PATTERNS:
+            name = name[:-1]  # images -> image
+        if name in BLOCK_URL_PATTERNS:
+            categories.add(name)
+        else:
+            logger.warning(f"Unknown resource block category '{item}' (known: {', '.join(BLOCK_CATEGORIES)})")
+    return tuple(sorted(categories))
+
+
+def blocked_url_patterns(categories: Iterable[str]) -> List[str]:
+    """类别对应的URL拦截模式"""
+    patterns = []
+    for category in categories:
+        patterns.extend(BLOCK_URL_PATTERNS.get(category, ()))
+    return patterns
+
+
+def blocked_resource_types(categories: Iterable[str]) -> List[str]:
+    """类别对应的CDP资源类型"""
+    types = []
+    for category in categories:
+        types.extend(BLOCK_RESOURCE_TYPES.get(category, ()))
+    return types
+
+
+def apply_cdp_blocking(tab, categories: Tuple[str, ...], timeout: float = 10):
+    """
+    在pychrome标签页上启用资源拦截（空类别即清除拦截）
+
+    Args:
+        tab: 已启用 Network 域的pychrome标签页
+        categories: normalize_block() 的结果
+        timeout: CDP命令超时（秒）
+    """
+    tab.Network.setBlockedURLs(urls=blocked_url_patterns(categories), _timeout=timeout)
+
+    types = blocked_resource_types(categories)
+    if types:
+        def _on_request_paused(requestId=None, **kwargs):
+            try:
+                tab.Fetch.failRequest(requestId=requestId, errorReason='BlockedByClient', _timeout=timeout)
+            except Exception as e:
+                logger.debug(f"Fetch.failRequest failed for {requestId}: {e}")
+
+        tab.set_listener('Fetch.requestPaused', _on_request_paused)
+        tab.Fetch.enable(patterns=[{'resourceType': t, 'requestStage': 'Request'} for t in types],
+                         _timeout=timeout)
+    else:
+        tab.Fetch.disable(_timeout=timeout)
+        tab.set_listener('Fetch.requestPaused', None)
+
+    if categories:
+        logger.debug(f"CDP resource blocking enabled: {', '.join(categories)}")
+
+
+def apply_selenium_blocking(driver, categories: Tuple[str, ...]):
+    """
+    通过 chromedriver 的CDP接口启用URL拦截（空类别即清除拦截）
+
+    Args:
+        driver: Selenium Chrome WebDriver
+        categories: normalize_block() 的结果
+    """
+    if categories:
+        driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns(categories)})
+    if categories:
+        logger.debug(f"Selenium resource blocking enabled: {', '.join(categories)}")
+
+
+__all__ = [
+    'BLOCK_CATEGORIES',
+    'normalize_block',
+    'blocked_url_patterns',
+    'blocked_resource_types',
+    'apply_cdp_blocking',
+    'apply_selenium_blocking',
+]
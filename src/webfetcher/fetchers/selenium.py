@@ -54,6 +54,11 @@ from dataclasses import dataclass
 
 # Import Chrome error handling utilities
 from webfetcher.errors.handler import ChromeErrorMessages
+from webfetcher.fetchers.resource_blocking import normalize_block, apply_selenium_blocking
+from webfetcher.fetchers.errors import (
+    ChromeConnectionError, SeleniumNotAvailableError,
+    SeleniumFetchError, SeleniumTimeoutError
+)
 
 # Conditional import for requests with urllib fallback
 try:
@@ -352,26 +357,6 @@ ChromeDriver: {driver_version}
         return True, message.strip()
 
 
-class ChromeConnectionError(Exception):
-    """Chrome debug connection failed"""
-    pass
-
-
-class SeleniumNotAvailableError(Exception):
-    """Selenium dependencies not installed"""
-    pass
-
-
-class SeleniumFetchError(Exception):
-    """Selenium fetch operation failed"""
-    pass
-
-
-class SeleniumTimeoutError(Exception):
-    """Selenium page load timeout"""
-    pass
-
-
 @dataclass
 class SeleniumMetrics:
     """Metrics for Selenium fetch operations"""
@@ -1061,7 +1046,7 @@ class SeleniumFetcher:
         return False, "Maximum connection attempts exceeded"
     
     def fetch_html_selenium(self, url: str, ua: Optional[str] = None, 
-                           timeout: Optional[int] = None) -> Tuple[str, SeleniumMetrics]:
+                           timeout: Optional[int] = None, block=()) -> Tuple[str, SeleniumMetrics]:
         """
         Fetch HTML using existing Chrome session - preserves all login states.
         
@@ -1069,6 +1054,8 @@ class SeleniumFetcher:
             url: Target URL to fetch
             ua: User agent string (ignored - uses existing Chrome UA)
             timeout: Page load timeout in seconds (uses config default if None)
+            block: Resource categories to block during this fetch
+                   (image, font, media, stylesheet, tracker - from routing.yaml action.block)
             
         Returns:
             Tuple of (html_content: str, metrics: SeleniumMetrics)
@@ -1093,11 +1080,21 @@ class SeleniumFetcher:
         )
         
         fetch_start = time.time()
+        categories = normalize_block(block)
         
         try:
             # Set timeout for this specific request
             original_timeout = self.driver.timeouts.page_load
             self.driver.set_page_load_timeout(fetch_timeout)
+
+            # Block heavy resources for this fetch only (the Chrome session is the user's own)
+            if categories:
+                try:
+                    apply_selenium_blocking(self.driver, categories)
+                    logging.info(f"Blocking resources for Selenium fetch: {', '.join(categories)}")
+                except Exception as e:
+                    logging.warning(f"Resource blocking unavailable, fetching without it: {e}")
+                    categories = ()
             
             logging.info(f"Fetching URL with Selenium: {url}")
             page_load_start = time.time()
@@ -1172,6 +1169,13 @@ class SeleniumFetcher:
             
             logging.error(f"Unexpected Selenium error for {url}: {e}")
             raise SeleniumFetchError(f"Unexpected error: {e}")
+            
+        finally:
+            if categories:
+                try:
+                    apply_selenium_blocking(self.driver, ())
+                except Exception as e:
+                    logging.debug(f"Failed to clear Selenium resource blocking: {e}")
     
     def execute_script(self, script: str, *args) -> Any:
         """
@@ -1,9 +1,23 @@
 """Web content parsing with template support."""
-from .parser import (
-    xhs_to_markdown,
-    wechat_to_markdown,
-    generic_to_markdown
-)
+import importlib
+
+# Parsers load on first access, so importing light submodules
+# (webfetcher.parsing.budget / .pool) does not pull in BeautifulSoup and the templates
+_LAZY_EXPORTS = {
+    'xhs_to_markdown': '.parser',
+    'wechat_to_markdown': '.parser',
+    'generic_to_markdown': '.parser',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'xhs_to_markdown',
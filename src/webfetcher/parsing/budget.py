@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Parse Budget
+解析预算（每页 CPU 时间上限）
+
+Cooperative, signal-free time limit for parsing one page. A budget is opened
+per page with ``parse_budget()`` and the extraction loops call
+``check_parse_budget()``; once the page has used more CPU time than allowed,
+the check raises ParseBudgetExceeded.
+协作式超时：解析循环中定期检查，超出预算时抛出 ParseBudgetExceeded。
+
+Unlike ``signal.alarm`` this works in any thread and in parse worker
+processes: the budget lives in a ContextVar and is measured with
+``time.thread_time()``, the CPU time of the parsing thread, so time spent
+waiting on other threads or the GIL does not count against the page.
+与 signal.alarm 不同，可在任意线程/子进程中使用，按当前线程 CPU 时间计算。
+
+Once exceeded, a budget stays exceeded: a check swallowed by a broad
+``except Exception`` is raised again by the next one.
+
+Example:
+    configure_parse_budget(10)          # --parse-budget 10
+    with parse_budget():
+        for element in tree.iter():
+            check_parse_budget()
+            ...
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+DEFAULT_PARSE_BUDGET = 30.0  # 默认每页 CPU 秒数（0 = 不限制）
+
+_default_budget: float = DEFAULT_PARSE_BUDGET
+_current: ContextVar[Optional['ParseBudget']] = ContextVar('webfetcher_parse_budget', default=None)
+
+
+class ParseBudgetExceeded(TimeoutError):
+    """解析超出每页 CPU 时间预算"""
+
+
+class ParseBudget:
+    """单页解析预算（当前线程 CPU 时间）"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started = time.thread_time()
+        self.deadline = self.started + seconds
+        self.exceeded = False
+
+    @property
+    def elapsed(self) -> float:
+        """已用 CPU 秒数"""
+        return time.thread_time() - self.started
+
+    def check(self):
+        """
+        超出预算时抛出异常
+
+        Raises:
+            ParseBudgetExceeded: 当前页面 CPU 时间超出预算
+        """
+        if self.exceeded or time.thread_time() > self.deadline:
+            self.exceeded = True
+            raise ParseBudgetExceeded(f"Parse budget of {self.seconds:g}s CPU time exceeded")
+
+
+def configure_parse_budget(seconds: Optional[float] = DEFAULT_PARSE_BUDGET):
+    """
+    Configure the process-wide per-page budget (used by --parse-budget)
+    配置进程级每页解析预算（对应 --parse-budget，0 或 None 表示不限制）
+    """
+    global _default_budget
+    _default_budget = float(seconds or 0)
+
+
+def get_parse_budget() -> float:
+    """Get the process-wide per-page budget in CPU seconds (0 = unlimited) / 获取进程级每页解析预算"""
+    return _default_budget
+
+
+@contextmanager
+def parse_budget(seconds: Optional[float] = None) -> Iterator[Optional[ParseBudget]]:
+    """
+    Open a per-page budget for the enclosed parse
+    为一次页面解析开启预算
+
+    Nested scopes share the outermost budget, so a page parsed through
+    generic_to_markdown -> TemplateParser.parse is limited once, not per layer.
+
+    Args:
+        seconds: CPU 秒数（None = 进程级配置，0 = 不限制）
+
+    Yields:
+        The active ParseBudget, or None when unlimited
+    """
+    current = _current.get()
+    if current is not None:
+        yield current
+        return
+    seconds = get_parse_budget() if seconds is None else seconds
+    if not seconds or seconds <= 0:
+        yield None
+        return
+    budget = ParseBudget(seconds)
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        _current.reset(token)
+
+
+def check_parse_budget():
+    """
+    Cooperative checkpoint for extraction loops (no-op without an open budget)
+    解析循环中的协作式检查点（未开启预算时无操作）
+
+    Raises:
+        ParseBudgetExceeded: 当前页面 CPU 时间超出预算
+    """
+    budget = _current.get()
+    if budget is not None:
+        budget.check()
+
+
+__all__ = ['DEFAULT_PARSE_BUDGET', 'ParseBudget', 'ParseBudgetExceeded', 'check_parse_budget',
+           'configure_parse_budget', 'get_parse_budget', 'parse_budget']
@@ -0,0 +1,143 @@
+"""Parse-once document shared by extraction strategies.
+
+This module provides ParsedDocument, a thin wrapper around an HTML string that
+lazily builds BeautifulSoup and lxml views on first use and hands the same
+tree to every selector afterwards. TemplateParser creates one per parse()
+call so a template with many selectors and fallbacks parses the page once per
+view instead of once per selector.
+"""
+
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+
+class ParsedDocument:
+    """
+    HTML document with lazily-built, cached DOM views.
+
+    Views are read-only by contract: strategies only select from them.
+    Callers that need to mutate a tree must use new_soup(), which always
+    parses a fresh copy.
+
+    Example:
+        doc = ParsedDocument(html)
+        CSSStrategy().extract(doc, "h1")        # builds the BeautifulSoup view
+        CSSStrategy().extract(doc, "title")     # reuses it
+        XPathStrategy().extract(doc, "//h1")    # builds the lxml view
+        doc.parses_avoided                      # -> 1
+
+    Attributes:
+        html: Original HTML string
+        parses: Number of full-document parses performed
+        parses_avoided: Number of view requests served from cache
+    """
+
+    def __init__(self, content: str, parser: str = 'html.parser'):
+        """
+        Initialize parsed document.
+
+        Args:
+            content: HTML string
+            parser: Default BeautifulSoup parser for the soup view
+        """
+        self.html = content or ""
+        self.parser = parser
+        self._soups: Dict[str, BeautifulSoup] = {}
+        self._tree = None
+        self._tree_error: Optional[Exception] = None
+        self._derived: Dict[str, Any] = {}
+        self.parses = 0
+        self.parses_avoided = 0
+
+    def __str__(self) -> str:
+        return self.html
+
+    def __len__(self) -> int:
+        return len(self.html)
+
+    def strip(self) -> str:
+        """Mirror str.strip() so emptiness checks written for strings keep working."""
+        return self.html.strip()
+
+    def get_soup(self, parser: Optional[str] = None) -> BeautifulSoup:
+        """
+        Get the shared BeautifulSoup view, parsing on first use.
+
+        Args:
+            parser: BeautifulSoup parser name (default: document parser)
+
+        Returns:
+            BeautifulSoup: Cached parse tree (do not mutate)
+        """
+        parser = parser or self.parser
+        soup = self._soups.get(parser)
+        if soup is None:
+            soup = BeautifulSoup(self.html, parser)
+            self._soups[parser] = soup
+            self.parses += 1
+        else:
+            self.parses_avoided += 1
+        return soup
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """Shared BeautifulSoup view using the default parser."""
+        return self.get_soup()
+
+    @property
+    def tree(self):
+        """
+        Shared lxml view, parsing on first use.
+
+        Parse failures are cached and re-raised so a bad document is not
+        re-parsed for every XPath selector.
+        """
+        if self._tree is None and self._tree_error is None:
+            try:
+                self._tree = lxml_html.fromstring(self.html)
+            except Exception as e:
+                self._tree_error = e
+            self.parses += 1
+        else:
+            self.parses_avoided += 1
+        if self._tree_error is not None:
+            raise self._tree_error
+        return self._tree
+
+    def derived(self, key: str, builder: Callable[['ParsedDocument'], Any]) -> Any:
+        """
+        Get a cached view derived from this document (e.g. a cleaned soup).
+
+        Args:
+            key: Cache key for the derived view
+            builder: Callable building the view from this document
+
+        Returns:
+            The cached view (built on first request)
+        """
+        if key in self._derived:
+            self.parses_avoided += 1
+            return self._derived[key]
+        view = builder(self)
+        self._derived[key] = view
+        return view
+
+    def new_soup(self, parser: Optional[str] = None) -> BeautifulSoup:
+        """
+        Parse a private, mutable BeautifulSoup copy (not cached).
+
+        Args:
+            parser: BeautifulSoup parser name (default: document parser)
+        """
+        self.parses += 1
+        return BeautifulSoup(self.html, parser or self.parser)
+
+    def stats(self) -> Dict[str, int]:
+        """Get parse counters."""
+        return {'parses': self.parses, 'parses_avoided': self.parses_avoided}
@@ -12,8 +12,8 @@ from .base_strategy import (
     SelectionError,
     ExtractionError
 )
-from .css_strategy import CSSStrategy
-from .xpath_strategy import XPathStrategy
+from .css_strategy import CSSStrategy, compile_css_selector
+from .xpath_strategy import XPathStrategy, compile_xpath
 from .text_pattern_strategy import TextPatternStrategy
 
 __all__ = [
@@ -24,4 +24,6 @@ __all__ = [
     'CSSStrategy',
     'XPathStrategy',
     'TextPatternStrategy',
+    'compile_css_selector',
+    'compile_xpath',
 ]
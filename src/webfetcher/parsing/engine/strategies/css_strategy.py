@@ -4,10 +4,14 @@ This module implements the ExtractionStrategy interface using CSS selectors
 and BeautifulSoup for HTML parsing and element selection.
 """
 
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, List, Union
 import logging
 from bs4 import BeautifulSoup, Tag
 import re
+import soupsieve
+
+from ..parsed_document import ParsedDocument
 
 from .base_strategy import (
     ExtractionStrategy,
@@ -20,6 +24,20 @@ from .base_strategy import (
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=2048)
+def compile_css_selector(css_selector: str) -> soupsieve.SoupSieve:
+    """
+    Compile a CSS selector once and cache it process-wide.
+
+    Args:
+        css_selector: CSS selector (without @attribute suffix)
+
+    Returns:
+        soupsieve.SoupSieve: Compiled selector usable via select_one()/select()
+    """
+    return soupsieve.compile(css_selector)
+
+
 class CSSStrategy(ExtractionStrategy):
     """
     CSS selector-based extraction strategy.
@@ -79,12 +97,14 @@ class CSSStrategy(ExtractionStrategy):
             return css_selector, attribute
         return selector.strip(), None
 
-    def _parse_html(self, content: str) -> BeautifulSoup:
+    def _parse_html(self, content: Union[str, ParsedDocument]) -> BeautifulSoup:
         """
         Parse HTML content into BeautifulSoup object.
 
+        A ParsedDocument returns its shared soup view instead of re-parsing.
+
         Args:
-            content: HTML string to parse
+            content: HTML string or ParsedDocument to parse
 
         Returns:
             BeautifulSoup: Parsed HTML tree
@@ -96,9 +116,14 @@ class CSSStrategy(ExtractionStrategy):
             if not content or not content.strip():
                 raise StrategyError("Content is empty or None")
 
+            if isinstance(content, ParsedDocument):
+                return content.get_soup(self.parser)
+
             soup = BeautifulSoup(content, self.parser)
             return soup
 
+        except StrategyError:
+            raise
         except Exception as e:
             logger.error(f"Failed to parse HTML: {e}")
             raise StrategyError(f"HTML parsing failed: {e}")
@@ -174,7 +199,7 @@ class CSSStrategy(ExtractionStrategy):
             soup = self._parse_html(content)
 
             # Find first matching element
-            element = soup.select_one(css_selector)
+            element = compile_css_selector(css_selector).select_one(soup)
 
             if element is None:
                 logger.debug(f"No element found for selector: '{css_selector}'")
@@ -240,7 +265,7 @@ class CSSStrategy(ExtractionStrategy):
             soup = self._parse_html(content)
 
             # Find all matching elements
-            elements = soup.select(css_selector)
+            elements = compile_css_selector(css_selector).select(soup)
 
             if not elements:
                 logger.debug(f"No elements found for selector: '{css_selector}'")
@@ -154,6 +154,9 @@ class TextPatternStrategy(ExtractionStrategy):
             if content is None:
                 raise StrategyError("Content is None")
 
+            # ParsedDocument (shared DOM) is matched against its raw HTML
+            content = str(content)
+
             # Build flags
             flags = self.default_flags
             if multiline:
@@ -231,6 +234,9 @@ class TextPatternStrategy(ExtractionStrategy):
             if content is None:
                 raise StrategyError("Content is None")
 
+            # ParsedDocument (shared DOM) is matched against its raw HTML
+            content = str(content)
+
             # Build flags
             flags = self.default_flags
             if multiline:
@@ -4,11 +4,14 @@ This module implements the ExtractionStrategy interface using XPath expressions
 and lxml for HTML parsing and element selection.
 """
 
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, List, Union
 import logging
 from lxml import html, etree
 from lxml.html import HtmlElement
 
+from ..parsed_document import ParsedDocument
+
 from .base_strategy import (
     ExtractionStrategy,
     StrategyError,
@@ -20,6 +23,20 @@ from .base_strategy import (
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=2048)
+def compile_xpath(xpath_expr: str) -> etree.XPath:
+    """
+    Compile an XPath expression once and cache it process-wide.
+
+    Args:
+        xpath_expr: XPath expression
+
+    Returns:
+        etree.XPath: Compiled expression, callable on an element tree
+    """
+    return etree.XPath(xpath_expr)
+
+
 class XPathStrategy(ExtractionStrategy):
     """
     XPath expression-based extraction strategy.
@@ -54,12 +71,14 @@ class XPathStrategy(ExtractionStrategy):
         super().__init__()
         logger.debug("XPathStrategy initialized")
 
-    def _parse_html(self, content: str) -> HtmlElement:
+    def _parse_html(self, content: Union[str, ParsedDocument]) -> HtmlElement:
         """
         Parse HTML content into lxml element tree.
 
+        A ParsedDocument returns its shared lxml view instead of re-parsing.
+
         Args:
-            content: HTML string to parse
+            content: HTML string or ParsedDocument to parse
 
         Returns:
             HtmlElement: Parsed HTML tree
@@ -71,10 +90,15 @@ class XPathStrategy(ExtractionStrategy):
             if not content or not content.strip():
                 raise StrategyError("Content is empty or None")
 
+            if isinstance(content, ParsedDocument):
+                return content.tree
+
             # Use html.fromstring for HTML content
             tree = html.fromstring(content)
             return tree
 
+        except StrategyError:
+            raise
         except etree.ParserError as e:
             logger.error(f"Failed to parse HTML with lxml: {e}")
             raise StrategyError(f"HTML parsing failed: {e}")
@@ -184,8 +208,8 @@ class XPathStrategy(ExtractionStrategy):
             # Parse HTML
             tree = self._parse_html(content)
 
-            # Apply XPath expression
-            results = tree.xpath(selector)
+            # Apply compiled XPath expression
+            results = compile_xpath(selector)(tree)
 
             if not results:
                 logger.debug(f"No element found for XPath: '{selector}'")
@@ -200,7 +224,7 @@ class XPathStrategy(ExtractionStrategy):
 
             return text if text else None
 
-        except etree.XPathEvalError as e:
+        except (etree.XPathEvalError, etree.XPathSyntaxError) as e:
             logger.error(f"Invalid XPath expression '{selector}': {e}")
             raise SelectionError(f"Invalid XPath expression: {e}")
 
@@ -251,8 +275,8 @@ class XPathStrategy(ExtractionStrategy):
             # Parse HTML
             tree = self._parse_html(content)
 
-            # Apply XPath expression
-            results = tree.xpath(selector)
+            # Apply compiled XPath expression
+            results = compile_xpath(selector)(tree)
 
             if not results:
                 logger.debug(f"No elements found for XPath: '{selector}'")
@@ -268,7 +292,7 @@ class XPathStrategy(ExtractionStrategy):
             logger.debug(f"Extracted {len(texts)} elements for XPath '{selector}'")
             return texts
 
-        except etree.XPathEvalError as e:
+        except (etree.XPathEvalError, etree.XPathSyntaxError) as e:
             logger.error(f"Invalid XPath expression '{selector}': {e}")
             raise SelectionError(f"Invalid XPath expression: {e}")
 
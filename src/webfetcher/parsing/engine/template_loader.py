@@ -1,10 +1,13 @@
 """Template loading and matching engine."""
 import yaml
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from urllib.parse import urlparse
 from .utils.validators import TemplateValidator
 
+# Trie node key holding the wildcard template matched at that suffix
+_WILDCARD = '*'
+
 
 class TemplateLoader:
     """Loads and manages parser templates."""
@@ -19,6 +22,8 @@ class TemplateLoader:
         self.template_dir = Path(template_dir)
         self.validator = TemplateValidator()
         self._templates = {}  # Cache loaded templates
+        # Domain index: (exact host -> template, reversed-label suffix trie for *.wildcards)
+        self._index: Tuple[Dict[str, Dict], Dict] = ({}, {})
         self._load_all_templates()
 
     def _load_all_templates(self):
@@ -26,6 +31,10 @@ class TemplateLoader:
         if not self.template_dir.exists():
             return
 
+        # Load into a fresh dict and swap at the end, so concurrent readers
+        # never observe a half-loaded template set during a reload
+        loaded = {}
+
         # Find all YAML files in templates directory
         for template_path in self.template_dir.rglob("*.yaml"):
             # Skip schema files (not actual templates)
@@ -33,11 +42,14 @@ class TemplateLoader:
                 continue
 
             try:
-                self._load_template_file(template_path)
+                self._load_template_file(template_path, loaded)
             except Exception as e:
                 print(f"Warning: Failed to load {template_path}: {e}")
 
-    def _load_template_file(self, path: Path):
+        self._templates = loaded
+        self._index = self._build_domain_index(loaded)
+
+    def _load_template_file(self, path: Path, target: Optional[Dict] = None):
         """Load a single template file."""
         with open(path, 'r', encoding='utf-8') as f:
             template = yaml.safe_load(f)
@@ -49,43 +61,101 @@ class TemplateLoader:
 
         # Store by name
         name = template.get('name', path.stem)
-        self._templates[name] = {
+        target = self._templates if target is None else target
+        target[name] = {
             'template': template,
             'path': str(path)
         }
 
+    @staticmethod
+    def _normalize_host(host: str) -> str:
+        """Lower-case a host and strip port and trailing dot."""
+        host = (host or '').strip().lower()
+        if host.startswith('['):  # IPv6 literal
+            return host.split(']')[0] + ']'
+        return host.split(':')[0].rstrip('.')
+
+    @staticmethod
+    def _precedence(name: str, template: Dict, path: str) -> Tuple:
+        """Sort key for templates claiming the same domain: higher priority wins, then name/path."""
+        try:
+            priority = float(template.get('priority', 0) or 0)
+        except (TypeError, ValueError):
+            priority = 0.0
+        return (-priority, name, path)
+
+    def _build_domain_index(self, templates: Dict[str, Dict]) -> Tuple[Dict[str, Dict], Dict]:
+        """
+        Build the domain index used by get_template_for_url.
+
+        Exact domains go into a dict keyed by host. "*.example.com" patterns go
+        into a trie keyed by reversed labels (com -> example) whose node holds
+        the wildcard template. When several templates claim the same domain,
+        the one with the highest priority (then name, then path) wins.
+        """
+        exact: Dict[str, Tuple] = {}
+        trie: Dict = {}
+
+        for name, info in templates.items():
+            template = info['template']
+            rank = self._precedence(name, template, info.get('path', ''))
+            for pattern in template.get('domains', []) or []:
+                if not isinstance(pattern, str):
+                    continue
+                pattern = pattern.strip().lower()
+                if not pattern or pattern == '*':  # Universal match handled by fallback
+                    continue
+                if pattern.startswith('*.'):
+                    node = trie
+                    for label in reversed(self._normalize_host(pattern[2:]).split('.')):
+                        node = node.setdefault(label, {})
+                    current = node.get(_WILDCARD)
+                    if current is None or rank < current[0]:
+                        node[_WILDCARD] = (rank, template)
+                else:
+                    host = self._normalize_host(pattern)
+                    current = exact.get(host)
+                    if current is None or rank < current[0]:
+                        exact[host] = (rank, template)
+
+        return ({host: entry[1] for host, entry in exact.items()}, trie)
+
     def get_template_for_url(self, url: str) -> Optional[Dict]:
         """
         Find the best matching template for a URL.
 
+        Lookup is O(host labels): an exact host match wins, otherwise the
+        longest matching "*.suffix" wildcard. A wildcard only matches on label
+        boundaries, so "*.news.cn" matches "www.news.cn" but not "evilnews.cn".
+
         Args:
             url: URL to match against templates
 
         Returns:
             Template dict or None
         """
-        # Parse URL to get domain
-        parsed = urlparse(url)
-        domain = parsed.netloc
-
-        # Try exact domain match first
-        for name, info in self._templates.items():
-            template = info['template']
-            domains = template.get('domains', [])
-
-            # Check exact match
-            if domain in domains:
-                return template
-
-            # Check wildcard match
-            for pattern in domains:
-                if pattern == '*':  # Universal match
-                    continue
-                if pattern.startswith('*.'):
-                    # Wildcard subdomain match
-                    base = pattern[2:]  # Remove *.
-                    if domain.endswith(base):
-                        return template
+        # Parse URL to get host
+        host = self._normalize_host(urlparse(url).netloc.rsplit('@', 1)[-1])
+        exact, trie = self._index
+
+        # Exact host match first
+        template = exact.get(host)
+        if template is not None:
+            return template
+
+        # Most specific wildcard: walk reversed labels, keep the deepest hit
+        # that still leaves at least one label for the "*" to match
+        labels = host.split('.') if host else []
+        node = trie
+        best = None
+        for depth, label in enumerate(reversed(labels)):
+            node = node.get(label)
+            if node is None:
+                break
+            if _WILDCARD in node and depth < len(labels) - 1:
+                best = node[_WILDCARD][1]
+        if best is not None:
+            return best
 
         # Fallback to generic template
         return self.get_template_by_name('Generic Web Template')
@@ -98,3 +168,8 @@ class TemplateLoader:
     def list_templates(self) -> List[str]:
         """List all loaded template names."""
         return list(self._templates.keys())
+
+    def iter_templates(self):
+        """Iterate over (name, template) pairs of all loaded templates."""
+        for name, info in list(self._templates.items()):
+            yield name, info['template']
@@ -5,7 +5,7 @@ from web pages. It integrates with the TemplateLoader to match URLs to templates
 and extract structured data based on template rules.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 import html2text
 from lxml import etree
 from .base_parser import (
@@ -16,7 +16,9 @@ from .base_parser import (
     TemplateNotFoundError
 )
 from .template_loader import TemplateLoader
-from .strategies import CSSStrategy, XPathStrategy, TextPatternStrategy
+from .parsed_document import ParsedDocument
+from .strategies import CSSStrategy, XPathStrategy, TextPatternStrategy, compile_css_selector
+from webfetcher.parsing.budget import ParseBudgetExceeded, check_parse_budget, parse_budget
 
 
 class TemplateParser(BaseParser):
@@ -38,16 +40,18 @@ class TemplateParser(BaseParser):
     Attributes:
         template_loader: TemplateLoader instance for template management
         current_template: Currently active template (None until parse is called)
-        template_cache: Cache of loaded templates by URL pattern
     """
 
-    def __init__(self, template_dir: Optional[str] = None):
+    def __init__(self, template_dir: Optional[str] = None,
+                 template_loader: Optional[TemplateLoader] = None):
         """
         Initialize template parser.
 
         Args:
             template_dir: Optional directory path for templates.
                          If None, uses default location (parsers/templates)
+            template_loader: Optional pre-built TemplateLoader to share
+                             (e.g. from TemplateRegistry); skips loading
 
         Raises:
             ParserError: If template loader initialization fails
@@ -58,15 +62,14 @@ class TemplateParser(BaseParser):
         import logging
         self.logger = logging.getLogger(__name__)
 
-        # Initialize template loader
+        # Initialize template loader (reuse a shared one when provided)
         try:
-            self.template_loader = TemplateLoader(template_dir)
+            self.template_loader = template_loader or TemplateLoader(template_dir)
         except Exception as e:
             raise ParserError(f"Failed to initialize template loader: {e}")
 
-        # Current template and cache
+        # Current template
         self.current_template: Optional[Dict[str, Any]] = None
-        self.template_cache: Dict[str, Dict[str, Any]] = {}
 
         # Initialize extraction strategies
         self.strategies = {
@@ -85,8 +88,9 @@ class TemplateParser(BaseParser):
         """
         Get matching template for URL.
 
-        This method finds and caches the best matching template for the given URL.
-        It uses the TemplateLoader's matching logic and caches results.
+        This method finds the best matching template for the given URL using
+        the TemplateLoader's host index. The lookup is cheap enough that results
+        are not cached per URL, which would grow without bound on a shared parser.
 
         Args:
             url: URL to find template for
@@ -97,18 +101,11 @@ class TemplateParser(BaseParser):
         Raises:
             TemplateNotFoundError: If no suitable template is found
         """
-        # Check cache first
-        if url in self.template_cache:
-            return self.template_cache[url]
-
-        # Find template
         template = self.template_loader.get_template_for_url(url)
 
         if template is None:
             raise TemplateNotFoundError(f"No template found for URL: {url}")
 
-        # Cache and return
-        self.template_cache[url] = template
         return template
 
     def _detect_strategy(self, selector: str) -> str:
@@ -174,7 +171,7 @@ class TemplateParser(BaseParser):
 
         return selectors
 
-    def _extract_field(self, content: str, field_config: Any) -> Optional[str]:
+    def _extract_field(self, content: Union[str, ParsedDocument], field_config: Any) -> Optional[str]:
         """
         Extract a field using configured selectors with fallback support.
 
@@ -193,6 +190,7 @@ class TemplateParser(BaseParser):
         # Process list of dicts with full config (including post_process)
         if isinstance(field_config, list):
             for item in field_config:
+                check_parse_budget()
                 if isinstance(item, dict):
                     selector = item.get('selector', '').strip()
                     strategy_type = item.get('strategy', 'css')
@@ -236,6 +234,7 @@ class TemplateParser(BaseParser):
 
             # Try each selector in order until one succeeds
             for selector, strategy_type in selectors:
+                check_parse_budget()
                 try:
                     # Auto-append @content for meta tags if not specified
                     if selector.startswith('meta[') and '@' not in selector:
@@ -332,6 +331,13 @@ class TemplateParser(BaseParser):
         3. Build structured result
         4. Return ParseResult
 
+        The page is wrapped in a ParsedDocument once, so every selector and
+        fallback shares the same BeautifulSoup/lxml trees. The number of
+        parses avoided is reported in metadata['dom_parses_avoided'].
+
+        Extraction runs inside the per-page parse budget (opened here unless
+        the caller already opened one) and checks it between selectors.
+
         Args:
             content: HTML content to parse
             url: Source URL of content
@@ -342,7 +348,13 @@ class TemplateParser(BaseParser):
         Raises:
             ExtractionError: If content extraction fails
             TemplateNotFoundError: If no template is found
+            ParseBudgetExceeded: If the page exceeds its parse budget
         """
+        with parse_budget():
+            return self._parse(content, url)
+
+    def _parse(self, content: str, url: str) -> ParseResult:
+        """parse() body, run inside the page's parse budget"""
         try:
             # Save URL for media URL normalization
             self.current_url = url
@@ -356,15 +368,25 @@ class TemplateParser(BaseParser):
                 template_name=self.current_template.get('name', 'Unknown')
             )
 
+            # Parse once, share the DOM across all strategies and selectors
+            doc = ParsedDocument(content)
+
             # Extract content using template
             # NOTE: This is Phase 2.1 framework - actual extraction in Phase 2.2
-            result.title = self._extract_title(content, url)
-            result.content = self._extract_content(content, url)
-            result.metadata = self._extract_metadata(content, url)
+            result.title = self._extract_title(doc, url)
+            check_parse_budget()
+            result.content = self._extract_content(doc, url)
+            check_parse_budget()
+            result.metadata = self._extract_metadata(doc, url)
+            result.metadata['dom_parses'] = doc.parses
+            result.metadata['dom_parses_avoided'] = doc.parses_avoided
 
             result.success = True
             return result
 
+        except ParseBudgetExceeded:
+            raise
+
         except TemplateNotFoundError as e:
             # No template found - return error result
             return ParseResult(
@@ -381,7 +403,7 @@ class TemplateParser(BaseParser):
                 parser_name="TemplateParser"
             )
 
-    def _extract_title(self, content: str, url: str) -> str:
+    def _extract_title(self, content: Union[str, ParsedDocument], url: str) -> str:
         """
         Extract title from content using template rules.
 
@@ -411,7 +433,7 @@ class TemplateParser(BaseParser):
 
         return title or ""
 
-    def _extract_content(self, content: str, url: str) -> str:
+    def _extract_content(self, content: Union[str, ParsedDocument], url: str) -> str:
         """
         Extract main content from HTML using template rules.
 
@@ -474,7 +496,7 @@ class TemplateParser(BaseParser):
                     try:
                         # Currently only support CSS selector strategy for removal
                         if strategy == 'css':
-                            elements_to_remove = soup.select(selector)
+                            elements_to_remove = compile_css_selector(selector).select(soup)
                             for element in elements_to_remove:
                                 element.decompose()
                             if elements_to_remove:
@@ -542,6 +564,7 @@ class TemplateParser(BaseParser):
             self.logger.debug(f"HTML pre-processing failed: {e}, continuing with original HTML")
 
         # Convert HTML to Markdown
+        check_parse_budget()
         try:
             # Note: Google Search Template is handled earlier before post-processing
             markdown = self.html_converter.handle(html_content)
@@ -565,7 +588,7 @@ class TemplateParser(BaseParser):
             # Return raw HTML as fallback
             return html_content
 
-    def _extract_html(self, content: str, selector_config: Any) -> Optional[str]:
+    def _extract_html(self, content: Union[str, ParsedDocument], selector_config: Any) -> Optional[str]:
         """
         Extract HTML content (not text) from elements.
 
@@ -581,14 +604,14 @@ class TemplateParser(BaseParser):
         Returns:
             Optional[str]: Extracted HTML or None if not found
         """
-        from bs4 import BeautifulSoup
-
         # Normalize configuration to list of (selector, strategy) tuples
         selectors = self._normalize_selector_config(selector_config)
 
         if not selectors:
             return None
 
+        doc = content if isinstance(content, ParsedDocument) else ParsedDocument(content)
+
         for selector, strategy_type in selectors:
             try:
                 # Currently only CSS strategy is supported for HTML extraction
@@ -597,11 +620,8 @@ class TemplateParser(BaseParser):
                     self.logger.debug(f"HTML extraction only supports CSS selectors, got: {strategy_type}")
                     continue
 
-                # Parse HTML
-                soup = BeautifulSoup(content, 'html.parser')
-
-                # Find element using CSS selector
-                element = soup.select_one(selector)
+                # Find element using CSS selector on the shared soup
+                element = compile_css_selector(selector).select_one(doc.soup)
 
                 if element:
                     # Return inner HTML (all children as HTML string)
@@ -613,7 +633,7 @@ class TemplateParser(BaseParser):
 
         return None
 
-    def _extract_list(self, content: str, field_config: Any) -> List[str]:
+    def _extract_list(self, content: Union[str, ParsedDocument], field_config: Any) -> List[str]:
         """
         Extract multiple values (e.g., images, links) using configured selectors.
 
@@ -624,9 +644,6 @@ class TemplateParser(BaseParser):
         Returns:
             List[str]: List of extracted values (validated URLs or text)
         """
-        from bs4 import BeautifulSoup
-        import re
-
         results = []
 
         # Parse field_config directly to preserve attribute information
@@ -659,27 +676,17 @@ class TemplateParser(BaseParser):
                 'validation': {}
             })
 
-        # Preprocess HTML once before all extractions
+        # Preprocess HTML once per document, shared by images/videos and all selectors
+        doc = content if isinstance(content, ParsedDocument) else ParsedDocument(content)
         try:
-            soup = BeautifulSoup(content, 'html.parser')
-
-            # Remove script, style, and noscript tags (prevent JS code extraction)
-            for tag in soup.find_all(['script', 'style', 'noscript']):
-                tag.decompose()
-
-            # Convert data-src to src for lazy-loaded images
-            for img in soup.find_all('img'):
-                data_src = img.get('data-src')
-                if data_src and not img.get('src'):
-                    img['src'] = data_src
-
-            preprocessed_content = str(soup)
+            soup = doc.derived('list_preprocessed', self._preprocess_list_soup)
         except Exception as e:
             self.logger.debug(f"HTML preprocessing failed in _extract_list: {e}")
-            preprocessed_content = content
+            soup = doc.soup
 
         # Process each configuration item
         for config in config_items:
+            check_parse_budget()
             selector = config.get('selector')
             attribute = config.get('attribute')
             validation = config.get('validation', {})
@@ -688,11 +695,8 @@ class TemplateParser(BaseParser):
                 continue
 
             try:
-                # Parse preprocessed HTML
-                soup = BeautifulSoup(preprocessed_content, 'html.parser')
-
                 # Find all matching elements
-                elements = soup.select(selector)
+                elements = compile_css_selector(selector).select(soup)
 
                 for element in elements:
                     value = None
@@ -725,6 +729,30 @@ class TemplateParser(BaseParser):
 
         return results
 
+    def _preprocess_list_soup(self, doc: ParsedDocument):
+        """
+        Build a cleaned soup for list extraction (scripts removed, lazy images resolved).
+
+        Args:
+            doc: Parsed document
+
+        Returns:
+            BeautifulSoup: Private mutable soup for list extraction
+        """
+        soup = doc.new_soup()
+
+        # Remove script, style, and noscript tags (prevent JS code extraction)
+        for tag in soup.find_all(['script', 'style', 'noscript']):
+            tag.decompose()
+
+        # Convert data-src to src for lazy-loaded images
+        for img in soup.find_all('img'):
+            data_src = img.get('data-src')
+            if data_src and not img.get('src'):
+                img['src'] = data_src
+
+        return soup
+
     def _should_validate_url(self, value: str) -> bool:
         """Check if value looks like a URL that needs validation."""
         if not value:
@@ -788,7 +816,7 @@ class TemplateParser(BaseParser):
 
         return True
 
-    def _extract_metadata(self, content: str, url: str) -> Dict[str, Any]:
+    def _extract_metadata(self, content: Union[str, ParsedDocument], url: str) -> Dict[str, Any]:
         """
         Extract metadata using template rules.
 
@@ -923,8 +951,7 @@ class TemplateParser(BaseParser):
         Reload all templates from disk.
 
         This is useful when templates are updated during runtime.
-        Clears the template cache and reinitializes the loader.
+        Resets the current template and reinitializes the loader.
         """
-        self.template_cache.clear()
         self.current_template = None
         self.template_loader._load_all_templates()
@@ -0,0 +1,258 @@
+"""Process-wide template registry.
+
+This module keeps parsed templates and compiled selectors alive across parse
+calls. Templates are loaded and validated once per template directory, their
+CSS/XPath selectors are compiled up front, and the set is reloaded only when a
+YAML file under the directory is added, removed or modified (mtime polling).
+
+Callers get a per-thread TemplateParser that shares the registry's loader, so
+no YAML I/O or validation happens on the per-page path.
+
+Example:
+    from webfetcher.parsing.engine.template_registry import get_template_parser
+    parser = get_template_parser(template_dir)
+    result = parser.parse(html, url)
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+import hashlib
+import logging
+import threading
+import time
+
+from .template_loader import TemplateLoader
+from .template_parser import TemplateParser
+from .strategies import compile_css_selector, compile_xpath
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between filesystem change checks
+DEFAULT_CHECK_INTERVAL = 2.0
+
+DEFAULT_TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+
+def _iter_selectors(config: Any) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (selector, strategy) pairs from any template selector config.
+
+    Mirrors the formats accepted by TemplateParser: comma-separated strings,
+    lists of dicts/strings, single dicts and nested field maps (metadata).
+    """
+    if isinstance(config, str):
+        for part in config.split(','):
+            selector = part.strip()
+            if selector:
+                yield selector, 'xpath' if selector.startswith('/') else 'css'
+    elif isinstance(config, list):
+        for item in config:
+            if isinstance(item, dict):
+                selector = str(item.get('selector', '')).strip()
+                if selector:
+                    yield selector, item.get('strategy', 'css')
+            elif isinstance(item, str) and item.strip():
+                selector = item.strip()
+                yield selector, 'xpath' if selector.startswith('/') else 'css'
+    elif isinstance(config, dict):
+        if 'selector' in config:
+            selector = str(config.get('selector', '')).strip()
+            if selector:
+                yield selector, config.get('strategy', 'css')
+        else:
+            for value in config.values():
+                yield from _iter_selectors(value)
+
+
+def _template_signature(template_dir: Path) -> tuple:
+    """(relative path, mtime_ns, size) for every YAML file under template_dir, sorted."""
+    if not template_dir.exists():
+        return ()
+    entries = []
+    for path in template_dir.rglob("*.yaml"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((path.relative_to(template_dir).as_posix(), stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+def template_fingerprint(template_dir: Optional[str] = None) -> str:
+    """
+    Digest of the template files' names, mtimes and sizes.
+
+    Changes whenever a YAML file is added, removed or modified. Unlike
+    TemplateRegistry.generation it is comparable across processes, so it can
+    invalidate parse results stored on disk (e.g. incremental crawl fragments).
+    Templates are not loaded.
+
+    Args:
+        template_dir: Template directory (default: engine/templates)
+
+    Returns:
+        str: 16 hex digits
+    """
+    signature = _template_signature(Path(template_dir) if template_dir else DEFAULT_TEMPLATE_DIR)
+    return hashlib.sha256(repr(signature).encode('utf-8')).hexdigest()[:16]
+
+
+class TemplateRegistry:
+    """
+    Loads templates once per directory and reloads them on file changes.
+
+    Attributes:
+        template_dir: Template directory being served
+        loader: Current TemplateLoader (replaced atomically on reload)
+        generation: Incremented on every reload
+    """
+
+    def __init__(self, template_dir: Optional[str] = None,
+                 check_interval: float = DEFAULT_CHECK_INTERVAL):
+        """
+        Initialize registry and load templates.
+
+        Args:
+            template_dir: Template directory (default: engine/templates)
+            check_interval: Minimum seconds between mtime checks
+        """
+        self.template_dir = Path(template_dir) if template_dir else DEFAULT_TEMPLATE_DIR
+        self.check_interval = check_interval
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_check = 0.0
+        self._signature = None
+        self.loader: Optional[TemplateLoader] = None
+        self._stats = {'loads': 0, 'checks': 0, 'compiled_selectors': 0}
+        self._load()
+
+    def _snapshot(self) -> tuple:
+        """Cheap change signature: (path, mtime_ns, size) for every YAML file."""
+        return _template_signature(self.template_dir)
+
+    def _compile_selectors(self, loader: TemplateLoader) -> int:
+        """Compile every CSS/XPath selector of the loaded templates up front."""
+        compiled = 0
+        for name, template in loader.iter_templates():
+            configs = [template.get('selectors', {})]
+            post_processing = template.get('post_processing') or {}
+            if isinstance(post_processing, dict):
+                configs.append(post_processing.get('remove_elements', []))
+            for config in configs:
+                for selector, strategy in _iter_selectors(config):
+                    try:
+                        if strategy == 'xpath':
+                            compile_xpath(selector)
+                        elif strategy == 'css':
+                            compile_css_selector(selector.split('@', 1)[0].strip())
+                        else:
+                            continue
+                        compiled += 1
+                    except Exception as e:
+                        logger.debug(f"Template '{name}': cannot precompile {strategy} selector '{selector}': {e}")
+        return compiled
+
+    def _load(self):
+        """(Re)load templates from disk and swap them in atomically."""
+        signature = self._snapshot()
+        loader = TemplateLoader(str(self.template_dir))
+        compiled = self._compile_selectors(loader)
+        self.loader = loader
+        self._signature = signature
+        self._last_check = time.monotonic()
+        self.generation += 1
+        self._stats['loads'] += 1
+        self._stats['compiled_selectors'] = compiled
+        logger.debug(f"Template registry loaded {len(loader.list_templates())} templates "
+                     f"({compiled} selectors compiled) from {self.template_dir}")
+
+    def check_for_changes(self, force: bool = False) -> bool:
+        """
+        Reload templates if any YAML file changed since the last load.
+
+        Args:
+            force: Check immediately, ignoring check_interval
+
+        Returns:
+            bool: True if templates were reloaded
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        with self._lock:
+            if not force and now - self._last_check < self.check_interval:
+                return False
+            self._stats['checks'] += 1
+            self._last_check = now
+            if self._snapshot() == self._signature:
+                return False
+            logger.info(f"Template files changed, reloading templates from {self.template_dir}")
+            self._load()
+            return True
+
+    def get_parser(self) -> TemplateParser:
+        """
+        Get this thread's TemplateParser bound to the current templates.
+
+        Parsers keep per-call state (current template/url), so one is kept
+        per thread; all of them share the registry's loader.
+        """
+        self.check_for_changes()
+        parser = getattr(self._local, 'parser', None)
+        if parser is None:
+            parser = TemplateParser(template_loader=self.loader)
+            self._local.parser = parser
+            self._local.generation = self.generation
+        elif self._local.generation != self.generation:
+            parser.template_loader = self.loader
+            parser.current_template = None
+            self._local.generation = self.generation
+        return parser
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics."""
+        return {
+            **self._stats,
+            'generation': self.generation,
+            'templates': len(self.loader.list_templates()) if self.loader else 0,
+        }
+
+
+_registries: Dict[str, TemplateRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_template_registry(template_dir: Optional[str] = None) -> TemplateRegistry:
+    """
+    Get the process-wide registry for a template directory.
+
+    Args:
+        template_dir: Template directory (default: engine/templates)
+
+    Returns:
+        TemplateRegistry: Shared registry instance
+    """
+    key = str(Path(template_dir).resolve()) if template_dir else str(DEFAULT_TEMPLATE_DIR.resolve())
+    registry = _registries.get(key)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.get(key)
+            if registry is None:
+                registry = TemplateRegistry(key)
+                _registries[key] = registry
+    return registry
+
+
+def get_template_parser(template_dir: Optional[str] = None) -> TemplateParser:
+    """
+    Get a ready TemplateParser backed by the shared registry.
+
+    Args:
+        template_dir: Template directory (default: engine/templates)
+
+    Returns:
+        TemplateParser: Per-thread parser sharing cached templates
+    """
+    return get_template_registry(template_dir).get_parser()
@@ -21,11 +21,12 @@ from typing import Optional, List, Dict, Set, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 from html.parser import HTMLParser
-import signal
 import time
 
 # Task-003 Phase 4: Import URL formatter utilities for consistent URL formatting
 from webfetcher.utils.url_formatter import format_url_as_markdown, replace_urls_with_markdown
+from webfetcher.parsing.budget import ParseBudgetExceeded, check_parse_budget
+from webfetcher.utils.environment import getenv
 
 # BeautifulSoup import and availability flag
 try:
@@ -447,23 +448,6 @@ def extract_list_content(html: str, base_url: str) -> tuple[str, List[ListItem]]
     Returns:
         tuple: (页面标题, 列表项列表)
     """
-    # 性能保护机制：内容大小和复杂度检测
-    html_size = len(html)
-    if html_size > 5 * 1024 * 1024:  # 超过5MB的HTML
-        print(f"Warning: Large HTML content ({html_size // 1024}KB), using simplified processing")
-    
-    # 表格复杂度检测
-    table_count = len(re.findall(r'<table[^>]*>', html, re.I))
-    tr_count = len(re.findall(r'<tr[^>]*>', html, re.I))
-    td_count = len(re.findall(r'<td[^>]*>', html, re.I))
-    
-    # 设置处理超时
-    def timeout_handler(_, __):
-        raise TimeoutError("List content extraction timeout after 5 seconds")
-    
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(5)  # 5秒超时
-    
     try:
         # 1. 提取页面标题
         page_title = extract_meta(html, 'og:title') or extract_meta(html, 'twitter:title')
@@ -476,218 +460,14 @@ def extract_list_content(html: str, base_url: str) -> tuple[str, List[ListItem]]
         # 检查是否为人民网，使用特殊处理策略
         is_people_site = 'cpc.people.com.cn' in base_url or 'people.com.cn' in base_url
         
-        # 表格数量过多时使用简化策略
-        if td_count > 500:
-            print(f"Warning: Too many table cells ({td_count}), limiting to first 500")
-            # 截断HTML以减少处理量
-            html = html[:len(html)//2] if len(html) > 1024*1024 else html
-        
-        # 2. 定义多种列表项提取模式，针对不同网站结构
-        list_patterns = []
-        
-        # 对于人民网使用优化的分步处理策略
-        if is_people_site:
-            list_patterns.append({
-                'container': r'<table[^>]*>(.*?)</table>',
-                'item': 'people_table_optimized',  # 标记使用优化处理
-                'title_link': None,
-                'date': r'(\d{4}年\d{1,2}月\d{1,2}日)',
-                'special': 'people_table_optimized'
-            })
-        else:
-            # 人民网政治局会议表格专用模式（原始版本，仅用于非人民网站点）
-            list_patterns.append({
-                'container': r'<table[^>]*>(.*?)</table>',
-                'item': r'<tr[^>]*>.*?<td[^>]*>.*?</td>.*?<td[^>]*>.*?<center>(.*?)</center>.*?</td>.*?<td[^>]*>(.*?)</td>.*?</tr>',
-                'title_link': None,  # 特殊处理
-                'date': r'(\d{4}年\d{1,2}月\d{1,2}日)',
-                'special': 'people_table'
-            })
-        
-        # 添加通用模式
-        list_patterns.extend([
-            # 通用表格形式的列表
-            {
-                'container': r'<table[^>]*>(.*?)</table>',
-                'item': r'<tr[^>]*>(.*?)</tr>',
-                'title_link': r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>',
-                'date': r'(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})'
-            },
-            # 人民网等新闻网站的典型结构
-            {
-                'container': r'<ul[^>]*class=["\'][^"\']*list[^"\']*["\'][^>]*>(.*?)</ul>',
-                'item': r'<li[^>]*>(.*?)</li>',
-                'title_link': r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>',
-                'date': r'(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})'
-            },
-            # 带有div包装的列表项
-            {
-                'container': r'<div[^>]*class=["\'][^"\']*list[^"\']*["\'][^>]*>(.*?)</div>',
-                'item': r'<div[^>]*class=["\'][^"\']*item[^"\']*["\'][^>]*>(.*?)</div>',
-                'title_link': r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>',
-                'date': r'(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})'
-            },
-            # 通用链接提取（作为后备方案）
-            {
-                'container': r'<body[^>]*>(.*?)</body>',
-                'item': r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>',
-                'title_link': None,  # 已在item中处理
-                'date': r'(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})'
-            }
-        ])
-        
-        list_items = []
-        
-        # 3. 尝试每种模式提取列表项
-        for pattern_config in list_patterns:
-            container_match = re.search(pattern_config['container'], html, re.I | re.S)
-            if container_match:
-                container_content = container_match.group(1)
-                
-                # 优化的人民网表格处理
-                if pattern_config.get('special') == 'people_table_optimized':
-                    # 分步处理，避免复杂正则表达式的灾难性回溯
-                    # 1. 先提取所有表格行
-                    rows = re.findall(r'<tr[^>]*>(.*?)</tr>', container_content, re.I | re.S)
-                    row_count = 0
-                    for row_html in rows:
-                        row_count += 1
-                        if row_count > 50:  # 限制处理行数
-                            print(f"Warning: Too many table rows, stopping at {row_count}")
-                            break
-                            
-                        # 2. 从每行中提取单元格
-                        cells = re.findall(r'<td[^>]*>(.*?)</td>', row_html, re.I | re.S)
-                        if len(cells) >= 3:  # 确保有足够的单元格
-                            # 3. 分别处理日期和内容单元格
-                            for i, cell in enumerate(cells):
-                                if i >= 2:  # 只处理前3个单元格
-                                    break
-                                # 寻找包含center标签的单元格（通常是日期）
-                                center_match = re.search(r'<center[^>]*>(.*?)</center>', cell, re.I | re.S)
-                                if center_match:
-                                    date_text = center_match.group(1)
-                                    date = re.sub(r'<[^>]+>', '', date_text).strip()
-                                    date = ihtml.unescape(date)
-                                    
-                                    # 从下一个单元格中提取内容
-                                    if i + 1 < len(cells):
-                                        content_cell = cells[i + 1]
-                                        link_match = re.search(r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>', content_cell, re.I | re.S)
-                                        if link_match:
-                                            href = link_match.group(1)
-                                            link_text = re.sub(r'<[^>]+>', '', link_match.group(2)).strip()
-                                            
-                                            # 构建标题
-                                            title = f"中央政治局会议 {date}"
-                                            
-                                            if title and href:
-                                                full_url = resolve_url_with_context(base_url, href)
-                                                list_items.append(ListItem(
-                                                    title=title,
-                                                    url=full_url,
-                                                    date=date,
-                                                    summary=None,
-                                                    index=len(list_items) + 1
-                                                ))
-                                    break  # 找到一个有效的日期单元格后跳出
-                
-                # 特殊处理人民网表格格式（原始版本）
-                elif pattern_config.get('special') == 'people_table':
-                    # 人民网政治局会议特殊表格处理
-                    items = re.findall(pattern_config['item'], container_content, re.I | re.S)
-                    for date_text, content_html in items:
-                        # 清理日期
-                        date = re.sub(r'<[^>]+>', '', date_text).strip()
-                        date = ihtml.unescape(date)
-                        
-                        # 提取链接
-                        link_match = re.search(r'<a[^>]*href=["\']([^"\']+)["\'][^>]*[^>]*>(.*?)</a>', content_html, re.I | re.S)
-                        if link_match:
-                            href = link_match.group(1)
-                            link_text = re.sub(r'<[^>]+>', '', link_match.group(2)).strip()
-                        else:
-                            # 如果没有链接，跳过这项
-                            continue
-                        
-                        # 清理内容作为摘要
-                        summary_text = re.sub(r'<a[^>]*>.*?</a>', '', content_html, flags=re.I | re.S)
-                        summary_text = re.sub(r'<[^>]+>', ' ', summary_text)
-                        summary_text = ihtml.unescape(summary_text).strip()
-                        summary = summary_text if len(summary_text) > 10 else None
-                        
-                        # 构建标题：会议名称 + 日期
-                        title = f"中央政治局会议 {date}"
-                        
-                        if title and href:
-                            full_url = resolve_url_with_context(base_url, href)
-                            list_items.append(ListItem(
-                                title=title,
-                                url=full_url,
-                                date=date,
-                                summary=summary,
-                                index=len(list_items) + 1
-                            ))
-                
-                elif pattern_config['title_link']:
-                    # 常规模式：先提取item，再提取链接
-                    items = re.findall(pattern_config['item'], container_content, re.I | re.S)
-                    for item_html in items:
-                        link_match = re.search(pattern_config['title_link'], item_html, re.I | re.S)
-                        if link_match:
-                            href = link_match.group(1)
-                            title_html = link_match.group(2)
-                            
-                            # 清理标题
-                            title = re.sub(r'<[^>]+>', '', title_html).strip()
-                            title = ihtml.unescape(title)
-                            
-                            # 提取日期
-                            date_match = re.search(pattern_config['date'], item_html)
-                            date = date_match.group(1) if date_match else None
-                            
-                            # 提取摘要（链接外的其他文本）
-                            summary_text = re.sub(r'<a[^>]*>.*?</a>', '', item_html, flags=re.I | re.S)
-                            summary_text = re.sub(r'<[^>]+>', ' ', summary_text)
-                            summary_text = ihtml.unescape(summary_text).strip()
-                            summary = summary_text if len(summary_text) > 10 else None
-                            
-                            if title and len(title) > 3:  # 过滤过短的标题
-                                full_url = resolve_url_with_context(base_url, href)
-                                list_items.append(ListItem(
-                                    title=title,
-                                    url=full_url,
-                                    date=date,
-                                    summary=summary,
-                                    index=len(list_items) + 1
-                                ))
-                else:
-                    # 直接链接模式：item就是链接
-                    items = re.findall(pattern_config['item'], container_content, re.I | re.S)
-                    for href, title_html in items:
-                        title = re.sub(r'<[^>]+>', '', title_html).strip()
-                        title = ihtml.unescape(title)
-                        
-                        # 过滤导航和无关链接
-                        if (len(title) > 5 and 
-                            not any(skip_word in title.lower() for skip_word in 
-                                   ['首页', '返回', '登录', '注册', 'home', 'back', 'login', 'register', 
-                                    '更多>>', '更多', '上一页', '下一页', 'prev', 'next'])):
-                            
-                            full_url = resolve_url_with_context(base_url, href)
-                            list_items.append(ListItem(
-                                title=title,
-                                url=full_url,
-                                date=None,
-                                summary=None,
-                                index=len(list_items) + 1
-                            ))
-        
-            # 如果找到足够的列表项，就停止尝试其他模式
-            if len(list_items) >= 5:
-                break
+        # 2. 单次 lxml 解析，依次尝试表格、ul.list、div.list、全部链接，提取到足够项即停止
+        from webfetcher.parsing.page_analysis import extract_list_candidates
+        list_items = [
+            ListItem(title=title, url=resolve_url_with_context(base_url, href), date=date, summary=summary)
+            for title, href, date, summary in extract_list_candidates(html, people_table_optimized=is_people_site)
+        ]
         
-        # 4. 去重和排序
+        # 3. 去重和排序
         seen_urls = set()
         unique_items = []
         for item in list_items:
@@ -705,15 +485,11 @@ def extract_list_content(html: str, base_url: str) -> tuple[str, List[ListItem]]
         
         return page_title, unique_items
         
-    except TimeoutError as e:
-        print(f"List extraction timed out: {e}")
-        return "页面处理超时", []
+    except ParseBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error during list extraction: {e}")
         return "列表页面", []
-    finally:
-        # 清理超时设置
-        signal.alarm(0)
 
 
 def normalize_media_url(u: str, base_url: str = None) -> str:
@@ -1128,7 +904,7 @@ def detect_page_type(html: str, url: Optional[str] = None, is_crawling: bool = F
     # Mode-aware detection: Skip detection in single-page mode
     if not is_crawling:
         # Check for emergency disable via environment variable
-        if os.environ.get('WF_FORCE_PAGE_DETECTION', '').lower() == 'true':
+        if getenv('WF_FORCE_PAGE_DETECTION', '').lower() == 'true':
             print("WF_FORCE_PAGE_DETECTION is set, proceeding with detection")
         else:
             print("Single-page mode: defaulting to ARTICLE type")
@@ -1143,99 +919,28 @@ def detect_page_type(html: str, url: Optional[str] = None, is_crawling: bool = F
             print(f"12371.cn article pattern detected: {url}")
             return PageType.ARTICLE
     
-    # 1. 提取所有链接
-    link_pattern = r'<a[^>]*href=["\']([^"\']+)["\'][^>]*>(.*?)</a>'
-    links = re.findall(link_pattern, html, re.I | re.S)
-    
-    # 2. 计算页面文本总量（去除HTML标签）
-    # 移除脚本和样式
-    clean_html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.I | re.S)
-    clean_html = re.sub(r'<style[^>]*>.*?</style>', '', clean_html, flags=re.I | re.S)
-    # 提取纯文本
-    text_content = re.sub(r'<[^>]+>', ' ', clean_html)
-    text_content = ihtml.unescape(text_content)
-    total_text_length = len(text_content.strip())
-    
-    # 3. 计算有效链接数量（排除导航、页脚等）
-    content_links = []
-    anchor_links = []  # 添加锚点链接列表
-    for href, link_text in links:
-        link_text_clean = re.sub(r'<[^>]+>', '', link_text).strip()
-        # 识别锚点链接
-        if href.startswith('#'):
-            anchor_links.append((href, link_text_clean))
-        # 过滤掉明显的导航链接（放宽条件）
-        elif (len(link_text_clean) > 2 and  # 降低最小长度要求
-            not any(nav_word in link_text_clean.lower() for nav_word in 
-                   ['首页', '返回', '登录', '注册', 'home', 'back', 'login', 'register']) and
-            not link_text_clean.lower() in ['更多', '更多>>']):  # 分别检查常见的短导航词
-            content_links.append((href, link_text_clean))
-    
-    # 4. 计算链接密度
-    link_density = len(content_links) / max(total_text_length, 1) * 1000  # 每1000字符的链接数
-    
-    # 5. 检测列表容器
-    list_containers = [
-        r'<ul[^>]*class=["\'][^"\']*list[^"\']*["\']',  # ul.list*
-        r'<ol[^>]*class=["\'][^"\']*list[^"\']*["\']',  # ol.list*
-        r'<div[^>]*class=["\'][^"\']*list[^"\']*["\']', # div.list*
-        r'<div[^>]*class=["\'][^"\']*index[^"\']*["\']', # div.index*
-        r'<div[^>]*class=["\'][^"\']*content-list[^"\']*["\']', # div.content-list*
-        r'<div[^>]*id=["\'][^"\']*list[^"\']*["\']',    # div#list*
-        r'<table[^>]*>.*?<tr[^>]*>.*?<td[^>]*>.*?</td>.*?<td[^>]*>.*?</td>.*?<td[^>]*>.*?</td>', # 三列表格
-    ]
-    
-    list_container_count = 0
-    for pattern in list_containers:
-        if re.search(pattern, html, re.I):
-            list_container_count += 1
-    
-    # 6. 检测重复链接模式（相似的链接文本长度和格式）
-    if len(content_links) >= 5:
-        link_lengths = [len(text) for _, text in content_links]
-        avg_length = sum(link_lengths) / len(link_lengths)
-        # 检查链接文本长度的一致性
-        similar_length_links = sum(1 for length in link_lengths 
-                                 if abs(length - avg_length) <= avg_length * 0.5)
-        pattern_consistency = similar_length_links / len(content_links)
-    else:
-        pattern_consistency = 0
-    
-    # 6.5. 锚点链接比例判定（解决章节导航误判问题）
-    all_links = links
-    if len(all_links) > 0:
-        anchor_ratio = len(anchor_links) / len(all_links)
-        
-        # 如果锚点链接占比超过30%，或者锚点链接数量>=10，很可能是文章页面的章节导航
-        if anchor_ratio > 0.3 or len(anchor_links) >= 10:
-            return PageType.ARTICLE
-        
-        # 如果有较多锚点链接（如章节导航），降低列表页判定权重
-        if len(anchor_links) >= 5:
-            # 减少有效链接计数，避免误判
-            content_links = content_links[:max(len(content_links)//2, 1)]
-    
-    # 7. 决策逻辑
-    # 强列表信号：
+    # 单次 lxml 解析提取特征：链接密度、列表容器、列数一致的表格（线性时间）
+    from webfetcher.parsing.page_analysis import analyze_page
+    features = analyze_page(html)
+
+    # 锚点链接比例判定（解决章节导航误判问题）
+    # 锚点链接占比超过30%或数量>=10，很可能是文章页面的章节导航
+    if features.is_section_navigation:
+        return PageType.ARTICLE
+
+    # 决策逻辑（锚点链接>=5时有效链接计数减半）：
     # - 高链接密度 (>1.5个链接/1000字符)
     # - 存在列表容器
     # - 链接模式一致性高 (>50%)
     # - 链接数量多 (>=5个)
-    
-    is_list_page = (
-        (link_density > 1.5 and len(content_links) >= 5) or  # 降低密度要求
-        (list_container_count >= 2) or  # 多个列表容器
-        (len(content_links) >= 8 and pattern_consistency > 0.5) or  # 降低一致性要求
-        (link_density > 1.0 and list_container_count >= 1 and len(content_links) >= 5) or  # 降低综合判断阈值
-        (list_container_count >= 1 and len(content_links) >= 10)  # 如果有列表容器且链接多，直接判定为列表
-    )
-    
+    is_list_page = features.is_list_page()
+
     # 调试信息（可选）
-    print(f"[DEBUG] Links - Total: {len(all_links)}, Content: {len(content_links)}, Anchor: {len(anchor_links)}")
-    print(f"Page type detection - Links: {len(content_links)}, "
-                 f"Density: {link_density:.2f}, "
-                 f"List containers: {list_container_count}, "
-                 f"Pattern consistency: {pattern_consistency:.2f}, "
+    print(f"[DEBUG] Links - Total: {features.total_links}, Content: {features.content_link_count}, Anchor: {features.anchor_links}")
+    print(f"Page type detection - Links: {features.content_link_count}, "
+                 f"Density: {features.link_density:.2f}, "
+                 f"List containers: {features.list_container_count}, "
+                 f"Pattern consistency: {features.pattern_consistency:.2f}, "
                  f"Result: {'LIST' if is_list_page else 'ARTICLE'}")
     
     return PageType.LIST_INDEX if is_list_page else PageType.ARTICLE
@@ -1334,6 +1039,7 @@ def generic_to_markdown(html: str, url: str, filter_level: str = 'safe', is_craw
                 title = ihtml.unescape(re.sub(r'<[^>]+>', '', m.group(1))).strip()
         title = title or 'Generic Article'
         
+        check_parse_budget()
         # Basic content extraction using modern selectors
         content = extract_from_modern_selectors(html)
         if not content:
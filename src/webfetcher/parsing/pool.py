@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Process-Pool Parse Stage
+多进程解析阶段
+
+HTML -> Markdown conversion (BeautifulSoup + html2text in TemplateParser) is
+pure-Python CPU work, so crawl threads cannot run it in parallel under the
+GIL. ParsePool moves it to a ``ProcessPoolExecutor`` whose workers preload
+the template registry once, while the crawler keeps fetching on threads.
+HTML 转 Markdown 是纯 Python 的 CPU 密集型工作，线程无法并行。ParsePool 将其
+交给进程池执行（工作进程启动时预加载模板注册表），抓取线程同时继续网络 I/O。
+
+With ``workers <= 1`` (single-page runs, single-core machines) tasks run
+in-process and return already-completed futures, so callers use one code
+path either way. A broken pool (worker crash, unpicklable task) degrades to
+in-process parsing instead of failing the crawl.
+``workers <= 1`` 时在当前进程内执行并返回已完成的 Future；进程池异常时自动
+退回进程内解析。
+
+Workers are started with the ``spawn`` method: the crawler is multi-threaded
+and forking a threaded process is unsafe.
+
+multiprocessing and the process executor are imported when the first pool
+starts, so importing this module (as every CLI run does) stays cheap.
+"""
+
+import os
+import logging
+import importlib
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Sequence
+
+from webfetcher.parsing.budget import configure_parse_budget, get_parse_budget
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARSE_WORKERS = min(8, os.cpu_count() or 1)  # 默认解析进程数
+
+
+def _init_worker(log_level: int, preload_modules: Sequence[str], parse_budget_seconds: float):
+    """Parse worker initializer: logging level, parse budget, module imports and template registry preload"""
+    logging.basicConfig(level=log_level)
+    configure_parse_budget(parse_budget_seconds)
+    for module in preload_modules:
+        importlib.import_module(module)
+    try:
+        from webfetcher.parsing.engine.template_registry import get_template_registry
+        get_template_registry().get_parser()
+    except Exception as e:
+        # Same as in-process: parsers fall back to the legacy path without templates
+        logger.debug(f"Template registry preload failed in parse worker: {e}")
+
+
+class ParsePool:
+    """
+    解析进程池（workers <= 1 时退化为进程内执行）
+
+    Example:
+        with ParsePool(workers=8, preload_modules=('webfetcher.core',)) as pool:
+            future = pool.submit(parse_func, html, url)
+            date, md, metadata = pool.result(future)
+    """
+
+    def __init__(self, workers: Optional[int] = None, preload_modules: Sequence[str] = ()):
+        """
+        Args:
+            workers: 解析进程数（None = DEFAULT_PARSE_WORKERS，<= 1 = 进程内解析）
+            preload_modules: 工作进程启动时预先导入的模块（任务函数所在模块）
+        """
+        self.workers = DEFAULT_PARSE_WORKERS if workers is None else max(0, int(workers))
+        self.preload_modules = tuple(preload_modules)
+        self._executor = None  # ProcessPoolExecutor, started on first parallel submit
+        self._broken = False
+        self.stats = {'submitted': 0, 'in_process': 0, 'fallbacks': 0}
+
+    @property
+    def parallel(self) -> bool:
+        """是否使用多进程"""
+        return self.workers > 1 and not self._broken
+
+    def _get_executor(self):
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(logging.getLogger().getEffectiveLevel(), self.preload_modules, get_parse_budget()),
+            )
+            logger.info(f"Parse pool started with {self.workers} worker processes")
+        return self._executor
+
+    @staticmethod
+    def _run_in_process(fn: Callable, args: tuple) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        提交解析任务
+
+        Args:
+            fn: 模块级函数（需可pickle）
+            *args: 参数（需可pickle）
+
+        Returns:
+            Future；进程内模式下为已完成的 Future
+        """
+        self.stats['submitted'] += 1
+        if self.parallel:
+            from concurrent.futures.process import BrokenProcessPool
+            try:
+                future = self._get_executor().submit(fn, *args)
+                future._wf_task = (fn, args)  # 进程池失败时在进程内重试
+                return future
+            except (BrokenProcessPool, OSError) as e:
+                self._mark_broken(e)
+        self.stats['in_process'] += 1
+        return self._run_in_process(fn, args)
+
+    def result(self, future: Future) -> Any:
+        """
+        获取任务结果；进程池损坏或任务无法序列化时在进程内重新执行
+
+        Raises:
+            解析函数本身抛出的异常
+        """
+        task = getattr(future, '_wf_task', None)
+        if task is None:
+            # In-process future: nothing to fall back to
+            return future.result()
+
+        import pickle
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            return future.result()
+        except (BrokenProcessPool, pickle.PicklingError) as e:
+            if isinstance(e, BrokenProcessPool):
+                self._mark_broken(e)
+            else:
+                logger.debug(f"Parse task not picklable, running in-process: {e}")
+            self.stats['fallbacks'] += 1
+            return self._run_in_process(*task).result()
+
+    def _mark_broken(self, error: Exception):
+        if not self._broken:
+            logger.warning(f"Parse pool unavailable ({error}), falling back to in-process parsing")
+        self._broken = True
+
+    def shutdown(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+
+__all__ = ['ParsePool', 'DEFAULT_PARSE_WORKERS']
@@ -47,6 +47,8 @@ from webfetcher.parsing.legacy import (
     get_beautifulsoup_parser,
 )
 
+from webfetcher.parsing.budget import ParseBudgetExceeded, parse_budget
+
 # TODO Phase 3.2: Import template-based parsing engine
 # from .engine.template_parser import TemplateParser
 # from .engine.template_loader import TemplateLoader
@@ -74,17 +76,9 @@ def xhs_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[str
         tuple: (date_only, markdown_content, metadata)
     """
     try:
-        # Import template-based parsing engine
-        from .engine.template_parser import TemplateParser
-        from .engine.template_loader import TemplateLoader
-        import os
-
-        # Initialize template parser with XiaoHongShu template directory
-        template_dir = os.path.join(
-            os.path.dirname(__file__),
-            'engine', 'templates'
-        )
-        parser = TemplateParser(template_dir=template_dir)
+        # Shared template parser (templates loaded once, reloaded on file change)
+        from .engine.template_registry import get_template_parser
+        parser = get_template_parser()
 
         # Parse using template engine
         result = parser.parse(html, url)
@@ -191,6 +185,8 @@ def xhs_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[str
         logger.info(f"Phase 3.4: Successfully parsed XHS article using template engine")
         return date_only, markdown_content, metadata
 
+    except ParseBudgetExceeded:
+        raise
     except Exception as e:
         # Fallback to legacy implementation if template parsing fails
         logger.warning(f"Template-based XHS parser failed: {e}, using legacy parser")
@@ -213,17 +209,9 @@ def wechat_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[
         tuple: (date_only, markdown_content, metadata)
     """
     try:
-        # Import template-based parsing engine
-        from .engine.template_parser import TemplateParser
-        from .engine.template_loader import TemplateLoader
-        import os
-
-        # Initialize template parser with WeChat template directory
-        template_dir = os.path.join(
-            os.path.dirname(__file__),
-            'engine', 'templates'
-        )
-        parser = TemplateParser(template_dir=template_dir)
+        # Shared template parser (templates loaded once, reloaded on file change)
+        from .engine.template_registry import get_template_parser
+        parser = get_template_parser()
 
         # Parse using template engine
         result = parser.parse(html, url)
@@ -266,6 +254,8 @@ def wechat_to_markdown(html: str, url: str, url_metadata: dict = None) -> tuple[
         logger.info(f"Phase 3.3: Successfully parsed WeChat article using template engine")
         return date_only, markdown_content, metadata
 
+    except ParseBudgetExceeded:
+        raise
     except Exception as e:
         # Fallback to legacy implementation if template parsing fails
         logger.warning(f"Template-based WeChat parser failed: {e}, using legacy parser")
@@ -291,19 +281,20 @@ def generic_to_markdown(html: str, url: str, filter_level: str = 'safe', is_craw
     Returns:
         tuple: (date_only, markdown_content, metadata)
     """
+    # One per-page CPU budget covers the template parser and the legacy fallback
+    with parse_budget():
+        return _generic_to_markdown(html, url, filter_level, is_crawling, url_metadata)
+
+
+def _generic_to_markdown(html: str, url: str, filter_level: str, is_crawling: bool,
+                         url_metadata: Optional[dict]) -> tuple[str, str, dict]:
+    """generic_to_markdown() body, run inside the page's parse budget"""
     try:
         # Phase 3.5: Try template-based parsing first
-        from .engine.template_parser import TemplateParser
-        from .engine.template_loader import TemplateLoader
-        import os
-
-        # Initialize template parser
-        template_dir = os.path.join(
-            os.path.dirname(__file__),
-            'engine', 'templates'
-        )
-        parser = TemplateParser(template_dir=template_dir)
-        parser.reload_templates()  # Force reload to get updated generic.yaml v2.1.0
+        # Shared template parser: the registry reloads templates only when a
+        # YAML file changes, instead of re-reading every template per page
+        from .engine.template_registry import get_template_parser
+        parser = get_template_parser()
 
         # Parse using template engine (will auto-select based on URL domain)
         result = parser.parse(html, url)
@@ -366,6 +357,8 @@ def generic_to_markdown(html: str, url: str, filter_level: str = 'safe', is_craw
 
         return date_only, markdown_content, metadata
 
+    except ParseBudgetExceeded:
+        raise
     except Exception as e:
         # Fallback to legacy implementation if template parsing fails
         logger.info(f"Phase 3.5: No template found or template parsing failed for {url}, using legacy parser")
@@ -0,0 +1,286 @@
+"""
+Rule Dispatch Table for Routing Engine
+
+Compiles the routing rules into lookup structures so a URL is parsed once and
+only rules that can possibly match it are checked:
+
+    - Host/suffix hash index for domain and domain_list conditions
+    - One combined alternation regex over url_pattern-only rules, used to
+      reject all of them in a single scan
+
+Rule order (priority) and matcher semantics are unchanged: the dispatch table
+only skips rules that the linear scan would have rejected anyway.
+"""
+
+import re
+import bisect
+import heapq
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple
+
+from .matchers import (
+    AlwaysMatcher, CompositeMatcher, DomainListMatcher, DomainMatcher, PatternMatcher
+)
+
+logger = logging.getLogger(__name__)
+
+# Matchers whose result depends only on the URL's netloc
+HOST_MATCHERS = (DomainMatcher, DomainListMatcher, AlwaysMatcher)
+
+# Backreferences change meaning once patterns are concatenated into one regex
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+def _filter_source(source: str) -> str:
+    """
+    Simplify a url_pattern for use in the combined reject filter.
+
+    re.search() already scans the whole URL, so a leading ".*" and a trailing
+    ".*" / ".*$" never change *whether* a pattern matches, but in a large
+    alternation they make every branch scan to the end of the URL. The
+    result may match more than the original (never less), which is all a
+    reject filter needs.
+    """
+    for prefix in ('^.*?', '^.*', '.*?', '.*'):
+        if source.startswith(prefix) and source[len(prefix):len(prefix) + 1] not in ('?', '+', '*', '{'):
+            source = source[len(prefix):]
+            break
+    for suffix in ('.*$', '.*'):
+        if source.endswith(suffix):
+            head = source[:-len(suffix)]
+            backslashes = len(head) - len(head.rstrip('\\'))
+            if backslashes % 2 == 0:
+                source = head
+            break
+    return source
+
+
+@dataclass
+class DispatchEntry:
+    """
+    A compiled rule prepared for dispatch.
+
+    Attributes:
+        index: Position in priority order
+        rule: Rule dict from configuration
+        matcher: Original matcher
+        host_parts: Matchers that only look at the netloc
+        url_parts: Matchers that need the full URL (url_pattern, custom)
+    """
+    index: int
+    rule: dict
+    matcher: Any
+    host_parts: List[Any] = field(default_factory=list)
+    url_parts: List[Any] = field(default_factory=list)
+
+
+def _host_domains(matcher: Any) -> List[str]:
+    """Domains a host matcher accepts (with their subdomains)."""
+    if isinstance(matcher, DomainMatcher):
+        return [matcher.domain]
+    if isinstance(matcher, DomainListMatcher):
+        return [m.domain for m in matcher.matchers]
+    return []
+
+
+def _host_matches(matcher: Any, host: str) -> bool:
+    """Evaluate a host-only matcher against an already parsed netloc."""
+    if isinstance(matcher, AlwaysMatcher):
+        return True
+    for domain in _host_domains(matcher):
+        if host == domain or host.endswith('.' + domain):
+            return True
+    return False
+
+
+class RuleDispatchTable:
+    """
+    Host-indexed dispatch structure built from compiled routing rules.
+
+    Usage:
+        table = RuleDispatchTable(compiled_rules)
+        candidates = table.candidates(host)
+        path_class, entry = table.resolve(candidates, url)
+    """
+
+    def __init__(self, compiled_rules: List[Tuple[dict, Any]]):
+        """
+        Build the dispatch table.
+
+        Args:
+            compiled_rules: (rule, matcher) pairs in priority order
+        """
+        self.entries: List[DispatchEntry] = []
+        self._domain_index: Dict[str, List[int]] = {}
+        self._unindexed: List[int] = []      # no domain condition, checked for every host
+        self._pattern_only: List[int] = []   # url_pattern-only rules behind the combined filter
+        self._combined: Optional[re.Pattern] = None
+
+        for index, (rule, matcher) in enumerate(compiled_rules):
+            parts = matcher.matchers if isinstance(matcher, CompositeMatcher) else [matcher]
+            entry = DispatchEntry(
+                index=index,
+                rule=rule,
+                matcher=matcher,
+                host_parts=[m for m in parts if isinstance(m, HOST_MATCHERS)],
+                url_parts=[m for m in parts if not isinstance(m, HOST_MATCHERS)],
+            )
+            self.entries.append(entry)
+
+            # Index by the first domain condition; the others are verified per host
+            domains = next((_host_domains(m) for m in entry.host_parts if _host_domains(m)), None)
+            if domains:
+                for domain in set(domains):
+                    self._domain_index.setdefault(domain, []).append(index)
+            elif not entry.host_parts and entry.url_parts and \
+                    all(isinstance(m, PatternMatcher) for m in entry.url_parts):
+                self._pattern_only.append(index)
+            else:
+                self._unindexed.append(index)
+
+        self._compile_patterns()
+
+    def _compile_patterns(self) -> None:
+        """
+        Combine the url_pattern-only rules into one alternation reject filter.
+
+        Rules whose patterns cannot be combined safely (backreferences,
+        inline global flags) are moved back to the per-host candidate list.
+        """
+        sources = []
+        combined = []
+        for index in self._pattern_only:
+            entry = self.entries[index]
+            parts = []
+            for matcher in entry.url_parts:
+                source = matcher.regex.pattern
+                if _BACKREFERENCE.search(source):
+                    break
+                source = f'(?:{_filter_source(source)})'
+                try:
+                    re.compile(source)
+                except re.error:
+                    break  # e.g. global inline flags, only valid at the start
+                parts.append(source)
+            else:
+                # A rule matches only if all its patterns do; any one is a valid filter
+                sources.append(parts[0])
+                combined.append(index)
+                continue
+            self._unindexed.append(index)
+
+        self._pattern_only = combined
+        self._unindexed.sort()
+        if not sources:
+            return
+        try:
+            self._combined = re.compile('|'.join(sources))
+        except re.error as e:
+            # Duplicate group names etc. - fall back to per-host candidates
+            logger.debug(f"Cannot combine url_pattern regexes, checking individually: {e}")
+            self._unindexed = sorted(self._unindexed + self._pattern_only)
+            self._pattern_only = []
+
+    def candidates(self, host: str, after: int = -1) -> List[DispatchEntry]:
+        """
+        Get the rules that can still match URLs on a host, in priority order.
+
+        Domain-indexed rules are found by walking the host's label suffixes
+        (www.example.com -> example.com -> com). The list stops at the first
+        rule that matches on host alone, since nothing after it can win.
+        url_pattern-only rules are not included; resolve() adds them only
+        when the combined filter matches.
+
+        Args:
+            host: Lower-cased netloc of the URL
+            after: Only consider rules ranked below this entry index (used to
+                continue past a rule whose action turned out to be broken)
+
+        Returns:
+            List of DispatchEntry
+        """
+        indices = list(self._unindexed)
+        suffix = host
+        while suffix:
+            indices.extend(self._domain_index.get(suffix, ()))
+            _, _, suffix = suffix.partition('.')
+
+        result = []
+        for index in sorted(set(indices)):
+            if index <= after:
+                continue
+            entry = self.entries[index]
+            if not all(_host_matches(m, host) for m in entry.host_parts):
+                continue
+            result.append(entry)
+            if not entry.url_parts:
+                break
+        return result
+
+    def resolve(self, candidates: List[DispatchEntry], url: str,
+                context: Optional[Dict[str, Any]] = None, after: int = -1) -> Tuple[tuple, Optional[DispatchEntry]]:
+        """
+        Find the first candidate whose URL-dependent conditions match.
+
+        Args:
+            candidates: Result of candidates() for the URL's host (with the same after)
+            url: Full URL
+            context: Optional context passed to custom matchers
+            after: Only consider rules ranked below this entry index, url_pattern-only
+                rules included
+
+        Returns:
+            (path_class, entry): whether the combined filter matched plus the
+            outcomes of the checked candidates, and the matching entry (None
+            if no rule matched)
+        """
+        limit = candidates[-1].index if candidates and not candidates[-1].url_parts else len(self.entries)
+        first = bisect.bisect_right(self._pattern_only, after)
+        filter_hit = first < len(self._pattern_only) and self._pattern_only[first] < limit and \
+            self._combined.search(url) is not None
+        if filter_hit:
+            extra = [self.entries[i] for i in self._pattern_only[first:] if i < limit]
+            candidates = list(heapq.merge(candidates, extra, key=lambda e: e.index))
+
+        outcomes = [filter_hit]
+        for entry in candidates:
+            matched = True
+            for matcher in entry.url_parts:
+                try:
+                    if not matcher.matches(url, context):
+                        matched = False
+                        break
+                except Exception as e:
+                    logger.warning(f"Error evaluating rule '{entry.rule.get('name')}': {e}")
+                    matched = False
+                    break
+            outcomes.append(matched)
+            if matched:
+                return tuple(outcomes), entry
+        return tuple(outcomes), None
+
+    def decided_by_host(self, candidates: List[DispatchEntry]) -> bool:
+        """
+        Whether the outcome of resolve() is the same for every URL on the host.
+
+        True when no candidate has URL-dependent conditions (so the list is
+        empty or holds one host-only rule) and no url_pattern-only rule ranks
+        above that rule. The decision can then be cached per host without
+        matching the URL at all.
+
+        Args:
+            candidates: Result of candidates() for the host
+        """
+        if any(entry.url_parts for entry in candidates):
+            return False
+        limit = candidates[-1].index if candidates else len(self.entries)
+        return not self._pattern_only or self._pattern_only[0] >= limit
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get dispatch table statistics."""
+        return {
+            'indexed_domains': len(self._domain_index),
+            'unindexed_rules': len(self._unindexed),
+            'combined_patterns': len(self._pattern_only),
+        }
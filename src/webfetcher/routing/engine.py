@@ -7,15 +7,35 @@ Evaluates routing rules and selects appropriate fetcher for each URL.
 import logging
 import time
 import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from functools import lru_cache
+from urllib.parse import urlparse
 
 from .config_loader import ConfigLoader
+from .dispatch import DispatchEntry, RuleDispatchTable
 from .matchers import create_matcher
 
 logger = logging.getLogger(__name__)
 
+# Decision cache defaults (overridable via global.cache_ttl / global.cache_size)
+DEFAULT_CACHE_TTL = 3600
+DEFAULT_CACHE_SIZE = 4096
+
+
+def _block_list(value: Any) -> Tuple[str, ...]:
+    """
+    Resource categories from a rule's action.block (list or comma-separated string).
+
+    Categories are validated by the browser fetchers (fetchers.resource_blocking).
+    """
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(',')
+    return tuple(str(item).strip().lower() for item in value if str(item).strip())
+
 
 @dataclass
 class RoutingDecision:
@@ -28,12 +48,14 @@ class RoutingDecision:
         priority: Priority of the matching rule
         reason: Explanation for this routing choice
         cached: Whether this decision came from cache
+        block: Resource categories browser fetchers should block (action.block)
     """
     fetcher: str
     rule_name: str
     priority: int
     reason: str = ""
     cached: bool = False
+    block: Tuple[str, ...] = ()
 
 
 class RoutingEngine:
@@ -42,7 +64,8 @@ class RoutingEngine:
 
     Features:
         - Priority-based rule evaluation
-        - LRU caching for performance
+        - LRU+TTL decision cache keyed on host, for hosts whose decision
+          does not depend on the URL path (a hit skips rule matching)
         - Thread-safe hot reload
         - Comprehensive logging
 
@@ -62,6 +85,14 @@ class RoutingEngine:
         self.config_loader = ConfigLoader(config_path)
         self._lock = threading.RLock()
         self._compiled_rules: List[Tuple[dict, Any]] = []
+        self._dispatch = RuleDispatchTable([])
+        # Decision cache: host -> (decision, expires_at), LRU ordered; only hosts
+        # whose decision is path-independent (RuleDispatchTable.decided_by_host)
+        self._cache: "OrderedDict[str, Tuple[RoutingDecision, float]]" = OrderedDict()
+        # Host profiles: host -> rules that can still match it (see _host_profile)
+        self._host_profiles: "OrderedDict[str, List[DispatchEntry]]" = OrderedDict()
+        self._cache_ttl = DEFAULT_CACHE_TTL
+        self._cache_size = DEFAULT_CACHE_SIZE
         self._stats = {
             'total_evaluations': 0,
             'cache_hits': 0,
@@ -77,10 +108,18 @@ class RoutingEngine:
         Load configuration and compile matchers for each rule.
 
         This is called during initialization and on reload.
-        Compiles regex patterns once for efficiency.
+        Compiles regex patterns once for efficiency and builds the
+        host-indexed dispatch table used by evaluate().
         """
         with self._lock:
+            # Cached decisions belong to the previous rule set
+            self._cache.clear()
+            self._host_profiles.clear()
             try:
+                settings = self.config_loader.get_global_settings()
+                self._cache_ttl = float(settings.get('cache_ttl', DEFAULT_CACHE_TTL))
+                self._cache_size = int(settings.get('cache_size', DEFAULT_CACHE_SIZE))
+
                 rules = self.config_loader.get_rules()
                 self._compiled_rules = []
 
@@ -96,11 +135,13 @@ class RoutingEngine:
                     # Store rule with its compiled matcher
                     self._compiled_rules.append((rule, matcher))
 
+                self._dispatch = RuleDispatchTable(self._compiled_rules)
                 logger.info(f"Compiled {len(self._compiled_rules)} routing rules")
 
             except Exception as e:
                 logger.error(f"Failed to compile rules: {e}")
                 self._compiled_rules = []
+                self._dispatch = RuleDispatchTable([])
 
     def evaluate(self, url: str, context: Optional[Dict[str, Any]] = None) -> RoutingDecision:
         """
@@ -122,42 +163,63 @@ class RoutingEngine:
         with self._lock:
             self._stats['total_evaluations'] += 1
 
-            # Check cache first
-            cached_decision = self._check_cache(url, context)
+            # Parse once, then only check rules indexed for this host
+            try:
+                host = urlparse(url).netloc.lower()
+            except Exception as e:
+                logger.warning(f"Domain matching error for {url}: {e}")
+                host = ''
+            candidates = self._host_profile(host)
+
+            # Cached per-host decision: only stored when no URL matching is needed
+            cacheable = self._cache_enabled(context)
+            cached_decision = self._check_cache(host) if cacheable else None
             if cached_decision:
                 self._stats['cache_hits'] += 1
+                logger.debug(f"Cached routing decision for {url}: {cached_decision.fetcher} "
+                             f"(rule: {cached_decision.rule_name})")
                 return cached_decision
 
             self._stats['cache_misses'] += 1
+            _, entry = self._dispatch.resolve(candidates, url, context)
+            # A rule with a broken action falls through to rules the host check did not cover
+            cacheable = cacheable and self._dispatch.decided_by_host(candidates)
 
-            # Evaluate rules in priority order (already sorted by ConfigLoader)
-            for rule, matcher in self._compiled_rules:
+            # First matching rule in priority order (already sorted by ConfigLoader)
+            while entry is not None:
+                rule = entry.rule
                 try:
-                    if matcher.matches(url, context):
-                        # Rule matched! Create decision
-                        action = rule['action']
-                        decision = RoutingDecision(
-                            fetcher=action['fetcher'],
-                            rule_name=rule['name'],
-                            priority=rule['priority'],
-                            reason=action.get('reason', 'No reason provided'),
-                            cached=False
-                        )
-
-                        # Log decision
-                        logger.info(
-                            f"Routing decision for {url}: {decision.fetcher} "
-                            f"(rule: {decision.rule_name}, priority: {decision.priority})"
-                        )
-
-                        # Cache decision
-                        self._cache_decision(url, context, decision)
-
-                        return decision
+                    # Rule matched! Create decision
+                    action = rule['action']
+                    decision = RoutingDecision(
+                        fetcher=action['fetcher'],
+                        rule_name=rule['name'],
+                        priority=rule['priority'],
+                        reason=action.get('reason', 'No reason provided'),
+                        cached=False,
+                        block=_block_list(action.get('block'))
+                    )
+
+                    # Log decision
+                    logger.info(
+                        f"Routing decision for {url}: {decision.fetcher} "
+                        f"(rule: {decision.rule_name}, priority: {decision.priority})"
+                    )
+
+                    # Cache decision
+                    if cacheable:
+                        self._cache_decision(host, decision)
+
+                    return decision
 
                 except Exception as e:
-                    logger.warning(f"Error evaluating rule '{rule['name']}': {e}")
-                    continue
+                    logger.warning(f"Error evaluating rule '{rule.get('name')}': {e}")
+                    # Continue in rule order below the broken rule; it may be a url_pattern-only
+                    # rule (not in candidates) or the host-only rule that ended the candidate list
+                    after = entry.index
+                    _, entry = self._dispatch.resolve(self._dispatch.candidates(host, after=after),
+                                                      url, context, after=after)
+                    cacheable = False
 
             # No rule matched - use default fetcher
             default_fetcher = self.config_loader.get_global_settings().get('default_fetcher', 'urllib')
@@ -170,37 +232,73 @@ class RoutingEngine:
             )
 
             logger.info(f"No matching rule for {url}, using default: {default_fetcher}")
+            if cacheable:
+                self._cache_decision(host, decision)
             return decision
 
-    def _check_cache(self, url: str, context: Optional[Dict[str, Any]]) -> Optional[RoutingDecision]:
+    def _host_profile(self, host: str) -> List[DispatchEntry]:
+        """
+        Get the rules that can still match URLs on this host.
+
+        Host-only conditions are evaluated once per host via the dispatch
+        table; the result is kept in a bounded LRU next to the decision cache.
+
+        Returns:
+            List of DispatchEntry in priority order
+        """
+        profile = self._host_profiles.get(host)
+        if profile is not None:
+            self._host_profiles.move_to_end(host)
+            return profile
+
+        profile = self._dispatch.candidates(host)
+        self._host_profiles[host] = profile
+        while len(self._host_profiles) > max(self._cache_size, 1):
+            self._host_profiles.popitem(last=False)
+        return profile
+
+    def _cache_enabled(self, context: Optional[Dict[str, Any]]) -> bool:
+        """Decisions are not cached for calls with context or when disabled by config"""
+        return not context and self._cache_ttl > 0 and self._cache_size > 0
+
+    def _check_cache(self, host: str) -> Optional[RoutingDecision]:
         """
         Check if routing decision is cached.
 
         Args:
-            url: URL to check
-            context: Optional context
+            host: Lower-cased netloc of the URL
 
         Returns:
-            Cached decision if found, None otherwise
+            Cached decision if found and not expired, None otherwise
         """
-        # Simple implementation - can be enhanced with LRU cache
-        # For now, we don't cache to ensure fresh decisions
-        # TODO: Implement LRU cache with TTL
-        return None
-
-    def _cache_decision(self, url: str, context: Optional[Dict[str, Any]], decision: RoutingDecision) -> None:
+        entry = self._cache.get(host)
+        if entry is None:
+            return None
+        decision, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[host]
+            return None
+        self._cache.move_to_end(host)
+        return replace(decision, cached=True)
+
+    def _cache_decision(self, host: str, decision: RoutingDecision) -> None:
         """
-        Cache a routing decision.
+        Cache a routing decision for every URL on a host.
 
         Args:
-            url: URL that was routed
-            context: Context used for decision
+            host: Lower-cased netloc whose decision does not depend on the path
             decision: Routing decision to cache
         """
-        # Simple implementation - can be enhanced with LRU cache
-        # For now, no caching implemented
-        # TODO: Implement LRU cache with TTL
-        pass
+        self._cache[host] = (decision, time.monotonic() + self._cache_ttl)
+        self._cache.move_to_end(host)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Drop all cached routing decisions."""
+        with self._lock:
+            self._cache.clear()
+            self._host_profiles.clear()
 
     def reload(self) -> None:
         """
@@ -214,7 +312,7 @@ class RoutingEngine:
             # Force reload configuration
             self.config_loader.reload()
 
-            # Recompile rules
+            # Recompile rules (also drops cached decisions under the same lock)
             self._compile_rules()
 
             # Update stats
@@ -233,11 +331,15 @@ class RoutingEngine:
 
         Returns:
             Dictionary with stats including evaluations, cache performance, etc.
+            cache_hits counts only evaluations that skipped rule matching.
         """
         with self._lock:
             return {
                 **self._stats,
                 'active_rules': len(self._compiled_rules),
+                **self._dispatch.get_stats(),
+                'cache_size': len(self._cache),
+                'cache_ttl': self._cache_ttl,
                 'cache_hit_rate': (
                     self._stats['cache_hits'] / max(self._stats['total_evaluations'], 1)
                 ) * 100
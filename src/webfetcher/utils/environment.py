@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Per-Request Environment
+按请求的环境变量
+
+Settings that the CLI reads from the environment (WF_LEGACY_IMAGE_MODE,
+WF_FORCE_PAGE_DETECTION, LANG) belong to the user running ``wf``. When a
+``wf serve`` daemon runs the fetch, its own os.environ is the wrong source,
+so the fetch path reads them through getenv() and the daemon wraps each
+request in client_environment() with the variables the client sent.
+通过 wf serve 执行时，这些变量取自发起请求的客户端，而不是守护进程自身的环境。
+
+Example:
+    with client_environment({'WF_LEGACY_IMAGE_MODE': None, 'LANG': 'zh_CN.UTF-8'}):
+        getenv('LANG')                  # 'zh_CN.UTF-8'
+        getenv('WF_LEGACY_IMAGE_MODE')  # None: unset for the client
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+_local = threading.local()
+
+
+def getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    os.environ.get() that sees the client's variables inside client_environment()
+    读取环境变量；在 client_environment() 中优先使用客户端传来的值
+    """
+    overrides = getattr(_local, 'overrides', None)
+    if overrides is not None and name in overrides:
+        value = overrides[name]
+        return default if value is None else value
+    return os.environ.get(name, default)
+
+
+@contextmanager
+def client_environment(overrides: Dict[str, Optional[str]]) -> Iterator[None]:
+    """
+    Make getenv() on this thread return overrides (None means unset)
+    在当前线程内用客户端的变量覆盖 getenv()（None 表示客户端未设置）
+    """
+    previous = getattr(_local, 'overrides', None)
+    _local.overrides = dict(overrides)
+    try:
+        yield
+    finally:
+        _local.overrides = previous
+
+
+__all__ = ['client_environment', 'getenv']
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Per-Host Fetch Statistics
+按主机统计的抓取结果
+
+Remembers, per host and fetch method (urllib, cdp, selenium), the recent
+outcomes of real fetches: when, how long (``FetchMetrics.fetch_duration``
+of the stage), whether it produced the page and, on failure, the error
+class. Two decisions are derived from it:
+记录每个主机、每种抓取方式最近的抓取结果（时间、耗时、是否成功、错误类别），
+并据此做出两项决策：
+
+- ``preferred_method()``: a host where urllib keeps failing while a browser
+  method works is routed straight to that method, so a crawl stops paying
+  the urllib retry/classification cost on every page. Outcomes decay with
+  age and urllib is re-probed at least every REPROBE_INTERVAL.
+  urllib 持续失败而浏览器方式可用的主机直接使用该方式；结果随时间衰减，并定期重新探测 urllib。
+- ``budget()``: the p90 of successful urllib durations, used by
+  ``fetch_html_with_retry(hedge=True)`` to decide when to start CDP in parallel.
+  成功 urllib 耗时的 p90，作为对冲抓取的预算。
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATS_FILE = Path.home() / ".cache" / "webfetcher" / "host_stats.json"
+METHODS = ('urllib', 'cdp', 'selenium')
+DEFAULT_MAX_SAMPLES = 50     # outcomes kept per host and method
+DEFAULT_MAX_HOSTS = 2000
+MAX_AGE = 30 * 86400         # outcomes older than this are dropped
+
+# Hedging budget
+MIN_BUDGET_SAMPLES = 5       # urllib outcomes needed before a budget is trusted
+MIN_BUDGET = 0.2             # seconds; keeps fast hosts from hedging on jitter
+
+# Learned routing
+DECAY_HALF_LIFE = 3 * 86400  # an outcome's weight halves every 3 days
+MIN_EVIDENCE = 2.5           # decayed weight needed to judge a method (~3 recent outcomes)
+URLLIB_FAILING_RATE = 0.2    # urllib is skipped at or below this success rate...
+BROWSER_WORKING_RATE = 0.6   # ...when a browser method succeeds at least this often
+MIN_BROWSER_EVIDENCE = 0.9   # decayed weight needed for the browser method (~1 recent outcome)
+REPROBE_INTERVAL = 3600      # try urllib again when its last outcome is older than this
+
+SAVE_INTERVAL = 5.0          # seconds between writes; pending outcomes are flushed at exit
+
+
+class HostFetchStats:
+    """
+    JSON-file backed per-host, per-method outcome window.
+    基于 JSON 文件的按主机、按抓取方式的结果窗口。
+
+    Like the redirect cache, all I/O errors are logged and swallowed: the
+    statistics only steer routing and hedging and must never make a fetch fail.
+
+    Outcomes recorded since the last write are merged into the file's current
+    contents on save, so concurrent wf processes add to each other's history
+    instead of overwriting it. The file is read and written outside the lock.
+    保存时将新记录合并进磁盘上的最新内容，多个 wf 进程不会互相覆盖。
+    """
+
+    def __init__(self, path: Path = STATS_FILE, max_samples: int = DEFAULT_MAX_SAMPLES,
+                 max_hosts: int = DEFAULT_MAX_HOSTS, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: JSON file holding the statistics
+            max_samples: Outcomes kept per host and method
+            max_hosts: Hosts kept; the least recently recorded are dropped first
+            clock: Source of the current time in seconds (injectable for tests)
+        """
+        self.path = Path(path)
+        self.max_samples = max_samples
+        self.max_hosts = max_hosts
+        self.clock = clock
+        self._hosts: Optional[dict] = None
+        self._pending: Dict[str, Dict[str, list]] = {}  # outcomes not yet written
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # serializes read-merge-write cycles
+        self._last_save = 0.0
+        self._flush_registered = False
+
+    def _read_file(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable host stats {self.path}: {e}")
+            return {}
+
+    def _load(self) -> dict:
+        if self._hosts is None:
+            self._hosts = self._read_file()
+        return self._hosts
+
+    def _merge(self, hosts: dict, new: Dict[str, Dict[str, list]], now: float):
+        """
+        Add new outcomes to hosts in place: drop expired outcomes, keep the latest
+        max_samples per method and move updated hosts to the end (insertion order
+        is recency), evicting the oldest beyond max_hosts.
+        """
+        for host, new_methods in new.items():
+            methods = hosts.pop(host, None)
+            if not isinstance(methods, dict):
+                methods = {}
+            for method, samples in new_methods.items():
+                merged = [s for s in (methods.get(method) or []) + samples
+                          if isinstance(s, list) and len(s) == 4 and now - s[0] <= MAX_AGE]
+                merged.sort(key=lambda s: s[0])  # another process may have written newer outcomes
+                methods[method] = merged[-self.max_samples:]
+            hosts[host] = methods
+        while len(hosts) > self.max_hosts:
+            hosts.pop(next(iter(hosts)))
+
+    def _save(self):
+        """Merge pending outcomes into the file on disk / 将未保存的记录合并写入磁盘"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._save_lock:
+            hosts = self._read_file()
+            self._merge(hosts, pending, self.clock())
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(hosts, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.debug(f"Failed to write host stats {self.path}: {e}")
+
+    @staticmethod
+    def _host(url: str) -> Optional[str]:
+        try:
+            return urllib.parse.urlparse(url).hostname
+        except ValueError:
+            return None
+
+    def _samples(self, url: str, method: str) -> list:
+        host = self._host(url)
+        if not host:
+            return []
+        with self._lock:
+            samples = (self._load().get(host) or {}).get(method) or []
+        return [s for s in samples if isinstance(s, list) and len(s) == 4]
+
+    def record(self, url: str, method: str, duration: float, ok: bool,
+               error_class: Optional[str] = None):
+        """
+        Record one fetch outcome for the URL's host
+        记录一次抓取结果
+
+        Args:
+            url: Fetched URL
+            method: 'urllib', 'cdp' or 'selenium'
+            duration: FetchMetrics.fetch_duration of the stage, in seconds
+            ok: Whether the method produced the page
+            error_class: Classified error type of a failure (e.g. 'ssl_config')
+        """
+        host = self._host(url)
+        if not host or duration < 0:
+            return
+        now = self.clock()
+        sample = [round(now, 1), round(duration, 3), bool(ok), None if ok else error_class]
+        with self._lock:
+            self._merge(self._load(), {host: {method: [sample]}}, now)
+            self._pending.setdefault(host, {}).setdefault(method, []).append(sample)
+            save = now - self._last_save >= SAVE_INTERVAL
+            if save:
+                self._last_save = now
+            elif not self._flush_registered:
+                self._flush_registered = True
+                atexit.register(self.flush)
+        if save:
+            self._save()
+
+    def method_stats(self, url: str) -> Dict[str, Tuple[float, float]]:
+        """
+        Decayed evidence per method for the URL's host
+        获取各抓取方式按时间衰减后的统计
+
+        Returns:
+            {method: (weight, success_rate)}, where weight is the number of
+            outcomes, each discounted by its age (half-life DECAY_HALF_LIFE)
+        """
+        now = self.clock()
+        stats = {}
+        for method in METHODS:
+            weight = successes = 0.0
+            for timestamp, _, ok, _ in self._samples(url, method):
+                w = 0.5 ** (max(0.0, now - timestamp) / DECAY_HALF_LIFE)
+                weight += w
+                successes += w if ok else 0.0
+            if weight:
+                stats[method] = (weight, successes / weight)
+        return stats
+
+    def preferred_method(self, url: str) -> Optional[str]:
+        """
+        Browser method to use instead of urllib for the URL's host, if any
+        获取应替代 urllib 的浏览器抓取方式（如有）
+
+        Returns:
+            'cdp' or 'selenium' when urllib has been failing for the host and that
+            method has been working; None to start with urllib as usual (including
+            when urllib is due for a re-probe)
+        """
+        urllib_samples = self._samples(url, 'urllib')
+        if not urllib_samples or self.clock() - urllib_samples[-1][0] > REPROBE_INTERVAL:
+            return None
+        stats = self.method_stats(url)
+        weight, rate = stats.get('urllib', (0.0, 1.0))
+        if weight < MIN_EVIDENCE or rate > URLLIB_FAILING_RATE:
+            return None
+
+        candidates = [(rate, method) for method, (weight, rate) in stats.items()
+                      if method != 'urllib' and weight >= MIN_BROWSER_EVIDENCE and rate >= BROWSER_WORKING_RATE]
+        if not candidates:
+            return None
+        # Highest success rate; on a tie CDP (lighter) comes first in METHODS
+        return max(candidates, key=lambda c: (c[0], -METHODS.index(c[1])))[1]
+
+    def last_error_class(self, url: str, method: str = 'urllib') -> Optional[str]:
+        """Error class of the method's latest failure on the host / 最近一次失败的错误类别"""
+        for _, _, ok, error_class in reversed(self._samples(url, method)):
+            if not ok:
+                return error_class
+        return None
+
+    def budget(self, url: str) -> Optional[float]:
+        """
+        Hedging budget for the URL's host, in seconds
+        获取主机的对冲预算（秒）
+
+        Returns:
+            The p90 of recent successful urllib durations (at least MIN_BUDGET);
+            0.0 when urllib has recently always failed for the host, so CDP should
+            start right away; None while there are fewer than MIN_BUDGET_SAMPLES outcomes
+        """
+        samples = self._samples(url, 'urllib')
+        if len(samples) < MIN_BUDGET_SAMPLES:
+            return None
+        durations = sorted(duration for _, duration, ok, _ in samples if ok)
+        if not durations:
+            return 0.0
+        # Nearest-rank percentile
+        p90 = durations[max(0, -(-9 * len(durations) // 10) - 1)]
+        return max(MIN_BUDGET, p90)
+
+    def flush(self):
+        """Write pending outcomes to disk / 将未保存的记录写入磁盘"""
+        self._save()
+
+
+_default_stats: Optional[HostFetchStats] = None
+
+
+def get_host_stats() -> HostFetchStats:
+    """Get the process-wide host statistics / 获取进程级主机统计"""
+    global _default_stats
+    if _default_stats is None:
+        _default_stats = HostFetchStats()
+    return _default_stats
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP Response Cache
+持久化 HTTP 响应缓存
+
+Content-addressed disk cache for pages fetched by ``fetch_html_original``.
+Each entry stores the decoded HTML, the validator headers (ETag,
+Last-Modified) and the final URL. On revisit the validators are sent as
+``If-None-Match`` / ``If-Modified-Since``; a ``304 Not Modified`` answer is
+served from disk, skipping both the body download and ``smart_decode``.
+为 ``fetch_html_original`` 抓取的页面提供按内容寻址的磁盘缓存。每条记录保存解码后
+的 HTML、校验头（ETag、Last-Modified）和最终 URL。再次访问时发送条件请求头，
+服务器返回 ``304 Not Modified`` 时直接使用磁盘内容，跳过下载和 ``smart_decode``。
+
+Layout / 目录结构::
+
+    <cache_dir>/entries/ab/<sha256(ua + url)>.json   # per-URL metadata
+    <cache_dir>/objects/cd/<sha256(body)>            # bodies, shared by identical pages
+
+Only responses carrying a validator are stored (nothing else could be
+revalidated), and ``Cache-Control: no-store`` is honoured. Total size is
+bounded; the least recently used entries are evicted first.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path.home() / ".cache" / "webfetcher" / "http"
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024  # 256 MB
+
+
+@dataclass
+class CachedResponse:
+    """A stored response / 缓存的响应"""
+    url: str
+    final_url: str
+    html: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_type: Optional[str] = None
+    stored_at: float = 0.0
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidation / 用于重新验证的条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    Size-bounded, content-addressed HTTP response cache.
+    有容量上限、按内容寻址的 HTTP 响应缓存。
+
+    All I/O errors are logged and swallowed: the cache is an optimisation and
+    must never make a fetch fail. Writes are atomic (``os.replace``), so
+    concurrent crawl workers and processes can share a directory.
+
+    Example:
+        cache = get_http_cache()
+        entry = cache.lookup(url, ua)
+        headers.update(entry.validators() if entry else {})
+        ...
+        if status == 304:
+            cache.touch(url, ua)
+            return entry.html
+        cache.store(url, ua, final_url, html, response.headers)
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self._entries_dir = self.cache_dir / "entries"
+        self._objects_dir = self.cache_dir / "objects"
+        self._lock = threading.Lock()
+        self._total_size: Optional[int] = None
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def lookup(self, url: str, ua: str = "") -> Optional[CachedResponse]:
+        """
+        Get the stored response for a URL, or None
+        获取 URL 的缓存响应，不存在时返回 None
+        """
+        entry_path = self._entry_path(url, ua)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self._object_path(meta['body']), 'rb') as f:
+                html = f.read().decode('utf-8')
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable HTTP cache entry {entry_path}: {e}")
+            return None
+        return CachedResponse(
+            url=meta.get('url', url),
+            final_url=meta.get('final_url') or url,
+            html=html,
+            etag=meta.get('etag'),
+            last_modified=meta.get('last_modified'),
+            content_type=meta.get('content_type'),
+            stored_at=meta.get('stored_at', 0.0),
+        )
+
+    def store(self, url: str, ua: str, final_url: str, html: str, headers) -> bool:
+        """
+        Store a response if it can be revalidated later
+        存储可在之后重新验证的响应
+
+        Args:
+            url: Requested URL
+            ua: User-Agent used for the request (part of the key)
+            final_url: URL after redirects
+            html: Decoded HTML
+            headers: Response headers (http.client.HTTPMessage or dict)
+
+        Returns:
+            bool: True if the response was stored
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return False
+        if 'no-store' in (headers.get('Cache-Control') or '').lower():
+            return False
+
+        body = html.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        meta = {
+            'url': url,
+            'final_url': final_url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': headers.get('Content-Type'),
+            'body': digest,
+            'size': len(body),
+            'stored_at': time.time(),
+        }
+        try:
+            object_path = self._object_path(digest)
+            added = 0
+            if not object_path.exists():
+                self._atomic_write(object_path, body)
+                added += len(body)
+            entry_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+            self._atomic_write(self._entry_path(url, ua), entry_bytes)
+            added += len(entry_bytes)
+        except Exception as e:
+            logger.debug(f"Failed to write HTTP cache entry for {url}: {e}")
+            return False
+
+        with self._lock:
+            self.stats['stores'] += 1
+            if self._total_size is not None:
+                self._total_size += added
+        if self._current_size() > self.max_size:
+            self.evict()
+        return True
+
+    def touch(self, url: str, ua: str = ""):
+        """
+        Mark an entry as recently used (after a 304)
+        将条目标记为最近使用（收到 304 后）
+        """
+        try:
+            os.utime(self._entry_path(url, ua))
+        except OSError:
+            pass
+
+    def record(self, hit: bool):
+        """Count a cache hit or miss / 记录命中或未命中"""
+        with self._lock:
+            self.stats['hits' if hit else 'misses'] += 1
+
+    def evict(self, target_ratio: float = 0.9):
+        """
+        Evict least recently used entries until under target_ratio * max_size
+        按最近最少使用淘汰条目，直到低于 target_ratio * max_size
+        """
+        with self._lock:
+            entries = []
+            referenced = {}
+            for path in self._entries_dir.rglob("*.json"):
+                try:
+                    stat = path.stat()
+                    with open(path, 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                except Exception:
+                    continue
+                entries.append((stat.st_mtime, path, meta.get('body'), stat.st_size))
+                referenced[meta.get('body')] = referenced.get(meta.get('body'), 0) + 1
+
+            object_sizes = {}
+            for path in self._objects_dir.rglob("*"):
+                if path.is_file():
+                    try:
+                        object_sizes[path.name] = path.stat().st_size
+                    except OSError:
+                        continue
+
+            total = sum(size for *_, size in entries) + sum(object_sizes.values())
+            target = self.max_size * target_ratio
+            entries.sort()
+            for _, path, digest, size in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                self.stats['evictions'] += 1
+                referenced[digest] -= 1
+                if referenced[digest] == 0 and digest in object_sizes:
+                    try:
+                        self._object_path(digest).unlink()
+                        total -= object_sizes.pop(digest)
+                    except OSError:
+                        pass
+
+            # Bodies no entry points to (e.g. left behind by an interrupted write)
+            for digest in [d for d in object_sizes if not referenced.get(d)]:
+                try:
+                    self._object_path(digest).unlink()
+                    total -= object_sizes.pop(digest)
+                except OSError:
+                    pass
+
+            self._total_size = total
+            logger.debug(f"HTTP cache evicted to {total / (1024 * 1024):.1f}MB")
+
+    def get_stats(self) -> dict:
+        """Get cache statistics / 获取缓存统计"""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0.0
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _entry_path(self, url: str, ua: str) -> Path:
+        key = hashlib.sha256(f"{ua}\n{url}".encode('utf-8')).hexdigest()
+        return self._entries_dir / key[:2] / f"{key}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self._objects_dir / digest[:2] / digest
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _current_size(self) -> int:
+        with self._lock:
+            if self._total_size is None:
+                total = 0
+                if self.cache_dir.exists():
+                    for path in self.cache_dir.rglob("*"):
+                        try:
+                            if path.is_file():
+                                total += path.stat().st_size
+                        except OSError:
+                            continue
+                self._total_size = total
+            return self._total_size
+
+
+_default_cache: Optional[HTTPCache] = None
+_cache_enabled = True
+_cache_dir: Path = CACHE_DIR
+
+
+def configure_http_cache(cache_dir: Optional[str] = None, enabled: bool = True):
+    """
+    Configure the process-wide HTTP cache (used by --cache-dir / --no-cache)
+    配置进程级 HTTP 缓存（对应 --cache-dir / --no-cache）
+    """
+    global _default_cache, _cache_enabled, _cache_dir
+    _cache_enabled = enabled
+    _cache_dir = Path(cache_dir).expanduser() if cache_dir else CACHE_DIR
+    _default_cache = None
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """Get the process-wide HTTP cache, or None when disabled / 获取进程级 HTTP 缓存，禁用时返回 None"""
+    global _default_cache
+    if not _cache_enabled:
+        return None
+    if _default_cache is None:
+        _default_cache = HTTPCache(_cache_dir)
+    return _default_cache
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+JSON Lines Input/Output
+JSON Lines 流式输入输出
+
+Output: one JSON object per page, appended and flushed as soon as the page
+completes, so a long batch or crawl can be consumed (``tail -f``, an indexer)
+while it is still running and memory does not grow with the number of pages.
+输出：每个页面一行 JSON，页面完成即追加写入并刷新，任务运行中即可被下游消费。
+
+Input: a URL list where each line is either a plain URL or a JSON object
+with a ``url`` and per-URL options (webfetcher argument names)::
+
+    https://example.com/a
+    {"url": "https://example.com/b", "fetch_mode": "cdp", "filter": "none"}
+    {"url": "https://example.com/c", "options": {"timeout": 10}}
+
+输入：每行为纯 URL，或包含 ``url`` 及单 URL 选项（参数名同命令行 dest）的 JSON 对象。
+"""
+
+import json
+import logging
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STDOUT = '-'
+
+
+class JsonlWriter:
+    """
+    Thread-safe, line-buffered JSON Lines writer.
+    线程安全的 JSON Lines 写入器（逐行刷新）。
+
+    The file is opened in append mode, so repeated runs accumulate into one
+    corpus; ``'-'`` writes to stdout.
+
+    Example:
+        with JsonlWriter('pages.jsonl') as writer:
+            writer.write({'url': url, 'markdown': md})
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.is_stdout = path == STDOUT
+        self.count = 0
+        self._lock = threading.Lock()
+        if self.is_stdout:
+            self._file = sys.stdout
+        else:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, record: Dict[str, Any]):
+        """Append one record and flush / 追加一条记录并刷新"""
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        if not self.is_stdout:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def parse_input_line(line: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Parse one URL list line / 解析URL列表中的一行
+
+    Args:
+        line: Plain URL, JSON object, blank line or ``#`` comment
+
+    Returns:
+        (url, options) or None for blank/comment lines
+
+    Raises:
+        ValueError: Invalid JSON, a JSON object without ``url`` or with a
+            non-object ``options``
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if not line.startswith('{'):
+        return line, {}
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}") from e
+    if not isinstance(record, dict) or not record.get('url'):
+        raise ValueError("JSON line must be an object with a 'url' field")
+    url = str(record.pop('url'))
+    options = record.pop('options', None)
+    if options is None:
+        options = {}
+    elif not isinstance(options, dict):
+        raise ValueError("'options' must be a JSON object")
+    options.update(record)
+    return url, options
+
+
+def read_url_items(path: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Read a plain-text or JSONL URL list / 读取纯文本或 JSONL 格式的URL列表
+
+    Invalid lines are logged and skipped.
+
+    Returns:
+        List of (url, options) in file order
+    """
+    items = []
+    with open(path, encoding='utf-8') as f:
+        for lineno, line in enumerate(f, 1):
+            try:
+                item = parse_input_line(line)
+            except ValueError as e:
+                logger.warning(f"{path}:{lineno}: skipped, {e}")
+                continue
+            if item is not None:
+                items.append(item)
+    return items
+
+
+__all__ = ['JsonlWriter', 'parse_input_line', 'read_url_items', 'STDOUT']
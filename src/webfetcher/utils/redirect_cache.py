@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Persistent Redirect Cache
+持久化重定向缓存
+
+Remembers ``input URL -> final URL`` mappings observed by real fetches so
+that parser/UA selection for a known short link (xhslink.com, t.cn, ...) can
+use the final host without a separate HEAD round-trip before the fetch.
+记录真实抓取观察到的 ``输入 URL -> 最终 URL`` 映射，使已知短链接在抓取前即可
+按最终主机选择解析器和 UA，而无需额外的 HEAD 请求。
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = Path.home() / ".cache" / "webfetcher" / "redirects.json"
+DEFAULT_TTL = 7 * 86400  # 7 days
+DEFAULT_MAX_ENTRIES = 2000
+SAVE_INTERVAL = 5.0  # seconds between writes; pending entries are flushed at exit
+
+
+class RedirectCache:
+    """
+    JSON-file backed redirect cache with TTL and size bound.
+    基于 JSON 文件的重定向缓存，支持 TTL 和容量上限。
+
+    All I/O errors are logged and swallowed: the cache is an optimisation and
+    must never make a fetch fail.
+
+    Writes are batched: new redirects are merged into the file's current
+    contents at most every SAVE_INTERVAL seconds (and at exit), outside the
+    lock, so concurrent wf processes keep each other's entries and put()
+    does not rewrite the file for every redirect.
+    新记录最多每 SAVE_INTERVAL 秒（及退出时）在锁外合并写入磁盘，多个 wf 进程不会互相覆盖。
+    """
+
+    def __init__(self, path: Path = CACHE_FILE, ttl: int = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Optional[dict] = None
+        self._pending: Dict[str, dict] = {}  # entries not yet written
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # serializes read-merge-write cycles
+        self._last_save = 0.0
+        self._flush_registered = False
+
+    def _read_file(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable redirect cache {self.path}: {e}")
+            return {}
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            self._entries = self._read_file()
+        return self._entries
+
+    def _merge(self, entries: dict, new: Dict[str, dict]):
+        """Add new entries in place (newest timestamp wins), re-inserted as most recent"""
+        for url, entry in new.items():
+            current = entries.pop(url, None)
+            if isinstance(current, dict) and current.get('timestamp', 0) > entry['timestamp']:
+                entry = current
+            entries[url] = entry
+        while len(entries) > self.max_entries:
+            entries.pop(next(iter(entries)))
+
+    def _save(self):
+        """Merge pending entries into the file on disk / 将未保存的记录合并写入磁盘"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._save_lock:
+            entries = self._read_file()
+            self._merge(entries, pending)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.debug(f"Failed to write redirect cache {self.path}: {e}")
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Get cached final URL for a URL, or None if unknown/expired
+        获取 URL 的缓存最终地址，未知或过期时返回 None
+        """
+        with self._lock:
+            entry = self._load().get(url)
+            if not entry:
+                return None
+            if time.time() > entry.get('timestamp', 0) + self.ttl:
+                return None
+            return entry.get('final_url')
+
+    def put(self, url: str, final_url: str):
+        """
+        Record an observed redirect; it is persisted with the next batched write
+        记录观察到的重定向（随下一次批量写入持久化）
+        """
+        if not url or not final_url or url == final_url:
+            return
+        now = time.time()
+        entry = {'final_url': final_url, 'timestamp': now}
+        with self._lock:
+            self._merge(self._load(), {url: entry})
+            self._pending[url] = entry
+            save = now - self._last_save >= SAVE_INTERVAL
+            if save:
+                self._last_save = now
+            elif not self._flush_registered:
+                self._flush_registered = True
+                atexit.register(self.flush)
+        if save:
+            self._save()
+
+    def flush(self):
+        """Write pending entries to disk / 将未保存的记录写入磁盘"""
+        self._save()
+
+
+_default_cache: Optional[RedirectCache] = None
+
+
+def get_redirect_cache() -> RedirectCache:
+    """Get the process-wide redirect cache / 获取进程级重定向缓存"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RedirectCache()
+    return _default_cache
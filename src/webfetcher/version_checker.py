@@ -4,13 +4,12 @@ Version checker for WebFetcher CLI
 Checks GitHub for updates without blocking main program
 """
 import os
+import sys
 import json
 import time
 import threading
 from pathlib import Path
 from typing import Optional, Tuple
-import urllib.request
-import urllib.error
 
 
 # Version check configuration
@@ -18,6 +17,7 @@ GITHUB_REPO = "ttieli/web-fetcher"
 GITHUB_API_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
 CHECK_INTERVAL = 86400  # 24 hours in seconds
 CACHE_FILE = Path.home() / ".cache" / "webfetcher" / "version_check.json"
+DISABLE_ENV = "WF_NO_UPDATE_CHECK"  # 设置后不检查更新
 
 
 def get_current_version() -> str:
@@ -149,6 +149,8 @@ def get_latest_version() -> Optional[str]:
         Optional[str]: Latest version tag or None if failed
     """
     try:
+        import urllib.request
+
         # Set timeout to avoid blocking
         req = urllib.request.Request(
             GITHUB_API_URL,
@@ -160,7 +162,7 @@ def get_latest_version() -> Optional[str]:
             tag_name = data.get('tag_name', '')
             return tag_name.lstrip('v')  # Remove 'v' prefix if present
 
-    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, Exception):
+    except Exception:
         return None
 
 
@@ -200,12 +202,32 @@ def check_for_updates_async():
     thread.start()
 
 
+def update_check_enabled() -> bool:
+    """
+    Whether this run should check for updates
+
+    Skipped when WF_NO_UPDATE_CHECK is set or stdout is not a terminal:
+    scripted runs (shell pipelines, batch jobs) would only get the notice
+    mixed into their output.
+    """
+    if os.environ.get(DISABLE_ENV):
+        return False
+    try:
+        return sys.stdout.isatty()
+    except Exception:
+        return False
+
+
 def check_for_updates():
     """
     Main entry point for version checking
     Call this at CLI startup
+
+    The 24h cache is consulted before starting the background thread, so
+    most runs only stat one small file.
     """
     try:
-        check_for_updates_async()
+        if update_check_enabled() and should_check_update():
+            check_for_updates_async()
     except Exception:
         pass  # Never let version check crash the program
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Async Fetch Benchmark
+
+Serves synthetic pages from local asyncio HTTP servers (one per loopback
+address, each response delayed by --latency ms to stand in for the network)
+and fetches them two ways:
+
+    - afetch:   all URLs in flight at once as coroutines on one event loop
+    - threads:  fetch_html_with_retry on a ThreadPoolExecutor (--threads)
+
+Both use the same per-host connection limit, so the difference is the cost
+of concurrency itself. Reports pages/s, threads alive during the run and
+connection reuse, and verifies that every page came back intact
+(Content-Length and chunked bodies alternate).
+
+Usage:
+    python tests/bench_afetch.py [--urls 2000] [--hosts 16] [--latency 50] [--threads 64]
+"""
+
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher import core
+from webfetcher.async_fetch import afetch
+from webfetcher.fetchers.async_http import get_async_http_pool
+from webfetcher.fetchers.http_pool import get_http_pool
+
+
+def page_html(path: str) -> str:
+    return (f"<html><head><title>{path}</title></head><body><h1>{path}</h1>"
+            + "<p>benchmark paragraph</p>" * 50 + f"<p id='end'>{path}</p></body></html>")
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latency: float):
+    """Minimal keep-alive HTTP/1.1 server: one page per request"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            path = request_line.split()[1].decode()
+            await asyncio.sleep(latency)
+            body = page_html(path).encode()
+            head = "HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+            if path.endswith('/chunked'):
+                half = len(body) // 2
+                writer.write((head + "Transfer-Encoding: chunked\r\n\r\n").encode())
+                for part in (body[:half], body[half:]):
+                    writer.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+                writer.write(b"0\r\n\r\n")
+            else:
+                writer.write((head + f"Content-Length: {len(body)}\r\n\r\n").encode() + body)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def start_servers(hosts: int, latency: float) -> Tuple[List[str], asyncio.AbstractEventLoop]:
+    """Start one server per loopback address on a background loop; returns base URLs"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    async def _start():
+        bases = []
+        for i in range(1, hosts + 1):
+            address = f"127.0.0.{i}"
+            try:
+                server = await asyncio.start_server(lambda r, w: _handle(r, w, latency), address, 0, backlog=4096)
+            except OSError:
+                break  # loopback aliases beyond 127.0.0.1 are unavailable on this platform
+            bases.append(f"http://{address}:{server.sockets[0].getsockname()[1]}")
+        return bases
+
+    return asyncio.run_coroutine_threadsafe(_start(), loop).result(), loop
+
+
+def make_urls(bases: List[str], count: int) -> List[str]:
+    return [f"{bases[i % len(bases)]}/page/{i}" + ('/chunked' if i % 2 else '') for i in range(count)]
+
+
+def check(urls: List[str], pages: List[str]) -> int:
+    """Number of pages that are missing or do not end with their own marker"""
+    bad = 0
+    for url, html in zip(urls, pages):
+        path = url.split('/', 3)[3]
+        if not html or f"<p id='end'>/{path}</p>" not in html:
+            bad += 1
+    return bad
+
+
+def run_async(urls: List[str]) -> Tuple[float, List[str], int, dict]:
+    peak_threads = threading.active_count()
+
+    async def _main():
+        nonlocal peak_threads
+        tasks = [asyncio.ensure_future(afetch(url, fetch_mode='urllib', timeout=30)) for url in urls]
+        while not all(task.done() for task in tasks):
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.01)
+        stats = get_async_http_pool().get_stats()
+        await get_async_http_pool().close()
+        return [task.result()[0] if not task.exception() else '' for task in tasks], stats
+
+    start = time.perf_counter()
+    pages, stats = asyncio.run(_main())
+    return time.perf_counter() - start, pages, peak_threads, stats
+
+
+def run_threads(urls: List[str], threads: int) -> Tuple[float, List[str], int, dict]:
+    peak_threads = threading.active_count()
+
+    def _fetch(url: str) -> str:
+        nonlocal peak_threads
+        peak_threads = max(peak_threads, threading.active_count())
+        try:
+            return core.fetch_html_with_retry(url, fetch_mode='urllib', timeout=30)[0]
+        except Exception:
+            return ''
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pages = list(executor.map(_fetch, urls))
+    return time.perf_counter() - start, pages, peak_threads, get_http_pool().get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark afetch against threaded fetch_html_with_retry")
+    parser.add_argument('--urls', type=int, default=2000, help="URLs to fetch")
+    parser.add_argument('--hosts', type=int, default=16, help="Loopback hosts (127.0.0.N) to spread URLs over")
+    parser.add_argument('--latency', type=float, default=50, help="Server response delay in ms")
+    parser.add_argument('--threads', type=int, default=64, help="Thread pool size for the blocking run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    core.configure_http_cache(None, enabled=False)
+    bases, _ = start_servers(args.hosts, args.latency / 1000)
+    urls = make_urls(bases, args.urls)
+    print(f"URLs: {len(urls)} over {len(bases)} hosts, latency {args.latency:g} ms")
+
+    failures = 0
+    for name, runner in (('afetch', lambda: run_async(urls)),
+                         (f'threads x{args.threads}', lambda: run_threads(urls, args.threads))):
+        elapsed, pages, peak_threads, stats = runner()
+        bad = check(urls, pages)
+        failures += bad
+        print(f"  {name:<12} {elapsed:7.2f}s  {len(urls) / elapsed:8.1f} pages/s  "
+              f"threads {peak_threads:4d}  connections {stats['connections_created']:4d}  "
+              f"reuse {stats['reuse_rate']:5.1f}%  bad {bad}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
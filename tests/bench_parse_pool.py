@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Parse Pool Scaling Benchmark
+
+Generates synthetic documentation pages and feeds them through
+StreamingSiteAggregator (the crawl parse stage) with ParsePool at several
+worker counts, reporting pages/s and speedup over in-process parsing. The
+aggregate document of every run is compared with the in-process one, so the
+benchmark also verifies that parallel parsing keeps page order and output.
+
+Parse throughput should scale close to linearly up to the number of cores.
+
+Usage:
+    python tests/bench_parse_pool.py [--pages 200] [--paragraphs 300] [--workers 1,2,4,8]
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher.core import StreamingSiteAggregator, generic_to_markdown
+from webfetcher.parsing.pool import ParsePool
+
+
+# Per-page fetch timestamps differ between runs; ignore them when comparing output
+_TIMESTAMP = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+
+
+def generate_pages(count: int, paragraphs: int) -> List[Tuple[str, str, int]]:
+    """Generate (url, html, depth) tuples shaped like a documentation crawl."""
+    pages = []
+    for i in range(count):
+        body = ''.join(
+            f"<h2>Section {k}</h2><p>Paragraph {k} of page {i} with <a href='/docs/p{(i + k) % count}.html'>a link</a>, "
+            f"<code>inline code</code> and <strong>emphasis</strong>.</p><ul><li>item one</li><li>item two</li></ul>"
+            for k in range(paragraphs)
+        )
+        html = (f"<html><head><title>Page {i}</title></head><body><nav><a href='/'>Home</a></nav>"
+                f"<main><h1>Page {i}</h1>{body}</main><footer>footer</footer></body></html>")
+        pages.append((f"https://docs.example.com/docs/p{i}.html", html, 0 if i == 0 else 1))
+    return pages
+
+
+def run(pages: List[Tuple[str, str, int]], workers: int) -> Tuple[float, str]:
+    """Parse all pages with the given worker count; returns (seconds, document)."""
+    with ParsePool(workers=workers, preload_modules=('webfetcher.core',)) as pool:
+        if pool.parallel:
+            # Start the workers outside the timed region (a crawl overlaps this with fetching)
+            pool.result(pool.submit(os.getpid))
+        aggregator = StreamingSiteAggregator(generic_to_markdown, parse_pool=pool)
+        start = time.perf_counter()
+        for url, html, depth in pages:
+            aggregator.add_page(url, html, depth)
+        aggregator.finish()
+        elapsed = time.perf_counter() - start
+        document = aggregator.get_document()
+        aggregator.close()
+    return elapsed, _TIMESTAMP.sub('<time>', document)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark process-pool parsing of crawled pages")
+    parser.add_argument('--pages', type=int, default=200, help="Number of synthetic pages")
+    parser.add_argument('--paragraphs', type=int, default=300, help="Sections per page (page size)")
+    parser.add_argument('--workers', default='1,2,4,8', help="Comma-separated worker counts (1 = in-process)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    pages = generate_pages(args.pages, args.paragraphs)
+    size_mb = sum(len(html) for _, html, _ in pages) / (1024 * 1024)
+    print(f"Pages: {len(pages)} ({size_mb:.1f}MB HTML), CPUs: {os.cpu_count()}")
+
+    baseline_time, baseline_doc = run(pages, 1)
+    print(f"  {'in-process':<12} {baseline_time:8.2f}s  {len(pages) / baseline_time:8.1f} pages/s")
+
+    mismatches = 0
+    for workers in [int(w) for w in args.workers.split(',') if int(w) > 1]:
+        elapsed, document = run(pages, workers)
+        same = document == baseline_doc
+        mismatches += not same
+        print(f"  {f'{workers} workers':<12} {elapsed:8.2f}s  {len(pages) / elapsed:8.1f} pages/s  "
+              f"speedup {baseline_time / elapsed:4.1f}x  {'identical' if same else 'OUTPUT DIFFERS'}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Routing Dispatch Microbenchmark
+
+Generates a routing.yaml with many synthetic rules (domain, domain_list,
+domain + url_pattern, url_pattern only, plus the default rule), then compares:
+
+    - linear:   the pre-dispatch algorithm (every compiled matcher in priority order)
+    - dispatch: RoutingEngine.evaluate with the decision cache disabled
+    - cached:   RoutingEngine.evaluate with the per-host decision cache enabled
+                (hits only for hosts whose decision cannot depend on the path,
+                so it reports its real hit rate)
+
+A sample of decisions is checked against the linear scan so the benchmark also
+verifies that priority order and RoutingDecision output are preserved.
+
+Usage:
+    python tests/bench_routing_dispatch.py [--rules 10000] [--urls 5000] [--rounds 3] [--check 500] [--seed 42]
+"""
+
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List
+
+import yaml
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher.routing import RoutingEngine
+
+
+def generate_rules(count: int, rng: random.Random) -> List[dict]:
+    """Generate synthetic routing rules with a realistic mix of conditions."""
+    rules = []
+    for i in range(count):
+        kind = i % 20
+        if kind < 12:
+            conditions = {'domain': f"d{i}.com"}
+        elif kind < 16:
+            conditions = {'domain_list': [f"l{i}a.net", f"l{i}b.net"]}
+        elif kind < 19:
+            conditions = {'domain': f"p{i}.org", 'url_pattern': f".*/section{i}/.*"}
+        else:
+            conditions = {'url_pattern': f".*/only{i}/\\d+$"}
+        rules.append({
+            'name': f"Synthetic rule {i}",
+            'priority': rng.randint(2, 1000),
+            'enabled': True,
+            'conditions': conditions,
+            'action': {'fetcher': rng.choice(['urllib', 'selenium', 'manual_chrome']),
+                       'reason': f"synthetic {i}"},
+        })
+    rules.append({
+        'name': "Default - Static Sites",
+        'priority': 1,
+        'enabled': True,
+        'conditions': {'always': True},
+        'action': {'fetcher': 'urllib', 'reason': "Standard static content"},
+    })
+    return rules
+
+
+def generate_urls(rule_count: int, count: int, rng: random.Random) -> List[str]:
+    """Generate URLs hitting domain rules, pattern rules and nothing at all."""
+    urls = []
+    for n in range(count):
+        i = rng.randrange(rule_count)
+        kind = i % 20
+        page = f"page{n}"
+        if kind < 12:
+            urls.append(f"https://www.d{i}.com/{page}")
+        elif kind < 16:
+            urls.append(f"https://l{i}b.net/{page}")
+        elif kind < 19:
+            section = i if rng.random() < 0.5 else i + 1
+            urls.append(f"https://p{i}.org/section{section}/{page}")
+        elif rng.random() < 0.5:
+            urls.append(f"https://other{n}.example/only{i}/{n}")
+        else:
+            urls.append(f"https://unknown{n}.example/{page}")
+    return urls
+
+
+def write_config(rules: List[dict], directory: Path, cache_ttl: int) -> Path:
+    """Write a routing.yaml for the given rules."""
+    path = directory / f"routing_ttl{cache_ttl}.yaml"
+    config = {
+        'version': "1.0",
+        'global': {'default_fetcher': 'urllib', 'cache_ttl': cache_ttl},
+        'rules': rules,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    return path
+
+
+def linear_evaluate(engine: RoutingEngine, url: str) -> str:
+    """Reference: evaluate every compiled matcher in priority order."""
+    for rule, matcher in engine._compiled_rules:
+        if matcher.matches(url):
+            return rule['name']
+    return "default"
+
+
+def bench(label: str, func, urls: List[str], rounds: int) -> float:
+    """Run func over all URLs and report the best round."""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for url in urls:
+            func(url)
+        best = min(best, time.perf_counter() - start)
+    per_eval = best / len(urls) * 1e6
+    print(f"  {label:<10} {best:8.3f}s  {per_eval:10.1f} us/eval")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark host-indexed routing dispatch")
+    parser.add_argument('--rules', type=int, default=10000, help="Number of synthetic rules")
+    parser.add_argument('--urls', type=int, default=5000, help="Number of URLs per round")
+    parser.add_argument('--rounds', type=int, default=3, help="Rounds per mode (best is reported)")
+    parser.add_argument('--check', type=int, default=500, help="URLs verified against the linear scan")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = random.Random(args.seed)
+    rules = generate_rules(args.rules, rng)
+    urls = generate_urls(args.rules, args.urls, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        start = time.perf_counter()
+        uncached = RoutingEngine(str(write_config(rules, tmp_path, cache_ttl=0)))
+        cached = RoutingEngine(str(write_config(rules, tmp_path, cache_ttl=3600)))
+        load_time = (time.perf_counter() - start) / 2
+
+    print(f"Rules: {args.rules + 1}, URLs: {len(urls)}, rounds: {args.rounds}")
+    print(f"Load + compile: {load_time:.2f}s per engine")
+    print(f"Dispatch table: {uncached.get_stats()}")
+
+    # Correctness: dispatch must pick the same rule as the linear scan.
+    # The linear scan is slow with many rules, so it runs on a sample.
+    check_urls = urls[:max(1, min(args.check, len(urls)))]
+    start = time.perf_counter()
+    expected = [linear_evaluate(uncached, url) for url in check_urls]
+    linear = (time.perf_counter() - start) / len(check_urls)
+    mismatches = 0
+    for url, rule_name in zip(check_urls, expected):
+        for engine in (uncached, cached):
+            if engine.evaluate(url).rule_name != rule_name:
+                mismatches += 1
+    print(f"Decisions checked: {len(check_urls) * 2}, mismatches: {mismatches}")
+
+    print("Timings:")
+    print(f"  {'linear':<10} {linear * len(urls):8.3f}s  {linear * 1e6:10.1f} us/eval (sampled)")
+    dispatch = bench('dispatch', uncached.evaluate, urls, args.rounds)
+    warm = bench('cached', cached.evaluate, urls, args.rounds)
+    linear_total = linear * len(urls)
+    print(f"Speedup vs linear: dispatch {linear_total / dispatch:.0f}x, cached {linear_total / warm:.0f}x")
+    print(f"Decision cache hit rate: {cached.get_stats()['cache_hit_rate']:.1f}%")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Per-URL Batch Option Tests
+
+Checks JSONL input parsing and that per-URL options get the same type
+coercion and fetch-mode shortcuts as command-line arguments.
+
+Usage:
+    python -m pytest tests/test_batch_options.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher import core
+from webfetcher.batch import _validate_options
+from webfetcher.utils.jsonl import parse_input_line
+
+URL = 'https://example.com/'
+
+
+def validate(options, argv=()):
+    parser = core.build_arg_parser()
+    args = core.normalize_args(parser.parse_args([URL] + list(argv)), configure_globals=False)
+    [(_, overrides)] = _validate_options([(URL, options)], parser, args)
+    return overrides
+
+
+def test_parse_input_line_merges_options():
+    line = '{"url": "%s", "options": {"timeout": 10}, "filter": "none"}' % URL
+    assert parse_input_line(line) == (URL, {'timeout': 10, 'filter': 'none'})
+    assert parse_input_line(URL) == (URL, {})
+    assert parse_input_line('# comment') is None
+
+
+@pytest.mark.parametrize('line', [
+    '{"url": "%s", "options": ["cdp"]}' % URL,
+    '{"url": "%s", "options": "cdp"}' % URL,
+    '{"options": {}}',
+    '{"url": ',
+])
+def test_parse_input_line_rejects_malformed_lines(line):
+    with pytest.raises(ValueError):
+        parse_input_line(line)
+
+
+def test_string_values_are_coerced():
+    assert validate({'timeout': '10', 'crawl_delay': '0.5'}) == {'timeout': 10, 'crawl_delay': 0.5}
+
+
+def test_invalid_values_are_dropped():
+    assert validate({'timeout': 'soon', 'fetch_mode': 'telnet', 'json': 'yes', 'filter': 'none'}) == {'filter': 'none'}
+
+
+def test_unknown_and_batch_level_options_are_dropped():
+    assert validate({'no_such_option': 1, 'jsonl': 'out.jsonl', 'cache_dir': '/tmp'}) == {}
+
+
+def test_shortcut_sets_fetch_mode():
+    overrides = validate({'cdp': True})
+    assert overrides['fetch_mode'] == 'cdp'
+
+
+def test_fetch_mode_overrides_shared_shortcut():
+    overrides = validate({'fetch_mode': 'urllib'}, argv=['--cdp'])
+    assert overrides['fetch_mode'] == 'urllib'
+    assert validate({'timeout': 5}, argv=['--cdp']) == {'timeout': 5}
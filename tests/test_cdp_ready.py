@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+PageReadyWaiter Event-Replay Tests
+
+Drives PageReadyWaiter with a fake pychrome tab that replays recorded CDP
+event sequences (main document, iframes, leftovers from the previous page
+of a pooled tab) and checks which navigation the waiter considers ready.
+
+Usage:
+    python -m pytest tests/test_cdp_ready.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher.fetchers.cdp_ready import (
+    PageReadyWaiter, READY_NETWORK_IDLE, READY_TIMEOUT,
+)
+
+MAIN_FRAME = 'MAIN'
+
+
+class FakeTab:
+    """pychrome tab stand-in: Page.navigate returns ids and replays events"""
+
+    def __init__(self, events, loader_id='L1', events_before_return=False):
+        self.listeners = {}
+        self.events = events
+        self.loader_id = loader_id
+        self.events_before_return = events_before_return
+        self.Page = self
+
+    def set_listener(self, event, handler):
+        self.listeners[event] = handler
+
+    def replay(self):
+        for event, params in self.events:
+            handler = self.listeners.get(event)
+            if handler:
+                handler(**params)
+
+    def navigate(self, url, **kwargs):
+        if self.events_before_return:
+            self.replay()  # events delivered before the command response
+        else:
+            threading.Timer(0.02, self.replay).start()
+        return {'frameId': MAIN_FRAME, 'loaderId': self.loader_id}
+
+
+def document(request_id, loader_id, frame_id):
+    return ('Network.requestWillBeSent',
+            {'requestId': request_id, 'loaderId': loader_id, 'frameId': frame_id, 'type': 'Document'})
+
+
+def finished(request_id):
+    return ('Network.loadingFinished', {'requestId': request_id})
+
+
+DOM_CONTENT = ('Page.domContentEventFired', {})
+LOAD = ('Page.loadEventFired', {})
+
+
+def wait_ready(tab, timeout=3.0):
+    with PageReadyWaiter(tab, idle_time=0.05) as waiter:
+        waiter.navigate('https://example.com/')
+        return waiter.wait(timeout=timeout)
+
+
+def test_page_without_iframes_is_ready_after_load():
+    tab = FakeTab([document('1', 'L1', MAIN_FRAME), finished('1'), DOM_CONTENT, LOAD])
+    reason, elapsed = wait_ready(tab)
+    assert reason == READY_NETWORK_IDLE
+    assert elapsed < 1.0
+
+
+def test_iframe_document_does_not_hide_main_load():
+    # load fires after the iframe document, whose loaderId differs from the main frame's
+    tab = FakeTab([
+        document('1', 'L1', MAIN_FRAME), finished('1'), DOM_CONTENT,
+        document('2', 'IFRAME-L', 'CHILD'), finished('2'),
+        document('3', 'IFRAME-L2', 'CHILD2'), finished('3'),
+        LOAD,
+    ])
+    reason, elapsed = wait_ready(tab)
+    assert reason == READY_NETWORK_IDLE
+    assert elapsed < 1.0
+
+
+def test_events_before_navigate_returns_are_attributed():
+    tab = FakeTab([document('1', 'L1', MAIN_FRAME), finished('1'),
+                   document('2', 'IFRAME-L', 'CHILD'), finished('2'), DOM_CONTENT, LOAD],
+                  events_before_return=True)
+    reason, _ = wait_ready(tab)
+    assert reason == READY_NETWORK_IDLE
+
+
+def test_previous_page_load_is_ignored():
+    # A pooled tab delivering the previous navigation's load event
+    tab = FakeTab([document('1', 'L0', MAIN_FRAME), finished('1'), LOAD], loader_id='L1')
+    start = time.monotonic()
+    reason, _ = wait_ready(tab, timeout=0.3)
+    assert reason == READY_TIMEOUT
+    assert time.monotonic() - start >= 0.3
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+ContentFilter Golden-Output Tests
+
+Runs every HTML page in tests/fixtures/content_filter through ContentFilter
+at each filter level and compares the filtered document with the stored
+golden output (<page>.<level>.golden.html), so changes to the filter
+implementation cannot silently change what gets removed.
+
+Usage:
+    python -m pytest tests/test_content_filter_golden.py
+    python tests/test_content_filter_golden.py --update   # regenerate golden files
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+bs4 = pytest.importorskip('bs4') if __name__ != '__main__' else __import__('bs4')
+
+from webfetcher.core import ContentFilter
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'content_filter'
+LEVELS = ('none', 'safe', 'moderate', 'aggressive')
+PAGES = sorted(path for path in FIXTURES.glob('*.html') if not path.name.endswith('.golden.html'))
+
+
+def render(page: Path, level: str) -> str:
+    """Filter one fixture page at the given level (stdlib parser for stable output)."""
+    soup = bs4.BeautifulSoup(page.read_text(encoding='utf-8'), 'html.parser')
+    return str(ContentFilter(level).filter_content(soup))
+
+
+def golden_path(page: Path, level: str) -> Path:
+    return page.with_name(f"{page.stem}.{level}.golden.html")
+
+
+@pytest.mark.parametrize('level', LEVELS)
+@pytest.mark.parametrize('page', PAGES, ids=lambda page: page.stem)
+def test_matches_golden_output(page, level):
+    assert render(page, level) == golden_path(page, level).read_text(encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate ContentFilter golden outputs")
+    parser.add_argument('--update', action='store_true', help="Write golden files from the current implementation")
+    args = parser.parse_args()
+
+    if not args.update:
+        return pytest.main([__file__, '-q'])
+    for page in PAGES:
+        for level in LEVELS:
+            golden_path(page, level).write_text(render(page, level), encoding='utf-8')
+            print(f"  wrote {golden_path(page, level).name}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+wf serve Authentication Tests
+
+Starts the daemon's socket servers (Unix socket and loopback TCP) on
+temporary addresses and checks the token handshake in both directions:
+only requests signed with the owner's token are served (everything else,
+shutdown included, is answered with "run locally" and never reaches
+FetchService), and the client sends nothing but a nonce to a peer that
+cannot prove it holds the token.
+
+Usage:
+    python -m pytest tests/test_daemon_auth.py
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher.daemon import client as daemon_client
+from webfetcher.daemon import server as daemon_server
+from webfetcher.daemon.protocol import (
+    connect, ensure_token, read_message, read_token, request_auth, write_message,
+)
+
+TOKEN = 'a' * 64
+
+
+def send_raw(address, *messages):
+    """Send messages on one connection without a handshake, returning every reply"""
+    replies = []
+    with connect(address) as sock, sock.makefile('rwb') as stream:
+        for message in messages:
+            write_message(stream, message)
+            reply = read_message(stream)
+            replies.append(reply)
+            if reply is None or not reply.get('ok'):
+                break
+    return replies
+
+
+class RecordingService:
+    """FetchService stand-in that records what reached it"""
+
+    def __init__(self, response=None):
+        self.handled = []
+        self.response = response
+
+    def handle(self, message):
+        self.handled.append(message)
+        return self.response or {'ok': True, 'op': message.get('op')}
+
+
+def start(server):
+    server.token = TOKEN
+    server.service = RecordingService()
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return server
+
+
+@pytest.fixture(params=['unix', 'tcp'])
+def running(request, tmp_path):
+    if request.param == 'unix':
+        if not hasattr(daemon_server, '_UnixServer'):
+            pytest.skip("AF_UNIX not available")
+        server = start(daemon_server._bind_unix(str(tmp_path / 'wf.sock')))
+        address = str(tmp_path / 'wf.sock')
+    else:
+        server = start(daemon_server._TCPServer(('127.0.0.1', 0), daemon_server._RequestHandler))
+        address = server.server_address[:2]
+    yield server, address
+    server.shutdown()
+    server.server_close()
+
+
+def test_owner_token_is_served(running):
+    server, address = running
+    response = daemon_client.request({'op': 'ping'}, address, token=TOKEN)
+    assert response == {'ok': True, 'op': 'ping'}
+    assert len(server.service.handled) == 1
+
+
+def test_wrong_token_is_refused_by_the_client(running):
+    server, address = running
+    with pytest.raises(daemon_client.ServerUnavailable):
+        daemon_client.request({'op': 'ping'}, address, token='b' * 64)
+    assert server.service.handled == []
+
+
+@pytest.mark.parametrize('first', [
+    {'op': 'fetch', 'argv': ['https://example.com', '--html', '/etc/passwd'], 'cwd': '/', 'token': TOKEN},
+    {'op': 'hello'},
+    {'op': 'hello', 'nonce': 12345},
+])
+def test_requests_without_handshake_run_locally(running, first):
+    server, address = running
+    [response] = send_raw(address, first)
+    assert response['ok'] is False and response['local'] is True
+    assert server.service.handled == []
+
+
+@pytest.mark.parametrize('auth', [None, '', 'b' * 64, TOKEN])
+def test_requests_without_valid_signature_run_locally(running, auth):
+    server, address = running
+    message = {'op': 'fetch', 'argv': ['https://example.com', '--html', '/etc/passwd'], 'cwd': '/'}
+    if auth is not None:
+        message['auth'] = auth
+    hello, response = send_raw(address, {'op': 'hello', 'nonce': '0' * 32}, message)
+    assert hello['ok'] is True
+    assert response['ok'] is False and response['local'] is True
+    assert server.service.handled == []
+
+
+def test_signature_covers_request_body(running):
+    server, address = running
+    with connect(address) as sock, sock.makefile('rwb') as stream:
+        client_nonce = '1' * 32
+        write_message(stream, {'op': 'hello', 'nonce': client_nonce})
+        hello = read_message(stream)
+        signed = {'op': 'fetch', 'argv': ['https://example.com'], 'cwd': '/tmp'}
+        auth = request_auth(TOKEN, client_nonce, hello['nonce'], signed)
+        write_message(stream, dict(signed, argv=['https://example.com', '--html', '/etc/passwd'], auth=auth))
+        response = read_message(stream)
+    assert response['local'] is True
+    assert server.service.handled == []
+
+
+def test_shutdown_requires_signature(running):
+    server, address = running
+    [response] = send_raw(address, {'op': 'shutdown', 'token': TOKEN})
+    assert response['local'] is True
+    assert daemon_client.request({'op': 'ping'}, address, token=TOKEN)['ok'] is True  # still running
+
+
+def test_peer_uid_mismatch_is_rejected(running, monkeypatch):
+    server, address = running
+    monkeypatch.setattr(daemon_server, '_peer_uid', lambda sock: -1)
+    if not hasattr(os, 'getuid'):
+        pytest.skip("no uids on this platform")
+    [response] = send_raw(address, {'op': 'hello', 'nonce': '0' * 32})
+    assert response['local'] is True and 'uid' in response['error']
+
+
+def test_impostor_never_receives_token_or_argv(tmp_path, monkeypatch):
+    """A process squatting on the TCP port only sees the client's hello"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    received = []
+
+    def impostor():
+        conn, _ = listener.accept()
+        with conn, conn.makefile('rwb') as stream:
+            received.append(read_message(stream))
+            write_message(stream, {'ok': True, 'nonce': '2' * 32, 'proof': '0' * 64})
+            received.append(stream.readline())
+
+    thread = threading.Thread(target=impostor, daemon=True)
+    thread.start()
+    monkeypatch.setattr(daemon_client, 'read_token', lambda: TOKEN)
+    exit_code = daemon_client.run_via_server(['https://example.com', '--jsonl', str(tmp_path / 'x.jsonl')],
+                                             listener.getsockname())
+    thread.join(2)
+    listener.close()
+    assert exit_code is None  # fell back to running in-process
+    assert received[0]['op'] == 'hello' and set(received[0]) == {'op', 'nonce'}
+    assert received[1] == b''
+    assert TOKEN not in json.dumps(received[0])
+
+
+def test_jsonl_goes_only_to_the_clients_path(running, tmp_path, monkeypatch):
+    server, address = running
+    evil = tmp_path / 'evil.jsonl'
+    mine = tmp_path / 'mine.jsonl'
+    server.service.response = {'ok': True, 'exit_code': 0, 'result': {'url': 'https://example.com/'},
+                               'jsonl': str(evil)}
+    monkeypatch.setattr(daemon_client, 'read_token', lambda: TOKEN)
+    assert daemon_client.run_via_server(['https://example.com', '--jsonl', str(mine)], address) == 0
+    assert daemon_client.run_via_server(['https://example.com'], address) == 0
+    assert not evil.exists()
+    assert [json.loads(line) for line in mine.read_text().splitlines()] == [{'url': 'https://example.com/'}]
+
+
+def test_tcp_is_not_a_silent_fallback(monkeypatch):
+    from webfetcher.daemon import protocol
+    monkeypatch.delenv(protocol.SERVER_ENV, raising=False)
+    monkeypatch.delattr(protocol.socket, 'AF_UNIX', raising=False)
+    assert protocol.default_address() is None
+    assert daemon_client.run_via_server(['https://example.com']) is None
+    monkeypatch.setenv(protocol.SERVER_ENV, '127.0.0.1:8765')
+    assert protocol.default_address() == ('127.0.0.1', 8765)
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permissions")
+def test_token_file_is_owner_only(tmp_path):
+    path = tmp_path / 'cache' / 'wf.token'
+    token = ensure_token(path)
+    assert read_token(path) == token and len(token) == 64
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert ensure_token(path) == token  # reused while permissions are tight
+
+    os.chmod(path, 0o644)
+    replaced = ensure_token(path)
+    assert replaced != token
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
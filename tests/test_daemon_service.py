@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+wf serve Request Context Tests
+
+Checks that a fetch served by the daemon runs with the client's view of the
+process: the forwarded environment variables take the client's values (not
+the daemon's), what the fetch prints is returned in the response instead of
+landing on the daemon's stderr, and the client prints it back.
+
+Usage:
+    python -m pytest tests/test_daemon_service.py
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher import core
+from webfetcher.daemon import client as daemon_client
+from webfetcher.daemon import server as daemon_server
+from webfetcher.utils.environment import getenv
+
+URL = 'https://example.com/'
+
+
+@pytest.fixture
+def service(monkeypatch):
+    seen = []
+
+    def process_url(url, args):
+        seen.append({'legacy_image_mode': args.legacy_image_mode, 'lang': getenv('LANG')})
+        print(f"Selenium error for {url}", file=sys.stderr)
+        return core.PageResult(url=url, input_url=url, status='failed', paths=['/tmp/report.md'])
+
+    monkeypatch.setattr(core, 'process_url', process_url)
+    fetch_service = daemon_server.FetchService(workers=2)
+    fetch_service.seen = seen
+    return fetch_service
+
+
+def test_client_environment_replaces_the_daemons(service, monkeypatch):
+    monkeypatch.setenv('WF_LEGACY_IMAGE_MODE', '1')
+    monkeypatch.setenv('LANG', 'en_US.UTF-8')
+    service.handle({'op': 'fetch', 'argv': [URL], 'cwd': '/tmp',
+                    'env': {'WF_LEGACY_IMAGE_MODE': None, 'LANG': 'zh_CN.UTF-8'}})
+    service.handle({'op': 'fetch', 'argv': [URL], 'cwd': '/tmp', 'env': {'WF_LEGACY_IMAGE_MODE': '1'}})
+    assert service.seen == [{'legacy_image_mode': False, 'lang': 'zh_CN.UTF-8'},
+                            {'legacy_image_mode': True, 'lang': None}]
+    assert getenv('LANG') == 'en_US.UTF-8'  # outside a request: the process environment
+
+
+def test_bad_env_is_rejected(service):
+    response = service.handle({'op': 'fetch', 'argv': [URL], 'cwd': '/tmp', 'env': {'LANG': 1}})
+    assert response['ok'] is False and response['exit_code'] == 2
+    assert service.seen == []
+
+
+def test_fetch_output_is_returned_not_printed(service, capfd):
+    response = service.handle({'op': 'fetch', 'argv': [URL], 'cwd': '/tmp', 'env': {}})
+    assert response['stderr'] == f"Selenium error for {URL}\n"
+    assert response['exit_code'] == 1
+    assert capfd.readouterr().err == ''
+
+
+def test_concurrent_requests_keep_their_own_output(service):
+    responses = {}
+
+    def run(name):
+        responses[name] = service.handle({'op': 'fetch', 'argv': [f'{URL}{name}'], 'cwd': '/tmp', 'env': {}})
+
+    threads = [threading.Thread(target=run, args=(str(i),)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for name, response in responses.items():
+        assert response['stderr'] == f"Selenium error for {URL}{name}\n"
+
+
+def test_client_prints_returned_output(capsys):
+    exit_code = daemon_client._emit({'ok': True, 'exit_code': 1, 'result': {'paths': ['/tmp/report.md']},
+                                     'stdout': '', 'stderr': 'Selenium error\n'})
+    out, err = capsys.readouterr()
+    assert exit_code == 1
+    assert err == 'Selenium error\n'
+    assert out == '/tmp/report.md\n'
+
+
+def test_client_sends_forwarded_environment(monkeypatch):
+    sent = []
+    monkeypatch.setattr(daemon_client, 'request', lambda message, address: sent.append(message) or {
+        'ok': True, 'exit_code': 0, 'result': {}})
+    monkeypatch.setenv('LANG', 'zh_CN.UTF-8')
+    monkeypatch.delenv('WF_LEGACY_IMAGE_MODE', raising=False)
+    monkeypatch.delenv(daemon_client.NO_SERVER_ENV, raising=False)
+    assert daemon_client.run_via_server([URL], ('127.0.0.1', 1)) == 0
+    assert sent[0]['env']['LANG'] == 'zh_CN.UTF-8'
+    assert sent[0]['env']['WF_LEGACY_IMAGE_MODE'] is None
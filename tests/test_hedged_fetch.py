@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Hedged Fetch Recording Tests
+
+Races the urllib and CDP legs of a hedged fetch so that both finish at about
+the same time and checks that the urllib leg's per-host outcome is recorded
+exactly once: either by the leg itself (it finished before the cancel) or as
+a lost hedge by the hedger, never both.
+
+Usage:
+    python -m pytest tests/test_hedged_fetch.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher import core
+
+URL = 'https://slow.example/page'
+
+
+class RecordingStats:
+    def __init__(self):
+        self.records = []
+        self.lock = threading.Lock()
+
+    def record(self, url, method, duration, ok, error_class=None):
+        with self.lock:
+            self.records.append((method, ok, error_class))
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    recorder = RecordingStats()
+    monkeypatch.setattr(core, 'get_host_stats', lambda: recorder)
+    return recorder
+
+
+def test_cancel_and_claim_are_exclusive():
+    leg_first = core._HedgeCancel()
+    assert leg_first.claim() is True
+    assert leg_first.cancel() is False and leg_first.is_set()
+
+    hedger_first = core._HedgeCancel()
+    assert hedger_first.cancel() is True
+    assert hedger_first.claim() is False
+
+
+@pytest.mark.parametrize('urllib_delay', [0.03, 0.05, 0.07])
+def test_urllib_outcome_is_recorded_once(stats, monkeypatch, urllib_delay):
+    def urllib_fetch(url, ua, timeout):
+        time.sleep(urllib_delay)
+        return '<html>urllib</html>', core.FetchMetrics(), url
+
+    def cdp_fetch(url, ua, timeout, metrics, start_time, input_url=None):
+        time.sleep(0.04)
+        return '<html>cdp</html>', metrics, {}
+
+    monkeypatch.setattr(core, 'fetch_html_original', urllib_fetch)
+    monkeypatch.setattr(core, '_try_cdp_fetch', cdp_fetch)
+    for _ in range(10):
+        stats.records.clear()
+        html, metrics, _ = core._hedged_fetch(URL, None, 10, core.FetchMetrics(), time.time(),
+                                             URL, False, budget=0.01)
+        time.sleep(urllib_delay)  # let a losing urllib leg finish
+        urllib_records = [r for r in stats.records if r[0] == 'urllib']
+        assert len(urllib_records) == 1
+        if 'cdp' in html:
+            assert urllib_records in ([('urllib', False, core.HEDGE_LOST_ERROR_CLASS)],
+                                      [('urllib', True, None)])
+        else:
+            assert urllib_records == [('urllib', True, None)]
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+HostFetchStats Tests
+
+Drives the per-host outcome store with an injected clock: learned routing
+(preferred_method), outcome decay, urllib re-probing, the hedging budget and
+merging with outcomes written to the same file by another process.
+
+Usage:
+    python -m pytest tests/test_host_stats.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher.utils.host_stats import (
+    DECAY_HALF_LIFE, MIN_BUDGET, REPROBE_INTERVAL, SAVE_INTERVAL, HostFetchStats,
+)
+
+URL = 'https://slow.example/page'
+START = 1_700_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def stats(tmp_path, clock):
+    return HostFetchStats(tmp_path / 'host_stats.json', clock=clock)
+
+
+def record_many(stats, clock, method, count, ok, duration=1.0, step=1.0):
+    for _ in range(count):
+        stats.record(URL, method, duration, ok=ok, error_class=None if ok else 'ssl_config')
+        clock.advance(step)
+
+
+def test_failing_urllib_routes_to_working_browser_method(stats, clock):
+    record_many(stats, clock, 'urllib', 3, ok=False)
+    assert stats.preferred_method(URL) is None  # no browser evidence yet
+    record_many(stats, clock, 'cdp', 1, ok=True)
+    assert stats.preferred_method(URL) == 'cdp'
+    assert stats.last_error_class(URL) == 'ssl_config'
+
+
+def test_too_little_evidence_keeps_urllib(stats, clock):
+    record_many(stats, clock, 'urllib', 2, ok=False)
+    record_many(stats, clock, 'cdp', 2, ok=True)
+    assert stats.preferred_method(URL) is None
+
+
+def test_working_urllib_is_not_skipped(stats, clock):
+    record_many(stats, clock, 'urllib', 5, ok=False)
+    record_many(stats, clock, 'urllib', 5, ok=True)
+    record_many(stats, clock, 'cdp', 3, ok=True)
+    assert stats.preferred_method(URL) is None
+
+
+def test_failing_browser_method_is_not_preferred(stats, clock):
+    record_many(stats, clock, 'urllib', 4, ok=False)
+    record_many(stats, clock, 'cdp', 2, ok=False)
+    record_many(stats, clock, 'selenium', 2, ok=True)
+    assert stats.preferred_method(URL) == 'selenium'
+
+
+def test_outcomes_decay_with_age(stats, clock):
+    record_many(stats, clock, 'urllib', 1, ok=False, step=0)
+    assert stats.method_stats(URL)['urllib'][0] == pytest.approx(1.0)
+    clock.advance(DECAY_HALF_LIFE)
+    weight, rate = stats.method_stats(URL)['urllib']
+    assert weight == pytest.approx(0.5)
+    assert rate == 0.0
+
+
+def test_old_failures_carry_less_weight_than_recent_successes(stats, clock):
+    record_many(stats, clock, 'urllib', 6, ok=False, step=0)
+    clock.advance(4 * DECAY_HALF_LIFE)
+    record_many(stats, clock, 'urllib', 1, ok=True, step=0)
+    weight, rate = stats.method_stats(URL)['urllib']
+    assert weight == pytest.approx(6 / 16 + 1)
+    assert rate > 0.7
+
+
+def test_urllib_is_reprobed_after_interval(stats, clock):
+    record_many(stats, clock, 'urllib', 3, ok=False)
+    record_many(stats, clock, 'cdp', 2, ok=True)
+    assert stats.preferred_method(URL) == 'cdp'
+    clock.advance(REPROBE_INTERVAL + 1)
+    assert stats.preferred_method(URL) is None
+    # The re-probe failed again: back to CDP
+    record_many(stats, clock, 'urllib', 1, ok=False)
+    assert stats.preferred_method(URL) == 'cdp'
+
+
+def test_budget_is_p90_of_successful_urllib_durations(stats, clock):
+    for duration in [0.5, 1.0, 1.5, 2.0]:
+        stats.record(URL, 'urllib', duration, ok=True)
+    assert stats.budget(URL) is None  # fewer than MIN_BUDGET_SAMPLES
+    for duration in [2.5, 3.0, 3.5, 4.0, 4.5, 10.0]:
+        stats.record(URL, 'urllib', duration, ok=True)
+    stats.record(URL, 'urllib', 60.0, ok=False)
+    assert stats.budget(URL) == 4.5
+
+
+def test_budget_floor_and_all_failures(stats, clock):
+    record_many(stats, clock, 'urllib', 5, ok=True, duration=0.01)
+    assert stats.budget(URL) == MIN_BUDGET
+    other = 'https://broken.example/'
+    for _ in range(5):
+        stats.record(other, 'urllib', 30.0, ok=False)
+    assert stats.budget(other) == 0.0
+
+
+def test_save_merges_with_outcomes_from_other_processes(tmp_path, clock):
+    path = tmp_path / 'host_stats.json'
+    first = HostFetchStats(path, clock=clock)
+    second = HostFetchStats(path, clock=clock)
+    first.record(URL, 'urllib', 1.0, ok=True)  # loads the (missing) file and writes
+    second.record('https://other.example/', 'cdp', 2.0, ok=True)
+    clock.advance(SAVE_INTERVAL / 2)
+    first.record(URL, 'urllib', 1.5, ok=False, error_class='temporary')
+    first.flush()
+    second.flush()
+
+    data = json.loads(path.read_text())
+    assert [s[1] for s in data['slow.example']['urllib']] == [1.0, 1.5]
+    assert data['other.example']['cdp'][0][1] == 2.0
+    assert HostFetchStats(path, clock=clock).last_error_class(URL) == 'temporary'
+
+
+def test_save_keeps_latest_samples_per_method(tmp_path, clock):
+    path = tmp_path / 'host_stats.json'
+    writer = HostFetchStats(path, max_samples=3, clock=clock)
+    record_many(writer, clock, 'urllib', 5, ok=True, step=SAVE_INTERVAL)
+    writer.flush()
+    data = json.loads(path.read_text())
+    assert len(data['slow.example']['urllib']) == 3
+    assert data['slow.example']['urllib'][-1][0] == pytest.approx(START + 4 * SAVE_INTERVAL)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+HostPolitenessScheduler Tests
+
+Checks the per-host token bucket (request spacing and burst size), the
+per-host concurrency cap and that hosts are scheduled independently.
+
+Usage:
+    python -m pytest tests/test_politeness.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher.crawler.politeness import HostPolitenessScheduler
+
+DELAY = 0.1
+TOLERANCE = 0.02  # timer slack on slow CI machines
+
+
+def acquire_times(scheduler, urls):
+    """Acquire and release each URL in turn, returning acquisition offsets"""
+    start = time.monotonic()
+    times = []
+    for url in urls:
+        with scheduler.slot(url):
+            times.append(time.monotonic() - start)
+    return times
+
+
+def test_single_slot_spaces_requests_by_delay():
+    scheduler = HostPolitenessScheduler(delay=DELAY, per_host_limit=1)
+    times = acquire_times(scheduler, ['https://example.com/%d' % i for i in range(4)])
+    assert times[0] < TOLERANCE
+    for earlier, later in zip(times, times[1:]):
+        assert later - earlier >= DELAY - TOLERANCE
+    stats = scheduler.get_stats()
+    assert stats['acquired'] == 4
+    assert stats['throttled'] == 3
+
+
+def test_per_host_limit_allows_burst_then_scaled_rate():
+    scheduler = HostPolitenessScheduler(delay=DELAY, per_host_limit=2)
+    times = acquire_times(scheduler, ['https://example.com/%d' % i for i in range(4)])
+    # A full bucket of two tokens, then one token every delay / 2
+    assert times[1] < TOLERANCE
+    assert times[2] >= DELAY / 2 - TOLERANCE
+    assert times[3] - times[2] >= DELAY / 2 - TOLERANCE
+    assert times[3] < 2 * DELAY
+
+
+def test_zero_delay_disables_rate_limit():
+    scheduler = HostPolitenessScheduler(delay=0, per_host_limit=1)
+    times = acquire_times(scheduler, ['https://example.com/%d' % i for i in range(20)])
+    assert times[-1] < 0.05
+    assert scheduler.get_stats()['throttled'] == 0
+
+
+def test_hosts_are_scheduled_independently():
+    scheduler = HostPolitenessScheduler(delay=1.0, per_host_limit=1)
+    times = acquire_times(scheduler, ['https://a.example/', 'https://b.example/',
+                                      'https://C.EXAMPLE/page'])
+    assert times[-1] < 0.1
+    assert scheduler.get_stats()['hosts'] == 3
+
+
+def test_slots_cap_concurrency_per_host():
+    scheduler = HostPolitenessScheduler(delay=0, per_host_limit=2)
+    lock = threading.Lock()
+    active = {'example.com': 0, 'other.example': 0}
+    peak = dict(active)
+
+    def worker(url):
+        host = scheduler.host_of(url)
+        with scheduler.slot(url):
+            with lock:
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+            time.sleep(0.05)
+            with lock:
+                active[host] -= 1
+
+    urls = ['https://example.com/%d' % i for i in range(6)] + ['https://other.example/%d' % i for i in range(6)]
+    threads = [threading.Thread(target=worker, args=(url,)) for url in urls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == {'example.com': 2, 'other.example': 2}
+
+
+def test_release_frees_slot_for_waiting_thread():
+    scheduler = HostPolitenessScheduler(delay=0, per_host_limit=1)
+    url = 'https://example.com/'
+    scheduler.acquire(url)
+    acquired = threading.Event()
+
+    def waiter():
+        scheduler.acquire(url)
+        acquired.set()
+        scheduler.release(url)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    assert not acquired.wait(0.1)
+    scheduler.release(url)
+    assert acquired.wait(1.0)
+    thread.join()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+RedirectCache Tests
+
+Checks that redirect writes are batched (one write per SAVE_INTERVAL, the
+rest at flush), that flushing merges with entries written to the same file
+by another process and that the size bound holds after merging.
+
+Usage:
+    python -m pytest tests/test_redirect_cache.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher.utils.redirect_cache import RedirectCache
+
+
+def test_puts_are_batched_until_flush(tmp_path):
+    path = tmp_path / 'redirects.json'
+    cache = RedirectCache(path)
+    cache.put('https://a.example/', 'https://a.example/home')  # first put writes
+    cache.put('https://b.example/', 'https://b.example/home')  # within SAVE_INTERVAL
+    assert set(json.loads(path.read_text())) == {'https://a.example/'}
+    assert cache.get('https://b.example/') == 'https://b.example/home'
+    cache.flush()
+    assert set(json.loads(path.read_text())) == {'https://a.example/', 'https://b.example/'}
+    assert list(tmp_path.iterdir()) == [path]  # no temporary files left behind
+
+
+def test_flush_merges_with_other_processes(tmp_path):
+    path = tmp_path / 'redirects.json'
+    first = RedirectCache(path)
+    second = RedirectCache(path)
+    first.put('https://a.example/', 'https://a.example/home')
+    second.put('https://b.example/', 'https://b.example/home')
+    first.put('https://c.example/', 'https://c.example/home')
+    first.flush()
+    second.flush()
+    fresh = RedirectCache(path)
+    for host in 'abc':
+        assert fresh.get(f'https://{host}.example/') == f'https://{host}.example/home'
+
+
+def test_merge_keeps_newest_entries_within_bound(tmp_path):
+    path = tmp_path / 'redirects.json'
+    first = RedirectCache(path, max_entries=2)
+    second = RedirectCache(path, max_entries=2)
+    first.put('https://old.example/', 'https://old.example/1')
+    second.put('https://a.example/', 'https://a.example/home')
+    second.put('https://b.example/', 'https://b.example/home')
+    second.flush()
+    assert set(json.loads(path.read_text())) == {'https://a.example/', 'https://b.example/'}
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Routing Broken-Action Fallthrough Tests
+
+A rule whose action cannot be turned into a RoutingDecision is skipped and
+evaluation continues with the next rule in priority order, whether the
+broken rule is url_pattern-only (merged in by the dispatch table's combined
+filter) or the host-only rule that ends a host's candidate list.
+
+Usage:
+    python -m pytest tests/test_routing_fallthrough.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+yaml = pytest.importorskip('yaml')
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from webfetcher.routing import RoutingEngine
+
+
+def rule(name, priority, conditions, fetcher):
+    return {'name': name, 'priority': priority, 'enabled': True, 'conditions': conditions,
+            'action': {'fetcher': fetcher, 'reason': name}}
+
+
+RULES = [
+    rule("Broken pattern", 100, {'url_pattern': r'.*/broken/.*'}, 'selenium'),
+    rule("Broken host", 90, {'domain': 'twice.example'}, 'selenium'),
+    rule("Second host rule", 80, {'domain_list': ['twice.example', 'other.example']}, 'manual_chrome'),
+    rule("Example host", 50, {'domain': 'example.com'}, 'manual_chrome'),
+    rule("Later pattern", 40, {'url_pattern': r'.*/broken/later$'}, 'selenium'),
+    rule("Default", 1, {'always': True}, 'urllib'),
+]
+
+
+@pytest.fixture(params=[0, 3600], ids=['uncached', 'cached'])
+def engine(request, tmp_path):
+    path = tmp_path / 'routing.yaml'
+    config = {'version': "1.0", 'global': {'default_fetcher': 'urllib', 'cache_ttl': request.param},
+              'rules': RULES}
+    path.write_text(yaml.safe_dump(config, sort_keys=False), encoding='utf-8')
+    engine = RoutingEngine(str(path))
+    # Break the actions after loading, so schema validation cannot reject the config
+    for entry in engine._dispatch.entries:
+        if entry.rule['name'].startswith('Broken'):
+            del entry.rule['action']['fetcher']
+    return engine
+
+
+@pytest.mark.parametrize('url, rule_name', [
+    ('https://example.com/broken/page', 'Example host'),      # broken pattern rule, then host rule
+    ('https://nowhere.example/broken/later', 'Later pattern'),  # next pattern-only rule
+    ('https://nowhere.example/broken/page', 'Default'),
+    ('https://twice.example/page', 'Second host rule'),        # broken rule ended the candidate list
+    ('https://twice.example/broken/page', 'Second host rule'),
+])
+def test_broken_action_falls_through_in_rule_order(engine, url, rule_name):
+    for _ in range(2):  # second call may be served from the decision cache
+        assert engine.evaluate(url).rule_name == rule_name